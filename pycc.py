@@ -10,17 +10,92 @@ Usage examples:
 from __future__ import annotations
 
 import argparse
+import re
 import sys
-from typing import Dict, List, Optional
+from typing import BinaryIO, Dict, List, Optional, Tuple
 
 import os
 import tempfile
 import subprocess
+from concurrent.futures import ProcessPoolExecutor, as_completed
 
 from pycc.preprocessor import Preprocessor
 
+from pycc.cache import ObjectCache
 from pycc.compiler import Compiler
-from pycc.toolchain import Toolchain
+from pycc.toolchain import Toolchain, linker_for_fuse_ld, staging_dir
+
+
+class _ChunkedWriter:
+    """Minimal text sink that encodes and writes in ~1 MiB chunks.
+
+    The preprocessor emits one short string per line; batching them keeps
+    the number of write() calls on the underlying binary stream small.
+    """
+
+    def __init__(self, raw: BinaryIO, encoding: str, chunk_size: int = 1 << 20) -> None:
+        self._raw = raw
+        self._encoding = encoding
+        self._chunk_size = chunk_size
+        self._parts: List[str] = []
+        self._pending = 0
+
+    def write(self, s: str) -> int:
+        self._parts.append(s)
+        self._pending += len(s)
+        if self._pending >= self._chunk_size:
+            self._drain()
+        return len(s)
+
+    def flush(self) -> None:
+        self._drain()
+        self._raw.flush()
+
+    def _drain(self) -> None:
+        if self._parts:
+            self._raw.write("".join(self._parts).encode(self._encoding))
+            self._parts = []
+            self._pending = 0
+
+
+# One -D operand: NAME, NAME=VALUE or NAME(PARAMS)=VALUE (surrounding
+# whitespace ignored).  A function-like NAME(PARAMS) is kept whole as the key.
+_D_RE = re.compile(r"^\s*([A-Za-z_]\w*(?:\([^)]*\))?)\s*(?:=\s*(.*?)\s*)?$", re.DOTALL)
+
+
+def _parse_macro_options(defines: List[str], undefines: List[Optional[str]]) -> Dict[str, str]:
+    """Build the initial macro table from -D/-U operands, in that order.
+
+    Raises ``ValueError`` with a user-facing message on a malformed operand.
+    """
+    macros: Dict[str, str] = {}
+    for item in defines:
+        if not item:
+            continue
+        m = _D_RE.match(item)
+        if m is None:
+            raise ValueError(f"invalid -D argument: {item!r}")
+        name, val = m.groups()
+        macros[name] = "1" if val is None else val
+    for name in undefines:
+        if name is None:
+            continue
+        name = name.strip()
+        if not name:
+            raise ValueError("invalid -U argument")
+        macros.pop(name, None)
+    return macros
+
+
+def _compile_one(src: str, obj: str, compiler_kwargs: Dict[str, object]) -> Tuple[bool, List[str], List[str]]:
+    """Compile one translation unit to *obj* (process-pool worker).
+
+    A fresh Compiler is built inside the worker so nothing but plain
+    arguments has to cross the process boundary.
+    Returns ``(success, errors, warnings)``.
+    """
+    res = Compiler(**compiler_kwargs).compile_file(src, obj)
+    return res.success, list(res.errors or []), list(res.warnings or [])
 
 
 def main(argv: Optional[List[str]] = None) -> int:
@@ -155,6 +230,16 @@ def main(argv: Optional[List[str]] = None) -> int:
     )
     ap.add_argument("-o", dest="output", required=False, help="Output: .s, .o, or executable")
     ap.add_argument("--no-opt", action="store_true", help="Disable optimizations")
+    ap.add_argument(
+        "--tmpdir",
+        metavar="DIR",
+        help="Directory for intermediate files (default: /dev/shm when usable)",
+    )
+    ap.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Do not reuse or populate the object cache (~/.cache/pycc)",
+    )
     ap.add_argument("-Wall", action="store_true", dest="wall", help="Enable all warnings")
     ap.add_argument("-Werror", action="store_true", dest="werror", help="Treat warnings as errors")
 
@@ -205,6 +290,12 @@ def main(argv: Optional[List[str]] = None) -> int:
     ap.add_argument("-pipe", action="store_true", help="Use pipes (ignored)")
     ap.add_argument("-w", action="store_true", dest="suppress_warnings", help="Suppress all warnings")
     ap.add_argument("-Wl", dest="wl_args", action="append", default=[], help="Pass option to linker")
+    ap.add_argument(
+        "-fuse-ld",
+        dest="fuse_ld",
+        metavar="NAME",
+        help="Link with ld.NAME (bfd, gold, lld, mold) or an explicit linker path",
+    )
     ap.add_argument("-shared", action="store_true", dest="shared", help="Generate shared library (.so)")
 
     args, _unknown = ap.parse_known_args(argv)
@@ -235,6 +326,11 @@ def main(argv: Optional[List[str]] = None) -> int:
         if (not args.c) and (not args.S):
             os.environ.setdefault("PYCC_OBJECT_OUT", "pycc-tmp.o")
 
+    # Like --save-temps, --tmpdir is passed down via the environment so that
+    # Compiler (and parallel compile workers) see it too.
+    if args.tmpdir:
+        os.environ["PYCC_TMPDIR"] = args.tmpdir
+
     # --dump-preprocessed is handled later, after compile_defines is built.
 
     if args.print_asm:
@@ -286,67 +382,57 @@ def main(argv: Optional[List[str]] = None) -> int:
         else:
             src_is_temp = False
 
-        initial_macros: Dict[str, str] = {}
-        for item in args.defines:
-            if not item:
-                continue
-            if "=" in item:
-                name, val = item.split("=", 1)
-                name = name.strip()
-                val = val.strip()
-            else:
-                name, val = item.strip(), "1"
-            if not name:
-                print(f"Error: invalid -D argument: {item!r}")
-                return 1
-            initial_macros[name] = val
-
-        for name in args.undefines:
-            if name is None:
-                continue
-            name = name.strip()
-            if not name:
-                print("Error: invalid -U argument")
-                return 1
-            initial_macros.pop(name, None)
+        try:
+            initial_macros = _parse_macro_options(args.defines, args.undefines)
+        except ValueError as e:
+            print(f"Error: {e}")
+            return 1
 
         src = args.source[0]
+        # Stream the result straight to its destination rather than
+        # materializing the whole translation unit in memory first.
+        out_f = None
         try:
+            if args.output:
+                try:
+                    out_f = open(args.output, "wb")
+                except OSError as e:
+                    print(f"Error: cannot write {args.output}: {e}")
+                    return 1
+                dest = _ChunkedWriter(out_f, "utf-8")
+            elif hasattr(sys.stdout, "buffer"):
+                sys.stdout.flush()
+                dest = _ChunkedWriter(sys.stdout.buffer, sys.stdout.encoding or "utf-8")
+            else:
+                dest = sys.stdout
             # -E mode: always use built-in preprocessor
             pp = Preprocessor(include_paths=args.include_dirs)
-            res = pp.preprocess(src, initial_macros=initial_macros)
+            try:
+                res = pp.preprocess_to(src, dest, initial_macros=initial_macros)
+            finally:
+                dest.flush()
             if not res.success:
                 for e in (res.errors or []):
                     print(f"Error: {e}")
+                if out_f is not None:
+                    out_f.close()
+                    out_f = None
+                    try:
+                        os.unlink(args.output)
+                    except OSError:
+                        pass
                 return 1
-            text = res.text
         except Exception as e:
             print(f"Error: {e}")
+            return 1
+        finally:
+            if out_f is not None:
+                out_f.close()
             if src_is_temp:
                 try:
                     os.unlink(src)
                 except OSError:
                     pass
-            return 1
-        if args.output:
-            try:
-                open(args.output, "w", encoding="utf-8").write(text)
-            except OSError as e:
-                print(f"Error: cannot write {args.output}: {e}")
-                if src_is_temp:
-                    try:
-                        os.unlink(src)
-                    except OSError:
-                        pass
-                return 1
-        else:
-            sys.stdout.write(text)
-
-        if src_is_temp:
-            try:
-                os.unlink(src)
-            except OSError:
-                pass
         return 0
 
     # -D/-U/-I are accepted for compilation as well; they are wired into
@@ -391,28 +477,11 @@ def main(argv: Optional[List[str]] = None) -> int:
         print("Error: -c requires -o <file.o> (or omit -o to use <source>.o)")
         return 1
 
-    compile_defines: Dict[str, str] = {}
-    for item in args.defines:
-        if not item:
-            continue
-        if "=" in item:
-            name, val = item.split("=", 1)
-            name = name.strip()
-            val = val.strip()
-        else:
-            name, val = item.strip(), "1"
-        if not name:
-            print(f"Error: invalid -D argument: {item!r}")
-            return 1
-        compile_defines[name] = val
-    for name in args.undefines:
-        if name is None:
-            continue
-        name = name.strip()
-        if not name:
-            print("Error: invalid -U argument")
-            return 1
-        compile_defines.pop(name, None)
+    try:
+        compile_defines = _parse_macro_options(args.defines, args.undefines)
+    except ValueError as e:
+        print(f"Error: {e}")
+        return 1
 
     if args.dump_tokens_only_to:
         if len(args.source) != 1:
@@ -676,7 +745,15 @@ def main(argv: Optional[List[str]] = None) -> int:
             print(f"Error: {e}")
             return 1
 
-    compiler = Compiler(
+    linker: Optional[str] = None
+    if args.fuse_ld:
+        try:
+            linker = linker_for_fuse_ld(args.fuse_ld)
+        except ValueError as e:
+            print(f"Error: {e}")
+            return 1
+
+    compiler_kwargs: Dict[str, object] = dict(
         optimize=not args.no_opt,
         include_paths=args.include_dirs,
         defines=compile_defines,
@@ -684,7 +761,10 @@ def main(argv: Optional[List[str]] = None) -> int:
         wall=getattr(args, "wall", False),
         werror=getattr(args, "werror", False),
         pic=getattr(args, "fpic", False),
+        cache=None if args.no_cache else ObjectCache(),
+        linker=linker,
     )
+    compiler = Compiler(**compiler_kwargs)
 
     # Single input: preserve previous behavior.
     # When -shared is set, use the multi-file link path which handles gcc -shared.
@@ -723,7 +803,7 @@ def main(argv: Optional[List[str]] = None) -> int:
             # compile-then-link workflow: pycc -c foo.c -o foo.o; pycc foo.o -o foo
             if ext in (".o", ".a"):
                 try:
-                    tc = Toolchain()
+                    tc = Toolchain(linker=linker)
                     link_cmd = tc.build_link_cmd(
                         [src], args.output,
                         extra_libs=args.link_libs or None,
@@ -772,7 +852,10 @@ def main(argv: Optional[List[str]] = None) -> int:
         return 1
 
     obj_paths: List[str] = []
-    with tempfile.TemporaryDirectory(prefix="pycc_mf_") as td:
+    with tempfile.TemporaryDirectory(prefix="pycc_mf_", dir=staging_dir()) as td:
+        # Translation units are independent, so compile them in parallel.
+        # The backend is pure Python (GIL-bound), hence processes, not threads.
+        jobs: List[Tuple[str, str]] = []
         for i, src in enumerate(args.source):
             ext = os.path.splitext(src)[1]
             if ext in (".o", ".a"):
@@ -782,16 +865,51 @@ def main(argv: Optional[List[str]] = None) -> int:
             obj = os.path.join(td, f"tu{i}.o")
             if args.verbose:
                 print(f"[pycc] compile: {src} -> {obj}")
-            res = compiler.compile_file(src, obj)
-            if not res.success:
-                for e in res.errors:
-                    print("Error:", e)
-                return 1
             obj_paths.append(obj)
+            jobs.append((src, obj))
+
+        # Per-job warnings, printed in source order once every TU compiled.
+        warnings: List[List[str]] = [[] for _ in jobs]
+        # Fail fast like `make -j`: stop at the first broken TU instead of
+        # finishing every other compile first.
+        failed: Optional[List[str]] = None
+        if len(jobs) > 1:
+            workers = min(len(jobs), os.cpu_count() or 1)
+            with ProcessPoolExecutor(max_workers=workers) as ex:
+                futures = {
+                    ex.submit(_compile_one, src, obj, compiler_kwargs): k
+                    for k, (src, obj) in enumerate(jobs)
+                }
+                for fut in as_completed(futures):
+                    try:
+                        ok, errors, warnings[futures[fut]] = fut.result()
+                    except Exception as e:
+                        ok, errors = False, [f"compile worker failed: {e}"]
+                    if not ok:
+                        failed = errors
+                        # Drop queued jobs (Python 3.8 has no cancel_futures);
+                        # leaving the block waits only for in-flight ones,
+                        # which must finish before `td` is removed anyway.
+                        for f in futures:
+                            f.cancel()
+                        break
+        else:
+            for k, (src, obj) in enumerate(jobs):
+                ok, errors, warnings[k] = _compile_one(src, obj, compiler_kwargs)
+                if not ok:
+                    failed = errors
+                    break
+        if failed is not None:
+            for e in failed:
+                print("Error:", e)
+            return 1
+        for tu_warnings in warnings:
+            for w in tu_warnings:
+                print(w, file=sys.stderr)
 
         # Link all objects using Toolchain (ld-based, no gcc dependency).
         try:
-            tc = Toolchain()
+            tc = Toolchain(linker=linker)
             link_cmd = tc.build_link_cmd(
                 obj_paths, args.output,
                 extra_libs=args.link_libs or None,
@@ -5,27 +5,51 @@ A complete implementation of a C99 compiler written in pure Python,
 following the classic three-stage compiler architecture.
 """
 
+from __future__ import annotations
+
+import importlib
+from typing import TYPE_CHECKING, Any, List
+
 __version__ = "0.1.0"
 __author__ = "PyCC Contributors"
 __license__ = "MIT"
 
-from .lexer import Lexer, Token
-from .parser import Parser
-from .semantics import SemanticAnalyzer
-from .ir import IRGenerator
-from .optimizer import Optimizer
-from .codegen import CodeGenerator
-from .compiler import Compiler
-from .toolchain import Toolchain
-
-__all__ = [
-    'Lexer',
-    'Token',
-    'Parser',
-    'SemanticAnalyzer',
-    'IRGenerator',
-    'Optimizer',
-    'CodeGenerator',
-    'Compiler',
-    'Toolchain',
-]
+# The public classes are resolved on first access (PEP 562), so importing one
+# stage (e.g. ``pycc.preprocessor`` or ``pycc.lexer``) does not load the whole
+# pipeline.
+_EXPORTS = {
+    'Lexer': '.lexer',
+    'Token': '.lexer',
+    'Parser': '.parser',
+    'SemanticAnalyzer': '.semantics',
+    'IRGenerator': '.ir',
+    'Optimizer': '.optimizer',
+    'CodeGenerator': '.codegen',
+    'Compiler': '.compiler',
+    'Toolchain': '.toolchain',
+}
+
+__all__ = list(_EXPORTS)
+
+if TYPE_CHECKING:
+    from .lexer import Lexer, Token
+    from .parser import Parser
+    from .semantics import SemanticAnalyzer
+    from .ir import IRGenerator
+    from .optimizer import Optimizer
+    from .codegen import CodeGenerator
+    from .compiler import Compiler
+    from .toolchain import Toolchain
+
+
+def __getattr__(name: str) -> Any:
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> List[str]:
+    return sorted(set(globals()) | set(_EXPORTS))
@@ -6,11 +6,21 @@ Defines the structure of AST nodes used to represent C99 programs.
 
 from __future__ import annotations
 
+import sys
 from dataclasses import dataclass, field
-from typing import List, Optional, Union, Any
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
 
+# Large translation units allocate AST nodes by the hundred thousand;
+# __slots__ drops the per-instance __dict__, which shrinks every node and
+# turns attribute reads into slot lookups.  ``slots=`` needs Python 3.10,
+# older interpreters fall back to plain dataclasses.
+if sys.version_info >= (3, 10):
+    _ast_dataclass = dataclass(slots=True)
+else:
+    _ast_dataclass = dataclass
 
-@dataclass
+
+@_ast_dataclass
 class ASTNode:
     """Base class for all AST nodes"""
     # Location fields (line/column) are required constructor arguments
@@ -21,6 +31,8 @@ class ASTNode:
 
 # ============== Type Nodes ==============
 
+# Not slotted: the parser and semantic passes attach ad-hoc metadata to
+# Type nodes (inline struct members, typedef array dimensions).
 @dataclass
 class Type(ASTNode):
     """Represents a C type"""
@@ -34,6 +46,10 @@ class Type(ASTNode):
     pointer_level: int = 0
     # Qualifiers that apply to the base (non-pointer) type.
     # Example: `const int *p` => is_const=True.
+    # Kept as separate bool fields rather than one packed bitmask: True/False
+    # are shared singletons, so each costs a single pointer in the instance
+    # dict, while a packed field would turn every `ty.is_const` read (the
+    # semantic passes do many) into a property call several times slower.
     is_const: bool = False
     is_volatile: bool = False
     is_restrict: bool = False
@@ -74,6 +90,12 @@ class Type(ASTNode):
     array_dimensions: Optional[List[Optional[int]]] = None
 
     def __str__(self) -> str:
+        # Fast path: most types are spelled exactly as their base name.
+        if not (
+            self.is_const or self.is_volatile or self.is_restrict or self.is_unsigned or self.is_signed
+            or self.pointer_level > 0 or self.is_pointer or self.is_array
+        ):
+            return self.base
         result = ""
         if self.is_const:
             result += "const "
@@ -90,31 +112,31 @@ class Type(ASTNode):
         if level <= 0 and self.is_pointer:
             level = 1
         if level > 0:
+            pointer_quals = self.pointer_quals
+            n_quals = len(pointer_quals)
             for i in range(level):
                 result += " *"
-                quals: set[str] = set()
-                if i < len(self.pointer_quals):
-                    quals = self.pointer_quals[i]
+                # Read the three qualifier flags directly rather than
+                # materializing a temporary set for every pointer level.
+                if i < n_quals:
+                    quals = pointer_quals[i]
+                    if not quals:
+                        continue
+                    q_const, q_volatile, q_restrict = "const" in quals, "volatile" in quals, "restrict" in quals
                 elif i == 0:
                     # Back-compat: when pointer_quals isn't populated, reflect ptr_is_*.
-                    if self.ptr_is_const:
-                        quals.add("const")
-                    if self.ptr_is_volatile:
-                        quals.add("volatile")
-                    if self.ptr_is_restrict:
-                        quals.add("restrict")
-                if "const" in quals:
+                    q_const, q_volatile, q_restrict = self.ptr_is_const, self.ptr_is_volatile, self.ptr_is_restrict
+                else:
+                    continue
+                if q_const:
                     result += " const"
-                if "volatile" in quals:
+                if q_volatile:
                     result += " volatile"
-                if "restrict" in quals:
+                if q_restrict:
                     result += " restrict"
         if self.is_array and self.array_dimensions is not None:
             for dim in self.array_dimensions:
-                if dim is None:
-                    result += "[]"
-                else:
-                    result += f"[{dim}]"
+                result += "[]" if dim is None else f"[{dim}]"
         return result
 
     def _normalize_pointer_state(self) -> None:
@@ -162,7 +184,7 @@ class Type(ASTNode):
         return t
 
 
-@dataclass
+@_ast_dataclass
 class ArrayType(ASTNode):
     """Array type"""
     element_type: 'Type'
@@ -171,14 +193,14 @@ class ArrayType(ASTNode):
     qualifiers: List[str] = field(default_factory=list)  # const, volatile, etc.
 
 
-@dataclass
+@_ast_dataclass
 class PointerType(ASTNode):
     """Pointer type"""
     pointed_type: 'Type'
     qualifiers: List[str] = field(default_factory=list)
 
 
-@dataclass
+@_ast_dataclass
 class FunctionType(ASTNode):
     """Function type"""
     return_type: 'Type'
@@ -188,7 +210,7 @@ class FunctionType(ASTNode):
 
 # ============== Declaration Nodes ==============
 
-@dataclass
+@_ast_dataclass
 class Declaration(ASTNode):
     """Variable or parameter declaration"""
     name: str
@@ -202,9 +224,14 @@ class Declaration(ASTNode):
     # Example: `char a[2][4];` => [2, 4]
     # Unknown/unsized dimensions are encoded as None.
     array_dims: Optional[List[Optional[int]]] = None
+    # Bit-field width for struct/union members (`int x : 3;`).
+    bit_width: Optional[int] = None
+    # Bit position within the storage unit, filled in by struct layout.
+    _bit_offset: Optional[int] = field(default=None, init=False, repr=False, compare=False)
+    _bit_width: Optional[int] = field(default=None, init=False, repr=False, compare=False)
 
 
-@dataclass
+@_ast_dataclass
 class FunctionDecl(ASTNode):
     """Function declaration/definition"""
     name: str
@@ -216,21 +243,21 @@ class FunctionDecl(ASTNode):
     is_inline: bool = False
 
 
-@dataclass
+@_ast_dataclass
 class StructDecl(ASTNode):
     """Structure declaration"""
     name: Optional[str]
     members: Optional[List[Declaration]] = None  # None if only name (forward decl)
 
 
-@dataclass
+@_ast_dataclass
 class UnionDecl(ASTNode):
     """Union declaration"""
     name: Optional[str]
     members: Optional[List[Declaration]] = None
 
 
-@dataclass
+@_ast_dataclass
 class TypedefDecl(ASTNode):
     """Typedef declaration"""
     name: str
@@ -241,7 +268,7 @@ class TypedefDecl(ASTNode):
     array_dims: Optional[list] = None
 
 
-@dataclass
+@_ast_dataclass
 class EnumDecl(ASTNode):
     """Enum declaration"""
     name: Optional[str]
@@ -250,25 +277,25 @@ class EnumDecl(ASTNode):
 
 # ============== Statement Nodes ==============
 
-@dataclass
+@_ast_dataclass
 class Statement(ASTNode):
     """Base class for statements"""
     pass
 
 
-@dataclass
+@_ast_dataclass
 class CompoundStmt(Statement):
     """Block statement { ... }"""
     statements: List[Union[Statement, Declaration]] = field(default_factory=list)
 
 
-@dataclass
+@_ast_dataclass
 class ExpressionStmt(Statement):
     """Expression statement"""
     expression: Optional['Expression'] = None
 
 
-@dataclass
+@_ast_dataclass
 class IfStmt(Statement):
     """If statement"""
     condition: 'Expression'
@@ -276,21 +303,21 @@ class IfStmt(Statement):
     else_stmt: Optional[Statement] = None
 
 
-@dataclass
+@_ast_dataclass
 class WhileStmt(Statement):
     """While loop"""
     condition: 'Expression'
     body: Statement
 
 
-@dataclass
+@_ast_dataclass
 class DoWhileStmt(Statement):
     """Do-while loop"""
     body: Statement
     condition: 'Expression'
 
 
-@dataclass
+@_ast_dataclass
 class ForStmt(Statement):
     """For loop"""
     init: Optional[Union['Expression', Declaration]] = None
@@ -299,64 +326,64 @@ class ForStmt(Statement):
     body: Optional[Statement] = None
 
 
-@dataclass
+@_ast_dataclass
 class SwitchStmt(Statement):
     """Switch statement"""
     expression: 'Expression'
     body: Statement
 
 
-@dataclass
+@_ast_dataclass
 class CaseStmt(Statement):
     """Case label in switch"""
     value: 'Expression'
     statement: Statement
 
 
-@dataclass
+@_ast_dataclass
 class DefaultStmt(Statement):
     """Default label in switch"""
     statement: Statement
 
 
-@dataclass
+@_ast_dataclass
 class BreakStmt(Statement):
     """Break statement"""
     pass
 
 
-@dataclass
+@_ast_dataclass
 class ContinueStmt(Statement):
     """Continue statement"""
     pass
 
 
-@dataclass
+@_ast_dataclass
 class ReturnStmt(Statement):
     """Return statement"""
     value: Optional['Expression'] = None
 
 
-@dataclass
+@_ast_dataclass
 class GotoStmt(Statement):
     """Goto statement"""
     label: str
 
 
-@dataclass
+@_ast_dataclass
 class LabelStmt(Statement):
     """Label statement"""
     name: str
     statement: Statement
 
 
-@dataclass
+@_ast_dataclass
 class DeclStmt(Statement):
     """Declaration statement"""
     declaration: Declaration
 
 
-@dataclass
+@_ast_dataclass
 class ComputedGoto(Statement):
     """GCC extension: goto *expr — indirect jump to computed address."""
     target: Expression
@@ -364,19 +391,22 @@ class ComputedGoto(Statement):
 
 # ============== Expression Nodes ==============
 
-@dataclass
+@_ast_dataclass
 class Expression(ASTNode):
     """Base class for expressions"""
-    pass
+    # CType computed by semantic analysis (see SemanticAnalyzer._annotate_type).
+    resolved_type: Any = field(default=None, init=False, repr=False, compare=False)
 
 
-@dataclass
+@_ast_dataclass
 class Identifier(Expression):
     """Identifier (variable or function name)"""
     name: str
+    # Declared type, filled in by semantic analysis when known.
+    type: Optional[Type] = field(default=None, init=False, repr=False, compare=False)
 
 
-@dataclass
+@_ast_dataclass
 class IntLiteral(Expression):
     """Integer literal"""
     value: int
@@ -384,26 +414,26 @@ class IntLiteral(Expression):
     is_octal: bool = False
 
 
-@dataclass
+@_ast_dataclass
 class FloatLiteral(Expression):
     """Float literal"""
     value: float
     suffix: str = ''  # 'f'/'F' for float, 'l'/'L' for long double, '' for double
 
 
-@dataclass
+@_ast_dataclass
 class CharLiteral(Expression):
     """Character literal"""
     value: str  # Single character
 
 
-@dataclass
+@_ast_dataclass
 class StringLiteral(Expression):
     """String literal"""
     value: str
 
 
-@dataclass
+@_ast_dataclass
 class BinaryOp(Expression):
     """Binary operation"""
     operator: str  # '+', '-', '*', '/', '%', '==', '!=', '<', '>', etc.
@@ -411,7 +441,7 @@ class BinaryOp(Expression):
     right: Expression
 
 
-@dataclass
+@_ast_dataclass
 class UnaryOp(Expression):
     """Unary operation"""
     operator: str  # '+', '-', '!', '~', '*', '&', '++', '--', 'sizeof'
@@ -419,7 +449,7 @@ class UnaryOp(Expression):
     is_postfix: bool = False
 
 
-@dataclass
+@_ast_dataclass
 class TernaryOp(Expression):
     """Ternary conditional operation (? :)"""
     condition: Expression
@@ -427,7 +457,7 @@ class TernaryOp(Expression):
     false_expr: Expression
 
 
-@dataclass
+@_ast_dataclass
 class CommaOp(Expression):
     """Comma operator: evaluates left, discards its value, then evaluates right."""
 
@@ -435,7 +465,7 @@ class CommaOp(Expression):
     right: Expression
 
 
-@dataclass
+@_ast_dataclass
 class Assignment(Expression):
     """Assignment expression"""
     target: Expression
@@ -443,62 +473,62 @@ class Assignment(Expression):
     value: Expression
 
 
-@dataclass
+@_ast_dataclass
 class FunctionCall(Expression):
     """Function call"""
     function: Expression  # Usually an Identifier
     arguments: List[Expression]
 
 
-@dataclass
+@_ast_dataclass
 class ArrayAccess(Expression):
     """Array indexing"""
     array: Expression
     index: Expression
 
 
-@dataclass
+@_ast_dataclass
 class MemberAccess(Expression):
     """Struct/union member access (.)"""
     object: Expression
     member: str
 
 
-@dataclass
+@_ast_dataclass
 class PointerMemberAccess(Expression):
     """Struct/union member access through pointer (->)"""
     pointer: Expression
     member: str
 
 
-@dataclass
+@_ast_dataclass
 class Cast(Expression):
     """Type cast"""
     type: Type
     expression: Expression
 
 
-@dataclass
+@_ast_dataclass
 class SizeOf(Expression):
     """Sizeof operator"""
     operand: Optional[Expression] = None  # None if sizeof(type)
     type: Optional[Type] = None
 
 
-@dataclass
+@_ast_dataclass
 class AlignOf(Expression):
     """Alignof operator (_Alignof)"""
     operand: Optional[Expression] = None
     type: Optional[Type] = None
 
 
-@dataclass
+@_ast_dataclass
 class Initializer(Expression):
     """Initializer list or compound literal"""
     elements: List[tuple[Optional['Designator'], Expression]]
 
 
-@dataclass
+@_ast_dataclass
 class Designator(ASTNode):
     """Designator for designated initializers"""
     index: Optional[Expression] = None  # For array [index]
@@ -506,14 +536,14 @@ class Designator(ASTNode):
     next: Optional['Designator'] = None  # For nested designators (.inner.member)
 
 
-@dataclass
+@_ast_dataclass
 class CompoundLiteral(Expression):
     """Compound literal"""
     type: Type
     initializer: Initializer
 
 
-@dataclass
+@_ast_dataclass
 class LabelAddress(Expression):
     """GCC extension: &&label — address of a label (void *)."""
     label_name: str
@@ -521,57 +551,109 @@ class LabelAddress(Expression):
 
 # ============== Program Node ==============
 
-@dataclass
+@_ast_dataclass
 class Program(ASTNode):
     """Root node representing entire program"""
     declarations: List[Union[Declaration, FunctionDecl, StructDecl, UnionDecl, TypedefDecl, EnumDecl]]
     external_declarations: List[Statement] = field(default_factory=list)
+    # struct/union tag -> member declarations, recorded by the parser.
+    _tag_members: dict = field(default_factory=dict, init=False, repr=False, compare=False)
 
 
 # ============== Utility Functions ==============
 
+_PrintItem = Union[str, Tuple[ASTNode, int]]
+
+
+# Each printer returns its node's output in order: finished text lines and
+# (child, indent) pairs still to be formatted.
+
+def _print_program(node: Program, indent: int) -> List[_PrintItem]:
+    prefix = "  " * indent
+    return [f"{prefix}Program\n", *((decl, indent + 1) for decl in node.declarations)]
+
+
+def _print_function_decl(node: FunctionDecl, indent: int) -> List[_PrintItem]:
+    prefix = "  " * indent
+    items: List[_PrintItem] = [
+        f"{prefix}FunctionDecl: {node.name}\n",
+        f"{prefix}  ReturnType: {node.return_type}\n",
+        f"{prefix}  Parameters:\n",
+    ]
+    items.extend((param, indent + 2) for param in node.parameters)
+    if node.body:
+        items.append(f"{prefix}  Body:\n")
+        items.append((node.body, indent + 2))
+    return items
+
+
+def _print_declaration(node: Declaration, indent: int) -> List[_PrintItem]:
+    prefix = "  " * indent
+    items: List[_PrintItem] = [f"{prefix}Declaration: {node.name} ({node.type})\n"]
+    if node.initializer:
+        items.append(f"{prefix}  Initializer:\n")
+        items.append((node.initializer, indent + 2))
+    return items
+
+
+def _print_compound_stmt(node: CompoundStmt, indent: int) -> List[_PrintItem]:
+    prefix = "  " * indent
+    return [f"{prefix}CompoundStmt\n", *((stmt, indent + 1) for stmt in node.statements)]
+
+
+def _print_binary_op(node: BinaryOp, indent: int) -> List[_PrintItem]:
+    return [f"{'  ' * indent}BinaryOp({node.operator})\n"]
+
+
+def _print_identifier(node: Identifier, indent: int) -> List[_PrintItem]:
+    return [f"{'  ' * indent}Identifier({node.name})\n"]
+
+
+def _print_int_literal(node: IntLiteral, indent: int) -> List[_PrintItem]:
+    return [f"{'  ' * indent}IntLiteral({node.value})\n"]
+
+
+def _print_default(node: ASTNode, indent: int) -> List[_PrintItem]:
+    return [f"{'  ' * indent}{node.__class__.__name__}\n"]
+
+
+_PRINTERS: Dict[type, Callable[[Any, int], List[_PrintItem]]] = {
+    Program: _print_program,
+    FunctionDecl: _print_function_decl,
+    Declaration: _print_declaration,
+    CompoundStmt: _print_compound_stmt,
+    BinaryOp: _print_binary_op,
+    Identifier: _print_identifier,
+    IntLiteral: _print_int_literal,
+}
+
+# Printer resolved through the MRO for classes not registered directly
+# (subclasses of a registered node type), filled on first use.
+_PRINTERS_BY_MRO: Dict[type, Callable[[Any, int], List[_PrintItem]]] = {}
+
+
+def _printer_for(cls: type) -> Callable[[Any, int], List[_PrintItem]]:
+    printer = _PRINTERS.get(cls)
+    if printer is None:
+        printer = _PRINTERS_BY_MRO.get(cls)
+        if printer is None:
+            printer = next((_PRINTERS[base] for base in cls.__mro__ if base in _PRINTERS), _print_default)
+            _PRINTERS_BY_MRO[cls] = printer
+    return printer
+
+
 def print_ast(node: ASTNode, indent: int = 0) -> str:
     """Pretty-print AST node"""
-    prefix = "  " * indent
-    
-    if isinstance(node, Program):
-        result = f"{prefix}Program\n"
-        for decl in node.declarations:
-            result += print_ast(decl, indent + 1)
-        return result
-    
-    elif isinstance(node, FunctionDecl):
-        result = f"{prefix}FunctionDecl: {node.name}\n"
-        result += f"{prefix}  ReturnType: {node.return_type}\n"
-        result += f"{prefix}  Parameters:\n"
-        for param in node.parameters:
-            result += print_ast(param, indent + 2)
-        if node.body:
-            result += f"{prefix}  Body:\n"
-            result += print_ast(node.body, indent + 2)
-        return result
-    
-    elif isinstance(node, Declaration):
-        result = f"{prefix}Declaration: {node.name} ({node.type})\n"
-        if node.initializer:
-            result += f"{prefix}  Initializer:\n"
-            result += print_ast(node.initializer, indent + 2)
-        return result
-    
-    elif isinstance(node, CompoundStmt):
-        result = f"{prefix}CompoundStmt\n"
-        for stmt in node.statements:
-            result += print_ast(stmt, indent + 1)
-        return result
-    
-    elif isinstance(node, BinaryOp):
-        return f"{prefix}BinaryOp({node.operator})\n"
-    
-    elif isinstance(node, Identifier):
-        return f"{prefix}Identifier({node.name})\n"
-    
-    elif isinstance(node, IntLiteral):
-        return f"{prefix}IntLiteral({node.value})\n"
-    
-    else:
-        return f"{prefix}{node.__class__.__name__}\n"
+    parts: List[str] = []
+    # Explicit work stack instead of recursion: entries are either finished
+    # text or a (node, indent) pair still to be formatted.  Each node's
+    # items are pushed in reverse so they pop (and print) in order.
+    stack: List[_PrintItem] = [(node, indent)]
+    while stack:
+        item = stack.pop()
+        if isinstance(item, str):
+            parts.append(item)
+            continue
+        node, indent = item
+        stack.extend(reversed(_printer_for(type(node))(node, indent)))
+    return "".join(parts)
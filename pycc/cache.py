@@ -0,0 +1,192 @@
+"""
+ObjectCache — ccache-style reuse of compiled outputs across runs.
+
+Entries are keyed by a SHA-256 over the *preprocessed* translation unit
+plus every compiler option that influences the output, so edits to
+included headers or ``-D`` flags invalidate them just like edits to the
+source file itself.  The compiler's own sources are fingerprinted too,
+so upgrading (or hacking on) pycc never serves stale objects.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import shutil
+import tempfile
+from typing import List, Optional, Tuple
+
+from pycc import __version__
+
+# Default upper bound on the cache size before least-recently-used
+# entries are evicted (overridable with ``PYCC_CACHE_MAX_SIZE``).
+_DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+_fingerprint: Optional[str] = None
+
+
+class ObjectCache:
+    """On-disk cache of ``.s``/``.o`` outputs.
+
+    Location: ``$PYCC_CACHE_DIR`` if set, else ``$XDG_CACHE_HOME/pycc``,
+    else ``~/.cache/pycc``.  All filesystem errors are swallowed: a broken
+    cache degrades to a miss, never to a failed compile.
+    """
+
+    def __init__(self, root: Optional[str] = None, *, max_bytes: Optional[int] = None) -> None:
+        if root is None:
+            root = os.environ.get("PYCC_CACHE_DIR")
+        if not root:
+            base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+            root = os.path.join(base, "pycc")
+        self.root = root
+        self.objects_dir = os.path.join(root, "objects")
+        # Running total of the entries' bytes, so a store only scans the
+        # whole cache once that total passes max_bytes.
+        self._size_path = os.path.join(self.objects_dir, "size")
+        if max_bytes is None:
+            try:
+                max_bytes = int(os.environ.get("PYCC_CACHE_MAX_SIZE", _DEFAULT_MAX_BYTES))
+            except ValueError:
+                max_bytes = _DEFAULT_MAX_BYTES
+        self.max_bytes = max_bytes
+
+    # ------------------------------------------------------------------
+    # Keys
+    # ------------------------------------------------------------------
+
+    def key(self, preprocessed: str, *, out_ext: str, options: Tuple[object, ...] = ()) -> str:
+        """Return the hex digest identifying one compilation."""
+        h = hashlib.sha256()
+        h.update(_compiler_fingerprint().encode("ascii"))
+        h.update(b"\0")
+        h.update(repr((out_ext, tuple(options))).encode("utf-8"))
+        h.update(b"\0")
+        h.update(preprocessed.encode("utf-8", "surrogatepass"))
+        return h.hexdigest()
+
+    def _entry_path(self, key: str, out_ext: str) -> str:
+        return os.path.join(self.objects_dir, key[:2], key + out_ext)
+
+    # ------------------------------------------------------------------
+    # Lookup / store
+    # ------------------------------------------------------------------
+
+    def fetch(self, key: str, out_ext: str, dest: str) -> bool:
+        """Copy a cached entry to *dest*.  Returns False on a miss."""
+        path = self._entry_path(key, out_ext)
+        try:
+            shutil.copyfile(path, dest)
+            # Refresh the timestamp so eviction is least-recently-used.
+            os.utime(path, None)
+        except OSError:
+            return False
+        return True
+
+    def store(self, key: str, out_ext: str, src: str) -> None:
+        """Insert *src* under *key* (atomically), then enforce the size cap.
+
+        Only the running size total is updated here; the cache is scanned
+        (by gc) when that total passes ``max_bytes`` or is missing.
+        """
+        path = self._entry_path(key, out_ext)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".tmp-")
+            os.close(fd)
+            try:
+                shutil.copyfile(src, tmp)
+                size = os.path.getsize(tmp)
+                os.replace(tmp, path)
+            except OSError:
+                try:
+                    os.unlink(tmp)
+                except OSError:
+                    pass
+                return
+        except OSError:
+            return
+        total = self._read_size()
+        if total is None or total + size > self.max_bytes:
+            self.gc()
+        else:
+            self._write_size(total + size)
+
+    def gc(self) -> None:
+        """Evict least-recently-used entries until under ``max_bytes``,
+        and record the exact remaining size as the running total."""
+        entries: List[Tuple[float, int, str]] = []
+        total = 0
+        try:
+            with os.scandir(self.objects_dir) as subdirs:
+                for sub in subdirs:
+                    if not sub.is_dir(follow_symlinks=False):
+                        continue
+                    with os.scandir(sub.path) as files:
+                        for f in files:
+                            try:
+                                st = f.stat(follow_symlinks=False)
+                            except OSError:
+                                continue
+                            entries.append((st.st_mtime, st.st_size, f.path))
+                            total += st.st_size
+        except OSError:
+            return
+        if total > self.max_bytes:
+            entries.sort()
+            for _mtime, size, p in entries:
+                if total <= self.max_bytes:
+                    break
+                try:
+                    os.unlink(p)
+                    total -= size
+                except OSError:
+                    pass
+        self._write_size(total)
+
+    def _read_size(self) -> Optional[int]:
+        try:
+            with open(self._size_path, "r", encoding="ascii") as f:
+                return int(f.read())
+        except (OSError, ValueError):
+            return None
+
+    def _write_size(self, total: int) -> None:
+        # Concurrent stores may lose an update; the total only has to be
+        # close enough to tell when a full gc scan is due, and that scan
+        # writes back the exact figure.
+        try:
+            fd, tmp = tempfile.mkstemp(dir=self.objects_dir, prefix=".tmp-")
+        except OSError:
+            return
+        try:
+            with os.fdopen(fd, "w", encoding="ascii") as f:
+                f.write(str(total))
+            os.replace(tmp, self._size_path)
+        except OSError:
+            try:
+                os.unlink(tmp)
+            except OSError:
+                pass
+
+
+# ======================================================================
+# Module-level helpers (not part of the public API)
+# ======================================================================
+
+def _compiler_fingerprint() -> str:
+    """Identify this pycc build: version plus size/mtime of its sources."""
+    global _fingerprint
+    if _fingerprint is None:
+        h = hashlib.sha256(__version__.encode("ascii"))
+        pkg_dir = os.path.dirname(os.path.abspath(__file__))
+        for name in sorted(os.listdir(pkg_dir)):
+            if not name.endswith(".py"):
+                continue
+            try:
+                st = os.stat(os.path.join(pkg_dir, name))
+            except OSError:
+                continue
+            h.update(f"{name}:{st.st_size}:{st.st_mtime_ns};".encode("utf-8"))
+        _fingerprint = h.hexdigest()
+    return _fingerprint
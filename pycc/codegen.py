@@ -21,15 +21,504 @@ from __future__ import annotations
 
 import struct as _struct
 from dataclasses import dataclass
-from typing import Dict, List, Optional, Tuple, Any
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Set, Tuple
 
-from pycc.ir import IRInstruction
 from pycc.types import (
     CType, TypeKind, PointerType, StructType, ArrayType,
     IntegerType, FloatType, EnumType,
     type_sizeof, ctype_to_ir_type, _str_to_ctype,
 )
 
+if TYPE_CHECKING:
+    # Annotations only; codegen never constructs IR instructions.
+    from pycc.ir import IRInstruction
+
+
+# ---------------------------------------------------------------------------
+# Precomposed instruction sequences (emitted with CodeGenerator._emit_lines)
+# ---------------------------------------------------------------------------
+
+def _setcc_rax(cc: str) -> Tuple[str, ...]:
+    return (f"  {cc} %dl", "  movq %rdx, %rax")
+
+
+# Integer comparison binops -> flag materialization into %rax.  Unsigned
+# comparisons arrive from the IR as "u<", "u<=", ...  The setcc writes %dl,
+# which _ZERO_RDX clears before the compare: the xor zero idiom has no input
+# dependency, unlike setcc %al + movzbq merging into the compared %rax.
+_ZERO_RDX = "  xorl %edx, %edx"
+_INT_CMP_SETCC: Dict[str, Tuple[str, ...]] = {
+    **{op: _setcc_rax(cc) for op, cc in (
+        ("==", "sete"), ("!=", "setne"),
+        ("<", "setl"), ("<=", "setle"), (">", "setg"), (">=", "setge"),
+    )},
+    **{"u" + op: _setcc_rax(cc) for op, cc in (
+        ("==", "sete"), ("!=", "setne"),
+        ("<", "setb"), ("<=", "setbe"), (">", "seta"), (">=", "setae"),
+    )},
+}
+
+# Integer comparison binops -> (jump taken when true, jump taken when false),
+# for a compare whose result only feeds the following jnz/jz.
+_INT_CMP_JCC: Dict[str, Tuple[str, str]] = {
+    "==": ("je", "jne"), "!=": ("jne", "je"),
+    "<": ("jl", "jge"), "<=": ("jle", "jg"), ">": ("jg", "jle"), ">=": ("jge", "jl"),
+    "u==": ("je", "jne"), "u!=": ("jne", "je"),
+    "u<": ("jb", "jae"), "u<=": ("jbe", "ja"), "u>": ("ja", "jbe"), "u>=": ("jae", "jb"),
+}
+
+# Floating-point comparisons (ucomis*/fcomip set CF/ZF like unsigned ints).
+_FCMP_SETCC: Dict[str, Tuple[str, ...]] = {
+    op: (f"  {cc} %al", "  movzbl %al, %eax", "  movslq %eax, %rax")
+    for op, cc in (
+        ("<", "setb"), ("<=", "setbe"), (">", "seta"), (">=", "setae"),
+        ("==", "sete"), ("!=", "setne"),
+    )
+}
+
+_LOGICAL_NOT_RAX: Tuple[str, ...] = ("  testq %rax, %rax", "  sete %al", "  movzbq %al, %rax")
+
+# (a != 0) && (b != 0), with a in %rax and b in %rcx.
+_LOGICAL_AND_RAX_RCX: Tuple[str, ...] = (
+    "  testq %rax, %rax",
+    "  setne %al",
+    "  movzbq %al, %rax",
+    "  testq %rcx, %rcx",
+    "  setne %cl",
+    "  movzbq %cl, %rcx",
+    "  andq %rcx, %rax",
+)
+
+# (a != 0) || (b != 0); or-ing the two 0/1 values already yields 0/1.
+_LOGICAL_OR_RAX_RCX: Tuple[str, ...] = (
+    "  testq %rax, %rax",
+    "  setne %al",
+    "  movzbq %al, %rax",
+    "  testq %rcx, %rcx",
+    "  setne %cl",
+    "  movzbq %cl, %rcx",
+    "  orq %rcx, %rax",
+)
+
+# Tails of the two templates above: %rax ends up 0 or 1, so a re-boolify
+# right after them is redundant (see CodeGenerator._peephole).
+_BOOL_RAX_TAILS = frozenset({_LOGICAL_AND_RAX_RCX[2:], _LOGICAL_OR_RAX_RCX[2:]})
+
+# Loads of 1/2/4-byte values widened to 64 bits, by width in bytes
+# (unsigned 4-byte loads use movl into the 32-bit register instead).
+_SEXT_LOAD_BY_SIZE: Dict[int, str] = {1: "movsbq", 2: "movswq", 4: "movslq"}
+_ZEXT_LOAD_BY_SIZE: Dict[int, str] = {1: "movzbq", 2: "movzwq"}
+
+# Data directives for scalar initializers, by width in bytes.
+_DATA_BY_SIZE: Dict[int, str] = {1: ".byte", 2: ".short", 4: ".long", 8: ".quad"}
+
+# Stack-slot and memory stores by width in bytes.
+_MOV_BY_SIZE: Dict[int, str] = {1: "movb", 2: "movw", 4: "movl", 8: "movq"}
+_RAX_BY_SIZE: Dict[int, str] = {1: "%al", 2: "%ax", 4: "%eax", 8: "%rax"}
+_RCX_BY_SIZE: Dict[int, str] = {1: "%cl", 2: "%cx", 4: "%ecx", 8: "%rcx"}
+_RDX_BY_SIZE: Dict[int, str] = {1: "%dl", 2: "%dx", 4: "%edx", 8: "%rdx"}
+# Sub-registers of the store source registers, by width.
+_SUBREG_BY_SIZE: Dict[str, Dict[int, str]] = {
+    "%rax": _RAX_BY_SIZE,
+    "%rcx": _RCX_BY_SIZE,
+    "%rdx": _RDX_BY_SIZE,
+}
+
+# `base + idx*scale` memory operands for %rax/%rcx, for the scales an x86
+# SIB byte can encode (see CodeGenerator._index_operand).
+_SIB_INDEX: Dict[int, str] = {1: "(%rax,%rcx)", 2: "(%rax,%rcx,2)", 4: "(%rax,%rcx,4)", 8: "(%rax,%rcx,8)"}
+
+# Re-normalizing %rax to 0/1; redundant when %rax was just produced by a
+# setcc/movzbq pair (see CodeGenerator._peephole).
+_BOOLIFY_RAX: Tuple[str, ...] = ("  testq %rax, %rax", "  setne %al", "  movzbq %al, %rax")
+
+# 32-bit ALU ops and moves that write %eax, and with it zero the upper half of
+# %rax; a following `movl %eax, %eax` zero-extension is then a no-op (see
+# CodeGenerator._peephole).  Compares and tests only set flags.
+_EAX_WRITER_PREFIXES: Tuple[str, ...] = tuple(
+    f"  {insn}l " for insn in ("mov", "add", "sub", "imul", "and", "or", "xor", "shl", "shr", "sar", "neg", "not")
+)
+
+# Two-operand integer binops that need no extra state: bop -> (64-bit form,
+# unsigned-32 form).  The 32-bit form wraps modulo 2^32 and zero-extends the
+# result so later 64-bit uses of %rax see the truncated value.
+_INT_ARITH_RAX_RCX: Dict[str, Tuple[Tuple[str, ...], Tuple[str, ...]]] = {
+    bop: ((f"  {insn}q %rcx, %rax",), (f"  {insn}l %ecx, %eax", "  movl %eax, %eax"))
+    for bop, insn in (("+", "add"), ("-", "sub"), ("*", "imul"), ("&", "and"), ("|", "or"), ("^", "xor"))
+}
+
+# Integer division: bop -> (unsigned 32-bit, unsigned 64-bit, signed 64-bit)
+# forms, dividing %rax by %rcx and leaving the quotient/remainder in %rax.
+# Unsigned forms clear the high half with xorl %edx, %edx, which also zeroes
+# the upper 32 bits of %rdx and encodes shorter than xorq.
+_INT_DIVMOD_RAX_RCX: Dict[str, Tuple[Tuple[str, ...], Tuple[str, ...], Tuple[str, ...]]] = {
+    "/": (("  xorl %edx, %edx", "  divl %ecx"),
+          ("  xorl %edx, %edx", "  divq %rcx"),
+          ("  cqto", "  idivq %rcx")),
+    "%": (("  xorl %edx, %edx", "  divl %ecx", "  movl %edx, %eax"),
+          ("  xorl %edx, %edx", "  divq %rcx", "  movq %rdx, %rax"),
+          ("  cqto", "  idivq %rcx", "  movq %rdx, %rax")),
+}
+
+# Binops with a literal integer operand (see _binop_imm_lines).  '+', '*',
+# '&', '|' and '^' also take it as operand1; all six are folded when both
+# operands are literals.
+_BINOP_IMM_OPS = frozenset({"+", "-", "*", "&", "|", "^", "<<", ">>", "/", "%"})
+_COMMUTATIVE_BINOPS = frozenset({"+", "*", "&", "|", "^"})
+_INT_FOLD: Dict[str, Callable[[int, int], int]] = {
+    "+": lambda a, b: a + b,
+    "-": lambda a, b: a - b,
+    "*": lambda a, b: a * b,
+    "&": lambda a, b: a & b,
+    "|": lambda a, b: a | b,
+    "^": lambda a, b: a ^ b,
+}
+_IMM_ARITH_INSN: Dict[str, str] = {"+": "add", "-": "sub", "&": "and", "|": "or", "^": "xor"}
+
+
+def _imm_int(operand: Optional[str]) -> Optional[int]:
+    """Value of a literal integer operand ("$k"), else None."""
+    if operand is None or operand[:1] != "$":
+        return None
+    try:
+        return int(operand[1:])
+    except ValueError:
+        return None
+
+
+def _binop_imm_lines(bop: str, c: int, u32: bool, unsigned: bool) -> Optional[Tuple[str, ...]]:
+    """Lines computing `%rax = %rax <bop> $c` in place, or None where the
+    general %rax/%rcx form must be used.
+
+    Follows the %rcx forms: *u32* selects the 32-bit unsigned form (result
+    zero-extended), *unsigned* a logical right shift or unsigned division.
+    Identities emit nothing, multiplies by 0, 1, -1, 2^k and 3/5/9 become
+    xor/nothing/neg/shl/lea, and division by 2^k a shift (signed: biased
+    toward zero) or mask.
+    """
+    q, rax = ("l", "%eax") if u32 else ("q", "%rax")
+    bits = 32 if u32 else 64
+    if bop == "&" and c == 0xFFFFFFFF and not u32:
+        return ("  movl %eax, %eax",)
+    if not -(1 << 31) <= c < (1 << 31):
+        return None
+    k = c.bit_length() - 1 if c > 0 and c & (c - 1) == 0 else -1
+    if bop in ("+", "-", "|", "^") and c == 0:
+        return ()
+    if bop == "&" and c == -1:
+        return ()
+    if bop == "&" and c == 0:
+        return ("  xorl %eax, %eax",)
+    if bop == "^" and c == -1:
+        return (f"  not{q} {rax}",)
+    if bop in _IMM_ARITH_INSN:
+        return (f"  {_IMM_ARITH_INSN[bop]}{q} ${c}, {rax}",)
+    if bop == "*":
+        if c == 0:
+            return ("  xorl %eax, %eax",)
+        if c == 1:
+            return ()
+        if c == -1:
+            return (f"  neg{q} {rax}",)
+        if k > 0:
+            return (f"  shl{q} ${k}, {rax}",)
+        if c in (3, 5, 9):
+            return (f"  lea{q} (%rax,%rax,{c - 1}), {rax}",)
+        return (f"  imul{q} ${c}, {rax}, {rax}",)
+    if bop in ("<<", ">>"):
+        if not 0 <= c < bits:
+            return None
+        if c == 0:
+            return ()
+        insn = "shl" if bop == "<<" else ("shr" if unsigned or u32 else "sar")
+        return (f"  {insn}{q} ${c}, {rax}",)
+    # '/' and '%': powers of two only.
+    if k < 0:
+        return None
+    if u32 or unsigned:
+        if bop == "/":
+            return () if k == 0 else (f"  shr{q} ${k}, {rax}",)
+        return (f"  and{q} ${c - 1}, {rax}",)
+    if k == 0:
+        return () if bop == "/" else ("  xorl %eax, %eax",)
+    # Signed: add 2^k - 1 to negative dividends so the result rounds
+    # toward zero, as idivq does.
+    bias = ("  movq %rax, %rdx", "  sarq $63, %rdx", f"  shrq ${64 - k}, %rdx")
+    if bop == "/":
+        return bias + ("  addq %rdx, %rax", f"  sarq ${k}, %rax")
+    return bias + ("  leaq (%rax,%rdx), %rcx", f"  andq ${-c}, %rcx", "  subq %rcx, %rax")
+
+
+# Shifts of %rax by %cl: mnemonic -> (64-bit form, unsigned-32 form).  The
+# count is used from %cl as loaded, with no extra move.  A 32-bit shift
+# writes %eax, and so zero-extends into %rax, even when the count is 0.
+_INT_SHIFT_RAX_CL: Dict[str, Tuple[Tuple[str, ...], Tuple[str, ...]]] = {
+    insn: ((f"  {insn}q %cl, %rax",), (f"  {insn}l %cl, %eax",))
+    for insn in ("shl", "sar", "shr")
+}
+
+# Unary ops applied in place to %rax.  Unary '+' (and the unsupported '&'/'*')
+# emit nothing.
+_UNOP_RAX: Dict[str, Tuple[str, ...]] = {
+    "-": ("  negq %rax",),
+    "!": _LOGICAL_NOT_RAX,
+    "~": ("  notq %rax",),
+}
+
+# Floating-point arithmetic IR ops -> x87 popping form (long double; the
+# reversed sub/div keep a - b, a / b operand order) and SSE mnemonic stem.
+_FARITH_X87: Dict[str, str] = {"fadd": "faddp", "fsub": "fsubrp", "fmul": "fmulp", "fdiv": "fdivrp"}
+_FARITH_SSE: Dict[str, str] = {"fadd": "add", "fsub": "sub", "fmul": "mul", "fdiv": "div"}
+
+# Compile-time evaluation of _UNOP_RAX on literal operands.
+_UNOP_FOLD: Dict[str, Callable[[int], int]] = {
+    "-": lambda v: -v,
+    "!": lambda v: int(v == 0),
+    "~": lambda v: ~v,
+    "+": lambda v: v,
+}
+
+# str.translate table for CodeGenerator._gas_escape, over byte values: printable
+# ASCII passes through, everything else becomes an escape GAS accepts.
+_GAS_ESCAPES: Dict[int, str] = {b: f"\\{b:03o}" for b in range(256) if not 32 <= b <= 126}
+_GAS_ESCAPES.update({
+    ord("\\"): "\\\\",
+    ord('"'): '\\"',
+    ord("\n"): "\\n",
+    ord("\t"): "\\t",
+    ord("\r"): "\\r",
+    ord("\0"): "\\0",
+})
+
+
+
+# IR array type encodings ("array(T,$N)") are re-read for every decl and
+# index op; each distinct string is parsed once.
+_ARRAY_ENC_CACHE: Dict[str, Tuple[str, int]] = {}
+
+
+def _parse_array_enc(enc: str) -> Tuple[str, int]:
+    """Split "array(T,$N)" into (T, N).  N is 1 if missing or malformed."""
+    hit = _ARRAY_ENC_CACHE.get(enc)
+    if hit is not None:
+        return hit
+    inner = enc.strip()[len("array("):]
+    if inner.endswith(")"):
+        inner = inner[:-1]
+    base_part, _, cnt_part = inner.partition(",")
+    cnt_part = cnt_part.strip()
+    elems = 1
+    if cnt_part.startswith("$"):
+        try:
+            elems = int(cnt_part[1:])
+        except ValueError:
+            elems = 1
+    hit = _ARRAY_ENC_CACHE[enc] = (base_part.strip(), elems)
+    return hit
+
+
+# 32-bit views of the registers _load_operand may target, for zero-extending
+# unsigned int loads.
+_REG32: Dict[str, str] = {
+    "%rax": "%eax", "%rcx": "%ecx", "%rbx": "%ebx", "%rdx": "%edx",
+    "%rsi": "%esi", "%rdi": "%edi", "%r8": "%r8d", "%r9": "%r9d",
+    "%r10": "%r10d", "%r11": "%r11d",
+}
+
+# SysV AMD64 integer/pointer argument registers in order, with their 8-, 16-
+# and 32-bit views at the same index, and the SSE argument registers.
+_ARG_REGS: Tuple[str, ...] = ("%rdi", "%rsi", "%rdx", "%rcx", "%r8", "%r9")
+_ARG_REGS_B: Tuple[str, ...] = ("%dil", "%sil", "%dl", "%cl", "%r8b", "%r9b")
+_ARG_REGS_W: Tuple[str, ...] = ("%di", "%si", "%dx", "%cx", "%r8w", "%r9w")
+_ARG_REGS_L: Tuple[str, ...] = ("%edi", "%esi", "%edx", "%ecx", "%r8d", "%r9d")
+_XMM_ARG_REGS: Tuple[str, ...] = tuple(f"%xmm{k}" for k in range(8))
+
+# `$imm` operand -> whether it is an integer in [0, 2^32), which a `movl` into
+# the 32-bit register view loads in a shorter encoding (the write zero-extends
+# into the full register).
+_IMM_U32_CACHE: Dict[str, bool] = {}
+
+
+def _imm_int(operand: Optional[str]) -> Optional[int]:
+    """Value of a `$N` integer literal operand, else None."""
+    if not operand or operand[0] != "$":
+        return None
+    try:
+        return int(operand[1:])
+    except ValueError:
+        return None
+
+
+def _imm_fits_u32(operand: str) -> bool:
+    hit = _IMM_U32_CACHE.get(operand)
+    if hit is None:
+        try:
+            hit = 0 <= int(operand[1:]) <= 0xFFFFFFFF
+        except ValueError:
+            hit = False
+        _IMM_U32_CACHE[operand] = hit
+    return hit
+
+
+# Stack-slot loads classify the slot's type string into the instruction that
+# widens it to 64 bits; operands are loaded far more often than there are
+# distinct type strings, so each (type, is_temp) pair is classified once.
+_SLOT_LOAD_CACHE: Dict[Tuple[str, bool], str] = {}
+
+
+def _slot_load_insn(b: str, is_temp: bool) -> str:
+    """Load instruction for a stack slot of (stripped) type `b`.
+
+    "leaq" for array locals (which decay to their address), "movl" for
+    unsigned int (zero-extended through the 32-bit register), otherwise the
+    sign/zero-extending mov or plain movq.  Temps carry only pointer and
+    small-integer types, so array and "signed char" are not checked for them.
+    """
+    key = (b, is_temp)
+    insn = _SLOT_LOAD_CACHE.get(key)
+    if insn is not None:
+        return insn
+    if not is_temp and b.startswith("array("):
+        insn = "leaq"
+    # IMPORTANT: pointers are 8-byte values; do not apply char/short
+    # load/extension rules to e.g. "unsigned char*".
+    elif "*" in b or b == "ptr":
+        insn = "movq"
+    # signed char / char (treat plain `char` as signed in this backend)
+    elif b == "char" or b.startswith("char ") or (not is_temp and b.startswith("signed char")):
+        insn = "movsbq"
+    elif b.startswith("unsigned char"):
+        insn = "movzbq"
+    elif b.startswith("short"):
+        insn = "movswq"
+    elif b.startswith("unsigned short"):
+        insn = "movzwq"
+    elif b == "int" or b.startswith("int ") or b.startswith("enum "):
+        insn = "movslq"
+    elif b.startswith("unsigned int"):
+        insn = "movl"
+    else:
+        # long/pointers/default
+        insn = "movq"
+    _SLOT_LOAD_CACHE[key] = insn
+    return insn
+
+
+# Stack-slot stores likewise classify the slot's type string into the store
+# width in bytes, once per distinct type string.
+_SLOT_STORE_CACHE: Dict[str, int] = {}
+
+
+def _slot_store_width(ty: str) -> int:
+    """Store width in bytes for a stack slot of type `ty`."""
+    size = _SLOT_STORE_CACHE.get(ty)
+    if size is not None:
+        return size
+    b = ty.strip()
+    # IMPORTANT: pointers are always 8-byte values. Do not let prefix
+    # checks like `startswith("unsigned char")` treat "unsigned char*"
+    # as a 1-byte scalar.
+    if "*" in b:
+        size = 8
+    elif b == "char" or b.startswith("char ") or b.startswith("unsigned char"):
+        size = 1
+    elif b.startswith("short") or b.startswith("unsigned short"):
+        size = 2
+    elif b == "int" or b.startswith("int ") or b.startswith("enum ") or b.startswith("unsigned int"):
+        size = 4
+    else:
+        size = 8
+    _SLOT_STORE_CACHE[ty] = size
+    return size
+
+
+# "-off(%rbp)" operand strings for the stack slots the load/store fast paths
+# touch; frame offsets repeat across functions, so this is shared.
+_SLOT_OPERANDS: Dict[int, str] = {}
+
+
+def _slot(off: int) -> str:
+    """Memory operand for the stack slot at -off(%rbp)."""
+    mem = _SLOT_OPERANDS.get(off)
+    if mem is None:
+        mem = _SLOT_OPERANDS[off] = f"-{off}(%rbp)"
+    return mem
+
+
+# Builtin type names that _resolve_type returns without a typedef lookup.
+_PRIMITIVE_TYPES = frozenset({
+    "void", "char", "unsigned char", "signed char",
+    "short", "short int", "unsigned short", "unsigned short int",
+    "signed short", "signed short int",
+    "int", "unsigned int", "signed int",
+    "long", "long int", "unsigned long", "unsigned long int",
+    "signed long", "signed long int",
+    "float", "double", "long double",
+})
+
+
+# IR ops consumed by the driver loop in CodeGenerator.generate rather than by
+# an _INS_HANDLERS emitter.
+_GLOBAL_DEF_OPS = frozenset({"gdecl", "gdef", "gdef_blob", "gdef_float", "gdef_ptr_array", "gdef_struct"})
+_DRIVER_OPS = _GLOBAL_DEF_OPS | {"func_begin", "func_ret", "func_end", "decl"}
+
+
+def _is_select_shape(instructions: List[IRInstruction], j: int) -> bool:
+    """Whether the jz/jnz at *j* opens `r = then; jmp END; ELSE: r = else;
+    END:` (how ternaries lower), i.e. a select of one of two values."""
+    arms = instructions[j + 1:j + 6]
+    if len(arms) < 5:
+        return False
+    then_mov, jmp, else_lbl, else_mov, end_lbl = arms
+    return (
+        then_mov.op == "mov"
+        and jmp.op == "jmp"
+        and else_lbl.op == "label"
+        and else_mov.op == "mov"
+        and end_lbl.op == "label"
+        and else_lbl.label == instructions[j].label
+        and jmp.label == end_lbl.label
+        and then_mov.result is not None
+        and then_mov.result == else_mov.result
+        and not then_mov.meta
+        and not else_mov.meta
+    )
+
+
+# Callee-saved registers %t temps may live in (see
+# CodeGenerator._assign_temp_regs).  Calls preserve them, so a temp's value
+# survives calls made while it is live.  %r10/%r11 are not used: call and
+# va_arg lowering borrow them as scratch.
+_TEMP_REGS: Tuple[str, ...] = ("%rbx", "%r12", "%r13", "%r14", "%r15")
+
+# IR op -> the fields whose %t temps its emitter only reads through
+# _load_operand and writes through _store_result/_store_imm.  A temp named
+# anywhere else (address-taken, a float/struct slot, ...) keeps its slot.
+_TEMP_REG_FIELDS: Dict[str, Tuple[str, ...]] = {
+    "mov": ("result", "operand1"),
+    "binop": ("result", "operand1", "operand2"),
+    **dict.fromkeys(("unop", "zext32", "sext32", "sext8", "sext16", "load", "store"),
+                    ("result", "operand1")),
+    **dict.fromkeys(("jz", "jnz", "ret", "i2f", "i2d"), ("operand1",)),
+    **dict.fromkeys(("str_const", "label_addr", "addr_of", "mov_addr", "fcmp", "f2i", "d2i"),
+                    ("result",)),
+    "call": ("result", "operand1", "args"),
+}
+
+# Integer kinds a register-held temp may have (pointers are allowed too).
+_TEMP_REG_KINDS = frozenset({TypeKind.CHAR, TypeKind.SHORT, TypeKind.INT, TypeKind.LONG,
+                             TypeKind.ENUM, TypeKind.POINTER})
+
+# IR ops a function may use and still run without a frame (see
+# CodeGenerator._frameless): none of them calls out or needs a stack slot
+# when its temps are in registers and its @names are globals.
+_FRAMELESS_OPS = frozenset({
+    "func_ret", "label", "jmp", "jz", "jnz", "mov", "binop", "unop", "zext32", "sext32",
+    "sext8", "sext16", "load", "store", "str_const", "label_addr", "addr_of", "mov_addr", "ret",
+})
+
+# Callees that may return twice; a setjmp'd frame keeps all temps in slots.
+_RETURNS_TWICE = frozenset({"@setjmp", "@_setjmp", "@sigsetjmp", "@__sigsetjmp", "@vfork"})
 
 # ---------------------------------------------------------------------------
 # SysV AMD64 ABI struct classification (eightbyte algorithm)
@@ -161,6 +650,10 @@ class CodeGenerator:
                  sym_table=None):
         self.optimize = optimize
         self._sema_ctx = sema_ctx
+        # Bound once: the symbol-type and layout tables are read on most
+        # loads/stores, and sema_ctx does not change for this generator.
+        self._global_types: Dict[str, Any] = getattr(sema_ctx, "global_types", {})
+        self._layouts: Dict[str, Any] = getattr(sema_ctx, "layouts", {})
         self._pic = pic
         self._sym_table = sym_table
         # Resolve TargetInfo from sema_ctx (with fallback to LP64 default)
@@ -190,11 +683,39 @@ class CodeGenerator:
         # Fixed spill area for temporaries (to avoid dynamic %rsp adjustment).
         self._spill_capacity = 0
         self._spill_used = 0
+        self._prologue_subq_idx: Optional[int] = None
+        self._prologue_end_idx = 0
         # Total size of declared locals area for current function (bytes).
         self._locals_base = 0
-        # struct layout: per-function member offset map
-        # (until full semantic layout is implemented).
-        self._member_offsets: Dict[tuple[str, str], int] = {}
+        # (base, member) -> (offset, size) resolved by _resolve_member in the
+        # current function.
+        self._member_offsets: Dict[Tuple[str, str], Tuple[int, int]] = {}
+        # (base, member) -> _resolve_bitfield result (None if not a bit-field).
+        self._member_bitfields: Dict[Tuple[str, str], Optional[Tuple[int, int]]] = {}
+        # operand -> (32/64 for unsigned int/long, else 0; unsigned), see
+        # _int_signedness.
+        self._signedness_cache: Dict[str, Tuple[int, bool]] = {}
+        # type string -> _resolve_type result (typedefs are fixed per TU).
+        self._resolved_types: Dict[str, str] = {}
+        # type string -> _type_info (size, unsigned, pointee size).
+        self._ty_cache: Dict[str, Tuple[int, bool, int]] = {}
+        # operand -> _get_type_str result for the active function.
+        self._type_str_cache: Dict[str, str] = {}
+        # operand -> (load instruction, store width) of its stack slot; see
+        # _slot_kind.  Invalidated together with _type_str_cache.
+        self._slot_kinds: Dict[str, Tuple[str, int]] = {}
+        # operand -> its complete `mov %rax-subreg, -off(%rbp)` store line,
+        # built on the first _store_result of %rax into it.
+        self._rax_stores: Dict[str, str] = {}
+        # %t temps the current function never reads; _store_result skips them.
+        self._dead_temps: Set[str] = set()
+        # %t temp -> callee-saved register holding it (see _assign_temp_regs),
+        # and the (register, save slot offset) pairs _emit_return restores.
+        self._temp_regs: Dict[str, str] = {}
+        self._saved_regs: List[Tuple[str, int]] = []
+        # Whether the current function runs without an %rbp frame (see
+        # _frameless); its saved registers are then pushed and popped.
+        self._omit_frame = False
 
     # ------------------------------------------------------------------
     # Type lookup helper (incremental migration)
@@ -243,8 +764,7 @@ class CodeGenerator:
 
     def _ctype_sizeof(self, ct: CType) -> int:
         """Get size in bytes from CType, using layouts for struct/union."""
-        layouts = getattr(self._sema_ctx, "layouts", None) if self._sema_ctx is not None else None
-        return self._target.sizeof_ctype(ct, layouts)
+        return self._target.sizeof_ctype(ct, self._layouts)
 
     def _get_base_struct_ctype(self, name: str) -> Optional[CType]:
         """Get the struct/union CType for a base operand used in member access.
@@ -313,17 +833,21 @@ class CodeGenerator:
         For non-temps (@locals), returns full type info.
         """
         if self._sym_table and isinstance(op, str):
-            # For temps, only return type info for non-scalar-integer types
-            if op.startswith("%t"):
-                ct = self._sym_table.lookup(op)
-                if ct is not None and ct.kind in (TypeKind.POINTER, TypeKind.ARRAY,
-                                                   TypeKind.FLOAT, TypeKind.DOUBLE,
-                                                   TypeKind.STRUCT, TypeKind.UNION):
-                    return self._ctype_to_type_str(ct)
-                return ""
+            # Every operand is looked up on each load/store; memoize the
+            # symbol-table walk and string conversion per operand.
+            hit = self._type_str_cache.get(op)
+            if hit is not None:
+                return hit
+            ty = ""
             ct = self._sym_table.lookup(op)
             if ct is not None:
-                return self._ctype_to_type_str(ct)
+                # For temps, only return type info for non-scalar-integer types
+                if not op.startswith("%t") or ct.kind in (TypeKind.POINTER, TypeKind.ARRAY,
+                                                          TypeKind.FLOAT, TypeKind.DOUBLE,
+                                                          TypeKind.STRUCT, TypeKind.UNION):
+                    ty = self._ctype_to_type_str(ct)
+            self._type_str_cache[op] = ty
+            return ty
         return ""
 
     def _ctype_to_type_str(self, ct: CType) -> str:
@@ -351,28 +875,44 @@ class CodeGenerator:
         """
         if self._sym_table:
             self._sym_table.insert(name, ctype)
+            self._type_str_cache.pop(name, None)
+            self._slot_kinds.pop(name, None)
+            self._rax_stores.pop(name, None)
 
     def generate(self, instructions: List[IRInstruction]) -> str:
         """Generate x86-64 assembly from IR"""
         self.assembly_lines = []
         self._string_pool = {}
         self._string_counter = 0
+        self._resolved_types = {}
+        self._ty_cache = {}
         # Optional per-temp pointer arithmetic step overrides (bytes).
         # Populated from IRInstruction.meta (e.g. for pointer-to-array decay).
         self._ptr_step_bytes: Dict[str, int] = {}
-        # function symbols in this translation unit (for function pointer decay)
-        self._functions = {ins.label for ins in instructions if ins.op == "func_begin" and ins.label}
-
-        # First pass: emit global declarations/definitions.
-        gdefs = [ins for ins in instructions if ins.op == "gdef"]
-        gblobs = [ins for ins in instructions if ins.op == "gdef_blob"]
-        gfloats = [ins for ins in instructions if ins.op == "gdef_float"]
-        gptrarrs = [ins for ins in instructions if ins.op == "gdef_ptr_array"]
-        gstructs = [ins for ins in instructions if ins.op == "gdef_struct"]
-        gdecls = [ins for ins in instructions if ins.op == "gdecl"]
+        # First pass: one walk over the IR collects the function symbols in
+        # this translation unit (for function pointer decay) and the global
+        # declarations/definitions, grouped by op, which are emitted next.
+        self._functions = set()
+        by_op: Dict[str, List[IRInstruction]] = {op: [] for op in _GLOBAL_DEF_OPS}
+        for ins in instructions:
+            op = ins.op
+            if op in _GLOBAL_DEF_OPS:
+                by_op[op].append(ins)
+            elif op == "func_begin" and ins.label:
+                self._functions.add(ins.label)
+        gdefs = by_op["gdef"]
+        gblobs = by_op["gdef_blob"]
+        gfloats = by_op["gdef_float"]
+        gptrarrs = by_op["gdef_ptr_array"]
+        gstructs = by_op["gdef_struct"]
+        gdecls = by_op["gdecl"]
 
         # Symbols with definitions should not also get .bss tentative entries
-        defined_syms = {(ins.result or "").lstrip("@") for ins in instructions if ins.op in ("gdef", "gdef_blob", "gdef_float", "gdef_ptr_array", "gdef_struct")}
+        defined_syms = {
+            (ins.result or "").lstrip("@")
+            for defs in (gdefs, gblobs, gfloats, gptrarrs, gstructs)
+            for ins in defs
+        }
 
         if gdecls:
             self._emit(".bss")
@@ -391,18 +931,11 @@ class CodeGenerator:
                 if "size" in meta:
                     sz = int(meta["size"])
                 elif isinstance(ty, str) and ty.startswith("array("):
-                    # Parse array(T,$N) to compute size
-                    inner = ty[len("array("):]
-                    if inner.endswith(")"):
-                        inner = inner[:-1]
-                    parts = inner.split(",", 1)
-                    base_part = parts[0].strip()
-                    cnt_part = parts[1].strip() if len(parts) > 1 else "$1"
-                    n = int(cnt_part.lstrip("$")) if cnt_part.startswith("$") else 1
+                    base_part, n = _parse_array_enc(ty)
                     elem_sz = self._type_size_bytes(base_part)
                     sz = n * elem_sz
                 elif isinstance(ty, str) and (ty.startswith("struct ") or ty.startswith("union ")) and self._sema_ctx is not None:
-                    layout = getattr(self._sema_ctx, "layouts", {}).get(ty)
+                    layout = self._layouts.get(ty)
                     sz = int(getattr(layout, "size", 8)) if layout is not None else 8
                 elif isinstance(ty, str) and (ty == "char" or ty.startswith("char ")):
                     sz = 1
@@ -423,16 +956,14 @@ class CodeGenerator:
                 self._emit(f"{name}:")
                 if isinstance(blob, str) and blob.startswith("blob:"):
                     hexbytes = blob[len("blob:") :]
-                    # emit as raw bytes
-                    for i in range(0, len(hexbytes), 2):
-                        b = int(hexbytes[i : i + 2] or "00", 16)
-                        self._emit(f"  .byte {b}")
+                    # emit as raw bytes, appended to the buffer in one call
+                    self._emit_lines([f"  .byte {b}" for b in bytes.fromhex(hexbytes)])
                     # Ensure any following objects are correctly aligned.
                     # In particular, struct blobs may include padding and may
                     # require natural alignment for correct field loads.
                     try:
                         if isinstance(ty, str) and (ty.startswith("struct ") or ty.startswith("union ")) and self._sema_ctx is not None:
-                            layout = getattr(self._sema_ctx, "layouts", {}).get(ty)
+                            layout = self._layouts.get(ty)
                             align = int(getattr(layout, "align", 1)) if layout is not None else 1
                         elif isinstance(ty, str) and (ty == "int" or ty.startswith("int ")):
                             align = 4
@@ -453,18 +984,22 @@ class CodeGenerator:
                 # extern with initializer isn't valid C; treat as definition anyway.
                 if gd.label != "static":
                     self._emit(f".globl {name}")
-                self._emit(f"{name}:")
                 # string-literal pointer initializer encoded as "=str:<text>"
                 if isinstance(imm, str) and imm.startswith("=str:"):
                     s = imm[len("=str:") :]
                     lbl = self._intern_string(s)
                     # pointer-sized object
+                    self._emit(f"  .align 8")
+                    self._emit(f"{name}:")
                     self._emit(f"  .quad {lbl}")
-                elif isinstance(ty, str) and (ty == "char" or ty.startswith("char ")):
-                    self._emit(f"  .byte {imm.lstrip('$')}")
                 else:
-                    # int
-                    self._emit(f"  .long {imm.lstrip('$')}")
+                    # Scalar: the same width _load_symbol/_store_result use,
+                    # naturally aligned.
+                    size = self._global_scalar_width(ty)[0]
+                    if size > 1:
+                        self._emit(f"  .align {size}")
+                    self._emit(f"{name}:")
+                    self._emit(f"  {_DATA_BY_SIZE[size]} {imm.lstrip('$')}")
 
             for gf in gfloats:
                 name = (gf.result or "").lstrip("@")
@@ -516,8 +1051,7 @@ class CodeGenerator:
                         lbl = self._intern_string(s)
                         self._emit(f"  .quad {lbl}")
                 elif "symbols" in meta:
-                    for sym in meta["symbols"]:
-                        self._emit(f"  .quad {sym}")
+                    self._emit_lines([f"  .quad {sym}" for sym in meta["symbols"]])
 
             # Struct/union member-by-member initialization
             for gs in gstructs:
@@ -558,8 +1092,8 @@ class CodeGenerator:
 
         # Seed symbol table for local static array symbols so codegen knows to
         # emit leaq (address) instead of movslq (value load).
-        for ins in instructions:
-            if ins.op == "gdecl" and ins.result and ins.operand1:
+        for ins in gdecls:
+            if ins.result and ins.operand1:
                 ty = str(ins.operand1)
                 if ty.startswith("array(") and self._sym_table:
                     if self._sym_table.lookup(ins.result) is None:
@@ -568,13 +1102,47 @@ class CodeGenerator:
                             self._register_type(ins.result, ct)
 
         self._emit(".text")
+        handlers = self._INS_HANDLERS
+        n = len(instructions)
+        # Index of a compare binop fused with the jz/jnz after it -> whether
+        # its result temp must still be stored (see _emit_cmp_jump).
+        cmp_jumps: Dict[int, bool] = {}
+        # Indices of jz/jnz that open a two-way select (see _select_arms).
+        selects: Set[int] = set()
+        # Where the current function starts in `instructions` and the
+        # output, to re-emit it with a frame if eliding one fails.
+        fn_begin = fn_lines = 0
+        force_frame = False
         i = 0
-        while i < len(instructions):
+        while i < n:
             ins = instructions[i]
-            if ins.op in {"gdecl", "gdef", "gdef_blob", "gdef_float", "gdef_ptr_array", "gdef_struct"}:
+            op = ins.op
+            if op not in _DRIVER_OPS:
+                if i in cmp_jumps:
+                    arms = self._select_arms(instructions, i + 1) if i + 1 in selects else None
+                    self._emit_cmp_jump(ins, instructions[i + 1], cmp_jumps[i], arms)
+                    i += 2 if arms is None else 7
+                    continue
+                if i in selects:
+                    arms = self._select_arms(instructions, i)
+                    if arms is not None:
+                        self._load_operand(ins.operand1, "%rax")
+                        self._emit("  testq %rax, %rax")
+                        self._emit_select(arms, "ne" if op == "jz" else "e")
+                        i += 6
+                        continue
+                # Ordinary body instruction: straight to its emitter (this is
+                # _emit_ins, inlined since it runs once per IR instruction).
+                handler = handlers.get(op)
+                if handler is not None:
+                    handler(self, ins)
+                i += 1
+                continue
+            if op in _GLOBAL_DEF_OPS:
                 i += 1
                 continue
-            if ins.op == "func_begin":
+            if op == "func_begin":
+                fn_begin, fn_lines = i, len(self.assembly_lines)
                 fn_name = ins.label or ""
                 self._fn_name = fn_name
                 # Activate the per-function symbol table locals so that
@@ -585,11 +1153,13 @@ class CodeGenerator:
                     # _func_locals keys, but func_begin label may have @static.
                     _activate_name = fn_name.split("@")[0] if "@" in fn_name else fn_name
                     self._sym_table.activate_function(_activate_name)
+                self._type_str_cache = {}
+                self._slot_kinds = {}
                 # Seed return type (if known) for ABI-sensitive `ret`.
                 self._fn_ret_ty = ""
                 try:
                     if getattr(self, "_sema_ctx", None) is not None and fn_name:
-                        fn_ty = getattr(self._sema_ctx, "global_types", {}).get(fn_name)
+                        fn_ty = self._global_types.get(fn_name)
                         if fn_ty is not None:
                             s = str(fn_ty)
                             if s.startswith("function "):
@@ -599,10 +1169,31 @@ class CodeGenerator:
                                 self._fn_ret_ty = rest
                 except Exception:
                     self._fn_ret_ty = ""
-                # Pre-scan: seed symbol table for decls and pointer-producing ops.
+                # Pre-scan (single pass to func_end): seed symbol table for
+                # decls and pointer-producing ops, and collect ALL decl/param
+                # instructions in the function body (not just top-of-function).
+                # C89 allows declarations after statements, and IR emits decl
+                # at the point of declaration.
+                decls: List[IRInstruction] = []
+                cmp_jumps = {}
+                selects = set()
                 j = i + 1
-                while j < len(instructions) and instructions[j].op != "func_end":
+                while j < n and instructions[j].op != "func_end":
                     d = instructions[j]
+                    if d.op == "decl" or d.op == "param":
+                        decls.append(d)
+                    elif d.op == "jz" or d.op == "jnz":
+                        prev = instructions[j - 1]
+                        if (
+                            prev.op == "binop"
+                            and prev.label in _INT_CMP_JCC
+                            and prev.result == d.operand1
+                            and d.operand1
+                            and d.operand1.startswith("%t")
+                        ):
+                            cmp_jumps[j - 1] = True
+                        if _is_select_shape(instructions, j):
+                            selects.add(j)
                     if d.op == "decl" and d.result and d.operand1 and self._sym_table:
                         # Only register if not already known (IR gen may have
                         # registered a more precise CType via activate_function).
@@ -627,50 +1218,59 @@ class CodeGenerator:
                         elif self._sym_table.lookup(d.result) is None:
                             self._register_type(d.result, PointerType(kind=TypeKind.POINTER, pointee=CType(kind=TypeKind.VOID)))
                     j += 1
-                # Collect ALL decl/param instructions in the function body
-                # (not just top-of-function). C89 allows declarations after
-                # statements, and IR emits decl at the point of declaration.
-                body_start = i + 1
-                decls: List[IRInstruction] = []
+                # Temps named only once in the body are never read: their
+                # stores are dropped (see _store_result), as are the stored
+                # 0/1 values of fused compares read only by their jump.
+                temp_refs = self._temp_refs(instructions, i + 1, j)
+                self._dead_temps = {t for t, c in temp_refs.items() if c == 1}
+                for k in cmp_jumps:
+                    cmp_jumps[k] = temp_refs[instructions[k].result] != 2
+                    if not cmp_jumps[k]:
+                        self._dead_temps.add(instructions[k].result)
+                if selects:
+                    # The else label must be private to its jz/jnz, since
+                    # the select does not emit it.
+                    label_refs = self._label_refs(instructions, i + 1, j)
+                    selects = {k for k in selects if label_refs[instructions[k].label] == 2}
                 # Skip initial prologue-only instructions (func_ret, param, decl)
                 # to find where the body starts for code emission.
-                prologue_end = body_start
-                while prologue_end < len(instructions) and instructions[prologue_end].op in {"decl", "param", "func_ret"}:
-                    if instructions[prologue_end].op in {"decl", "param"}:
-                        decls.append(instructions[prologue_end])
-                    elif instructions[prologue_end].op == "func_ret":
-                        self._fn_ret_ty = instructions[prologue_end].operand1 or ""
-                    prologue_end += 1
-                # Now scan the rest of the function body for additional decls.
-                scan = prologue_end
-                while scan < len(instructions) and instructions[scan].op != "func_end":
-                    if instructions[scan].op in {"decl", "param"}:
-                        decls.append(instructions[scan])
-                    scan += 1
-                body_start = prologue_end
+                body_start = i + 1
+                while body_start < j and instructions[body_start].op in {"decl", "param", "func_ret"}:
+                    if instructions[body_start].op == "func_ret":
+                        self._fn_ret_ty = instructions[body_start].operand1 or ""
+                    body_start += 1
 
                 # Compute stack frame layout for locals/params
-                # Reserve a fixed spill area for lazily-created temporaries.
-                # This avoids emitting `subq $8, %rsp` for every new %t temp.
+                # Reserve the spill area for lazily-created temporaries up
+                # front, so the body never emits `subq ..., %rsp` for them.
                 # Keep it 16B-aligned so call-site alignment stays stable.
-                self._spill_capacity = 4096
-                if self._spill_capacity % 16 != 0:
-                    self._spill_capacity += 16 - (self._spill_capacity % 16)
+                self._temp_regs = self._assign_temp_regs(instructions, i + 1, j)
+                self._spill_capacity = self._spill_area_estimate(instructions, body_start, j, self._temp_regs)
                 self._spill_used = 0
+                self._omit_frame = not force_frame and self._frameless(instructions, i + 1, j)
+                force_frame = False
 
                 self._begin_function(fn_name, decls)
 
                 i = body_start
                 continue
 
-            if ins.op == "func_ret":
+            if op == "func_ret":
                 # Per-function return type hint from IR.
                 self._fn_ret_ty = (ins.operand1 or "")
                 i += 1
                 continue
 
-            if ins.op == "func_end":
+            if op == "func_end":
+                if self._omit_frame and self._locals:
+                    # Something took a stack slot after all: emit the
+                    # function again, this time with a frame.
+                    del self.assembly_lines[fn_lines:]
+                    force_frame = True
+                    i = fn_begin
+                    continue
                 # function epilogue already emitted on ret; emit a safety label
+                self._finish_frame()
                 self._fn_name = None
                 self._fn_ret_ty = ""
                 i += 1
@@ -680,10 +1280,9 @@ class CodeGenerator:
             # Some IR lowerings may emit `decl` after the initial prologue scan.
             # Ensure such locals are registered so later loads/stores don't
             # mistakenly treat them as globals.
-            if ins.op == "decl" and ins.result:
-                if ins.result not in self._locals:
-                    # Allocate a slot now.
-                    self._ensure_local(ins.result)
+            if op == "decl" and ins.result:
+                # Allocate a slot now (a no-op if it already has one).
+                self._ensure_local(ins.result)
                 # Keep type info in sync for decls emitted after prologue scan
                 # (e.g. local `char s[] = "..."` lowers by overriding decl).
                 if ins.operand1:
@@ -699,32 +1298,22 @@ class CodeGenerator:
                     # later stack addressing and array decay behaves consistently.
                     op1 = str(ins.operand1)
                     if op1.strip().startswith("array("):
-                        enc = op1.strip()
-                        inner = enc[len("array(") :]
-                        if inner.endswith(")"):
-                            inner = inner[:-1]
-                        base_part, cnt_part = (inner.split(",", 1) + [""])[:2]
-                        base_part = base_part.strip()
-                        cnt_part = cnt_part.strip()
-                        elems = 1
-                        if cnt_part.startswith("$"):
-                            try:
-                                elems = int(cnt_part[1:])
-                            except Exception:
-                                elems = 1
+                        base_part, elems = _parse_array_enc(op1)
                         elem_sz = self._type_size_bytes(base_part)
                         self._arrays[ins.result] = max(0, elems) * elem_sz
-                i += 1
-                continue
-            self._emit_ins(ins)
             i += 1
 
         # Emit rodata for strings
         if self._string_pool or self._float_pool:
             self._emit(".section .rodata")
-            for s, lbl in self._string_pool.items():
-                self._emit(f"{lbl}:")
-                self._emit(f"  .string {self._gas_escape(s)}")
+            # The pool holds each distinct literal once, so each is escaped
+            # once here; its label/.string pairs go out in one extend.
+            escape = self._gas_escape
+            self._emit_lines([
+                line
+                for s, lbl in self._string_pool.items()
+                for line in (f"{lbl}:", f"  .string {escape(s)}")
+            ])
             # Emit float constants
             for key, lbl in self._float_pool.items():
                 fp_type, bits_hex = key.split(":", 1)
@@ -740,7 +1329,73 @@ class CodeGenerator:
                     val = _struct.unpack('<Q', raw)[0]
                     self._emit(f"  .quad {val}")
 
-        return "\n".join(self.assembly_lines) + "\n"
+        if self.optimize:
+            self._peephole()
+        # Join once with a trailing empty line for the final newline, rather
+        # than concatenating "\n" onto (and so copying) the whole output.
+        lines = self.assembly_lines
+        lines.append("")
+        asm = "\n".join(lines)
+        lines.pop()
+        return asm
+
+    def _peephole(self) -> None:
+        """Drop a `testq/setne/movzbq` re-boolify of %rax that directly
+        follows `movzbq %al, %rax`, a compare's `setcc %dl; movq %rdx, %rax`
+        or a logical &&/|| template (the value is already 0 or 1), a `movl %eax, %eax` zero-extension that directly
+        follows a 32-bit write to %eax, a `movq -off(%rbp), REG` reload that
+        directly follows `movq REG, -off(%rbp)` (REG still holds the stored
+        value), and `movq REG, REG` self-moves.
+
+        The re-boolify is kept when the next instruction reads the flags it
+        set; `movl` does not touch the flags.
+        """
+        lines = self.assembly_lines
+        n = len(lines)
+        out: List[str] = []
+        i = 0
+        while i < n:
+            line = lines[i]
+            if (
+                line == "  testq %rax, %rax"
+                and out
+                and (
+                    out[-1] == "  movzbq %al, %rax"
+                    or (
+                        out[-1] == "  movq %rdx, %rax"
+                        and out[-2].startswith("  set")
+                        and out[-2].endswith(" %dl")
+                    )
+                    or (out[-1].endswith("q %rcx, %rax") and tuple(out[-5:]) in _BOOL_RAX_TAILS)
+                )
+                and tuple(lines[i:i + 3]) == _BOOLIFY_RAX
+            ):
+                nxt = lines[i + 3] if i + 3 < n else ""
+                if not nxt.startswith(("  j", "  set", "  cmov", "  adc", "  sbb")) or nxt.startswith("  jmp"):
+                    i += 3
+                    continue
+            elif (
+                line == "  movl %eax, %eax"
+                and out
+                and out[-1].endswith(", %eax")
+                and out[-1].startswith(_EAX_WRITER_PREFIXES)
+            ):
+                i += 1
+                continue
+            elif line.startswith("  movq -") and out and out[-1].startswith("  movq %"):
+                mem, _, reg = line[7:].partition(", ")
+                if out[-1] == f"  movq {reg}, {mem}":
+                    i += 1
+                    continue
+            elif line.startswith("  movq %"):
+                src, _, dst = line[7:].partition(", ")
+                if src == dst:
+                    i += 1
+                    continue
+            out.append(line)
+            i += 1
+        if len(out) != n:
+            self.assembly_lines = out
 
     def _is_local(self, sym: str) -> bool:
         # Treat IR locals ("@x") as local even if they weren't part of the
@@ -764,7 +1419,7 @@ class CodeGenerator:
         if struct_ct is not None:
             tag = self._ctype_struct_tag(struct_ct)
             if tag:
-                layout = getattr(self._sema_ctx, "layouts", {}).get(tag)
+                layout = self._layouts.get(tag)
                 if layout is not None:
                     mtypes = getattr(layout, "member_types", None)
                     if isinstance(mtypes, dict):
@@ -785,13 +1440,13 @@ class CodeGenerator:
             elif self._ctype_is_struct_or_union(ct):
                 ty = self._ctype_struct_tag(ct)
         if (ty is None or ty == "") and isinstance(base, str) and base.startswith("@"):
-            ty = getattr(self._sema_ctx, "global_types", {}).get(base[1:], None)
+            ty = self._global_types.get(base[1:], None)
 
         if not isinstance(ty, str) or not ty:
             return None
 
         resolved_ty = self._resolve_type(ty)
-        layout = getattr(self._sema_ctx, "layouts", {}).get(resolved_ty)
+        layout = self._layouts.get(resolved_ty)
         if layout is None:
             return None
 
@@ -804,10 +1459,256 @@ class CodeGenerator:
 
     # Function framing
 
+    @staticmethod
+    def _spill_area_estimate(instructions: List[IRInstruction], start: int, end: int,
+                             in_regs: Dict[str, str]) -> int:
+        """Bytes to reserve for temps of the function body instructions[start:end].
+
+        Each distinct %t temp not held in a register (*in_regs*) gets 16
+        bytes (long double temps need 16), each register 8 for its save
+        slot, each call and call argument 8 more for the spill slots call
+        lowering creates, and sized ops (struct copies/returns) their size.
+        If the body still outgrows it, _grow_spill_area extends the frame.
+        """
+        temps = set()
+        extra = 64
+        for k in range(start, end):
+            ins = instructions[k]
+            for name in (ins.result, ins.operand1, ins.operand2):
+                if name and name.startswith("%t"):
+                    temps.add(name)
+            if ins.args:
+                for name in ins.args:
+                    if isinstance(name, str) and name.startswith("%t"):
+                        temps.add(name)
+                extra += 8 * len(ins.args)
+            if ins.op == "call":
+                extra += 8
+            size = ins.meta.get("size") if ins.meta else None
+            if isinstance(size, int) and size > 0:
+                extra += (size + 7) & ~7
+        total = 16 * len(temps.difference(in_regs)) + 8 * len(set(in_regs.values())) + extra
+        return (total + 15) & ~15
+
+    @staticmethod
+    def _temp_refs(instructions: List[IRInstruction], start: int, end: int) -> Dict[str, int]:
+        """Count how often each %t temp is named (defined or read) in
+        instructions[start:end]."""
+        refs: Dict[str, int] = {}
+        for k in range(start, end):
+            ins = instructions[k]
+            for name in (ins.result, ins.operand1, ins.operand2):
+                if name and name.startswith("%t"):
+                    refs[name] = refs.get(name, 0) + 1
+            if ins.args:
+                for name in ins.args:
+                    if isinstance(name, str) and name.startswith("%t"):
+                        refs[name] = refs.get(name, 0) + 1
+        return refs
+
+    @staticmethod
+    def _label_refs(instructions: List[IRInstruction], start: int, end: int) -> Dict[str, int]:
+        """Count how often each .L label is named (defined, jumped to or
+        taken the address of) in instructions[start:end]."""
+        refs: Dict[str, int] = {}
+        for k in range(start, end):
+            ins = instructions[k]
+            for name in (ins.label, ins.operand1, ins.operand2):
+                if name and name.startswith(".L"):
+                    refs[name] = refs.get(name, 0) + 1
+        return refs
+
+    def _assign_temp_regs(self, instructions: List[IRInstruction], start: int, end: int) -> Dict[str, str]:
+        """Map %t temps of the function instructions[start:end] to callee-saved
+        registers (_TEMP_REGS) by linear scan over their live intervals.
+
+        Only integer/pointer temps that every instruction naming them reads
+        and writes through _load_operand/_store_result qualify (see
+        _TEMP_REG_FIELDS).  An interval runs from a temp's first to its last
+        mention, widened to span any loop it is live around.  When the
+        registers run out, the interval ending last stays in its slot.
+        Varargs, setjmp and computed-goto functions keep every temp in its
+        slot.
+        """
+        first: Dict[str, int] = {}
+        last: Dict[str, int] = {}
+        # Temps whose first mention is a read (live into their first block).
+        read_first: Set[str] = set()
+        barred: Set[str] = set()
+        labels: Dict[str, int] = {}
+        loops: List[Tuple[int, int]] = []
+        ret_in_rax = self._returns_in_rax()
+        for k in range(start, end):
+            ins = instructions[k]
+            op = ins.op
+            if op == "label":
+                labels[ins.label] = k
+                continue
+            if op == "indirect_jump" or (op == "param" and ins.result == "@..."):
+                return {}
+            if op in ("jmp", "jz", "jnz") and ins.label in labels:
+                loops.append((labels[ins.label], k))
+            fields = _TEMP_REG_FIELDS.get(op, ())
+            if op == "call":
+                target = ins.operand1 or ""
+                if target in _RETURNS_TWICE:
+                    return {}
+                if target.startswith("@__builtin_"):
+                    fields = ()
+                elif any(t in str(ins.operand2 or "") for t in ("float", "double", "struct ", "union ")):
+                    fields = ("operand1", "args")
+            elif op == "mov":
+                src_ct = self._get_type(ins.operand1) if ins.operand1 else None
+                if src_ct is not None and src_ct.kind not in _TEMP_REG_KINDS:
+                    fields = ()
+            elif op == "ret" and not ret_in_rax:
+                fields = ()
+            named = [(ins.result, "result"), (ins.operand1, "operand1"), (ins.operand2, "operand2")]
+            if ins.args:
+                named.extend((a, "args") for a in ins.args if isinstance(a, str))
+            for name, field in named:
+                if not name or not name.startswith("%t"):
+                    continue
+                if name not in first:
+                    first[name] = k
+                    if field != "result":
+                        read_first.add(name)
+                last[name] = k
+                if field not in fields:
+                    barred.add(name)
+
+        intervals: Dict[str, Tuple[int, int]] = {}
+        for t, s in first.items():
+            if t in barred or t in self._dead_temps:
+                continue
+            ct = self._get_type(t)
+            if ct is not None and ct.kind not in _TEMP_REG_KINDS:
+                continue
+            if self._slot_kind(t) != ("movq", 8):
+                continue
+            intervals[t] = (s, last[t])
+        if not intervals:
+            return {}
+
+        # A value live on a loop's back edge must survive the whole loop:
+        # widen intervals reaching into or out of [head, tail], and those
+        # inside it that are read before they are written.
+        changed = bool(loops)
+        while changed:
+            changed = False
+            for head, tail in loops:
+                for t, (s, e) in intervals.items():
+                    if e < head or s > tail:
+                        continue
+                    if head <= s and e <= tail and t not in read_first:
+                        continue
+                    span = (min(s, head), max(e, tail))
+                    if span != (s, e):
+                        intervals[t] = span
+                        changed = True
+
+        regs: Dict[str, str] = {}
+        free = list(reversed(_TEMP_REGS))
+        active: List[Tuple[int, str]] = []
+        for t in sorted(intervals, key=lambda t: intervals[t][0]):
+            s, e = intervals[t]
+            # Intervals ending before this one starts free their register
+            # (one ending at `s` may still be read by the defining op).
+            still = []
+            for a in active:
+                if a[0] < s:
+                    free.append(regs[a[1]])
+                else:
+                    still.append(a)
+            active = still
+            if free:
+                regs[t] = free.pop()
+                active.append((e, t))
+                continue
+            far = max(active)
+            if far[0] > e:
+                regs[t] = regs.pop(far[1])
+                active.remove(far)
+                active.append((e, t))
+        return regs
+
+    def _returns_in_rax(self) -> bool:
+        """Whether the current function returns its value (if any) in %rax."""
+        ret_ty = self._resolve_type(self._fn_ret_ty.strip()) if self._fn_ret_ty else ""
+        return not ret_ty or "*" in ret_ty or not (
+            ret_ty.startswith(("struct ", "union ")) or ret_ty in ("float", "double", "long double"))
+
+    def _frameless(self, instructions: List[IRInstruction], start: int, end: int) -> bool:
+        """Whether the function instructions[start:end] can run without an
+        %rbp frame: a leaf with no params or locals whose temps all live in
+        registers (or are never stored) and that returns in %rax."""
+        if not self._returns_in_rax():
+            return False
+        temp_regs = self._temp_regs
+        dead = self._dead_temps
+        for k in range(start, end):
+            ins = instructions[k]
+            if ins.op not in _FRAMELESS_OPS:
+                return False
+            for name in (ins.result, ins.operand1, ins.operand2):
+                if name and name.startswith("%t") and name not in temp_regs and name not in dead:
+                    return False
+        return True
+
+    def _grow_spill_area(self, alloc: int) -> None:
+        """Extend the spill area so *alloc* more bytes fit, patching the
+        already-emitted prologue with the new frame size."""
+        if getattr(self, "_varargs_reg_save_base", None) is not None:
+            # The varargs save/tag area sits at the bottom of the current
+            # frame; continue spilling below it.
+            self._spill_capacity = self._stack_size - self._locals_base
+            self._spill_used = max(self._spill_used, self._spill_capacity)
+        need = self._spill_used + alloc - self._spill_capacity
+        grow = max(256, (need + 15) & ~15)
+        self._spill_capacity += grow
+        self._stack_size += grow
+        self._patch_prologue_frame()
+
+    def _patch_prologue_frame(self) -> None:
+        idx = self._prologue_subq_idx
+        if idx is not None:
+            self.assembly_lines[idx] = f"  subq ${self._stack_size}, %rsp"
+
+    def _finish_frame(self) -> None:
+        """Size the frame once the body is emitted: slots handed out after
+        the prologue (late @locals live past the spill area) must still lie
+        inside it, and the part of the up-front spill estimate no temp used
+        is trimmed off again."""
+        deepest = max(self._locals.values()) if self._locals else 0
+        if deepest <= self._stack_size:
+            # Every slot is a -off(%rbp) in self._locals, except the varargs
+            # save area pinned to the frame bottom.
+            idx = self._prologue_subq_idx
+            if idx is None or getattr(self, "_varargs_reg_save_base", None) is not None:
+                return
+            size = (deepest + 15) & ~15
+            if size == self._stack_size:
+                return
+            self._stack_size = size
+            if size:
+                self._patch_prologue_frame()
+            else:
+                del self.assembly_lines[idx]
+                self._prologue_subq_idx = None
+            return
+        self._stack_size = (deepest + 15) & ~15
+        if self._prologue_subq_idx is None:
+            self._prologue_subq_idx = self._prologue_end_idx
+            self.assembly_lines.insert(self._prologue_end_idx, "")
+        self._patch_prologue_frame()
+
     def _begin_function(self, name: str, decls: List[IRInstruction]) -> None:
         self._locals = {}
         self._arrays = {}
         self._member_offsets = {}
+        self._member_bitfields = {}
+        self._rax_stores = {}
+        self._signedness_cache = {}
 
         # Assign stack slots (minimum 8 bytes each to avoid overlap).
         offset = 0
@@ -817,22 +1718,11 @@ class CodeGenerator:
             sym = d.result
             if sym in self._locals:
                 continue
+            # The declared type string, stripped once for the tests below.
+            ty_str = str(d.operand1).strip() if d.operand1 else ""
             # Arrays: operand1 is encoded as "array(<base>,$N)".
-            if d.operand1 and isinstance(d.operand1, str) and d.operand1.strip().startswith("array("):
-                enc = d.operand1.strip()
-                # parse "array(T,$N)"
-                inner = enc[len("array(") :]
-                if inner.endswith(")"):
-                    inner = inner[:-1]
-                base_part, cnt_part = (inner.split(",", 1) + [""])[:2]
-                base_part = base_part.strip()
-                cnt_part = cnt_part.strip()
-                elems = 1
-                if cnt_part.startswith("$"):
-                    try:
-                        elems = int(cnt_part[1:])
-                    except Exception:
-                        elems = 1
+            if ty_str.startswith("array("):
+                base_part, elems = _parse_array_enc(ty_str)
                 elem_sz = self._type_size_bytes(base_part)
                 size_bytes = max(0, elems) * elem_sz
                 offset += size_bytes
@@ -846,7 +1736,6 @@ class CodeGenerator:
                     self._arrays[sym] = size_bytes
             else:
                 # Struct/union locals: allocate actual size, at least 8 bytes for alignment.
-                ty_str = str(d.operand1) if d.operand1 else ""
                 # CType-based path: parse the declared type string into CType
                 # Note: symbol table local scope is empty during codegen (popped
                 # after IR generation), so we parse the type string directly.
@@ -868,12 +1757,10 @@ class CodeGenerator:
                     self._locals[sym] = offset
                     if self._sym_table and decl_ct is not None:
                         self._register_type(sym, decl_ct)
-                elif ty_str.strip() == "long double":
+                elif ty_str == "long double":
                     # long double needs 16-byte aligned slot (x86-64 ABI)
                     # Align offset to 16-byte boundary first
-                    if offset % 16 != 0:
-                        offset += 16 - (offset % 16)
-                    offset += 16
+                    offset = ((offset + 15) & ~15) + 16
                     self._locals[sym] = offset
                     if self._sym_table:
                         self._register_type(sym, FloatType(kind=TypeKind.DOUBLE))
@@ -881,10 +1768,10 @@ class CodeGenerator:
                     # Scalar locals: reserve a full 8-byte slot (simplifies addressing).
                     offset += 8
                     self._locals[sym] = offset
-                    if d.operand1:
+                    if ty_str:
                         # remember declared type base for load/store width decisions
                         if self._sym_table:
-                            ct = _str_to_ctype(str(d.operand1))
+                            ct = _str_to_ctype(ty_str)
                             if ct is not None:
                                 self._register_type(sym, ct)
 
@@ -915,10 +1802,7 @@ class CodeGenerator:
 
         # Align stack to 16 bytes (SysV ABI requirement for call sites).
         # After push %rbp, %rsp is 16-aligned. subq $N must keep it aligned.
-        stack = offset
-        if stack % 16 != 0:
-            stack += 16 - (stack % 16)
-        self._stack_size = stack
+        self._stack_size = (offset + 15) & ~15
 
         # IR may tag internal-linkage functions as "name@static".
         emit_name = name
@@ -929,10 +1813,21 @@ class CodeGenerator:
 
         if not is_static_fn:
             self._emit(f".globl {emit_name}")
+        # Start each function on a 16-byte boundary (nop-padded).
+        self._emit("  .p2align 4, 0x90")
         self._emit(f"{emit_name}:")
-        self._emit("  pushq %rbp")
-        self._emit("  movq %rsp, %rbp")
+        if self._omit_frame:
+            self._stack_size = 0
+        else:
+            self._emit("  pushq %rbp")
+            self._emit("  movq %rsp, %rbp")
+        # Index of the frame-size line, for later patching as the frame grows;
+        # _finish_frame inserts one at _prologue_end_idx if the frame starts
+        # out empty.
+        self._prologue_subq_idx = None
+        self._prologue_end_idx = len(self.assembly_lines)
         if self._stack_size:
+            self._prologue_subq_idx = len(self.assembly_lines)
             self._emit(f"  subq ${self._stack_size}, %rsp")
         # Maintain SysV ABI stack alignment at call sites.
         # After `call`, %rsp is 8 mod 16 on entry. After `push %rbp`, %rsp is 0 mod 16.
@@ -947,7 +1842,7 @@ class CodeGenerator:
         ret_ty = getattr(self, "_fn_ret_ty", "") or ""
         if isinstance(ret_ty, str) and (ret_ty.strip().startswith("struct ") or ret_ty.strip().startswith("union ")):
             rty_s = ret_ty.strip()
-            layout = getattr(self._sema_ctx, "layouts", {}).get(rty_s) if self._sema_ctx else None
+            layout = self._layouts.get(rty_s)
             classification = classify_struct(rty_s, layout) if layout else [EightbyteClass.INTEGER]
             pm = get_struct_pass_mode(classification)
             if pm == "hidden_ptr":
@@ -957,8 +1852,8 @@ class CodeGenerator:
                 self._emit(f"  movq %rdi, -{self._hidden_ret_ptr_off}(%rbp)")
 
         # Move params from registers into stack slots (treat @param as local)
-        arg_regs = ["%rdi", "%rsi", "%rdx", "%rcx", "%r8", "%r9"]
-        xmm_arg_regs = ["%xmm0", "%xmm1", "%xmm2", "%xmm3", "%xmm4", "%xmm5", "%xmm6", "%xmm7"]
+        arg_regs = _ARG_REGS
+        xmm_arg_regs = _XMM_ARG_REGS
         gp_idx = 0
         xmm_idx = 0
         stack_arg_off = 0  # offset for stack-passed params (e.g. long double)
@@ -999,7 +1894,7 @@ class CodeGenerator:
             elif ty.startswith("struct ") or ty.startswith("union "):
                 # Struct/union by-value param: use StructClassifier to decide
                 # GP vs XMM registers per eightbyte (SysV ABI).
-                layout = getattr(self._sema_ctx, "layouts", {}).get(ty) if self._sema_ctx else None
+                layout = self._layouts.get(ty)
                 classification = classify_struct(ty, layout) if layout else [EightbyteClass.INTEGER]
                 pass_mode = get_struct_pass_mode(classification)
                 sz = self._type_size_bytes(ty)
@@ -1058,17 +1953,11 @@ class CodeGenerator:
             else:
                 if gp_idx < len(arg_regs):
                     if ty == "char" or ty == "unsigned char":
-                        r = arg_regs[gp_idx]
-                        breg = {"%rdi": "%dil", "%rsi": "%sil", "%rdx": "%dl", "%rcx": "%cl", "%r8": "%r8b", "%r9": "%r9b"}.get(r, "%dil")
-                        self._emit(f"  movb {breg}, -{off}(%rbp)")
+                        self._emit(f"  movb {_ARG_REGS_B[gp_idx]}, -{off}(%rbp)")
                     elif ty in ("short", "short int", "unsigned short"):
-                        r = arg_regs[gp_idx]
-                        w = {"%rdi": "%di", "%rsi": "%si", "%rdx": "%dx", "%rcx": "%cx", "%r8": "%r8w", "%r9": "%r9w"}.get(r, "%di")
-                        self._emit(f"  movw {w}, -{off}(%rbp)")
+                        self._emit(f"  movw {_ARG_REGS_W[gp_idx]}, -{off}(%rbp)")
                     elif ty in ("int", "unsigned int") or ty.startswith("enum "):
-                        r = arg_regs[gp_idx]
-                        l = {"%rdi": "%edi", "%rsi": "%esi", "%rdx": "%edx", "%rcx": "%ecx", "%r8": "%r8d", "%r9": "%r9d"}.get(r, "%edi")
-                        self._emit(f"  movl {l}, -{off}(%rbp)")
+                        self._emit(f"  movl {_ARG_REGS_L[gp_idx]}, -{off}(%rbp)")
                     else:
                         self._emit(f"  movq {arg_regs[gp_idx]}, -{off}(%rbp)")
                 gp_idx += 1
@@ -1081,6 +1970,19 @@ class CodeGenerator:
                     if ct is not None:
                         self._register_type(d.result, ct)
 
+        # Callee-saved registers that hold temps (see _assign_temp_regs) are
+        # saved in spill slots here and restored by _emit_return.
+        self._saved_regs = []
+        for reg in _TEMP_REGS:
+            if reg in self._temp_regs.values():
+                if self._omit_frame:
+                    self._emit(f"  pushq {reg}")
+                    self._saved_regs.append((reg, 0))
+                    continue
+                off = self._ensure_local(self._new_spill_name())
+                self._emit(f"  movq {reg}, {_slot(off)}")
+                self._saved_regs.append((reg, off))
+
         # Varargs support (SysV AMD64): reserve a fixed reg_save_area and tag
         # area in the callee frame so `__builtin_va_start` can produce a glibc
         # ABI-compatible `va_list`.
@@ -1104,17 +2006,16 @@ class CodeGenerator:
             # Layout (lowest addresses):
             #   [reg_save_area 176B] [tag area 32B]
             # Both are addressed via fixed -off(%rbp) offsets.
-            abi_reserve = self._VARARGS_VA_LIST_TAG_AREA_SIZE + self._VARARGS_REG_SAVE_AREA_SIZE
+            # The bases below sit _VARARGS_GP_SAVE_AREA_SIZE above the frame
+            # bottom, so reserve that too or the areas reach into the spill
+            # slots just above.
+            abi_reserve = (self._VARARGS_VA_LIST_TAG_AREA_SIZE + self._VARARGS_REG_SAVE_AREA_SIZE
+                           + self._VARARGS_GP_SAVE_AREA_SIZE)
             # keep 16B alignment
-            if abi_reserve % 16 != 0:
-                abi_reserve += 16 - (abi_reserve % 16)
-            self._stack_size += abi_reserve
+            self._stack_size += (abi_reserve + 15) & ~15
 
             # Patch already-emitted prologue to use the final frame size.
-            for idx, line in enumerate(self.assembly_lines[:16]):
-                if line.strip().startswith("subq $") and line.strip().endswith(", %rsp"):
-                    self.assembly_lines[idx] = f"  subq ${self._stack_size}, %rsp"
-                    break
+            self._patch_prologue_frame()
 
             # ABI region lives at the very bottom of the frame and is addressed
             # via fixed -off(%rbp) offsets (so later spills cannot overlap it).
@@ -1155,696 +2056,636 @@ class CodeGenerator:
     # Instruction emission
 
     def _emit_ins(self, ins: IRInstruction) -> None:
-        op = ins.op
-        if op == "label":
-            self._emit(f"{ins.label}:")
-            return
+        # One handler per IR op (see _INS_HANDLERS below): a single dict
+        # lookup instead of testing the op against every branch in turn.
+        # decl/param are handled in prologue and have no handler.
+        handler = self._INS_HANDLERS.get(ins.op)
+        if handler is not None:
+            handler(self, ins)
 
+    def _ins_label(self, ins: IRInstruction) -> None:
+        self._emit(f"{ins.label}:")
+
+    def _ins_jmp(self, ins: IRInstruction) -> None:
         # NOTE: Don't blindly rewrite bare identifiers to '@name' here.
         # Bare identifiers may legally be extern/global symbols or macro
         # expanded string-literals (e.g. NAME -> "ok"). Params/locals should
         # already be '@name' once prologue scanning assigns stack slots.
-        if op == "jmp":
-            self._emit(f"  jmp {ins.label}")
-            return
-        if op in {"jz", "jnz"}:
-            self._load_operand(ins.operand1, "%rax")
-            self._emit("  cmpq $0, %rax")
-            j = "je" if op == "jz" else "jne"
-            self._emit(f"  {j} {ins.label}")
-            return
-
-        if op == "str_const":
-            # result temp holds address of string
-            lbl = self._intern_string(ins.operand1 or "")
-            self._emit(f"  leaq {lbl}(%rip), %rax")
-            self._store_result(ins.result, "%rax")
-            return
-
-        if op == "label_addr":
-            self._emit(f"  leaq {ins.label}(%rip), %rax")
-            self._store_result(ins.result, "%rax")
-            return
-
-        if op == "indirect_jump":
-            self._load_operand(ins.operand1, "%rax")
-            self._emit("  jmp *%rax")
-            return
-
-        if op == "addr_of":
-            # result = &operand1
-            src = ins.operand1 or ""
-            self._addr_of_symbol(src, "%rax")
-            self._store_result(ins.result, "%rax")
-            return
-
-        if op == "mov":
-            # Volatile annotation: mark memory accesses for volatile-qualified
-            # variables so they are never optimised away.
-            _is_volatile_mov = bool(ins.meta and ins.meta.get("volatile"))
-            # Float-aware move: if source is a float-typed temp, use SSE move
-            src_ct = self._get_type(ins.operand1) if ins.operand1 else None
-            _src_is_float = src_ct is not None and src_ct.kind in (TypeKind.FLOAT, TypeKind.DOUBLE)
-            if _src_is_float:
-                src_ty = "float" if src_ct.kind == TypeKind.FLOAT else "double"
-                s = "s" if src_ct.kind == TypeKind.FLOAT else "d"
-                mov = f"movs{s}"
-                off1 = self._ensure_local(ins.operand1)
-                if _is_volatile_mov:
-                    self._emit(f"  {mov} -{off1}(%rbp), %xmm0  # volatile load")
-                else:
-                    self._emit(f"  {mov} -{off1}(%rbp), %xmm0")
-                off_r = self._ensure_local(ins.result)
-                if _is_volatile_mov:
-                    self._emit(f"  {mov} %xmm0, -{off_r}(%rbp)  # volatile store")
-                else:
-                    self._emit(f"  {mov} %xmm0, -{off_r}(%rbp)")
-                # Propagate float type
-                if self._sym_table and ins.result:
-                    ft = FloatType(kind=TypeKind.FLOAT) if src_ty == "float" else FloatType(kind=TypeKind.DOUBLE)
-                    self._register_type(ins.result, ft)
-                return
-            if _is_volatile_mov:
-                self._emit("  # volatile")
-            self._load_operand(ins.operand1, "%rax")
-            self._store_result(ins.result, "%rax")
-            try:
-                if ins.operand1 is not None:
-                    step = self._ptr_step_bytes.get(str(ins.operand1))
-                    if step is not None and ins.result is not None:
-                        self._ptr_step_bytes[str(ins.result)] = int(step)
-            except Exception:
-                pass
-            return
-
-        if op == "struct_copy":
-            sz = (ins.meta or {}).get("size", 0)
-            if sz > 0:
-                src_off = self._ensure_local(ins.operand1)
-                dst_off = self._ensure_local(ins.result)
-                self._emit(f"  leaq -{src_off}(%rbp), %rsi")
-                self._emit(f"  leaq -{dst_off}(%rbp), %rdi")
-                self._emit(f"  movq ${sz}, %rcx")
-                self._emit(f"  rep movsb")
-            return
+        self._emit(f"  jmp {ins.label}")
 
-        if op == "fmov":
-            fp_type = (ins.meta or {}).get("fp_type", "double")
-            if fp_type == "long double":
-                # x87 long double: load constant via memory (use double approximation,
-                # then store as 80-bit extended via x87 stack)
-                val_str = ins.operand1 or "0.0"
-                lbl = self._intern_float_literal(float(val_str), "double")
-                # Load double constant into x87 stack, then store as 80-bit tbyte
-                self._emit(f"  fldl {lbl}(%rip)")
-                if ins.result:
-                    off = self._ensure_local(ins.result, size=16)
-                    self._emit(f"  fstpt -{off}(%rbp)")
-                    if self._sym_table:
-                        self._register_type(ins.result, FloatType(kind=TypeKind.DOUBLE))
-                else:
-                    # Pop x87 stack if no result
-                    self._emit("  fstp %st(0)")
-                return
-            val_str = ins.operand1 or "0.0"
-            lbl = self._intern_float_literal(float(val_str), fp_type)
-            if fp_type == "float":
-                self._emit(f"  movss {lbl}(%rip), %xmm0")
-            else:
-                self._emit(f"  movsd {lbl}(%rip), %xmm0")
-            if ins.result:
-                off = self._ensure_local(ins.result)
-                if fp_type == "float":
-                    self._emit(f"  movss %xmm0, -{off}(%rbp)")
-                else:
-                    self._emit(f"  movsd %xmm0, -{off}(%rbp)")
-                if self._sym_table:
-                    ft = FloatType(kind=TypeKind.FLOAT) if fp_type == "float" else FloatType(kind=TypeKind.DOUBLE)
-                    self._register_type(ins.result, ft)
-            return
-
-        if op in ("fadd", "fsub", "fmul", "fdiv"):
-            fp_type = (ins.meta or {}).get("fp_type", "double")
-            if fp_type == "long double":
-                # x87 long double arithmetic
-                off1 = self._ensure_local(ins.operand1, size=16)
-                off2 = self._ensure_local(ins.operand2, size=16)
-                # Load first operand, then second operand onto x87 stack
-                self._emit(f"  fldt -{off1}(%rbp)")
-                self._emit(f"  fldt -{off2}(%rbp)")
-                # Perform operation: st(1) op st(0), pop
-                # Note: fsubrp/fdivrp for correct operand order (a - b, a / b)
-                x87_ops = {"fadd": "faddp", "fsub": "fsubrp",
-                           "fmul": "fmulp", "fdiv": "fdivrp"}
-                self._emit(f"  {x87_ops[op]} %st(0), %st(1)")
-                # Store result from x87 stack
-                off_r = self._ensure_local(ins.result, size=16)
-                self._emit(f"  fstpt -{off_r}(%rbp)")
-                if self._sym_table and ins.result:
-                    self._register_type(ins.result, FloatType(kind=TypeKind.DOUBLE))
-                return
-            s = "s" if fp_type == "float" else "d"
+    def _ins_jcc(self, ins: IRInstruction) -> None:
+        op = ins.op
+        self._load_operand(ins.operand1, "%rax")
+        self._emit("  testq %rax, %rax")
+        j = "je" if op == "jz" else "jne"
+        self._emit(f"  {j} {ins.label}")
+
+    def _ins_str_const(self, ins: IRInstruction) -> None:
+        # result temp holds address of string
+        lbl = self._intern_string(ins.operand1 or "")
+        self._emit(f"  leaq {lbl}(%rip), %rax")
+        self._store_result(ins.result, "%rax")
+
+    def _ins_label_addr(self, ins: IRInstruction) -> None:
+        self._emit(f"  leaq {ins.label}(%rip), %rax")
+        self._store_result(ins.result, "%rax")
+
+    def _ins_indirect_jump(self, ins: IRInstruction) -> None:
+        self._load_operand(ins.operand1, "%rax")
+        self._emit("  jmp *%rax")
+
+    def _ins_addr_of(self, ins: IRInstruction) -> None:
+        # result = &operand1
+        src = ins.operand1 or ""
+        self._addr_of_symbol(src, "%rax")
+        self._store_result(ins.result, "%rax")
+
+    def _ins_mov(self, ins: IRInstruction) -> None:
+        # Volatile annotation: mark memory accesses for volatile-qualified
+        # variables so they are never optimised away.
+        _is_volatile_mov = bool(ins.meta and ins.meta.get("volatile"))
+        # Float-aware move: if source is a float-typed temp, use SSE move
+        src_ct = self._get_type(ins.operand1) if ins.operand1 else None
+        _src_is_float = src_ct is not None and src_ct.kind in (TypeKind.FLOAT, TypeKind.DOUBLE)
+        if _src_is_float:
+            src_ty = "float" if src_ct.kind == TypeKind.FLOAT else "double"
+            s = "s" if src_ct.kind == TypeKind.FLOAT else "d"
             mov = f"movs{s}"
             off1 = self._ensure_local(ins.operand1)
-            self._emit(f"  {mov} -{off1}(%rbp), %xmm0")
-            off2 = self._ensure_local(ins.operand2)
-            self._emit(f"  {mov} -{off2}(%rbp), %xmm1")
-            sse_ops = {"fadd": f"adds{s}", "fsub": f"subs{s}",
-                       "fmul": f"muls{s}", "fdiv": f"divs{s}"}
-            self._emit(f"  {sse_ops[op]} %xmm1, %xmm0")
+            if _is_volatile_mov:
+                self._emit(f"  {mov} -{off1}(%rbp), %xmm0  # volatile load")
+            else:
+                self._emit(f"  {mov} -{off1}(%rbp), %xmm0")
             off_r = self._ensure_local(ins.result)
-            self._emit(f"  {mov} %xmm0, -{off_r}(%rbp)")
+            if _is_volatile_mov:
+                self._emit(f"  {mov} %xmm0, -{off_r}(%rbp)  # volatile store")
+            else:
+                self._emit(f"  {mov} %xmm0, -{off_r}(%rbp)")
+            # Propagate float type
             if self._sym_table and ins.result:
-                ft = FloatType(kind=TypeKind.FLOAT) if fp_type == "float" else FloatType(kind=TypeKind.DOUBLE)
+                ft = FloatType(kind=TypeKind.FLOAT) if src_ty == "float" else FloatType(kind=TypeKind.DOUBLE)
                 self._register_type(ins.result, ft)
             return
-
-        if op == "fcmp":
-            fp_type = (ins.meta or {}).get("fp_type", "double")
-            if fp_type == "long double":
-                # x87 long double comparison using fcomip
-                off1 = self._ensure_local(ins.operand1, size=16)
-                off2 = self._ensure_local(ins.operand2, size=16)
-                # Load operands: first load b (operand2), then a (operand1)
-                # so a is in st(0) and b is in st(1)
-                self._emit(f"  fldt -{off2}(%rbp)")
-                self._emit(f"  fldt -{off1}(%rbp)")
-                # fcomip compares st(0) with st(1), sets EFLAGS, pops st(0)
-                self._emit("  fcomip %st(1), %st(0)")
-                # Pop remaining st(0) (was st(1))
-                self._emit("  fstp %st(0)")
-                cmp_op = ins.label or "<"
-                set_map = {"<": "setb", "<=": "setbe", ">": "seta", ">=": "setae",
-                           "==": "sete", "!=": "setne"}
-                self._emit(f"  {set_map.get(cmp_op, 'setb')} %al")
-                self._emit("  movzbl %al, %eax")
-                self._emit("  movslq %eax, %rax")
-                self._store_result(ins.result, "%rax")
-                return
-            s = "s" if fp_type == "float" else "d"
-            mov = f"movs{s}"
-            off1 = self._ensure_local(ins.operand1)
-            self._emit(f"  {mov} -{off1}(%rbp), %xmm0")
-            off2 = self._ensure_local(ins.operand2)
-            self._emit(f"  {mov} -{off2}(%rbp), %xmm1")
-            self._emit(f"  ucomis{s} %xmm1, %xmm0")
-            cmp_op = ins.label or "<"
-            set_map = {"<": "setb", "<=": "setbe", ">": "seta", ">=": "setae",
-                       "==": "sete", "!=": "setne"}
-            self._emit(f"  {set_map.get(cmp_op, 'setb')} %al")
-            self._emit("  movzbl %al, %eax")
-            self._emit("  movslq %eax, %rax")
+        if _is_volatile_mov:
+            self._emit("  # volatile")
+        src = ins.operand1
+        if not (src is not None and src.startswith("$") and self._store_imm(ins.result, src)):
+            self._load_operand(src, "%rax")
             self._store_result(ins.result, "%rax")
-            return
-
-        if op in ("i2f", "i2d"):
-            fp_type = (ins.meta or {}).get("fp_type", "double")
-            # CType-based: use result_type to determine target fp type
-            if ins.result_type is not None:
-                if ins.result_type.kind == TypeKind.FLOAT:
-                    fp_type = "float"
-                elif ins.result_type.kind == TypeKind.DOUBLE:
-                    fp_type = "double"
-            self._load_operand(ins.operand1, "%rax")
-            if fp_type == "float":
-                self._emit("  cvtsi2ssl %eax, %xmm0")
-                off_r = self._ensure_local(ins.result)
-                self._emit(f"  movss %xmm0, -{off_r}(%rbp)")
+        try:
+            if ins.operand1 is not None:
+                step = self._ptr_step_bytes.get(str(ins.operand1))
+                if step is not None and ins.result is not None:
+                    self._ptr_step_bytes[str(ins.result)] = int(step)
+        except Exception:
+            pass
+
+    def _ins_struct_copy(self, ins: IRInstruction) -> None:
+        sz = (ins.meta or {}).get("size", 0)
+        if sz > 0:
+            src_off = self._ensure_local(ins.operand1)
+            dst_off = self._ensure_local(ins.result)
+            self._emit(f"  leaq -{src_off}(%rbp), %rsi")
+            self._emit(f"  leaq -{dst_off}(%rbp), %rdi")
+            self._emit(f"  movq ${sz}, %rcx")
+            self._emit(f"  rep movsb")
+
+    def _ins_fmov(self, ins: IRInstruction) -> None:
+        fp_type = (ins.meta or {}).get("fp_type", "double")
+        if fp_type == "long double":
+            # x87 long double: load constant via memory (use double approximation,
+            # then store as 80-bit extended via x87 stack)
+            val_str = ins.operand1 or "0.0"
+            lbl = self._intern_float_literal(float(val_str), "double")
+            # Load double constant into x87 stack, then store as 80-bit tbyte
+            self._emit(f"  fldl {lbl}(%rip)")
+            if ins.result:
+                off = self._ensure_local(ins.result, size=16)
+                self._emit(f"  fstpt -{off}(%rbp)")
+                if self._sym_table:
+                    self._register_type(ins.result, FloatType(kind=TypeKind.DOUBLE))
             else:
-                self._emit("  cvtsi2sdq %rax, %xmm0")
-                off_r = self._ensure_local(ins.result)
-                self._emit(f"  movsd %xmm0, -{off_r}(%rbp)")
-            ft = FloatType(kind=TypeKind.FLOAT) if fp_type == "float" else FloatType(kind=TypeKind.DOUBLE)
-            self._register_type(ins.result, ft)
+                # Pop x87 stack if no result
+                self._emit("  fstp %st(0)")
             return
-
-        if op in ("f2i", "d2i"):
-            fp_type = (ins.meta or {}).get("fp_type", "float" if op == "f2i" else "double")
-            # CType-based: use source operand type to determine fp width
-            if ins.operand1:
-                src_ct = self._get_type(ins.operand1)
-                if src_ct is not None:
-                    if src_ct.kind == TypeKind.FLOAT:
-                        fp_type = "float"
-                    elif src_ct.kind == TypeKind.DOUBLE:
-                        fp_type = "double"
-            src = ins.operand1 or ""
-            if src.startswith("@") and not self._is_local(src):
-                gname = src.lstrip("@")
-                if fp_type == "float":
-                    self._emit(f"  movss {gname}(%rip), %xmm0")
-                else:
-                    self._emit(f"  movsd {gname}(%rip), %xmm0")
-            else:
-                off1 = self._ensure_local(src)
-                if fp_type == "float":
-                    self._emit(f"  movss -{off1}(%rbp), %xmm0")
-                else:
-                    self._emit(f"  movsd -{off1}(%rbp), %xmm0")
+        val_str = ins.operand1 or "0.0"
+        lbl = self._intern_float_literal(float(val_str), fp_type)
+        if fp_type == "float":
+            self._emit(f"  movss {lbl}(%rip), %xmm0")
+        else:
+            self._emit(f"  movsd {lbl}(%rip), %xmm0")
+        if ins.result:
+            off = self._ensure_local(ins.result)
             if fp_type == "float":
-                self._emit("  cvttss2si %xmm0, %eax")
+                self._emit(f"  movss %xmm0, -{off}(%rbp)")
             else:
-                self._emit("  cvttsd2si %xmm0, %rax")
-            self._emit("  cltq")
-            self._store_result(ins.result, "%rax")
-            return
-
-        if op == "f2d":
-            off1 = self._ensure_local(ins.operand1)
-            self._emit(f"  movss -{off1}(%rbp), %xmm0")
-            self._emit("  cvtss2sd %xmm0, %xmm0")
-            off_r = self._ensure_local(ins.result)
-            self._emit(f"  movsd %xmm0, -{off_r}(%rbp)")
-            if self._sym_table and ins.result:
-                self._register_type(ins.result, FloatType(kind=TypeKind.DOUBLE))
-            return
-
-        if op == "d2f":
-            off1 = self._ensure_local(ins.operand1)
-            self._emit(f"  movsd -{off1}(%rbp), %xmm0")
-            self._emit("  cvtsd2ss %xmm0, %xmm0")
-            off_r = self._ensure_local(ins.result)
-            self._emit(f"  movss %xmm0, -{off_r}(%rbp)")
-            if self._sym_table and ins.result:
-                self._register_type(ins.result, FloatType(kind=TypeKind.FLOAT))
-            return
-
-        # --- long double (x87) conversion ops ---
-
-        if op == "i2ld":
-            # int → long double: push int to memory, use fildq, store as tbyte
-            self._load_operand(ins.operand1, "%rax")
-            # Store int to a temp memory slot for fild
-            tmp_off = self._ensure_local(self._new_spill_name())
-            self._emit(f"  movq %rax, -{tmp_off}(%rbp)")
-            self._emit(f"  fildq -{tmp_off}(%rbp)")
-            off_r = self._ensure_local(ins.result, size=16)
-            self._emit(f"  fstpt -{off_r}(%rbp)")
-            # CType-based: result_type already set by IR gen; keep string fallback
-            self._register_type(ins.result, FloatType(kind=TypeKind.DOUBLE))
-            return
+                self._emit(f"  movsd %xmm0, -{off}(%rbp)")
+            if self._sym_table:
+                ft = FloatType(kind=TypeKind.FLOAT) if fp_type == "float" else FloatType(kind=TypeKind.DOUBLE)
+                self._register_type(ins.result, ft)
 
-        if op == "ld2i":
-            # long double → int: load tbyte, use fistp to convert and store
+    def _ins_farith(self, ins: IRInstruction) -> None:
+        op = ins.op
+        fp_type = (ins.meta or {}).get("fp_type", "double")
+        if fp_type == "long double":
+            # x87 long double arithmetic
             off1 = self._ensure_local(ins.operand1, size=16)
+            off2 = self._ensure_local(ins.operand2, size=16)
+            # Load first operand, then second operand onto x87 stack
             self._emit(f"  fldt -{off1}(%rbp)")
-            # Use a temp slot for fistp result
-            tmp_off = self._ensure_local(self._new_spill_name())
-            # Set rounding mode to truncation (like C cast behavior)
-            # Save current x87 control word, set truncation mode, fistp, restore
-            cw_off = self._ensure_local(self._new_spill_name())
-            cw_new_off = self._ensure_local(self._new_spill_name())
-            self._emit(f"  fnstcw -{cw_off}(%rbp)")
-            self._emit(f"  movw -{cw_off}(%rbp), %ax")
-            self._emit("  orw $0x0c00, %ax")  # Set RC=11 (truncate)
-            self._emit(f"  movw %ax, -{cw_new_off}(%rbp)")
-            self._emit(f"  fldcw -{cw_new_off}(%rbp)")
-            self._emit(f"  fistpq -{tmp_off}(%rbp)")
-            self._emit(f"  fldcw -{cw_off}(%rbp)")  # Restore original CW
-            self._emit(f"  movq -{tmp_off}(%rbp), %rax")
-            self._store_result(ins.result, "%rax")
-            return
-
-        if op == "d2ld":
-            # double → long double: load double via fldl, store as tbyte
-            off1 = self._ensure_local(ins.operand1)
-            self._emit(f"  fldl -{off1}(%rbp)")
+            self._emit(f"  fldt -{off2}(%rbp)")
+            # Perform operation: st(1) op st(0), pop
+            self._emit(f"  {_FARITH_X87[op]} %st(0), %st(1)")
+            # Store result from x87 stack
             off_r = self._ensure_local(ins.result, size=16)
             self._emit(f"  fstpt -{off_r}(%rbp)")
-            self._register_type(ins.result, FloatType(kind=TypeKind.DOUBLE))
+            if self._sym_table and ins.result:
+                self._register_type(ins.result, FloatType(kind=TypeKind.DOUBLE))
             return
+        s = "s" if fp_type == "float" else "d"
+        mov = f"movs{s}"
+        off1 = self._ensure_local(ins.operand1)
+        self._emit(f"  {mov} -{off1}(%rbp), %xmm0")
+        off2 = self._ensure_local(ins.operand2)
+        self._emit(f"  {mov} -{off2}(%rbp), %xmm1")
+        self._emit(f"  {_FARITH_SSE[op]}s{s} %xmm1, %xmm0")
+        off_r = self._ensure_local(ins.result)
+        self._emit(f"  {mov} %xmm0, -{off_r}(%rbp)")
+        if self._sym_table and ins.result:
+            ft = FloatType(kind=TypeKind.FLOAT) if fp_type == "float" else FloatType(kind=TypeKind.DOUBLE)
+            self._register_type(ins.result, ft)
 
-        if op == "ld2d":
-            # long double → double: load tbyte, store as double via fstpl
+    def _ins_fcmp(self, ins: IRInstruction) -> None:
+        fp_type = (ins.meta or {}).get("fp_type", "double")
+        if fp_type == "long double":
+            # x87 long double comparison using fcomip
             off1 = self._ensure_local(ins.operand1, size=16)
+            off2 = self._ensure_local(ins.operand2, size=16)
+            # Load operands: first load b (operand2), then a (operand1)
+            # so a is in st(0) and b is in st(1)
+            self._emit(f"  fldt -{off2}(%rbp)")
             self._emit(f"  fldt -{off1}(%rbp)")
-            off_r = self._ensure_local(ins.result)
-            self._emit(f"  fstpl -{off_r}(%rbp)")
-            self._register_type(ins.result, FloatType(kind=TypeKind.DOUBLE))
+            # fcomip compares st(0) with st(1), sets EFLAGS, pops st(0)
+            self._emit("  fcomip %st(1), %st(0)")
+            # Pop remaining st(0) (was st(1))
+            self._emit("  fstp %st(0)")
+            self._emit_lines(_FCMP_SETCC.get(ins.label or "<", _FCMP_SETCC["<"]))
+            self._store_result(ins.result, "%rax")
             return
+        s = "s" if fp_type == "float" else "d"
+        mov = f"movs{s}"
+        off1 = self._ensure_local(ins.operand1)
+        self._emit(f"  {mov} -{off1}(%rbp), %xmm0")
+        off2 = self._ensure_local(ins.operand2)
+        self._emit(f"  {mov} -{off2}(%rbp), %xmm1")
+        self._emit(f"  ucomis{s} %xmm1, %xmm0")
+        self._emit_lines(_FCMP_SETCC.get(ins.label or "<", _FCMP_SETCC["<"]))
+        self._store_result(ins.result, "%rax")
+
+    def _ins_int_to_fp(self, ins: IRInstruction) -> None:
+        fp_type = (ins.meta or {}).get("fp_type", "double")
+        # CType-based: use result_type to determine target fp type
+        if ins.result_type is not None:
+            if ins.result_type.kind == TypeKind.FLOAT:
+                fp_type = "float"
+            elif ins.result_type.kind == TypeKind.DOUBLE:
+                fp_type = "double"
+        self._load_operand(ins.operand1, "%rax")
+        if fp_type == "float":
+            self._emit("  cvtsi2ssl %eax, %xmm0")
+            off_r = self._ensure_local(ins.result)
+            self._emit(f"  movss %xmm0, -{off_r}(%rbp)")
+        else:
+            self._emit("  cvtsi2sdq %rax, %xmm0")
+            off_r = self._ensure_local(ins.result)
+            self._emit(f"  movsd %xmm0, -{off_r}(%rbp)")
+        ft = FloatType(kind=TypeKind.FLOAT) if fp_type == "float" else FloatType(kind=TypeKind.DOUBLE)
+        self._register_type(ins.result, ft)
 
-        if op == "f2ld":
-            # float → long double: load float via flds, store as tbyte
-            off1 = self._ensure_local(ins.operand1)
-            self._emit(f"  flds -{off1}(%rbp)")
-            off_r = self._ensure_local(ins.result, size=16)
-            self._emit(f"  fstpt -{off_r}(%rbp)")
+    def _ins_fp_to_int(self, ins: IRInstruction) -> None:
+        op = ins.op
+        fp_type = (ins.meta or {}).get("fp_type", "float" if op == "f2i" else "double")
+        # CType-based: use source operand type to determine fp width
+        if ins.operand1:
+            src_ct = self._get_type(ins.operand1)
+            if src_ct is not None:
+                if src_ct.kind == TypeKind.FLOAT:
+                    fp_type = "float"
+                elif src_ct.kind == TypeKind.DOUBLE:
+                    fp_type = "double"
+        src = ins.operand1 or ""
+        if src.startswith("@") and not self._is_local(src):
+            gname = src.lstrip("@")
+            if fp_type == "float":
+                self._emit(f"  movss {gname}(%rip), %xmm0")
+            else:
+                self._emit(f"  movsd {gname}(%rip), %xmm0")
+        else:
+            off1 = self._ensure_local(src)
+            if fp_type == "float":
+                self._emit(f"  movss -{off1}(%rbp), %xmm0")
+            else:
+                self._emit(f"  movsd -{off1}(%rbp), %xmm0")
+        if fp_type == "float":
+            self._emit("  cvttss2si %xmm0, %eax")
+        else:
+            self._emit("  cvttsd2si %xmm0, %rax")
+        self._emit("  cltq")
+        self._store_result(ins.result, "%rax")
+
+    def _ins_f2d(self, ins: IRInstruction) -> None:
+        off1 = self._ensure_local(ins.operand1)
+        self._emit(f"  movss -{off1}(%rbp), %xmm0")
+        self._emit("  cvtss2sd %xmm0, %xmm0")
+        off_r = self._ensure_local(ins.result)
+        self._emit(f"  movsd %xmm0, -{off_r}(%rbp)")
+        if self._sym_table and ins.result:
             self._register_type(ins.result, FloatType(kind=TypeKind.DOUBLE))
-            return
 
-        if op == "ld2f":
-            # long double → float: load tbyte, store as float via fstps
-            off1 = self._ensure_local(ins.operand1, size=16)
-            self._emit(f"  fldt -{off1}(%rbp)")
-            off_r = self._ensure_local(ins.result)
-            self._emit(f"  fstps -{off_r}(%rbp)")
+    def _ins_d2f(self, ins: IRInstruction) -> None:
+        off1 = self._ensure_local(ins.operand1)
+        self._emit(f"  movsd -{off1}(%rbp), %xmm0")
+        self._emit("  cvtsd2ss %xmm0, %xmm0")
+        off_r = self._ensure_local(ins.result)
+        self._emit(f"  movss %xmm0, -{off_r}(%rbp)")
+        if self._sym_table and ins.result:
             self._register_type(ins.result, FloatType(kind=TypeKind.FLOAT))
-            return
 
-        if op == "sext16":
-            # result = sign_extend_16(operand1)
-            self._load_operand(ins.operand1, "%rax")
-            self._emit("  movswl %ax, %eax")
-            self._emit("  movslq %eax, %rax")
-            self._store_result(ins.result, "%rax")
-            return
-
-        if op == "load":
-            # result = *(operand1)
-            _is_volatile_load = bool(ins.meta and ins.meta.get("volatile"))
-            if _is_volatile_load:
-                self._emit("  # volatile load")
-            # Best-effort: choose width based on pointer pointee type.
-            addr = ins.operand1 or ""
-            elem_sz = 4
-            base_ty = None
-            if isinstance(addr, str):
-                base_ty = self._get_type_str(addr) or None
-                if (base_ty is None or base_ty == "") and addr.startswith("@") and self._sema_ctx is not None:
-                    base_ty = getattr(self._sema_ctx, "global_types", {}).get(addr[1:], None)
-                # If this is a temp holding a pointer but we didn't record its
-                # type, default to a generic byte pointer so we don't accidentally
-                # read 4 bytes (elem_sz=4) for a char dereference.
-                if (base_ty is None or base_ty == "") and addr.startswith("%t"):
-                    base_ty = "char*"
-            if isinstance(base_ty, str) and "*" in base_ty:
-                elem_sz = self._pointee_size_bytes(base_ty)
-
-            # If IR provided an explicit load size, prefer it.
+    def _ins_i2ld(self, ins: IRInstruction) -> None:
+        # --- long double (x87) conversion ops ---
+        # int → long double: push int to memory, use fildq, store as tbyte
+        self._load_operand(ins.operand1, "%rax")
+        # Store int to a temp memory slot for fild
+        tmp_off = self._ensure_local(self._new_spill_name())
+        self._emit(f"  movq %rax, -{tmp_off}(%rbp)")
+        self._emit(f"  fildq -{tmp_off}(%rbp)")
+        off_r = self._ensure_local(ins.result, size=16)
+        self._emit(f"  fstpt -{off_r}(%rbp)")
+        # CType-based: result_type already set by IR gen; keep string fallback
+        self._register_type(ins.result, FloatType(kind=TypeKind.DOUBLE))
+
+    def _ins_ld2i(self, ins: IRInstruction) -> None:
+        # long double → int: load tbyte, use fistp to convert and store
+        off1 = self._ensure_local(ins.operand1, size=16)
+        self._emit(f"  fldt -{off1}(%rbp)")
+        # Use a temp slot for fistp result
+        tmp_off = self._ensure_local(self._new_spill_name())
+        # Set rounding mode to truncation (like C cast behavior)
+        # Save current x87 control word, set truncation mode, fistp, restore
+        cw_off = self._ensure_local(self._new_spill_name())
+        cw_new_off = self._ensure_local(self._new_spill_name())
+        self._emit(f"  fnstcw -{cw_off}(%rbp)")
+        self._emit(f"  movw -{cw_off}(%rbp), %ax")
+        self._emit("  orw $0x0c00, %ax")  # Set RC=11 (truncate)
+        self._emit(f"  movw %ax, -{cw_new_off}(%rbp)")
+        self._emit(f"  fldcw -{cw_new_off}(%rbp)")
+        self._emit(f"  fistpq -{tmp_off}(%rbp)")
+        self._emit(f"  fldcw -{cw_off}(%rbp)")  # Restore original CW
+        self._emit(f"  movq -{tmp_off}(%rbp), %rax")
+        self._store_result(ins.result, "%rax")
+
+    def _ins_d2ld(self, ins: IRInstruction) -> None:
+        # double → long double: load double via fldl, store as tbyte
+        off1 = self._ensure_local(ins.operand1)
+        self._emit(f"  fldl -{off1}(%rbp)")
+        off_r = self._ensure_local(ins.result, size=16)
+        self._emit(f"  fstpt -{off_r}(%rbp)")
+        self._register_type(ins.result, FloatType(kind=TypeKind.DOUBLE))
+
+    def _ins_ld2d(self, ins: IRInstruction) -> None:
+        # long double → double: load tbyte, store as double via fstpl
+        off1 = self._ensure_local(ins.operand1, size=16)
+        self._emit(f"  fldt -{off1}(%rbp)")
+        off_r = self._ensure_local(ins.result)
+        self._emit(f"  fstpl -{off_r}(%rbp)")
+        self._register_type(ins.result, FloatType(kind=TypeKind.DOUBLE))
+
+    def _ins_f2ld(self, ins: IRInstruction) -> None:
+        # float → long double: load float via flds, store as tbyte
+        off1 = self._ensure_local(ins.operand1)
+        self._emit(f"  flds -{off1}(%rbp)")
+        off_r = self._ensure_local(ins.result, size=16)
+        self._emit(f"  fstpt -{off_r}(%rbp)")
+        self._register_type(ins.result, FloatType(kind=TypeKind.DOUBLE))
+
+    def _ins_ld2f(self, ins: IRInstruction) -> None:
+        # long double → float: load tbyte, store as float via fstps
+        off1 = self._ensure_local(ins.operand1, size=16)
+        self._emit(f"  fldt -{off1}(%rbp)")
+        off_r = self._ensure_local(ins.result)
+        self._emit(f"  fstps -{off_r}(%rbp)")
+        self._register_type(ins.result, FloatType(kind=TypeKind.FLOAT))
+
+    def _ins_sext16(self, ins: IRInstruction) -> None:
+        # result = sign_extend_16(operand1)
+        self._load_operand(ins.operand1, "%rax")
+        self._emit("  movswl %ax, %eax")
+        self._emit("  movslq %eax, %rax")
+        self._store_result(ins.result, "%rax")
+
+    def _ins_load(self, ins: IRInstruction) -> None:
+        # result = *(operand1)
+        _is_volatile_load = bool(ins.meta and ins.meta.get("volatile"))
+        if _is_volatile_load:
+            self._emit("  # volatile load")
+        # Best-effort: choose width based on pointer pointee type.
+        addr = ins.operand1 or ""
+        elem_sz = 4
+        base_ty = None
+        if isinstance(addr, str):
+            base_ty = self._get_type_str(addr) or None
+            if (base_ty is None or base_ty == "") and addr.startswith("@") and self._sema_ctx is not None:
+                base_ty = self._global_types.get(addr[1:], None)
+            # If this is a temp holding a pointer but we didn't record its
+            # type, default to a generic byte pointer so we don't accidentally
+            # read 4 bytes (elem_sz=4) for a char dereference.
+            if (base_ty is None or base_ty == "") and addr.startswith("%t"):
+                base_ty = "char*"
+        if isinstance(base_ty, str) and "*" in base_ty:
+            elem_sz = self._pointee_size_bytes(base_ty)
+
+        # If IR provided an explicit load size, prefer it.
+        try:
+            if isinstance(ins.meta, dict) and "load_size_bytes" in ins.meta:
+                elem_sz = int(ins.meta["load_size_bytes"])
+        except Exception:
+            pass
+
+        self._load_operand(addr, "%rax")
+        if elem_sz == 1:
+            if self._pointee_is_unsigned(base_ty):
+                self._emit("  movzbl (%rax), %eax")
+                self._emit("  movl %eax, %eax")
+            else:
+                self._emit("  movsbl (%rax), %eax")
+                self._emit("  movslq %eax, %rax")
+        elif elem_sz == 2:
+            if self._pointee_is_unsigned(base_ty):
+                self._emit("  movzwq (%rax), %rax")
+            else:
+                self._emit("  movswq (%rax), %rax")
+            # Track loaded value type so later ops (e.g. >>) can choose
+            # signed vs unsigned behavior correctly.
             try:
-                if isinstance(ins.meta, dict) and "load_size_bytes" in ins.meta:
-                    elem_sz = int(ins.meta["load_size_bytes"])
+                if ins.result:
+                    if self._sym_table and ins.result:
+                        self._register_type(ins.result, IntegerType(kind=TypeKind.SHORT, is_unsigned=self._pointee_is_unsigned(base_ty)))
             except Exception:
                 pass
-
-            self._load_operand(addr, "%rax")
-            if elem_sz == 1:
-                if self._pointee_is_unsigned(base_ty):
-                    self._emit("  movzbl (%rax), %eax")
-                    self._emit("  movl %eax, %eax")
-                else:
-                    self._emit("  movsbl (%rax), %eax")
-                    self._emit("  movslq %eax, %rax")
-            elif elem_sz == 2:
-                if self._pointee_is_unsigned(base_ty):
-                    self._emit("  movzwq (%rax), %rax")
-                else:
-                    self._emit("  movswq (%rax), %rax")
-                # Track loaded value type so later ops (e.g. >>) can choose
-                # signed vs unsigned behavior correctly.
-                try:
-                    if ins.result:
-                        if self._sym_table and ins.result:
-                            self._register_type(ins.result, IntegerType(kind=TypeKind.SHORT, is_unsigned=self._pointee_is_unsigned(base_ty)))
-                except Exception:
-                    pass
-            elif elem_sz == 4:
-                # Integer loads must respect signedness of the pointee.
-                if self._pointee_is_unsigned(base_ty):
-                    self._emit("  movl (%rax), %eax")
-                    self._emit("  movl %eax, %eax")
-                else:
-                    self._emit("  movslq (%rax), %rax")
+        elif elem_sz == 4:
+            # Integer loads must respect signedness of the pointee.
+            if self._pointee_is_unsigned(base_ty):
+                self._emit("  movl (%rax), %eax")
+                self._emit("  movl %eax, %eax")
             else:
-                self._emit("  movq (%rax), %rax")
-            self._store_result(ins.result, "%rax")
-            return
-
-        if op == "store":
-            # *(operand1) = result
-            _is_volatile_store = bool(ins.meta and ins.meta.get("volatile"))
-            if _is_volatile_store:
-                self._emit("  # volatile store")
-            # Best-effort: choose width based on pointer pointee type.
-            addr = ins.operand1 or ""
-            val = ins.result
-            elem_sz = 4
-            base_ty = None
-            if isinstance(addr, str):
-                base_ty = self._get_type_str(addr) or None
-                if (base_ty is None or base_ty == "") and addr.startswith("@") and self._sema_ctx is not None:
-                    base_ty = getattr(self._sema_ctx, "global_types", {}).get(addr[1:], None)
-            if isinstance(base_ty, str) and "*" in base_ty:
-                elem_sz = self._pointee_size_bytes(base_ty)
-
-            self._load_operand(addr, "%rax")
-            self._load_operand(val, "%rdx")
-            if elem_sz == 1:
-                self._emit("  movb %dl, (%rax)")
-            elif elem_sz == 2:
-                self._emit("  movw %dx, (%rax)")
-            elif elem_sz == 4:
-                self._emit("  movl %edx, (%rax)")
-            else:
-                self._emit("  movq %rdx, (%rax)")
-            return
-
-        if op == "mov_addr":
-            # result = &operand1 (more explicit than addr_of in cases where operand1
-            # is an lvalue expression already resolved to a symbol)
-            src = ins.operand1 or ""
-            self._addr_of_symbol(src, "%rax")
-            self._store_result(ins.result, "%rax")
-            # Preserve best-effort type info for address temps. IR may annotate
-            # such temps in `sema_ctx.var_types` (or rely on generator-side tables),
-            # but codegen needs it to choose correct element size in load_index.
-            if ins.result and isinstance(src, str):
-                # Check if source is an array via CType.
-                src_ct = self._get_type(src)
-                _is_src_array = src_ct is not None and src_ct.kind == TypeKind.ARRAY
-                if _is_src_array:
-                    # Extract element type from CType
-                    elem_ct = None
-                    if isinstance(src_ct, ArrayType) and src_ct.element is not None:
-                        elem_ct = src_ct.element
-                    if self._sym_table:
-                        if elem_ct is not None:
-                            self._register_type(ins.result, PointerType(kind=TypeKind.POINTER, pointee=elem_ct))
-                        else:
-                            self._register_type(ins.result, PointerType(kind=TypeKind.POINTER, pointee=CType(kind=TypeKind.VOID)))
-            # Carry optional pointer arithmetic scaling overrides (e.g. decay of
-            # multi-dimensional arrays to pointer-to-row).
-            try:
-                if ins.result and isinstance(ins.meta, dict) and "ptr_step_bytes" in ins.meta:
-                    self._ptr_step_bytes[ins.result] = int(ins.meta["ptr_step_bytes"])
-            except Exception:
-                pass
-            return
-
-        if op == "addr_index":
-            # result = &base[idx]
-            base = ins.operand1 or ""
-            idx = ins.operand2 or "$0"
-
-            # CType-based path: use symbol table to determine element size
-            ctype_elem_sz = None
-            base_ct = self._get_type(base) if isinstance(base, str) else None
-            if base_ct is not None:
-                if self._ctype_is_pointer(base_ct):
-                    pointee = self._ctype_deref(base_ct)
-                    if pointee is not None:
-                        ctype_elem_sz = self._ctype_sizeof(pointee) if self._ctype_is_struct_or_union(pointee) else type_sizeof(pointee)
-                        if ctype_elem_sz == 0:
-                            ctype_elem_sz = None
-                elif isinstance(base_ct, ArrayType) and base_ct.element is not None:
-                    elem = base_ct.element
-                    ctype_elem_sz = self._ctype_sizeof(elem) if self._ctype_is_struct_or_union(elem) else type_sizeof(elem)
+                self._emit("  movslq (%rax), %rax")
+        else:
+            self._emit("  movq (%rax), %rax")
+        self._store_result(ins.result, "%rax")
+
+    def _ins_store(self, ins: IRInstruction) -> None:
+        # *(operand1) = result
+        _is_volatile_store = bool(ins.meta and ins.meta.get("volatile"))
+        if _is_volatile_store:
+            self._emit("  # volatile store")
+        # Best-effort: choose width based on pointer pointee type.
+        addr = ins.operand1 or ""
+        val = ins.result
+        elem_sz = 4
+        base_ty = None
+        if isinstance(addr, str):
+            base_ty = self._get_type_str(addr) or None
+            if (base_ty is None or base_ty == "") and addr.startswith("@") and self._sema_ctx is not None:
+                base_ty = self._global_types.get(addr[1:], None)
+        if isinstance(base_ty, str) and "*" in base_ty:
+            elem_sz = self._pointee_size_bytes(base_ty)
+
+        self._load_operand(addr, "%rax")
+        self._load_operand(val, "%rdx")
+        if elem_sz == 1:
+            self._emit("  movb %dl, (%rax)")
+        elif elem_sz == 2:
+            self._emit("  movw %dx, (%rax)")
+        elif elem_sz == 4:
+            self._emit("  movl %edx, (%rax)")
+        else:
+            self._emit("  movq %rdx, (%rax)")
+
+    def _ins_mov_addr(self, ins: IRInstruction) -> None:
+        # result = &operand1 (more explicit than addr_of in cases where operand1
+        # is an lvalue expression already resolved to a symbol)
+        src = ins.operand1 or ""
+        self._addr_of_symbol(src, "%rax")
+        self._store_result(ins.result, "%rax")
+        # Preserve best-effort type info for address temps. IR may annotate
+        # such temps in `sema_ctx.var_types` (or rely on generator-side tables),
+        # but codegen needs it to choose correct element size in load_index.
+        if ins.result and isinstance(src, str):
+            # Check if source is an array via CType.
+            src_ct = self._get_type(src)
+            _is_src_array = src_ct is not None and src_ct.kind == TypeKind.ARRAY
+            if _is_src_array:
+                # Extract element type from CType
+                elem_ct = None
+                if isinstance(src_ct, ArrayType) and src_ct.element is not None:
+                    elem_ct = src_ct.element
+                if self._sym_table:
+                    if elem_ct is not None:
+                        self._register_type(ins.result, PointerType(kind=TypeKind.POINTER, pointee=elem_ct))
+                    else:
+                        self._register_type(ins.result, PointerType(kind=TypeKind.POINTER, pointee=CType(kind=TypeKind.VOID)))
+        # Carry optional pointer arithmetic scaling overrides (e.g. decay of
+        # multi-dimensional arrays to pointer-to-row).
+        try:
+            if ins.result and isinstance(ins.meta, dict) and "ptr_step_bytes" in ins.meta:
+                self._ptr_step_bytes[ins.result] = int(ins.meta["ptr_step_bytes"])
+        except Exception:
+            pass
+
+    def _ins_addr_index(self, ins: IRInstruction) -> None:
+        # result = &base[idx]
+        base = ins.operand1 or ""
+        idx = ins.operand2 or "$0"
+
+        # CType-based path: use symbol table to determine element size
+        ctype_elem_sz = None
+        base_ct = self._get_type(base) if isinstance(base, str) else None
+        if base_ct is not None:
+            if self._ctype_is_pointer(base_ct):
+                pointee = self._ctype_deref(base_ct)
+                if pointee is not None:
+                    ctype_elem_sz = self._ctype_sizeof(pointee) if self._ctype_is_struct_or_union(pointee) else type_sizeof(pointee)
                     if ctype_elem_sz == 0:
                         ctype_elem_sz = None
-
-            # String-based fallback: existing type info for the base temp/symbol.
-            base_ty = self._get_type_str(base) if isinstance(base, str) else ""
-            if (base_ty is None or base_ty == "") and isinstance(base, str) and base.startswith("@") and self._sema_ctx is not None:
-                base_ty = getattr(self._sema_ctx, "global_types", {}).get(base[1:], "")
-
-            elem_sz = 4
+            elif isinstance(base_ct, ArrayType) and base_ct.element is not None:
+                elem = base_ct.element
+                ctype_elem_sz = self._ctype_sizeof(elem) if self._ctype_is_struct_or_union(elem) else type_sizeof(elem)
+                if ctype_elem_sz == 0:
+                    ctype_elem_sz = None
+
+        # String-based fallback: existing type info for the base temp/symbol.
+        base_ty = self._get_type_str(base) if isinstance(base, str) else ""
+        if (base_ty is None or base_ty == "") and isinstance(base, str) and base.startswith("@") and self._sema_ctx is not None:
+            base_ty = self._global_types.get(base[1:], "")
+
+        elem_sz = 4
+        step_override = None
+        try:
+            if isinstance(ins.meta, dict) and "ptr_step_bytes" in ins.meta:
+                step_override = int(ins.meta["ptr_step_bytes"])
+            else:
+                step_override = self._ptr_step_bytes.get(str(base))
+        except Exception:
             step_override = None
-            try:
-                if isinstance(ins.meta, dict) and "ptr_step_bytes" in ins.meta:
-                    step_override = int(ins.meta["ptr_step_bytes"])
-                else:
-                    step_override = self._ptr_step_bytes.get(str(base))
-            except Exception:
-                step_override = None
 
-            # Prefer CType-based element size when available
-            if ctype_elem_sz is not None:
-                elem_sz = ctype_elem_sz
-            elif isinstance(base_ty, str) and "*" in base_ty:
-                elem_sz = self._pointee_size_bytes(base_ty)
-            elif isinstance(base_ty, str) and base_ty.strip().startswith("array("):
-                inner = base_ty.strip()[len("array(") :]
-                if inner.endswith(")"):
-                    inner = inner[:-1]
-                base_part = inner.split(",", 1)[0].strip()
-                elem_sz = self._type_size_bytes(base_part)
-            elif isinstance(base_ty, str) and (base_ty.startswith("struct ") or base_ty.startswith("union ")):
-                # Unsized arrays like `struct S arr[] = {...}` are recorded in
-                # global_types as just "struct S".
-                elem_sz = self._type_size_bytes(base_ty)
-
-            # base address
-            is_ptr_base = (isinstance(base_ty, str) and "*" in base_ty) or (isinstance(base, str) and base.startswith("%t"))
-            if is_ptr_base:
-                self._load_operand(base, "%rax")
-            else:
-                self._addr_of_symbol(base, "%rax")
-            self._load_operand(idx, "%rcx")
-            # Multi-dimensional arrays: when IR provides an explicit step,
-            # that value is already a byte stride. Use it directly as the
-            # scaling factor (do not apply another element-size scaling).
-            if isinstance(step_override, int) and step_override > 0:
-                elem_sz = int(step_override)
-            if elem_sz != 1:
-                self._emit(f"  imulq ${elem_sz}, %rcx")
-            self._emit("  addq %rcx, %rax")
-            self._store_result(ins.result, "%rax")
-            # Best-effort: record that the resulting temp holds an address.
-            if ins.result and isinstance(ins.result, str) and ins.result.startswith("%t"):
-                # If IR already knows the result temp's type as a specific pointer
-                # (not void*), keep it. Otherwise register the struct/array pointer.
-                existing_ct = self._get_type(ins.result)
-                _already_specific_ptr = (
-                    existing_ct is not None
-                    and self._ctype_is_pointer(existing_ct)
-                    and isinstance(existing_ct, PointerType)
-                    and existing_ct.pointee is not None
-                    and existing_ct.pointee.kind != TypeKind.VOID
-                )
-                if not _already_specific_ptr:
-                    if isinstance(base_ty, str) and (base_ty.startswith("struct ") or base_ty.startswith("union ")):
-                        base_ct_for_ptr = _str_to_ctype(base_ty)
-                        if base_ct_for_ptr is not None:
-                            self._register_type(ins.result, PointerType(kind=TypeKind.POINTER, pointee=base_ct_for_ptr))
-                        else:
-                            self._register_type(ins.result, PointerType(kind=TypeKind.POINTER, pointee=CType(kind=TypeKind.VOID)))
-                    elif isinstance(base_ty, str) and base_ty.strip().startswith("array("):
-                        enc = base_ty.strip()
-                        inner = enc[len("array(") :]
-                        if inner.endswith(")"):
-                            inner = inner[:-1]
-                        elem_ty = inner.split(",", 1)[0].strip()
-                        elem_ct = _str_to_ctype(elem_ty)
-                        if elem_ct is not None:
-                            self._register_type(ins.result, PointerType(kind=TypeKind.POINTER, pointee=elem_ct))
-                        else:
-                            self._register_type(ins.result, PointerType(kind=TypeKind.POINTER, pointee=CType(kind=TypeKind.VOID)))
+        # Prefer CType-based element size when available
+        if ctype_elem_sz is not None:
+            elem_sz = ctype_elem_sz
+        elif isinstance(base_ty, str) and "*" in base_ty:
+            elem_sz = self._pointee_size_bytes(base_ty)
+        elif isinstance(base_ty, str) and base_ty.strip().startswith("array("):
+            base_part = _parse_array_enc(base_ty)[0]
+            elem_sz = self._type_size_bytes(base_part)
+        elif isinstance(base_ty, str) and (base_ty.startswith("struct ") or base_ty.startswith("union ")):
+            # Unsized arrays like `struct S arr[] = {...}` are recorded in
+            # global_types as just "struct S".
+            elem_sz = self._type_size_bytes(base_ty)
+
+        # base address
+        is_ptr_base = (isinstance(base_ty, str) and "*" in base_ty) or (isinstance(base, str) and base.startswith("%t"))
+        if is_ptr_base:
+            self._load_operand(base, "%rax")
+        else:
+            self._addr_of_symbol(base, "%rax")
+        self._load_operand(idx, "%rcx")
+        # Multi-dimensional arrays: when IR provides an explicit step,
+        # that value is already a byte stride. Use it directly as the
+        # scaling factor (do not apply another element-size scaling).
+        if isinstance(step_override, int) and step_override > 0:
+            elem_sz = int(step_override)
+        self._index_address(elem_sz)
+        self._store_result(ins.result, "%rax")
+        # Best-effort: record that the resulting temp holds an address.
+        if ins.result and isinstance(ins.result, str) and ins.result.startswith("%t"):
+            # If IR already knows the result temp's type as a specific pointer
+            # (not void*), keep it. Otherwise register the struct/array pointer.
+            existing_ct = self._get_type(ins.result)
+            _already_specific_ptr = (
+                existing_ct is not None
+                and self._ctype_is_pointer(existing_ct)
+                and isinstance(existing_ct, PointerType)
+                and existing_ct.pointee is not None
+                and existing_ct.pointee.kind != TypeKind.VOID
+            )
+            if not _already_specific_ptr:
+                if isinstance(base_ty, str) and (base_ty.startswith("struct ") or base_ty.startswith("union ")):
+                    base_ct_for_ptr = _str_to_ctype(base_ty)
+                    if base_ct_for_ptr is not None:
+                        self._register_type(ins.result, PointerType(kind=TypeKind.POINTER, pointee=base_ct_for_ptr))
                     else:
                         self._register_type(ins.result, PointerType(kind=TypeKind.POINTER, pointee=CType(kind=TypeKind.VOID)))
-            # Carry optional pointer arithmetic scaling overrides (bytes).
-            # This is used for row pointers produced by multi-dimensional array
-            # indexing lowerings.
-            try:
-                if ins.result and isinstance(ins.meta, dict) and "ptr_step_bytes" in ins.meta:
-                    self._ptr_step_bytes[str(ins.result)] = int(ins.meta["ptr_step_bytes"])
-            except Exception:
-                pass
-            return
-
-        if op == "addr_of_member":
-            # result = &operand1.member
-            base = ins.operand1 or ""
-            member = ins.operand2 or ""
-            # Load base address into %rax then add member offset.
-            # IMPORTANT: `base` is an lvalue (struct/union object). We must take
-            # its address rather than load its value.
-            _base_is_ptr = self._is_pointer_type_op(base) if isinstance(base, str) else False
-            if isinstance(base, str) and base.startswith("%t") and _base_is_ptr:
-                # addr_of_member can be used on a temp that already is a pointer
-                # to a struct/union object (e.g. when rewriting `s.b` as an
-                # lvalue address). In that case, load the pointer value.
-                self._load_operand(base, "%rax")
-            else:
+                elif isinstance(base_ty, str) and base_ty.strip().startswith("array("):
+                    elem_ty = _parse_array_enc(base_ty)[0]
+                    elem_ct = _str_to_ctype(elem_ty)
+                    if elem_ct is not None:
+                        self._register_type(ins.result, PointerType(kind=TypeKind.POINTER, pointee=elem_ct))
+                    else:
+                        self._register_type(ins.result, PointerType(kind=TypeKind.POINTER, pointee=CType(kind=TypeKind.VOID)))
+                else:
+                    self._register_type(ins.result, PointerType(kind=TypeKind.POINTER, pointee=CType(kind=TypeKind.VOID)))
+        # Carry optional pointer arithmetic scaling overrides (bytes).
+        # This is used for row pointers produced by multi-dimensional array
+        # indexing lowerings.
+        try:
+            if ins.result and isinstance(ins.meta, dict) and "ptr_step_bytes" in ins.meta:
+                self._ptr_step_bytes[str(ins.result)] = int(ins.meta["ptr_step_bytes"])
+        except Exception:
+            pass
+
+    def _ins_addr_of_member(self, ins: IRInstruction) -> None:
+        # result = &operand1.member
+        base = ins.operand1 or ""
+        member = ins.operand2 or ""
+        # Load base address into %rax then add member offset.
+        # IMPORTANT: `base` is an lvalue (struct/union object). We must take
+        # its address rather than load its value.
+        _base_is_ptr = self._is_pointer_type_op(base) if isinstance(base, str) else False
+        if isinstance(base, str) and base.startswith("%t") and _base_is_ptr:
+            # addr_of_member can be used on a temp that already is a pointer
+            # to a struct/union object (e.g. when rewriting `s.b` as an
+            # lvalue address). In that case, load the pointer value.
+            self._load_operand(base, "%rax")
+        else:
+            self._addr_of_symbol(base, "%rax")
+        off = self._resolve_member_offset(base, member)
+        if off:
+            self._emit(f"  addq ${off}, %rax")
+        self._store_result(ins.result, "%rax")
+
+    def _ins_load_member(self, ins: IRInstruction) -> None:
+        base = ins.operand1 or ""
+        member = ins.operand2 or ""
+        # Compute base address.
+        # - locals/globals: take address of the symbol
+        # - temps holding addresses (e.g. from addr_index/addr_of_member): load pointer value
+        # For load_member we want the *pointee* type when `base` is a pointer.
+        _base_is_ptr_lm = self._is_pointer_type_op(base) if isinstance(base, str) else False
+        slot = None
+        if isinstance(base, str) and base.startswith("%t") and _base_is_ptr_lm:
+            self._load_operand(base, "%rax")
+        else:
+            slot = self._direct_base(base)
+            if slot is None:
                 self._addr_of_symbol(base, "%rax")
-            off = self._resolve_member_offset(base, member)
-            if off:
-                self._emit(f"  addq ${off}, %rax")
+        off = self._resolve_member_offset(base, member)
+        if slot is not None:
+            mem = f"{off - slot}(%rbp)"
+        else:
+            mem = f"{off}(%rax)" if off else "(%rax)"
+        # Bit-field read: shift + mask
+        bf = self._resolve_bitfield(base, member)
+        if bf is not None:
+            bit_off, bit_w = bf
+            self._emit(f"  movl {mem}, %eax")
+            if bit_off > 0:
+                self._emit(f"  shrl ${bit_off}, %eax")
+            mask = (1 << bit_w) - 1
+            self._emit(f"  andl ${mask}, %eax")
+            self._emit("  movslq %eax, %rax")
             self._store_result(ins.result, "%rax")
             return
-
-        if op == "load_member":
-            base = ins.operand1 or ""
-            member = ins.operand2 or ""
-            # Compute base address.
-            # - locals/globals: take address of the symbol
-            # - temps holding addresses (e.g. from addr_index/addr_of_member): load pointer value
-            # For load_member we want the *pointee* type when `base` is a pointer.
-            _base_is_ptr_lm = self._is_pointer_type_op(base) if isinstance(base, str) else False
-            if isinstance(base, str) and base.startswith("%t") and _base_is_ptr_lm:
-                self._load_operand(base, "%rax")
-            else:
-                self._addr_of_symbol(base, "%rax")
-            off = self._resolve_member_offset(base, member)
-            if off:
-                self._emit(f"  addq ${off}, %rax")
-            # Bit-field read: shift + mask
-            bf = self._resolve_bitfield(base, member)
-            if bf is not None:
-                bit_off, bit_w = bf
-                self._emit("  movl (%rax), %eax")
-                if bit_off > 0:
-                    self._emit(f"  shrl ${bit_off}, %eax")
-                mask = (1 << bit_w) - 1
-                self._emit(f"  andl ${mask}, %eax")
-                self._emit("  movslq %eax, %rax")
-                self._store_result(ins.result, "%rax")
-                return
-            # CType-based path: use result_type to determine member size
-            rt = getattr(ins, "result_type", None)
-            is_float_member = False
-            is_double_member = False
-            if rt is not None:
-                sz = self._ctype_sizeof(rt)
-                is_unsigned_char = self._ctype_is_unsigned_char(rt)
-                is_float_member = (rt.kind == TypeKind.FLOAT)
-                is_double_member = (rt.kind == TypeKind.DOUBLE)
-            else:
-                # String-based fallback
-                _, sz = self._resolve_member(base, member)
-                is_unsigned_char = False
-                mem_ty = self._resolve_member_type(base, member)
-                if isinstance(mem_ty, str) and "unsigned" in mem_ty:
-                    is_unsigned_char = True
-                mem_ty_s = str(mem_ty).strip().lower() if mem_ty is not None else ""
-                if mem_ty_s == "float":
-                    is_float_member = True
-                elif mem_ty_s == "double":
-                    is_double_member = True
-
-            # Float/double members: use SSE load instructions.
-            if is_float_member or is_double_member:
-                fp_ty = "float" if is_float_member else "double"
-                s = "s" if is_float_member else "d"
-                self._emit(f"  movs{s} (%rax), %xmm0")
-                if ins.result:
-                    off_r = self._ensure_local(ins.result, size=8)
-                    self._emit(f"  movs{s} %xmm0, -{off_r}(%rbp)")
-                    if self._sym_table and ins.result:
-                        self._register_type(ins.result, FloatType(kind=TypeKind.FLOAT) if fp_ty == "float" else FloatType(kind=TypeKind.DOUBLE))
-                if isinstance(ins.meta, dict) and "member_type" in ins.meta:
-                    if self._sym_table and ins.result:
-                        _mct = _str_to_ctype(ins.meta["member_type"])
-                        if _mct is not None:
-                            self._register_type(ins.result, _mct)
-                return
-
-            if sz == 1:
-                if is_unsigned_char:
-                    self._emit("  movb (%rax), %al")
-                    self._emit("  movzbq %al, %rax")
-                else:
-                    self._emit("  movb (%rax), %al")
-                    self._emit("  movsbq %al, %rax")
-            elif sz == 2:
-                self._emit("  movw (%rax), %ax")
-                self._emit("  movswq %ax, %rax")
-            elif sz == 4:
-                self._emit("  movl (%rax), %eax")
-                self._emit("  movl %eax, %eax")
-            else:
-                self._emit("  movq (%rax), %rax")
-            self._store_result(ins.result, "%rax")
-            # Propagate member type for correct pointer arithmetic downstream.
+        # CType-based path: use result_type to determine member size
+        rt = getattr(ins, "result_type", None)
+        is_float_member = False
+        is_double_member = False
+        if rt is not None:
+            sz = self._ctype_sizeof(rt)
+            is_unsigned_char = self._ctype_is_unsigned_char(rt)
+            is_float_member = (rt.kind == TypeKind.FLOAT)
+            is_double_member = (rt.kind == TypeKind.DOUBLE)
+        else:
+            # String-based fallback
+            _, sz = self._resolve_member(base, member)
+            is_unsigned_char = False
+            mem_ty = self._resolve_member_type(base, member)
+            if isinstance(mem_ty, str) and "unsigned" in mem_ty:
+                is_unsigned_char = True
+            mem_ty_s = str(mem_ty).strip().lower() if mem_ty is not None else ""
+            if mem_ty_s == "float":
+                is_float_member = True
+            elif mem_ty_s == "double":
+                is_double_member = True
+
+        # Float/double members: use SSE load instructions.
+        if is_float_member or is_double_member:
+            fp_ty = "float" if is_float_member else "double"
+            s = "s" if is_float_member else "d"
+            self._emit(f"  movs{s} {mem}, %xmm0")
+            if ins.result:
+                off_r = self._ensure_local(ins.result, size=8)
+                self._emit(f"  movs{s} %xmm0, -{off_r}(%rbp)")
+                if self._sym_table and ins.result:
+                    self._register_type(ins.result, FloatType(kind=TypeKind.FLOAT) if fp_ty == "float" else FloatType(kind=TypeKind.DOUBLE))
             if isinstance(ins.meta, dict) and "member_type" in ins.meta:
                 if self._sym_table and ins.result:
                     _mct = _str_to_ctype(ins.meta["member_type"])
@@ -1852,107 +2693,100 @@ class CodeGenerator:
                         self._register_type(ins.result, _mct)
             return
 
-        if op == "addr_of_member_ptr":
-            # result = &operand1->member
-            base = ins.operand1 or ""
-            member = ins.operand2 or ""
-            # Load pointer value into %rax then add member offset.
-            self._load_operand(base, "%rax")
-            off = self._resolve_member_offset(base, member)
-            if off:
-                self._emit(f"  addq ${off}, %rax")
-            self._store_result(ins.result, "%rax")
-            # Propagate member type as pointer for correct element size in
-            # downstream load_index/store_index (array-to-pointer decay).
-            if ins.result and isinstance(ins.meta, dict) and "member_type" in ins.meta:
-                mty = ins.meta["member_type"]
-                if isinstance(mty, str) and mty.strip():
-                    if self._sym_table and ins.result:
-                        _resolved_mty = self._resolve_type(mty.strip())
-                        _bct = _str_to_ctype(_resolved_mty)
-                        if _bct is not None:
-                            self._register_type(ins.result, PointerType(kind=TypeKind.POINTER, pointee=_bct))
-                        else:
-                            self._register_type(ins.result, PointerType(kind=TypeKind.POINTER, pointee=CType(kind=TypeKind.VOID)))
-            return
-
-        if op == "load_member_ptr":
-            # result = operand1->member
-            base = ins.operand1 or ""
-            member = ins.operand2 or ""
-            # If IR carries struct type metadata from a cast, seed type info
-            # so _resolve_member_offset can find the layout.
-            # Only register if not already known (IR gen types are more precise).
-            if isinstance(ins.meta, dict) and "struct_type" in ins.meta:
-                if self._sym_table and base and self._get_base_struct_ctype(base) is None:
-                    _bct = _str_to_ctype(ins.meta['struct_type'])
+        self._emit_member_load(mem, sz, is_unsigned_char)
+        self._store_result(ins.result, "%rax")
+        # Propagate member type for correct pointer arithmetic downstream.
+        if isinstance(ins.meta, dict) and "member_type" in ins.meta:
+            if self._sym_table and ins.result:
+                _mct = _str_to_ctype(ins.meta["member_type"])
+                if _mct is not None:
+                    self._register_type(ins.result, _mct)
+
+    def _emit_member_load(self, mem: str, sz: int, is_unsigned: bool) -> None:
+        """Load the scalar member at *mem* into %rax, widened to 64 bits
+        by a single extending mov (movl zero-extends into %rax)."""
+        if sz == 1:
+            self._emit(f"  {'movzbq' if is_unsigned else 'movsbq'} {mem}, %rax")
+        elif sz == 2:
+            self._emit(f"  movswq {mem}, %rax")
+        elif sz == 4:
+            self._emit(f"  movl {mem}, %eax")
+        else:
+            self._emit(f"  movq {mem}, %rax")
+
+    def _ins_addr_of_member_ptr(self, ins: IRInstruction) -> None:
+        # result = &operand1->member
+        base = ins.operand1 or ""
+        member = ins.operand2 or ""
+        # Load pointer value into %rax then add member offset.
+        self._load_operand(base, "%rax")
+        off = self._resolve_member_offset(base, member)
+        if off:
+            self._emit(f"  addq ${off}, %rax")
+        self._store_result(ins.result, "%rax")
+        # Propagate member type as pointer for correct element size in
+        # downstream load_index/store_index (array-to-pointer decay).
+        if ins.result and isinstance(ins.meta, dict) and "member_type" in ins.meta:
+            mty = ins.meta["member_type"]
+            if isinstance(mty, str) and mty.strip():
+                if self._sym_table and ins.result:
+                    _resolved_mty = self._resolve_type(mty.strip())
+                    _bct = _str_to_ctype(_resolved_mty)
                     if _bct is not None:
-                        self._register_type(base, PointerType(kind=TypeKind.POINTER, pointee=_bct))
+                        self._register_type(ins.result, PointerType(kind=TypeKind.POINTER, pointee=_bct))
                     else:
-                        self._register_type(base, PointerType(kind=TypeKind.POINTER, pointee=CType(kind=TypeKind.VOID)))
-            # Load pointer value into %rax then add member offset, then load value.
-            self._load_operand(base, "%rax")
-            off = self._resolve_member_offset(base, member)
-            if off:
-                self._emit(f"  addq ${off}, %rax")
-            # CType-based path: use result_type to determine member size
-            rt = getattr(ins, "result_type", None)
-            is_float_member = False
-            is_double_member = False
-            if rt is not None:
-                sz = self._ctype_sizeof(rt)
-                is_unsigned_char = self._ctype_is_unsigned_char(rt)
-                is_float_member = (rt.kind == TypeKind.FLOAT)
-                is_double_member = (rt.kind == TypeKind.DOUBLE)
-            else:
-                # String-based fallback
-                _, sz = self._resolve_member(base, member)
-                is_unsigned_char = False
-                mem_ty = self._resolve_member_type(base, member)
-                if isinstance(mem_ty, str) and "unsigned" in mem_ty:
-                    is_unsigned_char = True
-                mem_ty_s = str(mem_ty).strip().lower() if mem_ty is not None else ""
-                if mem_ty_s == "float":
-                    is_float_member = True
-                elif mem_ty_s == "double":
-                    is_double_member = True
-
-            # Float/double members: use SSE load instructions.
-            if is_float_member or is_double_member:
-                fp_ty = "float" if is_float_member else "double"
-                s = "s" if is_float_member else "d"
-                self._emit(f"  movs{s} (%rax), %xmm0")
-                if ins.result:
-                    off_r = self._ensure_local(ins.result, size=8)
-                    self._emit(f"  movs{s} %xmm0, -{off_r}(%rbp)")
-                    if self._sym_table and ins.result:
-                        self._register_type(ins.result, FloatType(kind=TypeKind.FLOAT) if fp_ty == "float" else FloatType(kind=TypeKind.DOUBLE))
-                if isinstance(ins.meta, dict) and "member_type" in ins.meta:
-                    if self._sym_table and ins.result:
-                        _mct = _str_to_ctype(ins.meta["member_type"])
-                        if _mct is not None:
-                            self._register_type(ins.result, _mct)
-                return
+                        self._register_type(ins.result, PointerType(kind=TypeKind.POINTER, pointee=CType(kind=TypeKind.VOID)))
 
-            # Load the member value based on its size.
-            if sz == 1:
-                if is_unsigned_char:
-                    self._emit("  movb (%rax), %al")
-                    self._emit("  movzbq %al, %rax")
+    def _ins_load_member_ptr(self, ins: IRInstruction) -> None:
+        # result = operand1->member
+        base = ins.operand1 or ""
+        member = ins.operand2 or ""
+        # If IR carries struct type metadata from a cast, seed type info
+        # so _resolve_member_offset can find the layout.
+        # Only register if not already known (IR gen types are more precise).
+        if isinstance(ins.meta, dict) and "struct_type" in ins.meta:
+            if self._sym_table and base and self._get_base_struct_ctype(base) is None:
+                _bct = _str_to_ctype(ins.meta['struct_type'])
+                if _bct is not None:
+                    self._register_type(base, PointerType(kind=TypeKind.POINTER, pointee=_bct))
                 else:
-                    self._emit("  movb (%rax), %al")
-                    self._emit("  movsbq %al, %rax")
-            elif sz == 2:
-                self._emit("  movw (%rax), %ax")
-                self._emit("  movswq %ax, %rax")
-            elif sz == 4:
-                self._emit("  movl (%rax), %eax")
-                self._emit("  movl %eax, %eax")  # zero-extend to 64-bit
-            else:
-                self._emit("  movq (%rax), %rax")
-            self._store_result(ins.result, "%rax")
-            # Propagate member type to result for correct pointer arithmetic
-            # and array indexing downstream.
+                    self._register_type(base, PointerType(kind=TypeKind.POINTER, pointee=CType(kind=TypeKind.VOID)))
+        # Load the pointer value into %rax; the member is at off(%rax).
+        self._load_operand(base, "%rax")
+        off = self._resolve_member_offset(base, member)
+        mem = f"{off}(%rax)" if off else "(%rax)"
+        # CType-based path: use result_type to determine member size
+        rt = getattr(ins, "result_type", None)
+        is_float_member = False
+        is_double_member = False
+        if rt is not None:
+            sz = self._ctype_sizeof(rt)
+            is_unsigned_char = self._ctype_is_unsigned_char(rt)
+            is_float_member = (rt.kind == TypeKind.FLOAT)
+            is_double_member = (rt.kind == TypeKind.DOUBLE)
+        else:
+            # String-based fallback
+            _, sz = self._resolve_member(base, member)
+            is_unsigned_char = False
+            mem_ty = self._resolve_member_type(base, member)
+            if isinstance(mem_ty, str) and "unsigned" in mem_ty:
+                is_unsigned_char = True
+            mem_ty_s = str(mem_ty).strip().lower() if mem_ty is not None else ""
+            if mem_ty_s == "float":
+                is_float_member = True
+            elif mem_ty_s == "double":
+                is_double_member = True
+
+        # Float/double members: use SSE load instructions.
+        if is_float_member or is_double_member:
+            fp_ty = "float" if is_float_member else "double"
+            s = "s" if is_float_member else "d"
+            self._emit(f"  movs{s} {mem}, %xmm0")
+            if ins.result:
+                off_r = self._ensure_local(ins.result, size=8)
+                self._emit(f"  movs{s} %xmm0, -{off_r}(%rbp)")
+                if self._sym_table and ins.result:
+                    self._register_type(ins.result, FloatType(kind=TypeKind.FLOAT) if fp_ty == "float" else FloatType(kind=TypeKind.DOUBLE))
             if isinstance(ins.meta, dict) and "member_type" in ins.meta:
                 if self._sym_table and ins.result:
                     _mct = _str_to_ctype(ins.meta["member_type"])
@@ -1960,1501 +2794,1339 @@ class CodeGenerator:
                         self._register_type(ins.result, _mct)
             return
 
-        if op == "unop":
-            self._load_operand(ins.operand1, "%rax")
-            u = ins.label
-            if u == "-":
-                self._emit("  negq %rax")
-            elif u == "!":
-                self._emit("  cmpq $0, %rax")
-                self._emit("  sete %al")
-                self._emit("  movzbq %al, %rax")
-            elif u == "~":
-                self._emit("  notq %rax")
-            elif u == "+":
+        # Load the member value based on its size.
+        self._emit_member_load(mem, sz, is_unsigned_char)
+        self._store_result(ins.result, "%rax")
+        # Propagate member type to result for correct pointer arithmetic
+        # and array indexing downstream.
+        if isinstance(ins.meta, dict) and "member_type" in ins.meta:
+            if self._sym_table and ins.result:
+                _mct = _str_to_ctype(ins.meta["member_type"])
+                if _mct is not None:
+                    self._register_type(ins.result, _mct)
+
+    def _ins_unop(self, ins: IRInstruction) -> None:
+        src = ins.operand1
+        fold = _UNOP_FOLD.get(ins.label) if src is not None and src.startswith("$") else None
+        if fold is not None:
+            try:
+                v = fold(int(src[1:]))
+            except ValueError:
                 pass
             else:
-                # & and * are not fully supported yet
-                pass
-            self._store_result(ins.result, "%rax")
+                # Literal operand: fold at codegen time (64-bit wraparound).
+                imm = f"${((v + (1 << 63)) & ((1 << 64) - 1)) - (1 << 63)}"
+                if not self._store_imm(ins.result, imm):
+                    self._load_operand(imm, "%rax")
+                    self._store_result(ins.result, "%rax")
+                return
+        self._load_operand(src, "%rax")
+        self._emit_lines(_UNOP_RAX.get(ins.label, ()))
+        self._store_result(ins.result, "%rax")
+
+    def _ins_zext32(self, ins: IRInstruction) -> None:
+        # Zero-extend low 32 bits to 64 bits.
+        self._load_operand(ins.operand1, "%rax")
+        self._emit("  movl %eax, %eax")
+        self._store_result(ins.result, "%rax")
+
+    def _ins_sext32(self, ins: IRInstruction) -> None:
+        # Sign-extend low 32 bits to 64 bits.
+        self._load_operand(ins.operand1, "%rax")
+        self._emit("  movslq %eax, %rax")
+        self._store_result(ins.result, "%rax")
+
+    def _ins_sext8(self, ins: IRInstruction) -> None:
+        # Sign-extend low 8 bits to 64 bits.
+        self._load_operand(ins.operand1, "%rax")
+        self._emit("  movsbl %al, %eax")
+        self._emit("  movslq %eax, %rax")
+        self._store_result(ins.result, "%rax")
+
+    def _ins_binop(self, ins: IRInstruction) -> None:
+        bop = ins.label
+        if bop in _BINOP_IMM_OPS and self._emit_binop_imm(ins):
             return
+        self._load_operand(ins.operand1, "%rax")
+        self._load_operand(ins.operand2, "%rcx")
+
+        # Pointer arithmetic scaling (best-effort): if either operand is a
+        # pointer temp with an explicit step size, scale the integer operand.
+        # This is used for multi-dimensional array decay where (p + 1)
+        # should advance by sizeof(row).
+        # NOTE: General pointer arithmetic scaling (e.g. int* + 3 -> scale
+        # by sizeof(int)) is already done by the IR generator. The codegen
+        # only handles explicit ptr_step_bytes overrides here.
+        try:
+            if bop in {"+", "-"}:
+                # 1) Temp-based overrides
+                s1 = self._ptr_step_bytes.get(str(ins.operand1 or ""))
+                s2 = self._ptr_step_bytes.get(str(ins.operand2 or ""))
+                # 2) Symbol-based overrides (e.g. local variable holding a
+                # decayed pointer value): use its declared type if it is
+                # pointer-typed. CType-based check takes priority.
+                if not s1 and isinstance(ins.operand1, str):
+                    ct1 = self._get_type(ins.operand1)
+                    is_ptr1 = (ct1 is not None and self._ctype_is_pointer(ct1))
+                    if is_ptr1:
+                        s1 = self._ptr_step_bytes.get(str(ins.operand1))
+                if not s2 and isinstance(ins.operand2, str):
+                    ct2 = self._get_type(ins.operand2)
+                    is_ptr2 = (ct2 is not None and self._ctype_is_pointer(ct2))
+                    if is_ptr2:
+                        s2 = self._ptr_step_bytes.get(str(ins.operand2))
+
+                if s1 and not s2:
+                    step = int(s1)
+                    if step != 1:
+                        self._emit(f"  imulq ${step}, %rcx")
+                elif s2 and not s1 and bop == "+":
+                    step = int(s2)
+                    if step != 1:
+                        self._emit(f"  imulq ${step}, %rax")
+        except Exception:
+            pass
+
+        # Best-effort usual arithmetic conversions for 32-bit unsigned ints:
+        # if either operand is an unsigned-32 value, perform arithmetic in
+        # 32-bit and zero-extend the result.
+        bits1 = self._int_signedness(ins.operand1)[0]
+        bits2 = self._int_signedness(ins.operand2)[0]
+        u32_arith = bits1 == 32 or bits2 == 32
+        u64_arith = bits1 == 64 or bits2 == 64
+
+        emit_op = self._BINOP_EMITTERS.get(bop)
+        if emit_op is not None:
+            emit_op(self, ins, u32_arith, u64_arith)
+
+        self._store_result(ins.result, "%rax")
+
+    def _emit_binop_imm(self, ins: IRInstruction) -> bool:
+        """Emit a binop with a literal integer operand without loading it
+        into %rcx (see _binop_imm_lines), folding it if both are literals.
+
+        Returns False, emitting nothing, when the general form is needed.
+        """
+        bop = ins.label
+        x, c = ins.operand1, _imm_int(ins.operand2)
+        lit = _imm_int(x)
+        if lit is not None:
+            if c is not None:
+                fold = _INT_FOLD.get(bop)
+                if fold is None:
+                    return False
+                # 64-bit wraparound, like the %rax arithmetic.
+                v = ((fold(lit, c) + (1 << 63)) & ((1 << 64) - 1)) - (1 << 63)
+                imm = f"${v}"
+                if not self._store_imm(ins.result, imm):
+                    self._load_operand(imm, "%rax")
+                    self._store_result(ins.result, "%rax")
+                return True
+            if bop not in _COMMUTATIVE_BINOPS and bop != "-":
+                return False
+            x, c = ins.operand2, lit
+        elif c is None:
+            return False
+        # Pointer steps scale the integer side (see _ins_binop).
+        if bop in ("+", "-") and self._ptr_step_bytes.get(str(x or "")):
+            return False
+        bits, unsigned = self._int_signedness(x)
+        if bop in ("/", "%"):
+            unsigned = bits == 64 or bool(isinstance(ins.meta, dict) and ins.meta.get("unsigned_div"))
+        if lit is not None and bop == "-":
+            # $c - x == -x + c
+            lines = _binop_imm_lines("+", c, bits == 32, unsigned)
+            if lines is None:
+                return False
+            lines = (f"  neg{'l %eax' if bits == 32 else 'q %rax'}",) + lines
+        else:
+            lines = _binop_imm_lines(bop, c, bits == 32, unsigned)
+            if lines is None:
+                return False
+        self._load_operand(x, "%rax")
+        self._emit_lines(lines)
+        self._store_result(ins.result, "%rax")
+        return True
+
+    def _int_signedness(self, operand: Optional[str]) -> Tuple[int, bool]:
+        """Classify a binop operand's declared integer type.
+
+        Returns (bits, unsigned): bits is 32 for `unsigned int` and 64 for
+        `unsigned long` (typedefs resolved, e.g. size_t), 0 otherwise.
+        Cached per function since operand types do not change within one.
+        """
+        if not isinstance(operand, str):
+            return (0, False)
+        hit = self._signedness_cache.get(operand)
+        if hit is not None:
+            return hit
+        ty = self._get_type_str(operand)
+        if not ty and operand.startswith("@") and self._sema_ctx is not None:
+            ty = self._global_types.get(operand[1:], "")
+        # Resolve typedefs to detect unsigned types correctly
+        # (e.g. size_t -> unsigned long)
+        tyr = self._resolve_type(ty) if isinstance(ty, str) and ty.strip() else ""
+        tyn = tyr.strip().lower() if isinstance(tyr, str) else ""
+        if tyn.startswith("unsigned int"):
+            bits = 32
+        elif tyn.startswith("unsigned long"):
+            bits = 64
+        else:
+            bits = 0
+        hit = self._signedness_cache[operand] = (bits, tyn.startswith("unsigned "))
+        return hit
+
+    # binop emitters: (self, ins, u32_arith, u64_arith), operands already in
+    # %rax/%rcx, result left in %rax.
+
+    def _binop_arith(self, ins: IRInstruction, u32_arith: bool, u64_arith: bool) -> None:
+        self._emit_lines(_INT_ARITH_RAX_RCX[ins.label][1 if u32_arith else 0])
+
+    def _binop_divmod(self, ins: IRInstruction, u32_arith: bool, u64_arith: bool) -> None:
+        u32_form, u64_form, s64_form = _INT_DIVMOD_RAX_RCX[ins.label]
+        if u32_arith:
+            self._emit_lines(u32_form)
+        elif u64_arith or (isinstance(ins.meta, dict) and ins.meta.get("unsigned_div")):
+            self._emit_lines(u64_form)
+        else:
+            self._emit_lines(s64_form)
+
+    def _binop_cmp(self, ins: IRInstruction, u32_arith: bool, u64_arith: bool) -> None:
+        self._emit(_ZERO_RDX)
+        self._emit_int_compare(ins)
+        # Signedness is decided in IR ("u<" etc. for unsigned).
+        self._emit_lines(_INT_CMP_SETCC[ins.label])
+
+    def _emit_int_compare(self, ins: IRInstruction) -> None:
+        # Compare width matters: `unsigned int` values must be compared
+        # in 32-bit to avoid treating zero-extended UINT32 as signed 64-bit.
+        # Prefer 32-bit compare if either operand is known to be unsigned int.
+        lty = self._get_type_str(ins.operand1 or "") if isinstance(ins.operand1, str) else ""
+        rty = self._get_type_str(ins.operand2 or "") if isinstance(ins.operand2, str) else ""
+        lty_n = lty.strip().lower() if isinstance(lty, str) else ""
+        rty_n = rty.strip().lower() if isinstance(rty, str) else ""
+
+        u32_cmp = (lty_n == "unsigned int") or (rty_n == "unsigned int")
+
+        if u32_cmp:
+            # Use 32-bit registers for compare.
+            self._emit("  cmpl %ecx, %eax")
+        else:
+            self._emit("  cmpq %rcx, %rax")
 
-        if op == "zext32":
-            # Zero-extend low 32 bits to 64 bits.
-            self._load_operand(ins.operand1, "%rax")
-            self._emit("  movl %eax, %eax")
-            self._store_result(ins.result, "%rax")
-            return
+    def _emit_cmp_jump(self, ins: IRInstruction, jump: IRInstruction, keep: bool,
+                       arms: Optional[Tuple[IRInstruction, IRInstruction, str]] = None) -> None:
+        """Emit a compare binop and the jz/jnz testing its result as cmp + jcc,
+        or as cmp + cmov when the jump opens a select (*arms*).
 
-        if op == "sext32":
-            # Sign-extend low 32 bits to 64 bits.
-            self._load_operand(ins.operand1, "%rax")
-            self._emit("  movslq %eax, %rax")
+        The 0/1 value is still materialized and stored when *keep* is set
+        (the temp has other readers); setcc/mov leave the flags intact.
+        """
+        self._load_operand(ins.operand1, "%rax")
+        self._load_operand(ins.operand2, "%rcx")
+        if keep:
+            self._emit(_ZERO_RDX)
+        self._emit_int_compare(ins)
+        if keep:
+            self._emit_lines(_INT_CMP_SETCC[ins.label])
             self._store_result(ins.result, "%rax")
+        if arms is not None:
+            # The then-arm runs when the jump is not taken.
+            self._emit_select(arms, _INT_CMP_JCC[ins.label][jump.op != "jz"][1:])
             return
-
-        if op == "sext8":
-            # Sign-extend low 8 bits to 64 bits.
-            self._load_operand(ins.operand1, "%rax")
-            self._emit("  movsbl %al, %eax")
-            self._emit("  movslq %eax, %rax")
-            self._store_result(ins.result, "%rax")
+        self._emit(f"  {_INT_CMP_JCC[ins.label][jump.op == 'jz']} {jump.label}")
+
+    def _select_arms(self, instructions: List[IRInstruction],
+                     j: int) -> Optional[Tuple[IRInstruction, IRInstruction, str]]:
+        """(then mov, else mov, end label) of the select opened at *j*, if
+        both values can be loaded without side effects or touching the
+        flags: immediates, temps and stack locals, all non-float."""
+        then_mov, else_mov, end_lbl = instructions[j + 1], instructions[j + 4], instructions[j + 5]
+        for mov in (then_mov, else_mov):
+            src = mov.operand1
+            if not src or not (src[0] in "$%" or src in self._locals):
+                return None
+            if src in self._ptr_step_bytes:
+                return None
+            ct = self._get_type(src)
+            if ct is not None and ct.kind in (TypeKind.FLOAT, TypeKind.DOUBLE):
+                return None
+        return then_mov, else_mov, end_lbl.label
+
+    def _emit_select(self, arms: Tuple[IRInstruction, IRInstruction, str], cc: str) -> None:
+        """With the flags set, store then-value if `cc` holds, else
+        else-value, through cmov.  The loads (mov*, no xorl) keep the flags."""
+        then_mov, else_mov, end_label = arms
+        self._load_operand(else_mov.operand1, "%rax")
+        self._load_operand(then_mov.operand1, "%rcx")
+        self._emit(f"  cmov{cc} %rcx, %rax")
+        self._store_result(then_mov.result, "%rax")
+        self._emit(f"{end_label}:")
+
+    def _binop_land(self, ins: IRInstruction, u32_arith: bool, u64_arith: bool) -> None:
+        # (a!=0) && (b!=0)
+        self._emit_lines(_LOGICAL_AND_RAX_RCX)
+
+    def _binop_lor(self, ins: IRInstruction, u32_arith: bool, u64_arith: bool) -> None:
+        self._emit_lines(_LOGICAL_OR_RAX_RCX)
+
+    def _binop_shl(self, ins: IRInstruction, u32_arith: bool, u64_arith: bool) -> None:
+        # The count is already in %cl (low byte of %rcx).
+        self._emit_lines(_INT_SHIFT_RAX_CL["shl"][1 if u32_arith else 0])
+
+    def _binop_shr(self, ins: IRInstruction, u32_arith: bool, u64_arith: bool) -> None:
+        # Best-effort: if the left operand is declared unsigned, use logical shift.
+        # Otherwise use arithmetic shift.
+        insn = "shr" if self._int_signedness(ins.operand1)[1] else "sar"
+        self._emit_lines(_INT_SHIFT_RAX_CL[insn][1 if u32_arith else 0])
+
+    # Unsupported operators have no entry and leave %rax as operand1.
+    _BINOP_EMITTERS: Dict[str, Callable[["CodeGenerator", IRInstruction, bool, bool], None]] = {
+        **dict.fromkeys(_INT_ARITH_RAX_RCX, _binop_arith),
+        **dict.fromkeys(_INT_DIVMOD_RAX_RCX, _binop_divmod),
+        **dict.fromkeys(_INT_CMP_SETCC, _binop_cmp),
+        "&&": _binop_land,
+        "||": _binop_lor,
+        "<<": _binop_shl,
+        ">>": _binop_shr,
+    }
+
+    def _ins_call(self, ins: IRInstruction) -> None:
+        op = ins.op
+        # Builtins: handle varargs setup/teardown without emitting external calls.
+        # System headers expand va_start/va_end into these builtins.
+        target0 = (ins.operand1 or "")
+        if target0.startswith("@"):
+            target0 = target0[1:]
+        if target0 == "__builtin_va_end":
+            # SysV: va_end is a no-op.
+            self._store_result(ins.result, "$0")
             return
 
-        if op == "sext16":
-            # Sign-extend low 16 bits to 64 bits.
-            self._load_operand(ins.operand1, "%rax")
-            self._emit("  movswl %ax, %eax")
-            self._emit("  movslq %eax, %rax")
+        if target0 == "__builtin_va_arg_int":
+            # SysV AMD64 va_arg for GP (int/long/pointer) types.
+            # Layout of __va_list_tag:
+            #   +0: u32 gp_offset
+            #   +4: u32 fp_offset
+            #   +8: void* overflow_arg_area
+            #  +16: void* reg_save_area
+            ap = (ins.args or [None])[0]
+            # ap is a pointer to the __va_list_tag (or the tag itself).
+            self._addr_of_symbol(ap or "", "%rax")
+            self._emit("  movq (%rax), %r11")  # r11 = &tag
+            seq = getattr(self, "_va_label_seq", 0)
+            self._va_label_seq = seq + 1
+            lbl_stack = f".Lva_stack_{seq}"
+            lbl_done = f".Lva_done_{seq}"
+            # Check gp_offset < 48
+            self._emit("  movl (%r11), %ecx")       # ecx = gp_offset
+            self._emit("  cmpl $48, %ecx")
+            self._emit(f"  jge {lbl_stack}")
+            # Fetch from reg_save_area + gp_offset
+            self._emit("  movq 16(%r11), %r10")      # r10 = reg_save_area
+            self._emit("  movslq %ecx, %rcx")
+            self._emit("  movq (%r10,%rcx), %rax")   # result
+            # Advance gp_offset += 8
+            self._emit("  addl $8, (%r11)")
+            self._emit(f"  jmp {lbl_done}")
+            # Fetch from overflow_arg_area
+            self._emit(f"{lbl_stack}:")
+            self._emit("  movq 8(%r11), %r10")       # r10 = overflow_arg_area
+            self._emit("  movq (%r10), %rax")         # result
+            self._emit("  addq $8, %r10")
+            self._emit("  movq %r10, 8(%r11)")        # advance overflow_arg_area
+            self._emit(f"{lbl_done}:")
             self._store_result(ins.result, "%rax")
             return
 
-        if op == "binop":
-            self._load_operand(ins.operand1, "%rax")
-            self._load_operand(ins.operand2, "%rcx")
-            bop = ins.label
-
-            # Pointer arithmetic scaling (best-effort): if either operand is a
-            # pointer temp with an explicit step size, scale the integer operand.
-            # This is used for multi-dimensional array decay where (p + 1)
-            # should advance by sizeof(row).
-            # NOTE: General pointer arithmetic scaling (e.g. int* + 3 -> scale
-            # by sizeof(int)) is already done by the IR generator. The codegen
-            # only handles explicit ptr_step_bytes overrides here.
-            try:
-                if bop in {"+", "-"}:
-                    # 1) Temp-based overrides
-                    s1 = self._ptr_step_bytes.get(str(ins.operand1 or ""))
-                    s2 = self._ptr_step_bytes.get(str(ins.operand2 or ""))
-                    # 2) Symbol-based overrides (e.g. local variable holding a
-                    # decayed pointer value): use its declared type if it is
-                    # pointer-typed. CType-based check takes priority.
-                    if not s1 and isinstance(ins.operand1, str):
-                        ct1 = self._get_type(ins.operand1)
-                        is_ptr1 = (ct1 is not None and self._ctype_is_pointer(ct1))
-                        if is_ptr1:
-                            s1 = self._ptr_step_bytes.get(str(ins.operand1))
-                    if not s2 and isinstance(ins.operand2, str):
-                        ct2 = self._get_type(ins.operand2)
-                        is_ptr2 = (ct2 is not None and self._ctype_is_pointer(ct2))
-                        if is_ptr2:
-                            s2 = self._ptr_step_bytes.get(str(ins.operand2))
-
-                    if s1 and not s2:
-                        step = int(s1)
-                        if step != 1:
-                            self._emit(f"  imulq ${step}, %rcx")
-                    elif s2 and not s1 and bop == "+":
-                        step = int(s2)
-                        if step != 1:
-                            self._emit(f"  imulq ${step}, %rax")
-            except Exception:
-                pass
-
-            # Best-effort usual arithmetic conversions for 32-bit unsigned ints:
-            # if either operand is an unsigned-32 value, perform arithmetic in
-            # 32-bit and zero-extend the result.
-            ty1 = self._get_type_str(ins.operand1) if isinstance(ins.operand1, str) else ""
-            ty2 = self._get_type_str(ins.operand2) if isinstance(ins.operand2, str) else ""
-            if not ty1 and isinstance(ins.operand1, str) and ins.operand1.startswith("@") and self._sema_ctx is not None:
-                ty1 = getattr(self._sema_ctx, "global_types", {}).get(ins.operand1[1:], "")
-            if not ty2 and isinstance(ins.operand2, str) and ins.operand2.startswith("@") and self._sema_ctx is not None:
-                ty2 = getattr(self._sema_ctx, "global_types", {}).get(ins.operand2[1:], "")
-            # Resolve typedefs to detect unsigned types correctly
-            # (e.g. size_t -> unsigned long)
-            ty1r = self._resolve_type(ty1) if isinstance(ty1, str) and ty1.strip() else ""
-            ty2r = self._resolve_type(ty2) if isinstance(ty2, str) and ty2.strip() else ""
-            ty1n = ty1r.strip().lower() if isinstance(ty1r, str) else ""
-            ty2n = ty2r.strip().lower() if isinstance(ty2r, str) else ""
-            u32_arith = ty1n.startswith("unsigned int") or ty2n.startswith("unsigned int")
-            u64_arith = ty1n.startswith("unsigned long") or ty2n.startswith("unsigned long")
-
-            if bop == "+":
-                if u32_arith:
-                    self._emit("  addl %ecx, %eax")
-                    # 32-bit unsigned arithmetic wraps modulo 2^32; ensure the
-                    # computed value in %rax is zero-extended for subsequent 64-bit uses.
-                    self._emit("  movl %eax, %eax")
-                else:
-                    self._emit("  addq %rcx, %rax")
-            elif bop == "-":
-                if u32_arith:
-                    self._emit("  subl %ecx, %eax")
-                    self._emit("  movl %eax, %eax")
-                else:
-                    self._emit("  subq %rcx, %rax")
-            elif bop == "*":
-                if u32_arith:
-                    self._emit("  imull %ecx, %eax")
-                    self._emit("  movl %eax, %eax")
-                else:
-                    self._emit("  imulq %rcx, %rax")
-            elif bop == "/":
-                if u32_arith:
-                    # unsigned 32-bit division: edx:eax / ecx
-                    self._emit("  xorl %edx, %edx")
-                    self._emit("  divl %ecx")
-                elif u64_arith or (isinstance(ins.meta, dict) and ins.meta.get("unsigned_div")):
-                    # unsigned 64-bit division: rdx:rax / rcx
-                    self._emit("  xorq %rdx, %rdx")
-                    self._emit("  divq %rcx")
-                else:
-                    self._emit("  cqto")
-                    self._emit("  idivq %rcx")
-            elif bop == "%":
-                if u32_arith:
-                    self._emit("  xorl %edx, %edx")
-                    self._emit("  divl %ecx")
-                    self._emit("  movl %edx, %eax")
-                elif u64_arith or (isinstance(ins.meta, dict) and ins.meta.get("unsigned_div")):
-                    self._emit("  xorq %rdx, %rdx")
-                    self._emit("  divq %rcx")
-                    self._emit("  movq %rdx, %rax")
-                else:
-                    self._emit("  cqto")
-                    self._emit("  idivq %rcx")
-                    self._emit("  movq %rdx, %rax")
-            elif bop in {"==", "!=", "<", "<=", ">", ">=", "u<", "u<=", "u>", "u>=", "u==", "u!="}:
-                # Compare width matters: `unsigned int` values must be compared
-                # in 32-bit to avoid treating zero-extended UINT32 as signed 64-bit.
-                # Prefer 32-bit compare if either operand is known to be unsigned int.
-                unsigned = bop.startswith("u")
-                lty = self._get_type_str(ins.operand1 or "") if isinstance(ins.operand1, str) else ""
-                rty = self._get_type_str(ins.operand2 or "") if isinstance(ins.operand2, str) else ""
-                lty_n = lty.strip().lower() if isinstance(lty, str) else ""
-                rty_n = rty.strip().lower() if isinstance(rty, str) else ""
-
-                u32_cmp = (lty_n == "unsigned int") or (rty_n == "unsigned int")
-
-                if u32_cmp:
-                    # Use 32-bit registers for compare.
-                    self._emit("  cmpl %ecx, %eax")
-                else:
-                    self._emit("  cmpq %rcx, %rax")
-
-                # Signedness is decided in IR.
-                core = bop[1:] if unsigned else bop
-                if unsigned:
-                    cc = {
-                        "==": "sete",
-                        "!=": "setne",
-                        "<": "setb",
-                        "<=": "setbe",
-                        ">": "seta",
-                        ">=": "setae",
-                    }[core]
-                else:
-                    cc = {
-                        "==": "sete",
-                        "!=": "setne",
-                        "<": "setl",
-                        "<=": "setle",
-                        ">": "setg",
-                        ">=": "setge",
-                    }[core]
-                self._emit(f"  {cc} %al")
-                self._emit("  movzbq %al, %rax")
-            elif bop == "&&":
-                # (a!=0) && (b!=0)
-                self._emit("  cmpq $0, %rax")
-                self._emit("  setne %al")
-                self._emit("  movzbq %al, %rax")
-                self._emit("  cmpq $0, %rcx")
-                self._emit("  setne %cl")
-                self._emit("  movzbq %cl, %rcx")
-                self._emit("  andq %rcx, %rax")
-            elif bop == "||":
-                self._emit("  cmpq $0, %rax")
-                self._emit("  setne %al")
-                self._emit("  movzbq %al, %rax")
-                self._emit("  cmpq $0, %rcx")
-                self._emit("  setne %cl")
-                self._emit("  movzbq %cl, %rcx")
-                self._emit("  orq %rcx, %rax")
-                self._emit("  cmpq $0, %rax")
-                self._emit("  setne %al")
-                self._emit("  movzbq %al, %rax")
-            elif bop == "&":
-                if u32_arith:
-                    self._emit("  andl %ecx, %eax")
-                    self._emit("  movl %eax, %eax")
-                else:
-                    self._emit("  andq %rcx, %rax")
-            elif bop == "|":
-                if u32_arith:
-                    self._emit("  orl %ecx, %eax")
-                    self._emit("  movl %eax, %eax")
-                else:
-                    self._emit("  orq %rcx, %rax")
-            elif bop == "^":
-                if u32_arith:
-                    self._emit("  xorl %ecx, %eax")
-                    self._emit("  movl %eax, %eax")
-                else:
-                    self._emit("  xorq %rcx, %rax")
-            elif bop == "<<":
-                self._emit("  movb %cl, %cl")
-                if u32_arith:
-                    self._emit("  shll %cl, %eax")
-                    self._emit("  movl %eax, %eax")
-                else:
-                    self._emit("  shlq %cl, %rax")
-            elif bop == ">>":
-                self._emit("  movb %cl, %cl")
-                # Best-effort: if the left operand is declared unsigned, use logical shift.
-                # Otherwise use arithmetic shift.
-                lty = self._get_type_str(ins.operand1) if isinstance(ins.operand1, str) else ""
-                if not lty and isinstance(ins.operand1, str) and ins.operand1.startswith("@") and self._sema_ctx is not None:
-                    lty = getattr(self._sema_ctx, "global_types", {}).get(ins.operand1[1:], "")
-                unsigned_left = isinstance(lty, str) and lty.strip().startswith("unsigned ")
-                if u32_arith:
-                    # For unsigned 32-bit, prefer logical shift; otherwise arithmetic.
-                    if unsigned_left:
-                        self._emit("  shrl %cl, %eax")
-                    else:
-                        self._emit("  sarl %cl, %eax")
-                    self._emit("  movl %eax, %eax")
-                else:
-                    if unsigned_left:
-                        self._emit("  shrq %cl, %rax")
-                    else:
-                        self._emit("  sarq %cl, %rax")
+        if target0 == "__builtin_va_start":
+            # SysV AMD64 minimal: initialize the 24-byte __va_list_tag so
+            # passing it to libc (vsnprintf) works for GP args.
+            # Layout (glibc):
+            #   u32 gp_offset; u32 fp_offset; void* overflow; void* regsave;
+            #
+            # IMPORTANT: `va_list` on SysV is an array-of-1 struct. In C,
+            # the macro expansion passes a `va_list` lvalue, so the builtin
+            # receives a pointer to the first element (i.e. `&ap[0]`).
+            #
+            # If the frontend models `va_list` as the real array type, the
+            # operand will be a stack slot containing the tag itself.
+            # If the frontend models it as `void*` (via system-cpp defines),
+            # the operand will be a pointer-sized slot that holds the tag
+            # address, and we must load that pointer.
+            ap = (ins.args or [None, None])[0]
+
+            # We store a *tag pointer* into the user-visible `ap` local.
+            # Our frame reserves a dedicated tag slot at rbp-_varargs_tag_base.
+            self._addr_of_symbol(ap or "", "%rax")  # rax = &ap_slot
+            tag_base = int(getattr(self, "_varargs_tag_base", 0) or 0)
+            if not tag_base:
+                # Fallback: use the current frame bottom.
+                tag_base = int(getattr(self, "_stack_size", 0) or 0)
+            # Build it in caller-saved %r11: callers may keep temps in the
+            # callee-saved registers across the call (see _TEMP_REGS).
+            self._emit(f"  leaq -{tag_base}(%rbp), %r11")
+            self._emit("  movq %r11, (%rax)")
+            tag_reg = "%r11"
+
+            # gp_offset: offset of the first *variable* argument within
+            # the GP save area. On SysV AMD64, the fixed args of the
+            # variadic function may already occupy some registers.
+            #
+            # The System V ABI uses a 6-slot GP area:
+            #   rdi,rsi,rdx,rcx,r8,r9
+            # For our supported subset, compute gp_offset from the number
+            # of fixed params, but note that `va_start(ap, last_named)`
+            # should start *after* the last named argument.
+            named_gp = int(getattr(self, "_varargs_named_gpr_count", 0) or 0)
+            # SysV AMD64: gp_offset is the byte offset *within the GP save area*
+            # of the next argument to be fetched. It should point to the first
+            # *variadic* argument slot, i.e. right after the last named argument.
+            #
+            # Example: wrap(out, n, fmt, ...) has 3 named GP args:
+            #   out -> rdi (slot 0)
+            #   n   -> rsi (slot 1)
+            #   fmt -> rdx (slot 2)
+            # so the first vararg is in rcx (slot 3) => gp_offset = 3*8.
+            gp_off = min(self._VARARGS_GP_SAVE_AREA_SIZE, named_gp * 8)
+            self._emit(f"  movl ${gp_off}, ({tag_reg})")
+            # fp_offset: byte offset within reg_save_area where FP regs start.
+            # SysV AMD64: FP area starts after 48 bytes of GP slots.
+            self._emit(f"  movl ${self._VARARGS_GP_SAVE_AREA_SIZE}, 4({tag_reg})")
+
+            # overflow_arg_area: point to first stack vararg.
+            # Best-effort default: just past the return address.
+            # (Only used when gp_offset exceeds 48.)
+            # SysV frame: 0(%rbp)=old rbp, 8(%rbp)=retaddr, so +16 is the
+            # first stack argument slot.
+            self._emit(f"  leaq {self._VARARGS_FIRST_STACK_ARG_OFF}(%rbp), %r10")
+            self._emit(f"  movq %r10, 8({tag_reg})")
+
+            # Keep reg_save_area's GP slots consistent with the ABI.
+            # We save incoming arg regs in the prologue; refresh the
+            # vararg-relevant slots (rcx/r8/r9) in case later codegen
+            # clobbered them before va_start runs.
+            base = int(getattr(self, "_varargs_reg_save_base", 0) or 0)
+            if base:
+                # With ascending layout: rdi at -(base+40), rsi at -(base+32), ...
+                # rcx at -(base+16), r8 at -(base+8), r9 at -(base+0)
+                self._emit(f"  movq %rcx, -{base + 16}(%rbp)")
+                self._emit(f"  movq %r8,  -{base + 8}(%rbp)")
+                self._emit(f"  movq %r9,  -{base + 0}(%rbp)")
+
+            # reg_save_area: points to rdi slot (lowest address).
+            base = int(getattr(self, "_varargs_reg_save_base", 0) or 0)
+            if base:
+                self._emit(f"  leaq -{base + 40}(%rbp), %r10")
             else:
-                # unsupported operator
-                pass
+                # Fallback (should not happen for a true variadic function)
+                base2 = int(getattr(self, "_locals_base", 0))
+                self._emit(f"  leaq -{base2 + 48 + 128}(%rbp), %r10")
+            self._emit(f"  movq %r10, 16({tag_reg})")
 
-            self._store_result(ins.result, "%rax")
-            return
 
-        if op == "call":
-            # Builtins: handle varargs setup/teardown without emitting external calls.
-            # System headers expand va_start/va_end into these builtins.
-            target0 = (ins.operand1 or "")
-            if target0.startswith("@"):
-                target0 = target0[1:]
-            if target0 == "__builtin_va_end":
-                # SysV: va_end is a no-op.
-                self._store_result(ins.result, "$0")
-                return
 
-            if target0 == "__builtin_va_arg_int":
-                # SysV AMD64 va_arg for GP (int/long/pointer) types.
-                # Layout of __va_list_tag:
-                #   +0: u32 gp_offset
-                #   +4: u32 fp_offset
-                #   +8: void* overflow_arg_area
-                #  +16: void* reg_save_area
-                ap = (ins.args or [None])[0]
-                # ap is a pointer to the __va_list_tag (or the tag itself).
-                self._addr_of_symbol(ap or "", "%rax")
-                self._emit("  movq (%rax), %r11")  # r11 = &tag
-                seq = getattr(self, "_va_label_seq", 0)
-                self._va_label_seq = seq + 1
-                lbl_stack = f".Lva_stack_{seq}"
-                lbl_done = f".Lva_done_{seq}"
-                # Check gp_offset < 48
-                self._emit("  movl (%r11), %ecx")       # ecx = gp_offset
-                self._emit("  cmpl $48, %ecx")
-                self._emit(f"  jge {lbl_stack}")
-                # Fetch from reg_save_area + gp_offset
-                self._emit("  movq 16(%r11), %r10")      # r10 = reg_save_area
-                self._emit("  movslq %ecx, %rcx")
-                self._emit("  movq (%r10,%rcx), %rax")   # result
-                # Advance gp_offset += 8
-                self._emit("  addl $8, (%r11)")
-                self._emit(f"  jmp {lbl_done}")
-                # Fetch from overflow_arg_area
-                self._emit(f"{lbl_stack}:")
-                self._emit("  movq 8(%r11), %r10")       # r10 = overflow_arg_area
-                self._emit("  movq (%r10), %rax")         # result
-                self._emit("  addq $8, %r10")
-                self._emit("  movq %r10, 8(%r11)")        # advance overflow_arg_area
-                self._emit(f"{lbl_done}:")
-                self._store_result(ins.result, "%rax")
-                return
-
-            if target0 == "__builtin_va_start":
-                # SysV AMD64 minimal: initialize the 24-byte __va_list_tag so
-                # passing it to libc (vsnprintf) works for GP args.
-                # Layout (glibc):
-                #   u32 gp_offset; u32 fp_offset; void* overflow; void* regsave;
-                #
-                # IMPORTANT: `va_list` on SysV is an array-of-1 struct. In C,
-                # the macro expansion passes a `va_list` lvalue, so the builtin
-                # receives a pointer to the first element (i.e. `&ap[0]`).
-                #
-                # If the frontend models `va_list` as the real array type, the
-                # operand will be a stack slot containing the tag itself.
-                # If the frontend models it as `void*` (via system-cpp defines),
-                # the operand will be a pointer-sized slot that holds the tag
-                # address, and we must load that pointer.
-                ap = (ins.args or [None, None])[0]
-
-                # We store a *tag pointer* into the user-visible `ap` local.
-                # Our frame reserves a dedicated tag slot at rbp-_varargs_tag_base.
-                self._addr_of_symbol(ap or "", "%rax")  # rax = &ap_slot
-                tag_base = int(getattr(self, "_varargs_tag_base", 0) or 0)
-                if not tag_base:
-                    # Fallback: use the current frame bottom.
-                    tag_base = int(getattr(self, "_stack_size", 0) or 0)
-                self._emit(f"  leaq -{tag_base}(%rbp), %r12")
-                self._emit("  movq %r12, (%rax)")
-                tag_reg = "%r12"
-
-                # gp_offset: offset of the first *variable* argument within
-                # the GP save area. On SysV AMD64, the fixed args of the
-                # variadic function may already occupy some registers.
-                #
-                # The System V ABI uses a 6-slot GP area:
-                #   rdi,rsi,rdx,rcx,r8,r9
-                # For our supported subset, compute gp_offset from the number
-                # of fixed params, but note that `va_start(ap, last_named)`
-                # should start *after* the last named argument.
-                named_gp = int(getattr(self, "_varargs_named_gpr_count", 0) or 0)
-                # SysV AMD64: gp_offset is the byte offset *within the GP save area*
-                # of the next argument to be fetched. It should point to the first
-                # *variadic* argument slot, i.e. right after the last named argument.
-                #
-                # Example: wrap(out, n, fmt, ...) has 3 named GP args:
-                #   out -> rdi (slot 0)
-                #   n   -> rsi (slot 1)
-                #   fmt -> rdx (slot 2)
-                # so the first vararg is in rcx (slot 3) => gp_offset = 3*8.
-                gp_off = min(self._VARARGS_GP_SAVE_AREA_SIZE, named_gp * 8)
-                self._emit(f"  movl ${gp_off}, ({tag_reg})")
-                # fp_offset: byte offset within reg_save_area where FP regs start.
-                # SysV AMD64: FP area starts after 48 bytes of GP slots.
-                self._emit(f"  movl ${self._VARARGS_GP_SAVE_AREA_SIZE}, 4({tag_reg})")
-
-                # overflow_arg_area: point to first stack vararg.
-                # Best-effort default: just past the return address.
-                # (Only used when gp_offset exceeds 48.)
-                # SysV frame: 0(%rbp)=old rbp, 8(%rbp)=retaddr, so +16 is the
-                # first stack argument slot.
-                self._emit(f"  leaq {self._VARARGS_FIRST_STACK_ARG_OFF}(%rbp), %r10")
-                self._emit(f"  movq %r10, 8({tag_reg})")
-
-                # Keep reg_save_area's GP slots consistent with the ABI.
-                # We save incoming arg regs in the prologue; refresh the
-                # vararg-relevant slots (rcx/r8/r9) in case later codegen
-                # clobbered them before va_start runs.
-                base = int(getattr(self, "_varargs_reg_save_base", 0) or 0)
-                if base:
-                    # With ascending layout: rdi at -(base+40), rsi at -(base+32), ...
-                    # rcx at -(base+16), r8 at -(base+8), r9 at -(base+0)
-                    self._emit(f"  movq %rcx, -{base + 16}(%rbp)")
-                    self._emit(f"  movq %r8,  -{base + 8}(%rbp)")
-                    self._emit(f"  movq %r9,  -{base + 0}(%rbp)")
-
-                # reg_save_area: points to rdi slot (lowest address).
-                base = int(getattr(self, "_varargs_reg_save_base", 0) or 0)
-                if base:
-                    self._emit(f"  leaq -{base + 40}(%rbp), %r11")
-                else:
-                    # Fallback (should not happen for a true variadic function)
-                    base2 = int(getattr(self, "_locals_base", 0))
-                    self._emit(f"  leaq -{base2 + 48 + 128}(%rbp), %r11")
-                self._emit(f"  movq %r11, 16({tag_reg})")
-
-
-
-                self._store_result(ins.result, "$0")
-                return
+            self._store_result(ins.result, "$0")
+            return
 
-            # Stack alignment will be checked after all stack pushes (see below).
-            pre_call_pad = False
+        # Stack alignment will be checked after all stack pushes (see below).
+        pre_call_pad = False
 
-            # operand1 is function name or @name
-            # args are operand strings
-            arg_regs = ["%rdi", "%rsi", "%rdx", "%rcx", "%r8", "%r9"]
+        # operand1 is function name or @name
+        # args are operand strings
+        arg_regs = _ARG_REGS
 
-            xmm_regs = ["%xmm0", "%xmm1", "%xmm2", "%xmm3", "%xmm4", "%xmm5", "%xmm6", "%xmm7"]
-            gp_idx = 0
-            xmm_idx = 0
+        xmm_regs = _XMM_ARG_REGS
+        gp_idx = 0
+        xmm_idx = 0
 
-            # SysV AMD64: GP args beyond 6 go on the stack.
-            # SSE (float/double) args have their own register bank and do NOT
-            # consume GP register slots.  We must classify args first to
-            # determine which GP args overflow to the stack.
-            #
-            # Deferred: stack_args will be computed after _arg_descs classification.
-            stack_pad = 0
-
-            # --- Two-pass argument setup for struct-aware ABI ---
-            # Pass 1: Pre-allocate stack copies for large (MEMORY class) structs
-            #         and record the stack pointer for each.  This must happen
-            #         before we start loading argument registers because the
-            #         copy may clobber scratch registers.
-            # Pass 2: Load all arguments into their target registers.
-
-            # SysV ABI: if the callee returns a MEMORY-class struct, the caller
-            # must allocate space and pass a hidden pointer via %rdi as the
-            # implicit first argument.
-            _ret_hidden_ptr_slot = 0  # spill offset for the hidden return pointer
-            ret_ty = str(ins.operand2 or "")
-            _call_ret_ty_s = ret_ty.replace("function ", "").strip() if ret_ty.startswith("function ") else ""
-            _call_ret_is_memory = False
-            if _call_ret_ty_s.startswith("struct ") or _call_ret_ty_s.startswith("union "):
-                _call_ret_sz = self._type_size_bytes(_call_ret_ty_s)
-                _call_ret_layout = getattr(self._sema_ctx, "layouts", {}).get(_call_ret_ty_s) if self._sema_ctx else None
-                _call_ret_cls = classify_struct(_call_ret_ty_s, _call_ret_layout) if _call_ret_layout else [EightbyteClass.INTEGER]
-                _call_ret_pm = get_struct_pass_mode(_call_ret_cls)
-                if _call_ret_pm == "hidden_ptr":
-                    _call_ret_is_memory = True
-                    # Allocate space on the stack for the return value.
-                    alloc_sz = ((_call_ret_sz + 15) // 16) * 16  # 16-byte aligned
-                    alloc_sz = max(alloc_sz, 16)
-                    self._emit(f"  subq ${alloc_sz}, %rsp")
-                    stack_pad += alloc_sz
-                    self._call_stack_adjust = getattr(self, "_call_stack_adjust", 0) + alloc_sz
-                    # Save the pointer in a temp slot for later use.
-                    tmp = self._new_spill_name()
-                    _ret_hidden_ptr_slot = self._ensure_local(tmp)
-                    self._emit(f"  movq %rsp, %rax")
-                    self._emit(f"  movq %rax, -{_ret_hidden_ptr_slot}(%rbp)")
-                    # Hidden return pointer consumes %rdi (first GP register).
-                    gp_idx = 1
-
-            # Build an argument descriptor list.
-            _arg_descs = []  # list of (arg, a_ty, kind, extra)
-            #   kind: 'float', 'long_double', 'struct_reg', 'struct_hidden', 'struct_stack', 'gp'
-            #   extra: for struct_hidden -> temp slot offset holding the pointer
-            _pre_gp = gp_idx
-            _pre_xmm = 0
-            for idx, a in enumerate(ins.args or []):
-                a_ty = self._get_type_str(a) if isinstance(a, str) else ""
-                # CType-based: use symbol table to determine argument type
-                # for correct GP vs SSE classification.
-                a_ct = self._get_type(a) if isinstance(a, str) else None
-                if a_ct is not None:
-                    if a_ct.kind == TypeKind.FLOAT:
-                        a_ty = "float"
-                    elif a_ct.kind == TypeKind.DOUBLE:
-                        a_ty = "double"
-                if isinstance(a_ty, str) and a_ty.strip() == "long double":
-                    # SysV ABI: long double is MEMORY class, passed on the stack
-                    _arg_descs.append((a, a_ty, "long_double", None))
-                elif isinstance(a_ty, str) and a_ty in ("float", "double"):
-                    _arg_descs.append((a, a_ty, "float", None))
-                    _pre_xmm += 1
-                elif isinstance(a_ty, str) and (a_ty.strip().startswith("struct ") or a_ty.strip().startswith("union ")) and "*" not in a_ty:
-                    sty = a_ty.strip()
-                    sz = self._type_size_bytes(sty)
-                    layout = getattr(self._sema_ctx, "layouts", {}).get(sty) if self._sema_ctx else None
-                    classification = classify_struct(sty, layout) if layout else [EightbyteClass.INTEGER]
-                    pass_mode = get_struct_pass_mode(classification)
-                    if pass_mode == "hidden_ptr":
-                        _arg_descs.append((a, a_ty, "struct_hidden", {"sz": sz, "classification": classification}))
-                        _pre_gp += 1  # hidden pointer consumes one GP reg
-                    elif pass_mode == "registers":
-                        gp_needed = sum(1 for c in classification if c == EightbyteClass.INTEGER)
-                        sse_needed = sum(1 for c in classification if c == EightbyteClass.SSE)
-                        if _pre_gp + gp_needed <= len(arg_regs) and _pre_xmm + sse_needed <= len(xmm_regs):
-                            _arg_descs.append((a, a_ty, "struct_reg", {"sz": sz, "classification": classification}))
-                            _pre_gp += gp_needed
-                            _pre_xmm += sse_needed
-                        else:
-                            _arg_descs.append((a, a_ty, "struct_stack", {"sz": sz, "classification": classification}))
+        # SysV AMD64: GP args beyond 6 go on the stack.
+        # SSE (float/double) args have their own register bank and do NOT
+        # consume GP register slots.  We must classify args first to
+        # determine which GP args overflow to the stack.
+        #
+        # Deferred: stack_args will be computed after _arg_descs classification.
+        stack_pad = 0
+
+        # --- Two-pass argument setup for struct-aware ABI ---
+        # Pass 1: Pre-allocate stack copies for large (MEMORY class) structs
+        #         and record the stack pointer for each.  This must happen
+        #         before we start loading argument registers because the
+        #         copy may clobber scratch registers.
+        # Pass 2: Load all arguments into their target registers.
+
+        # SysV ABI: if the callee returns a MEMORY-class struct, the caller
+        # must allocate space and pass a hidden pointer via %rdi as the
+        # implicit first argument.
+        _ret_hidden_ptr_slot = 0  # spill offset for the hidden return pointer
+        ret_ty = str(ins.operand2 or "")
+        _call_ret_ty_s = ret_ty.replace("function ", "").strip() if ret_ty.startswith("function ") else ""
+        _call_ret_is_memory = False
+        if _call_ret_ty_s.startswith("struct ") or _call_ret_ty_s.startswith("union "):
+            _call_ret_sz = self._type_size_bytes(_call_ret_ty_s)
+            _call_ret_layout = self._layouts.get(_call_ret_ty_s)
+            _call_ret_cls = classify_struct(_call_ret_ty_s, _call_ret_layout) if _call_ret_layout else [EightbyteClass.INTEGER]
+            _call_ret_pm = get_struct_pass_mode(_call_ret_cls)
+            if _call_ret_pm == "hidden_ptr":
+                _call_ret_is_memory = True
+                # Allocate space on the stack for the return value.
+                alloc_sz = ((_call_ret_sz + 15) // 16) * 16  # 16-byte aligned
+                alloc_sz = max(alloc_sz, 16)
+                self._emit(f"  subq ${alloc_sz}, %rsp")
+                stack_pad += alloc_sz
+                self._call_stack_adjust = getattr(self, "_call_stack_adjust", 0) + alloc_sz
+                # Save the pointer in a temp slot for later use.
+                tmp = self._new_spill_name()
+                _ret_hidden_ptr_slot = self._ensure_local(tmp)
+                self._emit(f"  movq %rsp, %rax")
+                self._emit(f"  movq %rax, -{_ret_hidden_ptr_slot}(%rbp)")
+                # Hidden return pointer consumes %rdi (first GP register).
+                gp_idx = 1
+
+        # Build an argument descriptor list.
+        _arg_descs = []  # list of (arg, a_ty, kind, extra)
+        #   kind: 'float', 'long_double', 'struct_reg', 'struct_hidden', 'struct_stack', 'gp'
+        #   extra: for struct_hidden -> temp slot offset holding the pointer
+        _pre_gp = gp_idx
+        _pre_xmm = 0
+        for idx, a in enumerate(ins.args or []):
+            a_ty = self._get_type_str(a) if isinstance(a, str) else ""
+            # CType-based: use symbol table to determine argument type
+            # for correct GP vs SSE classification.
+            a_ct = self._get_type(a) if isinstance(a, str) else None
+            if a_ct is not None:
+                if a_ct.kind == TypeKind.FLOAT:
+                    a_ty = "float"
+                elif a_ct.kind == TypeKind.DOUBLE:
+                    a_ty = "double"
+            if isinstance(a_ty, str) and a_ty.strip() == "long double":
+                # SysV ABI: long double is MEMORY class, passed on the stack
+                _arg_descs.append((a, a_ty, "long_double", None))
+            elif isinstance(a_ty, str) and a_ty in ("float", "double"):
+                _arg_descs.append((a, a_ty, "float", None))
+                _pre_xmm += 1
+            elif isinstance(a_ty, str) and (a_ty.strip().startswith("struct ") or a_ty.strip().startswith("union ")) and "*" not in a_ty:
+                sty = a_ty.strip()
+                sz = self._type_size_bytes(sty)
+                layout = self._layouts.get(sty)
+                classification = classify_struct(sty, layout) if layout else [EightbyteClass.INTEGER]
+                pass_mode = get_struct_pass_mode(classification)
+                if pass_mode == "hidden_ptr":
+                    _arg_descs.append((a, a_ty, "struct_hidden", {"sz": sz, "classification": classification}))
+                    _pre_gp += 1  # hidden pointer consumes one GP reg
+                elif pass_mode == "registers":
+                    gp_needed = sum(1 for c in classification if c == EightbyteClass.INTEGER)
+                    sse_needed = sum(1 for c in classification if c == EightbyteClass.SSE)
+                    if _pre_gp + gp_needed <= len(arg_regs) and _pre_xmm + sse_needed <= len(xmm_regs):
+                        _arg_descs.append((a, a_ty, "struct_reg", {"sz": sz, "classification": classification}))
+                        _pre_gp += gp_needed
+                        _pre_xmm += sse_needed
                     else:
                         _arg_descs.append((a, a_ty, "struct_stack", {"sz": sz, "classification": classification}))
                 else:
-                    _arg_descs.append((a, a_ty, "gp", None))
-                    _pre_gp += 1
-
-            # Push GP args that overflow beyond the 6 GP registers onto the stack.
-            # SSE (float/double) args do NOT consume GP register slots.
-            _gp_count = 0
-            _stack_overflow_args = []  # (arg_value, desc_idx) for GP args beyond 6
-            for desc_idx, (a, a_ty, kind, extra) in enumerate(_arg_descs):
-                if kind == "gp":
-                    _gp_count += 1
-                    if _gp_count > len(arg_regs):
-                        _stack_overflow_args.append((a, desc_idx))
-                elif kind in ("struct_reg", "struct_hidden"):
-                    _gp_count += 1
-                    if _gp_count > len(arg_regs):
-                        _stack_overflow_args.append((a, desc_idx))
-
-            # Ensure the stack is 16-byte aligned at the call instruction.
-            # Must be checked AFTER counting overflow args but BEFORE pushing them,
-            # so the padding is below the args (at higher stack address).
-            _overflow_push_count = len(_stack_overflow_args)
-            _total_stack_push = _overflow_push_count * 8
-            if (getattr(self, "_call_stack_adjust", 0) + _total_stack_push) % 16 != 0:
-                self._emit("  subq $8, %rsp")
-                self._call_stack_adjust = getattr(self, "_call_stack_adjust", 0) + 8
+                    _arg_descs.append((a, a_ty, "struct_stack", {"sz": sz, "classification": classification}))
+            else:
+                _arg_descs.append((a, a_ty, "gp", None))
+                _pre_gp += 1
+
+        # Push GP args that overflow beyond the 6 GP registers onto the stack.
+        # SSE (float/double) args do NOT consume GP register slots.
+        _gp_count = 0
+        _stack_overflow_args = []  # (arg_value, desc_idx) for GP args beyond 6
+        for desc_idx, (a, a_ty, kind, extra) in enumerate(_arg_descs):
+            if kind == "gp":
+                _gp_count += 1
+                if _gp_count > len(arg_regs):
+                    _stack_overflow_args.append((a, desc_idx))
+            elif kind in ("struct_reg", "struct_hidden"):
+                _gp_count += 1
+                if _gp_count > len(arg_regs):
+                    _stack_overflow_args.append((a, desc_idx))
+
+        # Ensure the stack is 16-byte aligned at the call instruction.
+        # Must be checked AFTER counting overflow args but BEFORE pushing them,
+        # so the padding is below the args (at higher stack address).
+        _overflow_push_count = len(_stack_overflow_args)
+        _total_stack_push = _overflow_push_count * 8
+        if (getattr(self, "_call_stack_adjust", 0) + _total_stack_push) % 16 != 0:
+            self._emit("  subq $8, %rsp")
+            self._call_stack_adjust = getattr(self, "_call_stack_adjust", 0) + 8
+            stack_pad += 8
+            pre_call_pad = True
+
+        if _stack_overflow_args:
+            for a, _ in reversed(_stack_overflow_args):
+                self._load_operand(a, "%rax")
+                self._emit("  pushq %rax")
                 stack_pad += 8
-                pre_call_pad = True
-
-            if _stack_overflow_args:
-                for a, _ in reversed(_stack_overflow_args):
-                    self._load_operand(a, "%rax")
-                    self._emit("  pushq %rax")
+            self._call_stack_adjust = getattr(self, "_call_stack_adjust", 0) + _overflow_push_count * 8
+
+        # Pass 1: allocate stack copies for hidden_ptr structs.
+        # We store the resulting pointer in a temp spill slot so that
+        # Pass 2 can load it into the correct GP register without
+        # clobbering other argument registers.
+        _hidden_ptr_slots = {}  # arg index -> spill offset
+        for desc_idx, (a, a_ty, kind, extra) in enumerate(_arg_descs):
+            if kind == "struct_hidden":
+                sz = extra["sz"]
+                off = self._ensure_local(a)
+                alloc_sz = ((sz + 7) // 8) * 8
+                self._emit(f"  subq ${alloc_sz}, %rsp")
+                stack_pad += alloc_sz
+                self._call_stack_adjust = getattr(self, "_call_stack_adjust", 0) + alloc_sz
+                # Copy struct data to the stack copy using movq loop
+                # (avoids clobbering rdi/rsi/rcx which are arg registers).
+                chunks = (sz + 7) // 8
+                for ci in range(chunks):
+                    self._emit(f"  movq -{off - ci * 8}(%rbp), %rax")
+                    self._emit(f"  movq %rax, {ci * 8}(%rsp)")
+                # Save the pointer to the copy in a temp slot.
+                tmp = self._new_spill_name()
+                tmp_off = self._ensure_local(tmp)
+                self._emit(f"  movq %rsp, %rax")
+                self._emit(f"  movq %rax, -{tmp_off}(%rbp)")
+                _hidden_ptr_slots[desc_idx] = tmp_off
+
+        # Also push struct_stack args and long_double args (register-exhausted structs) right-to-left.
+        for desc_idx in reversed(range(len(_arg_descs))):
+            a, a_ty, kind, extra = _arg_descs[desc_idx]
+            if kind == "long_double":
+                # SysV ABI: long double passed on stack (16 bytes)
+                off = self._ensure_local(a, size=16)
+                # Push high 8 bytes first, then low 8 bytes (right-to-left)
+                self._emit(f"  pushq -{off - 8}(%rbp)")
+                self._emit(f"  pushq -{off}(%rbp)")
+                stack_pad += 16
+                self._call_stack_adjust = getattr(self, "_call_stack_adjust", 0) + 16
+            elif kind == "struct_stack":
+                sz = extra["sz"]
+                off = self._ensure_local(a)
+                chunks = (sz + 7) // 8
+                for ci in reversed(range(chunks)):
+                    self._emit(f"  pushq -{off - ci * 8}(%rbp)")
                     stack_pad += 8
-                self._call_stack_adjust = getattr(self, "_call_stack_adjust", 0) + _overflow_push_count * 8
-
-            # Pass 1: allocate stack copies for hidden_ptr structs.
-            # We store the resulting pointer in a temp spill slot so that
-            # Pass 2 can load it into the correct GP register without
-            # clobbering other argument registers.
-            _hidden_ptr_slots = {}  # arg index -> spill offset
-            for desc_idx, (a, a_ty, kind, extra) in enumerate(_arg_descs):
-                if kind == "struct_hidden":
-                    sz = extra["sz"]
+                self._call_stack_adjust = getattr(self, "_call_stack_adjust", 0) + chunks * 8
+
+        # Pass 2: load arguments into registers.
+        # If there's a hidden return pointer, load it into %rdi first.
+        if _call_ret_is_memory and _ret_hidden_ptr_slot:
+            self._emit(f"  movq -{_ret_hidden_ptr_slot}(%rbp), %rdi")
+        for desc_idx, (a, a_ty, kind, extra) in enumerate(_arg_descs):
+            if kind == "float":
+                if xmm_idx < len(xmm_regs):
+                    s = "s" if a_ty == "float" else "d"
                     off = self._ensure_local(a)
-                    alloc_sz = ((sz + 7) // 8) * 8
-                    self._emit(f"  subq ${alloc_sz}, %rsp")
-                    stack_pad += alloc_sz
-                    self._call_stack_adjust = getattr(self, "_call_stack_adjust", 0) + alloc_sz
-                    # Copy struct data to the stack copy using movq loop
-                    # (avoids clobbering rdi/rsi/rcx which are arg registers).
-                    chunks = (sz + 7) // 8
-                    for ci in range(chunks):
-                        self._emit(f"  movq -{off - ci * 8}(%rbp), %rax")
-                        self._emit(f"  movq %rax, {ci * 8}(%rsp)")
-                    # Save the pointer to the copy in a temp slot.
-                    tmp = self._new_spill_name()
-                    tmp_off = self._ensure_local(tmp)
-                    self._emit(f"  movq %rsp, %rax")
-                    self._emit(f"  movq %rax, -{tmp_off}(%rbp)")
-                    _hidden_ptr_slots[desc_idx] = tmp_off
-
-            # Also push struct_stack args and long_double args (register-exhausted structs) right-to-left.
-            for desc_idx in reversed(range(len(_arg_descs))):
-                a, a_ty, kind, extra = _arg_descs[desc_idx]
-                if kind == "long_double":
-                    # SysV ABI: long double passed on stack (16 bytes)
-                    off = self._ensure_local(a, size=16)
-                    # Push high 8 bytes first, then low 8 bytes (right-to-left)
-                    self._emit(f"  pushq -{off - 8}(%rbp)")
-                    self._emit(f"  pushq -{off}(%rbp)")
-                    stack_pad += 16
-                    self._call_stack_adjust = getattr(self, "_call_stack_adjust", 0) + 16
-                elif kind == "struct_stack":
-                    sz = extra["sz"]
-                    off = self._ensure_local(a)
-                    chunks = (sz + 7) // 8
-                    for ci in reversed(range(chunks)):
-                        self._emit(f"  pushq -{off - ci * 8}(%rbp)")
-                        stack_pad += 8
-                    self._call_stack_adjust = getattr(self, "_call_stack_adjust", 0) + chunks * 8
-
-            # Pass 2: load arguments into registers.
-            # If there's a hidden return pointer, load it into %rdi first.
-            if _call_ret_is_memory and _ret_hidden_ptr_slot:
-                self._emit(f"  movq -{_ret_hidden_ptr_slot}(%rbp), %rdi")
-            for desc_idx, (a, a_ty, kind, extra) in enumerate(_arg_descs):
-                if kind == "float":
-                    if xmm_idx < len(xmm_regs):
-                        s = "s" if a_ty == "float" else "d"
-                        off = self._ensure_local(a)
-                        self._emit(f"  movs{s} -{off}(%rbp), {xmm_regs[xmm_idx]}")
+                    self._emit(f"  movs{s} -{off}(%rbp), {xmm_regs[xmm_idx]}")
+                    xmm_idx += 1
+            elif kind == "struct_reg":
+                classification = extra["classification"]
+                off = self._ensure_local(a)
+                for ci, cls in enumerate(classification):
+                    if cls == EightbyteClass.SSE:
+                        self._emit(f"  movq -{off - ci * 8}(%rbp), {xmm_regs[xmm_idx]}")
                         xmm_idx += 1
-                elif kind == "struct_reg":
-                    classification = extra["classification"]
-                    off = self._ensure_local(a)
-                    for ci, cls in enumerate(classification):
-                        if cls == EightbyteClass.SSE:
-                            self._emit(f"  movq -{off - ci * 8}(%rbp), {xmm_regs[xmm_idx]}")
-                            xmm_idx += 1
-                        else:
-                            self._emit(f"  movq -{off - ci * 8}(%rbp), {arg_regs[gp_idx]}")
-                            gp_idx += 1
-                elif kind == "struct_hidden":
-                    # Load the saved pointer from the temp slot.
-                    tmp_off = _hidden_ptr_slots[desc_idx]
-                    if gp_idx < len(arg_regs):
-                        self._emit(f"  movq -{tmp_off}(%rbp), {arg_regs[gp_idx]}")
-                        gp_idx += 1
-                elif kind == "struct_stack":
-                    pass  # already pushed in pass 1
-                elif kind == "long_double":
-                    pass  # already pushed on stack in pass 1
-                elif kind == "gp":
-                    if gp_idx < len(arg_regs):
-                        self._load_operand(a, "%rax")
-                        self._emit(f"  movq %rax, {arg_regs[gp_idx]}")
+                    else:
+                        self._emit(f"  movq -{off - ci * 8}(%rbp), {arg_regs[gp_idx]}")
                         gp_idx += 1
+            elif kind == "struct_hidden":
+                # Load the saved pointer from the temp slot.
+                tmp_off = _hidden_ptr_slots[desc_idx]
+                if gp_idx < len(arg_regs):
+                    self._emit(f"  movq -{tmp_off}(%rbp), {arg_regs[gp_idx]}")
+                    gp_idx += 1
+            elif kind == "struct_stack":
+                pass  # already pushed in pass 1
+            elif kind == "long_double":
+                pass  # already pushed on stack in pass 1
+            elif kind == "gp":
+                if gp_idx < len(arg_regs):
+                    self._load_operand(a, "%rax")
+                    self._emit(f"  movq %rax, {arg_regs[gp_idx]}")
+                    gp_idx += 1
 
-            # ABI fix: SysV `va_list` is an array-of-1 tag; when passed as an
-            # argument it decays to a pointer to that tag.
-            target_name = (ins.operand1 or "")
-            if target_name.startswith("@"):  # symbol
-                target_name = target_name[1:]
-
-            # SysV AMD64 ABI: for variadic calls, %al must contain the number
-            # of vector registers used to pass arguments. We don't pass any
-            # vector args yet, so clear %eax.
-            # This is required for calls like printf("%d\n", 42).
-            if isinstance(ins.operand2, str) and "..." in ins.operand2:
-                if xmm_idx > 0:
-                    self._emit(f"  movl ${xmm_idx}, %eax")
-                else:
-                    self._emit("  xorl %eax, %eax")
-
-            # IMPORTANT: for glibc v* functions that take a `va_list`, the caller
-            # should not clear %al unless the function is variadic. These v*
-            # entrypoints are not variadic.
-
-            # Final fixup: if calling a libc v* function and the 4th argument is
-            # a local va_list variable, ensure we pass the tag pointer it holds
-            # (not the address of the local slot).
-            if target_name in {"vsnprintf", "vprintf", "vfprintf", "vsprintf", "vasprintf", "vdprintf"}:
-                if ins.args and len(ins.args) >= 4:
-                    a3 = ins.args[3]
-                    if isinstance(a3, str) and a3.startswith("@"):
-                        # 4th arg is %rcx
-                        self._addr_of_symbol(a3, "%rax")
-                        self._emit("  movq %rax, %rcx")
-                        self._emit("  movq (%rcx), %rcx")
-
-            target = ins.operand1 or ""
-            if target.startswith("@"):  # symbol
-                # If it names a function symbol, do a direct call. This must
-                # work across translation units (extern prototypes).
-                sym = target[1:]
-                # If it's a local variable/temp, it's not a function symbol.
-                if self._is_local(target):
-                    # If semantics says this name is a function (e.g. an
-                    # extern prototype declared inside a function), emit a
-                    # direct call instead of indirect through an uninitialized
-                    # local slot.
-                    gty = getattr(self._sema_ctx, "global_types", {}).get(sym) if self._sema_ctx is not None else None
-                    if isinstance(gty, str) and gty.strip().startswith("function"):
-                        # Keep SysV varargs ABI happy for calls the IR marks
-                        # as variadic (operand2 contains "...").
-                        if isinstance(ins.operand2, str) and "..." in ins.operand2:
-                            # SysV x86-64: for variadic calls, %al must contain
-                            # the number of XMM registers used to pass float
-                            # args. We don't pass floats yet, so set 0.
-                            self._emit("  xorl %eax, %eax")
-                        self._emit(f"  call {sym}")
-                        self._store_result(ins.result, "%rax")
-                        return
-                    self._load_operand(target, "%rax")
-                    self._emit("  call *%rax")
+        # ABI fix: SysV `va_list` is an array-of-1 tag; when passed as an
+        # argument it decays to a pointer to that tag.
+        target_name = (ins.operand1 or "")
+        if target_name.startswith("@"):  # symbol
+            target_name = target_name[1:]
+
+        # SysV AMD64 ABI: for variadic calls, %al must contain the number
+        # of vector registers used to pass arguments. We don't pass any
+        # vector args yet, so clear %eax.
+        # This is required for calls like printf("%d\n", 42).
+        if isinstance(ins.operand2, str) and "..." in ins.operand2:
+            if xmm_idx > 0:
+                self._emit(f"  movl ${xmm_idx}, %eax")
+            else:
+                self._emit("  xorl %eax, %eax")
+
+        # IMPORTANT: for glibc v* functions that take a `va_list`, the caller
+        # should not clear %al unless the function is variadic. These v*
+        # entrypoints are not variadic.
+
+        # Final fixup: if calling a libc v* function and the 4th argument is
+        # a local va_list variable, ensure we pass the tag pointer it holds
+        # (not the address of the local slot).
+        if target_name in {"vsnprintf", "vprintf", "vfprintf", "vsprintf", "vasprintf", "vdprintf"}:
+            if ins.args and len(ins.args) >= 4:
+                a3 = ins.args[3]
+                if isinstance(a3, str) and a3.startswith("@"):
+                    # 4th arg is %rcx
+                    self._addr_of_symbol(a3, "%rax")
+                    self._emit("  movq %rax, %rcx")
+                    self._emit("  movq (%rcx), %rcx")
+
+        target = ins.operand1 or ""
+        if target.startswith("@"):  # symbol
+            # If it names a function symbol, do a direct call. This must
+            # work across translation units (extern prototypes).
+            sym = target[1:]
+            # If it's a local variable/temp, it's not a function symbol.
+            if self._is_local(target):
+                # If semantics says this name is a function (e.g. an
+                # extern prototype declared inside a function), emit a
+                # direct call instead of indirect through an uninitialized
+                # local slot.
+                gty = self._global_types.get(sym)
+                if isinstance(gty, str) and gty.strip().startswith("function"):
+                    # Keep SysV varargs ABI happy for calls the IR marks
+                    # as variadic (operand2 contains "...").
+                    if isinstance(ins.operand2, str) and "..." in ins.operand2:
+                        # SysV x86-64: for variadic calls, %al must contain
+                        # the number of XMM registers used to pass float
+                        # args. We don't pass floats yet, so set 0.
+                        self._emit("  xorl %eax, %eax")
+                    self._emit(f"  call {sym}")
                     self._store_result(ins.result, "%rax")
                     return
-                # Heuristic: if it's defined in this TU, it's definitely a function.
-                # Otherwise, if semantics says it's externally linked, also treat as function.
-                is_func = sym in getattr(self, "_functions", set())
-                if not is_func and self._sema_ctx is not None:
-                    # If semantics recorded it as a function, prefer a direct call.
-                    gty = getattr(self._sema_ctx, "global_types", {}).get(sym)
-                    if isinstance(gty, str) and gty.strip().startswith("function"):
-                        is_func = True
-                    else:
-                        # If it's not a known global variable, treat as a function symbol.
-                        # This allows extern prototypes across translation units.
-                        is_func = sym not in getattr(self._sema_ctx, "global_linkage", {})
-                # If we don't have semantic info, still treat unknown @symbols
-                # as functions by default. This avoids generating
-                # `movslq foo(%rip), %rax; call *%rax` for extern functions.
-                if not is_func and self._sema_ctx is None:
+                self._load_operand(target, "%rax")
+                self._emit("  call *%rax")
+                self._store_result(ins.result, "%rax")
+                return
+            # Heuristic: if it's defined in this TU, it's definitely a function.
+            # Otherwise, if semantics says it's externally linked, also treat as function.
+            is_func = sym in getattr(self, "_functions", set())
+            if not is_func and self._sema_ctx is not None:
+                # If semantics recorded it as a function, prefer a direct call.
+                gty = self._global_types.get(sym)
+                if isinstance(gty, str) and gty.strip().startswith("function"):
                     is_func = True
-                if is_func:
-                    self._emit(f"  call {sym}")
                 else:
-                    # Otherwise treat it as a function pointer variable.
-                    self._load_operand(target, "%rax")
-                    self._emit("  call *%rax")
+                    # If it's not a known global variable, treat as a function symbol.
+                    # This allows extern prototypes across translation units.
+                    is_func = sym not in getattr(self._sema_ctx, "global_linkage", {})
+            # If we don't have semantic info, still treat unknown @symbols
+            # as functions by default. This avoids generating
+            # `movslq foo(%rip), %rax; call *%rax` for extern functions.
+            if not is_func and self._sema_ctx is None:
+                is_func = True
+            if is_func:
+                self._emit(f"  call {sym}")
             else:
-                # Indirect call via function pointer stored in a local/temp.
-                if not target.startswith("%t") and not target.startswith("@"):
-                    # Parser/IR may pass a bare identifier for local variables.
-                    target = f"@{target}"
+                # Otherwise treat it as a function pointer variable.
                 self._load_operand(target, "%rax")
                 self._emit("  call *%rax")
-
-            if pre_call_pad:
-                self._emit("  addq $8, %rsp")
-                self._call_stack_adjust = max(0, getattr(self, "_call_stack_adjust", 0) - 8)
-
-            if stack_pad:
-                self._emit(f"  addq ${stack_pad}, %rsp")
-                self._call_stack_adjust = max(0, getattr(self, "_call_stack_adjust", 0) - stack_pad)
-            # long double return: SysV ABI returns via x87 st(0)
-            ret_ty = str(ins.operand2 or "")
-            _ret_is_ld = False
-            if "long double" in ret_ty and "function" in ret_ty:
-                _ret_is_ld = True
-            elif ins.result and isinstance(self._get_type_str(ins.result), str) and self._get_type_str(ins.result).strip() == "long double":
-                _ret_is_ld = True
-            if _ret_is_ld:
-                if ins.result:
-                    off_r = self._ensure_local(ins.result, size=16)
-                    self._emit(f"  fstpt -{off_r}(%rbp)")
-                    if self._sym_table and ins.result:
-                        self._register_type(ins.result, FloatType(kind=TypeKind.DOUBLE))
-                else:
-                    # Pop x87 stack if no result needed
-                    self._emit("  fstp %st(0)")
-            # Float/double return: result in xmm0
-            elif ("float" in ret_ty or "double" in ret_ty) and "function" in ret_ty and "long double" not in ret_ty:
-                fp = "float" if ret_ty.endswith("float") else "double"
-                s = "s" if fp == "float" else "d"
-                if ins.result:
-                    off_r = self._ensure_local(ins.result)
-                    self._emit(f"  movs{s} %xmm0, -{off_r}(%rbp)")
-                    if self._sym_table and ins.result:
-                        self._register_type(ins.result, FloatType(kind=TypeKind.FLOAT) if fp == "float" else FloatType(kind=TypeKind.DOUBLE))
+        else:
+            # Indirect call via function pointer stored in a local/temp.
+            if not target.startswith("%t") and not target.startswith("@"):
+                # Parser/IR may pass a bare identifier for local variables.
+                target = f"@{target}"
+            self._load_operand(target, "%rax")
+            self._emit("  call *%rax")
+
+        if pre_call_pad:
+            self._emit("  addq $8, %rsp")
+            self._call_stack_adjust = max(0, getattr(self, "_call_stack_adjust", 0) - 8)
+
+        if stack_pad:
+            self._emit(f"  addq ${stack_pad}, %rsp")
+            self._call_stack_adjust = max(0, getattr(self, "_call_stack_adjust", 0) - stack_pad)
+        # long double return: SysV ABI returns via x87 st(0)
+        ret_ty = str(ins.operand2 or "")
+        _ret_is_ld = False
+        if "long double" in ret_ty and "function" in ret_ty:
+            _ret_is_ld = True
+        elif ins.result and isinstance(self._get_type_str(ins.result), str) and self._get_type_str(ins.result).strip() == "long double":
+            _ret_is_ld = True
+        if _ret_is_ld:
+            if ins.result:
+                off_r = self._ensure_local(ins.result, size=16)
+                self._emit(f"  fstpt -{off_r}(%rbp)")
+                if self._sym_table and ins.result:
+                    self._register_type(ins.result, FloatType(kind=TypeKind.DOUBLE))
             else:
-                # Struct/union return: use StructClassifier to determine registers.
-                ret_ty_s = ret_ty.replace("function ", "").strip() if ret_ty.startswith("function ") else ""
-                if ret_ty_s.startswith("struct ") or ret_ty_s.startswith("union "):
-                    sz = self._type_size_bytes(ret_ty_s)
-                    layout = getattr(self._sema_ctx, "layouts", {}).get(ret_ty_s) if self._sema_ctx else None
-                    ret_classification = classify_struct(ret_ty_s, layout) if layout else [EightbyteClass.INTEGER]
-                    ret_pass_mode = get_struct_pass_mode(ret_classification)
-
-                    if ret_pass_mode == "hidden_ptr":
-                        # MEMORY class: the hidden pointer was passed via rdi
-                        # before the call.  The callee returns the pointer in
-                        # rax.  Copy the data from the pointed-to area into
-                        # the local result slot.
-                        if ins.result:
-                            alloc_sz = ((sz + 7) // 8) * 8
-                            alloc_sz = max(alloc_sz, 8)
-                            off_r = self._ensure_local(ins.result, size=alloc_sz)
-                            # rax holds the pointer to the returned struct data.
-                            self._emit(f"  movq %rax, %rsi")
-                            self._emit(f"  leaq -{off_r}(%rbp), %rdi")
-                            self._emit(f"  movq ${sz}, %rcx")
-                            self._emit("  rep movsb")
-                            if self._sym_table and ins.result:
-                                _rct = _str_to_ctype(ret_ty_s)
-                                if _rct is not None:
-                                    self._register_type(ins.result, _rct)
-                    else:
-                        # Register return: extract from rax/rdx and/or xmm0/xmm1.
-                        if ins.result:
-                            alloc_sz = ((sz + 7) // 8) * 8
-                            alloc_sz = max(alloc_sz, 8)
-                            off_r = self._ensure_local(ins.result, size=alloc_sz)
-                            ret_gp_regs = ["%rax", "%rdx"]
-                            ret_xmm_regs = ["%xmm0", "%xmm1"]
-                            gp_ri = 0
-                            xmm_ri = 0
-                            for ci, cls in enumerate(ret_classification):
-                                if cls == EightbyteClass.SSE:
-                                    self._emit(f"  movq {ret_xmm_regs[xmm_ri]}, -{off_r - ci * 8}(%rbp)")
-                                    xmm_ri += 1
-                                else:
-                                    self._emit(f"  movq {ret_gp_regs[gp_ri]}, -{off_r - ci * 8}(%rbp)")
-                                    gp_ri += 1
-                            if self._sym_table and ins.result:
-                                _rct = _str_to_ctype(ret_ty_s)
-                                if _rct is not None:
-                                    self._register_type(ins.result, _rct)
+                # Pop x87 stack if no result needed
+                self._emit("  fstp %st(0)")
+        # Float/double return: result in xmm0
+        elif ("float" in ret_ty or "double" in ret_ty) and "function" in ret_ty and "long double" not in ret_ty:
+            fp = "float" if ret_ty.endswith("float") else "double"
+            s = "s" if fp == "float" else "d"
+            if ins.result:
+                off_r = self._ensure_local(ins.result)
+                self._emit(f"  movs{s} %xmm0, -{off_r}(%rbp)")
+                if self._sym_table and ins.result:
+                    self._register_type(ins.result, FloatType(kind=TypeKind.FLOAT) if fp == "float" else FloatType(kind=TypeKind.DOUBLE))
+        else:
+            # Struct/union return: use StructClassifier to determine registers.
+            ret_ty_s = ret_ty.replace("function ", "").strip() if ret_ty.startswith("function ") else ""
+            if ret_ty_s.startswith("struct ") or ret_ty_s.startswith("union "):
+                sz = self._type_size_bytes(ret_ty_s)
+                layout = self._layouts.get(ret_ty_s)
+                ret_classification = classify_struct(ret_ty_s, layout) if layout else [EightbyteClass.INTEGER]
+                ret_pass_mode = get_struct_pass_mode(ret_classification)
+
+                if ret_pass_mode == "hidden_ptr":
+                    # MEMORY class: the hidden pointer was passed via rdi
+                    # before the call.  The callee returns the pointer in
+                    # rax.  Copy the data from the pointed-to area into
+                    # the local result slot.
+                    if ins.result:
+                        alloc_sz = ((sz + 7) // 8) * 8
+                        alloc_sz = max(alloc_sz, 8)
+                        off_r = self._ensure_local(ins.result, size=alloc_sz)
+                        # rax holds the pointer to the returned struct data.
+                        self._emit(f"  movq %rax, %rsi")
+                        self._emit(f"  leaq -{off_r}(%rbp), %rdi")
+                        self._emit(f"  movq ${sz}, %rcx")
+                        self._emit("  rep movsb")
                         if self._sym_table and ins.result:
                             _rct = _str_to_ctype(ret_ty_s)
                             if _rct is not None:
                                 self._register_type(ins.result, _rct)
                 else:
-                    self._store_result(ins.result, "%rax")
-            return
+                    # Register return: extract from rax/rdx and/or xmm0/xmm1.
+                    if ins.result:
+                        alloc_sz = ((sz + 7) // 8) * 8
+                        alloc_sz = max(alloc_sz, 8)
+                        off_r = self._ensure_local(ins.result, size=alloc_sz)
+                        ret_gp_regs = ["%rax", "%rdx"]
+                        ret_xmm_regs = ["%xmm0", "%xmm1"]
+                        gp_ri = 0
+                        xmm_ri = 0
+                        for ci, cls in enumerate(ret_classification):
+                            if cls == EightbyteClass.SSE:
+                                self._emit(f"  movq {ret_xmm_regs[xmm_ri]}, -{off_r - ci * 8}(%rbp)")
+                                xmm_ri += 1
+                            else:
+                                self._emit(f"  movq {ret_gp_regs[gp_ri]}, -{off_r - ci * 8}(%rbp)")
+                                gp_ri += 1
+                        if self._sym_table and ins.result:
+                            _rct = _str_to_ctype(ret_ty_s)
+                            if _rct is not None:
+                                self._register_type(ins.result, _rct)
+                    if self._sym_table and ins.result:
+                        _rct = _str_to_ctype(ret_ty_s)
+                        if _rct is not None:
+                            self._register_type(ins.result, _rct)
+            else:
+                self._store_result(ins.result, "%rax")
 
-        if op == "load_index":
-            # Array/pointer indexing: result = base[index]
-            base = ins.operand1 or ""
-            idx = ins.operand2
-            elem_sz = 4
-
-            # CType-based path: use symbol table to determine element size
-            ctype_elem_sz = None
-            base_ct = self._get_type(base) if isinstance(base, str) else None
-            if base_ct is not None:
-                if self._ctype_is_pointer(base_ct):
-                    pointee = self._ctype_deref(base_ct)
-                    if pointee is not None:
-                        ctype_elem_sz = self._ctype_sizeof(pointee) if self._ctype_is_struct_or_union(pointee) else type_sizeof(pointee)
-                        if ctype_elem_sz == 0:
-                            ctype_elem_sz = None
-                elif isinstance(base_ct, ArrayType) and base_ct.element is not None:
-                    elem = base_ct.element
-                    ctype_elem_sz = self._ctype_sizeof(elem) if self._ctype_is_struct_or_union(elem) else type_sizeof(elem)
+    def _ins_load_index(self, ins: IRInstruction) -> None:
+        # Array/pointer indexing: result = base[index]
+        base = ins.operand1 or ""
+        idx = ins.operand2
+        elem_sz = 4
+
+        # CType-based path: use symbol table to determine element size
+        ctype_elem_sz = None
+        base_ct = self._get_type(base) if isinstance(base, str) else None
+        if base_ct is not None:
+            if self._ctype_is_pointer(base_ct):
+                pointee = self._ctype_deref(base_ct)
+                if pointee is not None:
+                    ctype_elem_sz = self._ctype_sizeof(pointee) if self._ctype_is_struct_or_union(pointee) else type_sizeof(pointee)
                     if ctype_elem_sz == 0:
                         ctype_elem_sz = None
-
-            # Also check result_type for element size hint (e.g. from IR gen)
-            ctype_result_elem_sz = None
-            if ins.result_type is not None and not self._ctype_is_pointer(ins.result_type):
-                if self._ctype_is_struct_or_union(ins.result_type):
-                    ctype_result_elem_sz = self._ctype_sizeof(ins.result_type)
-                else:
-                    sz_r = type_sizeof(ins.result_type)
-                    if sz_r > 0:
-                        ctype_result_elem_sz = sz_r
-
-            base_ty = None
+            elif isinstance(base_ct, ArrayType) and base_ct.element is not None:
+                elem = base_ct.element
+                ctype_elem_sz = self._ctype_sizeof(elem) if self._ctype_is_struct_or_union(elem) else type_sizeof(elem)
+                if ctype_elem_sz == 0:
+                    ctype_elem_sz = None
+
+        # Also check result_type for element size hint (e.g. from IR gen)
+        ctype_result_elem_sz = None
+        if ins.result_type is not None and not self._ctype_is_pointer(ins.result_type):
+            if self._ctype_is_struct_or_union(ins.result_type):
+                ctype_result_elem_sz = self._ctype_sizeof(ins.result_type)
+            else:
+                sz_r = type_sizeof(ins.result_type)
+                if sz_r > 0:
+                    ctype_result_elem_sz = sz_r
+
+        base_ty = None
+        step_override = None
+        try:
+            # Prefer instruction-scoped override (IR meta) when present.
+            if isinstance(ins.meta, dict) and "ptr_step_bytes" in ins.meta:
+                step_override = int(ins.meta["ptr_step_bytes"])
+            else:
+                step_override = self._ptr_step_bytes.get(str(base))
+        except Exception:
             step_override = None
-            try:
-                # Prefer instruction-scoped override (IR meta) when present.
-                if isinstance(ins.meta, dict) and "ptr_step_bytes" in ins.meta:
-                    step_override = int(ins.meta["ptr_step_bytes"])
-                else:
-                    step_override = self._ptr_step_bytes.get(str(base))
-            except Exception:
-                step_override = None
-            if isinstance(base, str):
-                base_ty = self._get_type_str(base) or None
-                if (base_ty is None or base_ty == "") and base.startswith("@"):
-                    sym = base[1:]
-                    base_ty = getattr(self._sema_ctx, "global_types", {}).get(sym) if self._sema_ctx is not None else None
-
-            # If IR annotated the result temp with a scalar type (e.g. "char"),
-            # prefer that as the element type for width decisions. This is
-            # important for multi-dimensional array indexing where the base can
-            # be a row-object temp.
-            try:
-                if ins.result:
-                    rty = self._get_type_str(str(ins.result))
-                    if isinstance(rty, str) and rty and ("*" not in rty) and not rty.strip().startswith("array("):
-                        elem_sz = self._type_size_bytes(rty.strip())
-            except Exception:
+        if isinstance(base, str):
+            base_ty = self._get_type_str(base) or None
+            if (base_ty is None or base_ty == "") and base.startswith("@"):
+                sym = base[1:]
+                base_ty = self._global_types.get(sym)
+
+        # If IR annotated the result temp with a scalar type (e.g. "char"),
+        # prefer that as the element type for width decisions. This is
+        # important for multi-dimensional array indexing where the base can
+        # be a row-object temp.
+        try:
+            if ins.result:
+                rty = self._get_type_str(str(ins.result))
+                if isinstance(rty, str) and rty and ("*" not in rty) and not rty.strip().startswith("array("):
+                    elem_sz = self._type_size_bytes(rty.strip())
+        except Exception:
+            pass
+
+        # Prefer scalar element type hint from IR on the *result temp*.
+        # This must override any base-derived element size (including row
+        # objects in multi-dimensional arrays).
+        try:
+            if ins.result:
+                rty = self._get_type_str(str(ins.result))
+                if isinstance(rty, str) and rty.strip() and ("*" not in rty) and not rty.strip().startswith("array("):
+                    elem_sz = self._type_size_bytes(rty.strip())
+        except Exception:
+            pass
+
+        if isinstance(base_ty, str) and base_ty.strip().startswith("array("):
+            # array(T,$N)
+            base_part = _parse_array_enc(base_ty)[0]
+            # Only compute elem_sz from base when IR didn't provide a more
+            # specific scalar result type.
+            if elem_sz == 4:
+                elem_sz = self._type_size_bytes(base_part)
+        elif isinstance(base_ty, str) and "*" in base_ty:
+            elem_sz = self._pointee_size_bytes(base_ty)
+        elif isinstance(base_ty, str):
+            # Global fixed-size arrays are tracked as their element type.
+            elem_sz = self._type_size_bytes(base_ty.strip())
+        elif isinstance(base, str) and base.startswith("%t"):
+            # For temps used as addresses, consult CType to infer pointee size.
+            tyt = self._get_type_str(base) if base else None
+            if isinstance(tyt, str) and "*" in tyt:
+                elem_sz = self._pointee_size_bytes(tyt)
+            else:
+                # Fall back: if the base temp comes from an address-of array,
+                # its pointee is typically an int-sized element .
+                # Keep elem_sz as-is.
                 pass
 
-            # Prefer scalar element type hint from IR on the *result temp*.
-            # This must override any base-derived element size (including row
-            # objects in multi-dimensional arrays).
+        # CType-based element size: override string-based result when
+        # CType info is available. Result type hint takes priority over
+        # base-derived size (matches the string-based result temp hint).
+        if ctype_result_elem_sz is not None:
+            elem_sz = ctype_result_elem_sz
+        elif ctype_elem_sz is not None:
+            elem_sz = ctype_elem_sz
+
+        # A temp base is treated as a pointer/address value only when it is
+        # pointer-typed (or explicitly tagged as ptr). Temps that represent
+        # array objects (e.g. row objects in multi-dimensional indexing)
+        # must be addressed, not loaded.
+        is_ptr_temp = False
+        if isinstance(base, str) and base.startswith("%t"):
+            # CType-based: check if base is a pointer type
+            if base_ct is not None and self._ctype_is_pointer(base_ct):
+                is_ptr_temp = True
+            elif isinstance(base_ty, str) and ("*" in base_ty or base_ty.strip() == "ptr"):
+                is_ptr_temp = True
+        is_ptr_base = (isinstance(base_ty, str) and "*" in base_ty) or is_ptr_temp
+        # Also check CType for pointer base (covers cases where symbol table
+        # doesn't have the info but symbol table does)
+        if not is_ptr_base and base_ct is not None and self._ctype_is_pointer(base_ct):
+            is_ptr_base = True
+        # compute address: base + idx*elem_sz
+        # - if base is a pointer value, load the pointer value
+        # - else treat it as an array object and take its address
+        # Multi-dimensional arrays: when indexing a row-pointer, scale by
+        # the row size (bytes), not by sizeof(element).
+        if isinstance(step_override, int) and step_override > 0:
+            scale = int(step_override)
+        else:
+            scale = elem_sz
+        slot = None if is_ptr_base else self._direct_base(base)
+        k = _imm_int(idx)
+        if slot is not None and k is not None:
+            # constant index into a stack array: address it directly
+            mem = f"{k * scale - slot}(%rbp)"
+        else:
+            if is_ptr_base:
+                self._load_operand(base, "%rax")
+            else:
+                # base is an array object or a raw address temp
+                self._addr_of_symbol(base, "%rax")
+            self._load_operand(idx, "%rcx")
+            mem = self._index_operand(scale)
+        # load with width based on element size
+        if elem_sz == 1:
+            # char loads: choose sign/zero extension based on pointee type.
+            unsigned_char = False
+            # CType-based: check pointee for unsigned char
+            if base_ct is not None and self._ctype_is_pointer(base_ct):
+                pointee = self._ctype_deref(base_ct)
+                if pointee is not None:
+                    unsigned_char = self._ctype_is_unsigned_char(pointee)
+            # String-based fallback
+            if not unsigned_char and isinstance(base_ty, str) and "unsigned" in base_ty and "char" in base_ty:
+                unsigned_char = True
+            if unsigned_char:
+                self._emit(f"  movzbl {mem}, %eax")
+                self._emit("  movl %eax, %eax")
+            else:
+                self._emit(f"  movsbl {mem}, %eax")
+                self._emit("  movslq %eax, %rax")
+        elif elem_sz == 2:
+            self._emit(f"  movswq {mem}, %rax")
+        elif elem_sz == 4:
+            self._emit(f"  movslq {mem}, %rax")
+        else:
+            self._emit(f"  movq {mem}, %rax")
+        self._store_result(ins.result, "%rax")
+
+    def _ins_store_member(self, ins: IRInstruction) -> None:
+        base = ins.operand1 or ""
+        member = ins.operand2 or ""
+        val = ins.result
+        _sm_base_is_ptr = self._is_pointer_type_op(base) if isinstance(base, str) else False
+        slot = None
+        if isinstance(base, str) and base.startswith("%t"):
+            self._load_operand(base, "%rax")
+        elif _sm_base_is_ptr:
+            self._load_operand(base, "%rax")
+        else:
+            slot = self._direct_base(base)
+            if slot is None:
+                self._addr_of_symbol(base, "%rax")
+        off, sz = self._resolve_member(base, member)
+        bf = self._resolve_bitfield(base, member)
+        # CType-based path: use member_ctype from meta to determine copy size
+        member_ct = (ins.meta or {}).get("member_ctype") if isinstance(ins.meta, dict) else None
+        if member_ct is not None and bf is None:
+            sz = self._ctype_sizeof(member_ct)
+
+        # Float/double member store: convert value via SSE and store.
+        is_float_mem = (member_ct is not None and member_ct.kind == TypeKind.FLOAT)
+        is_double_mem = (member_ct is not None and member_ct.kind == TypeKind.DOUBLE)
+        if not is_float_mem and not is_double_mem and bf is None:
+            # String-based fallback for member type detection
             try:
-                if ins.result:
-                    rty = self._get_type_str(str(ins.result))
-                    if isinstance(rty, str) and rty.strip() and ("*" not in rty) and not rty.strip().startswith("array("):
-                        elem_sz = self._type_size_bytes(rty.strip())
+                _mt = self._resolve_member_type(base, member)
+                _mts = str(_mt).strip().lower() if _mt else ""
+                if _mts == "float":
+                    is_float_mem = True
+                elif _mts == "double":
+                    is_double_mem = True
             except Exception:
                 pass
 
-            if isinstance(base_ty, str) and base_ty.strip().startswith("array("):
-                # array(T,$N)
-                inner = base_ty.strip()[len("array(") :]
-                if inner.endswith(")"):
-                    inner = inner[:-1]
-                base_part = inner.split(",", 1)[0].strip()
-                # Only compute elem_sz from base when IR didn't provide a more
-                # specific scalar result type.
-                if elem_sz == 4:
-                    elem_sz = self._type_size_bytes(base_part)
-            elif isinstance(base_ty, str) and "*" in base_ty:
-                elem_sz = self._pointee_size_bytes(base_ty)
-            elif isinstance(base_ty, str):
-                # Global fixed-size arrays are tracked as their element type.
-                elem_sz = self._type_size_bytes(base_ty.strip())
-            elif isinstance(base, str) and base.startswith("%t"):
-                # For temps used as addresses, consult CType to infer pointee size.
-                tyt = self._get_type_str(base) if base else None
-                if isinstance(tyt, str) and "*" in tyt:
-                    elem_sz = self._pointee_size_bytes(tyt)
+        # Scalar and float stores address the member directly (stack slot or
+        # off(%rax)); the bit-field and memcpy paths want its address in %rax.
+        if slot is not None:
+            mem = f"{off - slot}(%rbp)"
+            if bf is not None or sz > 8:
+                self._emit(f"  leaq {mem}, %rax")
+                mem = "(%rax)"
+        elif off and (bf is not None or sz > 8):
+            self._emit(f"  addq ${off}, %rax")
+            mem = "(%rax)"
+        else:
+            mem = f"{off}(%rax)" if off else "(%rax)"
+        # Bit-field write: read-modify-write
+        if bf is not None:
+            bit_off, bit_w = bf
+            mask = (1 << bit_w) - 1
+            self._emit("  movq %rax, %rdx")  # save address
+            self._load_operand(val, "%rcx")
+            self._emit(f"  andl ${mask}, %ecx")  # mask new value
+            if bit_off > 0:
+                self._emit(f"  shll ${bit_off}, %ecx")  # shift to position
+            clear_mask = ~(mask << bit_off) & 0xFFFFFFFF
+            self._emit("  movl (%rdx), %eax")  # load current word
+            self._emit(f"  andl ${clear_mask}, %eax")  # clear bits
+            self._emit("  orl %ecx, %eax")  # set new bits
+            self._emit("  movl %eax, (%rdx)")  # store back
+            return
+        if is_float_mem or is_double_mem:
+            self._emit("  movq %rax, %rdx")  # save dest address
+            dmem = mem.replace("(%rax)", "(%rdx)")
+            val_ct = self._get_type(val) if isinstance(val, str) else None
+            val_ty = ""
+            if val_ct is not None and val_ct.kind == TypeKind.FLOAT:
+                val_ty = "float"
+            elif val_ct is not None and val_ct.kind == TypeKind.DOUBLE:
+                val_ty = "double"
+            val_off = self._ensure_local(val) if isinstance(val, str) else 0
+            if is_float_mem:
+                if val_ty == "float":
+                    self._emit(f"  movss -{val_off}(%rbp), %xmm0")
+                elif val_ty == "double":
+                    self._emit(f"  movsd -{val_off}(%rbp), %xmm0")
+                    self._emit("  cvtsd2ss %xmm0, %xmm0")
                 else:
-                    # Fall back: if the base temp comes from an address-of array,
-                    # its pointee is typically an int-sized element .
-                    # Keep elem_sz as-is.
-                    pass
-
-            # CType-based element size: override string-based result when
-            # CType info is available. Result type hint takes priority over
-            # base-derived size (matches the string-based result temp hint).
-            if ctype_result_elem_sz is not None:
-                elem_sz = ctype_result_elem_sz
-            elif ctype_elem_sz is not None:
-                elem_sz = ctype_elem_sz
-
-            # A temp base is treated as a pointer/address value only when it is
-            # pointer-typed (or explicitly tagged as ptr). Temps that represent
-            # array objects (e.g. row objects in multi-dimensional indexing)
-            # must be addressed, not loaded.
-            is_ptr_temp = False
-            if isinstance(base, str) and base.startswith("%t"):
-                # CType-based: check if base is a pointer type
-                if base_ct is not None and self._ctype_is_pointer(base_ct):
-                    is_ptr_temp = True
-                elif isinstance(base_ty, str) and ("*" in base_ty or base_ty.strip() == "ptr"):
-                    is_ptr_temp = True
-            is_ptr_base = (isinstance(base_ty, str) and "*" in base_ty) or is_ptr_temp
-            # Also check CType for pointer base (covers cases where symbol table
-            # doesn't have the info but symbol table does)
-            if not is_ptr_base and base_ct is not None and self._ctype_is_pointer(base_ct):
-                is_ptr_base = True
-            # compute address: base + idx*elem_sz
-            # - if base is a pointer value, load the pointer value
-            # - else treat it as an array object and take its address
-            if is_ptr_base:
-                self._load_operand(base, "%rax")
+                    # Source is integer; convert int -> float.
+                    self._load_operand(val, "%rax")
+                    self._emit("  cvtsi2ssq %rax, %xmm0")
+                self._emit(f"  movss %xmm0, {dmem}")
             else:
-                # base is an array object or a raw address temp
-                self._addr_of_symbol(base, "%rax")
-            self._load_operand(idx, "%rcx")
-            # Multi-dimensional arrays: when indexing a row-pointer, scale by
-            # the row size (bytes), not by sizeof(element).
-            if isinstance(step_override, int) and step_override > 0:
-                self._emit(f"  imulq ${int(step_override)}, %rcx")
-            elif elem_sz != 1:
-                self._emit(f"  imulq ${elem_sz}, %rcx")
-            self._emit("  addq %rcx, %rax")
-            # load with width based on element size
-            if elem_sz == 1:
-                # char loads: choose sign/zero extension based on pointee type.
-                unsigned_char = False
-                # CType-based: check pointee for unsigned char
-                if base_ct is not None and self._ctype_is_pointer(base_ct):
-                    pointee = self._ctype_deref(base_ct)
-                    if pointee is not None:
-                        unsigned_char = self._ctype_is_unsigned_char(pointee)
-                # String-based fallback
-                if not unsigned_char and isinstance(base_ty, str) and "unsigned" in base_ty and "char" in base_ty:
-                    unsigned_char = True
-                if unsigned_char:
-                    self._emit("  movzbl (%rax), %eax")
-                    self._emit("  movl %eax, %eax")
+                # double member
+                if val_ty == "double":
+                    self._emit(f"  movsd -{val_off}(%rbp), %xmm0")
+                elif val_ty == "float":
+                    self._emit(f"  movss -{val_off}(%rbp), %xmm0")
+                    self._emit("  cvtss2sd %xmm0, %xmm0")
                 else:
-                    self._emit("  movsbl (%rax), %eax")
-                    self._emit("  movslq %eax, %rax")
-            elif elem_sz == 2:
-                self._emit("  movswq (%rax), %rax")
-            elif elem_sz == 4:
-                self._emit("  movslq (%rax), %rax")
-            else:
-                self._emit("  movq (%rax), %rax")
-            self._store_result(ins.result, "%rax")
+                    # Source is integer; convert int -> double.
+                    self._load_operand(val, "%rax")
+                    self._emit("  cvtsi2sdq %rax, %xmm0")
+                self._emit(f"  movsd %xmm0, {dmem}")
             return
 
-        if op == "load_member":
-            # treat operand1 as addressable base (stack local), operand2 as member name.
-            base = ins.operand1 or ""
-            member = ins.operand2 or ""
-            # Compute base address.
-            # - locals/globals: take address of the symbol
-            # - temps holding addresses (e.g. from addr_index/addr_of_member): load pointer value
-            # For load_member we want the *pointee* type when `base` is a pointer.
-            # CType-based: check if base is a pointer type
-            _lm2_base_ct = self._get_type(base) if isinstance(base, str) else None
-            _lm2_is_ptr = _lm2_base_ct is not None and self._ctype_is_pointer(_lm2_base_ct)
-            # For temps, decide whether it holds an address (pointer value) or a scalar.
-            # - If we know it is pointer-typed, treat as pointer value.
-            # - Otherwise it's a scalar temp stored in a stack slot; use its address as base.
-            # IMPORTANT: for non-temp locals like "@s" (a struct object), ALWAYS take
-            # the address of the object. Do not treat it as a pointer even if the type
-            # string contains '*' somewhere (e.g. "struct X*" for pointer vars).
-            if isinstance(base, str) and base.startswith("%t"):
-                # Temps may hold either a pointer value or a scalar in a spill slot.
-                if _lm2_is_ptr:
-                    self._load_operand(base, "%rax")
+        # Struct/union member: block copy via memcpy.
+        if sz > 8:
+            self._emit("  movq %rax, %rdi")  # dest = &base.member
+            self._load_operand(val, "%rsi")   # src = value (address of source struct)
+            self._emit(f"  movq ${sz}, %rdx")
+            self._emit("  call memcpy")
+            return
+        self._load_operand(val, "%rcx")
+        w = sz if sz in _MOV_BY_SIZE else 8
+        self._emit(f"  {_MOV_BY_SIZE[w]} {_RCX_BY_SIZE[w]}, {mem}")
+
+    def _ins_store_member_ptr(self, ins: IRInstruction) -> None:
+        base = ins.operand1 or ""
+        member = ins.operand2 or ""
+        val = ins.result
+        # Only register struct type from meta if not already known
+        # (IR gen types via activate_function are more precise).
+        if isinstance(ins.meta, dict) and "struct_type" in ins.meta:
+            if self._sym_table and base and self._get_base_struct_ctype(base) is None:
+                _bct = _str_to_ctype(ins.meta['struct_type'])
+                if _bct is not None:
+                    self._register_type(base, PointerType(kind=TypeKind.POINTER, pointee=_bct))
                 else:
-                    self._addr_of_symbol(base, "%rax")
-            else:
-                # Non-temp: treat as pointer value only if the variable is pointer-typed.
-                if _lm2_is_ptr:
-                    self._load_operand(base, "%rax")
+                    self._register_type(base, PointerType(kind=TypeKind.POINTER, pointee=CType(kind=TypeKind.VOID)))
+        self._load_operand(base, "%rax")
+        off, sz = self._resolve_member(base, member)
+        # CType-based path: use member_ctype from meta to determine copy size
+        member_ct = (ins.meta or {}).get("member_ctype") if isinstance(ins.meta, dict) else None
+        if member_ct is not None:
+            sz = self._ctype_sizeof(member_ct)
+
+        # Float/double member store: use SSE instructions.
+        is_float_mem = (member_ct is not None and member_ct.kind == TypeKind.FLOAT)
+        is_double_mem = (member_ct is not None and member_ct.kind == TypeKind.DOUBLE)
+        if not is_float_mem and not is_double_mem:
+            try:
+                _mt = self._resolve_member_type(base, member)
+                _mts = str(_mt).strip().lower() if _mt else ""
+                if _mts == "float":
+                    is_float_mem = True
+                elif _mts == "double":
+                    is_double_mem = True
+            except Exception:
+                pass
+        # Scalar stores address the member as off(%rax); the memcpy path
+        # wants its address in %rax.
+        mem = f"{off}(%rax)" if off else "(%rax)"
+        if off and sz > 8:
+            self._emit(f"  addq ${off}, %rax")
+        if is_float_mem or is_double_mem:
+            self._emit("  movq %rax, %rdx")  # save dest address
+            dmem = mem.replace("(%rax)", "(%rdx)")
+            val_ct_ptr = self._get_type(val) if isinstance(val, str) else None
+            val_ty = ""
+            if val_ct_ptr is not None and val_ct_ptr.kind == TypeKind.FLOAT:
+                val_ty = "float"
+            elif val_ct_ptr is not None and val_ct_ptr.kind == TypeKind.DOUBLE:
+                val_ty = "double"
+            val_off = self._ensure_local(val) if isinstance(val, str) else 0
+            if is_float_mem:
+                if val_ty == "float":
+                    self._emit(f"  movss -{val_off}(%rbp), %xmm0")
+                elif val_ty == "double":
+                    self._emit(f"  movsd -{val_off}(%rbp), %xmm0")
+                    self._emit("  cvtsd2ss %xmm0, %xmm0")
                 else:
-                    self._addr_of_symbol(base, "%rax")
-            off, sz = self._resolve_member(base, member)
-            if off:
-                self._emit(f"  addq ${off}, %rax")
-
-            # CType-based path: use result_type to determine member type/size
-            rt = getattr(ins, "result_type", None)
-
-            # If the member itself is a struct/union, `load_member` should yield
-            # its address (so subsequent `.x` accesses don't interpret the first
-            # bytes of the subobject as a pointer).
-            is_struct_member = False
-            if rt is not None and self._ctype_is_struct_or_union(rt):
-                is_struct_member = True
-            else:
-                mem_ty = self._resolve_member_type(base, member)
-                # Fallback: for locals, semantic typing might not be available.
-                # If IR recorded the member access result as a struct/union type,
-                # treat it as an address.
-                if mem_ty is None:
-                    try:
-                        rty = self._get_type_str(ins.result or "") if ins.result else None
-                    except Exception:
-                        rty = None
-                    if isinstance(rty, str) and (rty.strip().startswith("struct ") or rty.strip().startswith("union ")):
-                        mem_ty = rty.strip()
-                if mem_ty is not None:
-                    mem_ty_s = str(mem_ty).strip()
-                    if mem_ty_s.startswith("struct ") or mem_ty_s.startswith("union "):
-                        is_struct_member = True
-
-            if is_struct_member:
-                if ins.result and isinstance(ins.result, str) and ins.result.startswith("%t"):
-                    if rt is not None:
-                        tag = self._ctype_struct_tag(rt)
-                        if tag:
-                            if self._sym_table and ins.result:
-                                _bct = _str_to_ctype(tag)
-                                if _bct is not None:
-                                    self._register_type(ins.result, PointerType(kind=TypeKind.POINTER, pointee=_bct))
-                                else:
-                                    self._register_type(ins.result, PointerType(kind=TypeKind.POINTER, pointee=CType(kind=TypeKind.VOID)))
-                    else:
-                        mem_ty_s = str(mem_ty).strip() if mem_ty is not None else ""
-                        if mem_ty_s:
-                            if self._sym_table and ins.result:
-                                _bct = _str_to_ctype(mem_ty_s)
-                                if _bct is not None:
-                                    self._register_type(ins.result, PointerType(kind=TypeKind.POINTER, pointee=_bct))
-                                else:
-                                    self._register_type(ins.result, PointerType(kind=TypeKind.POINTER, pointee=CType(kind=TypeKind.VOID)))
-                self._store_result(ins.result, "%rax")
-                return
-
-            # Determine load width from CType or string fallback
-            is_float_member = False
-            is_double_member = False
-            if rt is not None:
-                sz = self._ctype_sizeof(rt)
-                is_unsigned_char = self._ctype_is_unsigned_char(rt)
-                is_float_member = (rt.kind == TypeKind.FLOAT)
-                is_double_member = (rt.kind == TypeKind.DOUBLE)
+                    self._load_operand(val, "%rax")
+                    self._emit("  cvtsi2ssq %rax, %xmm0")
+                self._emit(f"  movss %xmm0, {dmem}")
             else:
-                is_unsigned_char = False
-                mem_ty_s = str(mem_ty).strip().lower() if mem_ty is not None else ""
-                is_unsigned_char = mem_ty_s.startswith("unsigned char")
-                if mem_ty_s == "float":
-                    is_float_member = True
-                elif mem_ty_s == "double":
-                    is_double_member = True
-
-            # Float/double members: use SSE load instructions.
-            if is_float_member or is_double_member:
-                fp_ty = "float" if is_float_member else "double"
-                s = "s" if is_float_member else "d"
-                self._emit(f"  movs{s} (%rax), %xmm0")
-                if ins.result:
-                    off_r = self._ensure_local(ins.result, size=8)
-                    self._emit(f"  movs{s} %xmm0, -{off_r}(%rbp)")
-                    if self._sym_table and ins.result:
-                        self._register_type(ins.result, FloatType(kind=TypeKind.FLOAT) if fp_ty == "float" else FloatType(kind=TypeKind.DOUBLE))
-                return
-
-            # load based on member size
-            if sz == 1:
-                if is_unsigned_char:
-                    self._emit("  movzbl (%rax), %eax")
-                    self._emit("  movl %eax, %eax")
+                if val_ty == "double":
+                    self._emit(f"  movsd -{val_off}(%rbp), %xmm0")
+                elif val_ty == "float":
+                    self._emit(f"  movss -{val_off}(%rbp), %xmm0")
+                    self._emit("  cvtss2sd %xmm0, %xmm0")
                 else:
-                    self._emit("  movsbl (%rax), %eax")
-                    self._emit("  movslq %eax, %rax")
-            elif sz == 2:
-                self._emit("  movw (%rax), %ax")
-                self._emit("  movswq %ax, %rax")
-            elif sz == 4:
-                self._emit("  movl (%rax), %eax")
-                self._emit("  movl %eax, %eax")
-                # Keep as zero-extended 32-bit in %rax; signedness is handled
-                # by downstream casts/ops.
-            else:
-                self._emit("  movq (%rax), %rax")
-            # After loading the member value, %rax no longer holds an address.
-            if ins.result and isinstance(ins.result, str) and ins.result.startswith("%t"):
-                if self._sym_table and ins.result:
-                    self._register_type(ins.result, IntegerType(kind=TypeKind.LONG, is_unsigned=False))
-            self._store_result(ins.result, "%rax")
+                    self._load_operand(val, "%rax")
+                    self._emit("  cvtsi2sdq %rax, %xmm0")
+                self._emit(f"  movsd %xmm0, {dmem}")
             return
 
-        if op == "load_member_ptr":
-            # operand1 holds pointer value; load it as address then add member offset
-            base = ins.operand1 or ""
-            member = ins.operand2 or ""
-            if isinstance(ins.meta, dict) and "struct_type" in ins.meta:
-                if self._sym_table and base:
-                    _bct = _str_to_ctype(ins.meta['struct_type'])
-                    if _bct is not None:
-                        self._register_type(base, PointerType(kind=TypeKind.POINTER, pointee=_bct))
-                    else:
-                        self._register_type(base, PointerType(kind=TypeKind.POINTER, pointee=CType(kind=TypeKind.VOID)))
-            self._load_operand(base, "%rax")
-            # CType-based path: use result_type to determine member size
-            rt = getattr(ins, "result_type", None)
-            is_float_member = False
-            is_double_member = False
-            if rt is not None:
-                off_only, _ = self._resolve_member(base, member)
-                sz = self._ctype_sizeof(rt)
-                is_unsigned_char = self._ctype_is_unsigned_char(rt)
-                is_float_member = (rt.kind == TypeKind.FLOAT)
-                is_double_member = (rt.kind == TypeKind.DOUBLE)
-            else:
-                # String-based fallback
-                off_only, sz = self._resolve_member(base, member)
-                is_unsigned_char = False
-                try:
-                    mem_ty = self._resolve_member_type(base, member)
-                except Exception:
-                    mem_ty = None
-                mem_ty_s = str(mem_ty).strip().lower() if mem_ty is not None else ""
-                is_unsigned_char = mem_ty_s.startswith("unsigned char")
-                if mem_ty_s == "float":
-                    is_float_member = True
-                elif mem_ty_s == "double":
-                    is_double_member = True
-            if off_only:
-                self._emit(f"  addq ${off_only}, %rax")
-
-            # Float/double members: use SSE load instructions.
-            if is_float_member or is_double_member:
-                fp_ty = "float" if is_float_member else "double"
-                s = "s" if is_float_member else "d"
-                self._emit(f"  movs{s} (%rax), %xmm0")
-                if ins.result:
-                    off_r = self._ensure_local(ins.result, size=8)
-                    self._emit(f"  movs{s} %xmm0, -{off_r}(%rbp)")
-                    if self._sym_table and ins.result:
-                        self._register_type(ins.result, FloatType(kind=TypeKind.FLOAT) if fp_ty == "float" else FloatType(kind=TypeKind.DOUBLE))
-                return
-
-            if sz == 1:
-                if is_unsigned_char:
-                    self._emit("  movzbl (%rax), %eax")
-                    self._emit("  movl %eax, %eax")
-                else:
-                    self._emit("  movsbl (%rax), %eax")
-                    self._emit("  movslq %eax, %rax")
-            elif sz == 2:
-                self._emit("  movw (%rax), %ax")
-                self._emit("  movswq %ax, %rax")
-            elif sz == 4:
-                self._emit("  movl (%rax), %eax")
-                self._emit("  movl %eax, %eax")
-                # Keep as zero-extended 32-bit in %rax.
-            else:
-                self._emit("  movq (%rax), %rax")
-            if ins.result and isinstance(ins.result, str) and ins.result.startswith("%t"):
-                if self._sym_table and ins.result:
-                    self._register_type(ins.result, IntegerType(kind=TypeKind.LONG, is_unsigned=False))
-            self._store_result(ins.result, "%rax")
+        if sz > 8:
+            self._emit("  movq %rax, %rdi")
+            self._load_operand(val, "%rsi")
+            self._emit(f"  movq ${sz}, %rdx")
+            self._emit("  call memcpy")
             return
-
-
-        if op == "store_member":
-            base = ins.operand1 or ""
-            member = ins.operand2 or ""
-            val = ins.result
-            _sm_base_is_ptr = self._is_pointer_type_op(base) if isinstance(base, str) else False
-            if isinstance(base, str) and base.startswith("%t"):
-                self._load_operand(base, "%rax")
-            elif _sm_base_is_ptr:
-                self._load_operand(base, "%rax")
-            else:
-                self._addr_of_symbol(base, "%rax")
-            off, sz = self._resolve_member(base, member)
-            if off:
-                self._emit(f"  addq ${off}, %rax")
-            # Bit-field write: read-modify-write
-            bf = self._resolve_bitfield(base, member)
-            if bf is not None:
-                bit_off, bit_w = bf
-                mask = (1 << bit_w) - 1
-                self._emit("  movq %rax, %rdx")  # save address
-                self._load_operand(val, "%rcx")
-                self._emit(f"  andl ${mask}, %ecx")  # mask new value
-                if bit_off > 0:
-                    self._emit(f"  shll ${bit_off}, %ecx")  # shift to position
-                clear_mask = ~(mask << bit_off) & 0xFFFFFFFF
-                self._emit("  movl (%rdx), %eax")  # load current word
-                self._emit(f"  andl ${clear_mask}, %eax")  # clear bits
-                self._emit("  orl %ecx, %eax")  # set new bits
-                self._emit("  movl %eax, (%rdx)")  # store back
-                return
-            # CType-based path: use member_ctype from meta to determine copy size
-            member_ct = (ins.meta or {}).get("member_ctype") if isinstance(ins.meta, dict) else None
-            if member_ct is not None:
-                sz = self._ctype_sizeof(member_ct)
-
-            # Float/double member store: convert value via SSE and store.
-            is_float_mem = (member_ct is not None and member_ct.kind == TypeKind.FLOAT)
-            is_double_mem = (member_ct is not None and member_ct.kind == TypeKind.DOUBLE)
-            if not is_float_mem and not is_double_mem:
-                # String-based fallback for member type detection
-                try:
-                    _mt = self._resolve_member_type(base, member)
-                    _mts = str(_mt).strip().lower() if _mt else ""
-                    if _mts == "float":
-                        is_float_mem = True
-                    elif _mts == "double":
-                        is_double_mem = True
-                except Exception:
-                    pass
-            if is_float_mem or is_double_mem:
-                self._emit("  movq %rax, %rdx")  # save dest address
-                val_ct = self._get_type(val) if isinstance(val, str) else None
-                val_ty = ""
-                if val_ct is not None and val_ct.kind == TypeKind.FLOAT:
-                    val_ty = "float"
-                elif val_ct is not None and val_ct.kind == TypeKind.DOUBLE:
-                    val_ty = "double"
-                val_off = self._ensure_local(val) if isinstance(val, str) else 0
-                if is_float_mem:
-                    if val_ty == "float":
-                        self._emit(f"  movss -{val_off}(%rbp), %xmm0")
-                    elif val_ty == "double":
-                        self._emit(f"  movsd -{val_off}(%rbp), %xmm0")
-                        self._emit("  cvtsd2ss %xmm0, %xmm0")
-                    else:
-                        # Source is integer; convert int -> float.
-                        self._load_operand(val, "%rax")
-                        self._emit("  cvtsi2ssq %rax, %xmm0")
-                    self._emit("  movss %xmm0, (%rdx)")
-                else:
-                    # double member
-                    if val_ty == "double":
-                        self._emit(f"  movsd -{val_off}(%rbp), %xmm0")
-                    elif val_ty == "float":
-                        self._emit(f"  movss -{val_off}(%rbp), %xmm0")
-                        self._emit("  cvtss2sd %xmm0, %xmm0")
-                    else:
-                        # Source is integer; convert int -> double.
-                        self._load_operand(val, "%rax")
-                        self._emit("  cvtsi2sdq %rax, %xmm0")
-                    self._emit("  movsd %xmm0, (%rdx)")
-                return
-
-            # Struct/union member: block copy via memcpy.
-            if sz > 8:
-                self._emit("  movq %rax, %rdi")  # dest = &base.member
-                self._load_operand(val, "%rsi")   # src = value (address of source struct)
-                self._emit(f"  movq ${sz}, %rdx")
-                self._emit("  call memcpy")
-                return
-            self._load_operand(val, "%rcx")
-            if sz == 1:
-                self._emit("  movb %cl, (%rax)")
-            elif sz == 2:
-                self._emit("  movw %cx, (%rax)")
-            elif sz == 4:
-                self._emit("  movl %ecx, (%rax)")
-            else:
-                self._emit("  movq %rcx, (%rax)")
+        self._load_operand(val, "%rcx")
+        w = sz if sz in _MOV_BY_SIZE else 8
+        self._emit(f"  {_MOV_BY_SIZE[w]} {_RCX_BY_SIZE[w]}, {mem}")
+
+    def _emit_return(self) -> None:
+        """Restore the callee-saved registers holding temps, then leave/ret."""
+        if self._omit_frame:
+            for reg, _ in reversed(self._saved_regs):
+                self._emit(f"  popq {reg}")
+            self._emit("  ret")
             return
-
-
-        if op == "store_member_ptr":
-            base = ins.operand1 or ""
-            member = ins.operand2 or ""
-            val = ins.result
-            # Only register struct type from meta if not already known
-            # (IR gen types via activate_function are more precise).
-            if isinstance(ins.meta, dict) and "struct_type" in ins.meta:
-                if self._sym_table and base and self._get_base_struct_ctype(base) is None:
-                    _bct = _str_to_ctype(ins.meta['struct_type'])
-                    if _bct is not None:
-                        self._register_type(base, PointerType(kind=TypeKind.POINTER, pointee=_bct))
-                    else:
-                        self._register_type(base, PointerType(kind=TypeKind.POINTER, pointee=CType(kind=TypeKind.VOID)))
-            self._load_operand(base, "%rax")
-            off, sz = self._resolve_member(base, member)
-            if off:
-                self._emit(f"  addq ${off}, %rax")
-            # CType-based path: use member_ctype from meta to determine copy size
-            member_ct = (ins.meta or {}).get("member_ctype") if isinstance(ins.meta, dict) else None
-            if member_ct is not None:
-                sz = self._ctype_sizeof(member_ct)
-
-            # Float/double member store: use SSE instructions.
-            is_float_mem = (member_ct is not None and member_ct.kind == TypeKind.FLOAT)
-            is_double_mem = (member_ct is not None and member_ct.kind == TypeKind.DOUBLE)
-            if not is_float_mem and not is_double_mem:
-                try:
-                    _mt = self._resolve_member_type(base, member)
-                    _mts = str(_mt).strip().lower() if _mt else ""
-                    if _mts == "float":
-                        is_float_mem = True
-                    elif _mts == "double":
-                        is_double_mem = True
-                except Exception:
-                    pass
-            if is_float_mem or is_double_mem:
-                self._emit("  movq %rax, %rdx")  # save dest address
-                val_ct_ptr = self._get_type(val) if isinstance(val, str) else None
-                val_ty = ""
-                if val_ct_ptr is not None and val_ct_ptr.kind == TypeKind.FLOAT:
-                    val_ty = "float"
-                elif val_ct_ptr is not None and val_ct_ptr.kind == TypeKind.DOUBLE:
-                    val_ty = "double"
-                val_off = self._ensure_local(val) if isinstance(val, str) else 0
-                if is_float_mem:
-                    if val_ty == "float":
-                        self._emit(f"  movss -{val_off}(%rbp), %xmm0")
-                    elif val_ty == "double":
-                        self._emit(f"  movsd -{val_off}(%rbp), %xmm0")
-                        self._emit("  cvtsd2ss %xmm0, %xmm0")
-                    else:
-                        self._load_operand(val, "%rax")
-                        self._emit("  cvtsi2ssq %rax, %xmm0")
-                    self._emit("  movss %xmm0, (%rdx)")
-                else:
-                    if val_ty == "double":
-                        self._emit(f"  movsd -{val_off}(%rbp), %xmm0")
-                    elif val_ty == "float":
-                        self._emit(f"  movss -{val_off}(%rbp), %xmm0")
-                        self._emit("  cvtss2sd %xmm0, %xmm0")
-                    else:
-                        self._load_operand(val, "%rax")
-                        self._emit("  cvtsi2sdq %rax, %xmm0")
-                    self._emit("  movsd %xmm0, (%rdx)")
-                return
-
-            if sz > 8:
-                self._emit("  movq %rax, %rdi")
-                self._load_operand(val, "%rsi")
-                self._emit(f"  movq ${sz}, %rdx")
-                self._emit("  call memcpy")
-                return
-            self._load_operand(val, "%rcx")
-            if sz == 1:
-                self._emit("  movb %cl, (%rax)")
-            elif sz == 2:
-                self._emit("  movw %cx, (%rax)")
-            elif sz == 4:
-                self._emit("  movl %ecx, (%rax)")
-            else:
-                self._emit("  movq %rcx, (%rax)")
+        for reg, off in self._saved_regs:
+            self._emit(f"  movq {_slot(off)}, {reg}")
+        self._emit("  leave")
+        self._emit("  ret")
+
+    def _ins_ret(self, ins: IRInstruction) -> None:
+        # Check if returning a float value
+        src = ins.operand1 or ""
+        src_ty = self._get_type_str(src) if isinstance(src, str) else ""
+        rty = getattr(self, "_fn_ret_ty", "") or ""
+
+        # long double return: SysV ABI returns via x87 st(0)
+        if isinstance(src_ty, str) and src_ty.strip() == "long double":
+            off = self._ensure_local(src, size=16)
+            self._emit(f"  fldt -{off}(%rbp)")
+            self._emit_return()
+            return
+        if isinstance(rty, str) and rty.strip() == "long double":
+            off = self._ensure_local(src, size=16)
+            self._emit(f"  fldt -{off}(%rbp)")
+            self._emit_return()
             return
 
-        if op == "ret":
-            # Check if returning a float value
-            src = ins.operand1 or ""
-            src_ty = self._get_type_str(src) if isinstance(src, str) else ""
-            rty = getattr(self, "_fn_ret_ty", "") or ""
-
-            # long double return: SysV ABI returns via x87 st(0)
-            if isinstance(src_ty, str) and src_ty.strip() == "long double":
-                off = self._ensure_local(src, size=16)
-                self._emit(f"  fldt -{off}(%rbp)")
-                self._emit("  leave")
-                self._emit("  ret")
-                return
-            if isinstance(rty, str) and rty.strip() == "long double":
-                off = self._ensure_local(src, size=16)
-                self._emit(f"  fldt -{off}(%rbp)")
-                self._emit("  leave")
-                self._emit("  ret")
-                return
+        if isinstance(src_ty, str) and src_ty in ("float", "double"):
+            s = "s" if src_ty == "float" else "d"
+            off = self._ensure_local(src)
+            self._emit(f"  movs{s} -{off}(%rbp), %xmm0")
+            self._emit_return()
+            return
+        if isinstance(rty, str) and rty.strip() in ("float", "double"):
+            s = "s" if rty.strip() == "float" else "d"
+            off = self._ensure_local(src)
+            self._emit(f"  movs{s} -{off}(%rbp), %xmm0")
+            self._emit_return()
+            return
 
-            if isinstance(src_ty, str) and src_ty in ("float", "double"):
-                s = "s" if src_ty == "float" else "d"
-                off = self._ensure_local(src)
-                self._emit(f"  movs{s} -{off}(%rbp), %xmm0")
-                self._emit("  leave")
-                self._emit("  ret")
-                return
-            if isinstance(rty, str) and rty.strip() in ("float", "double"):
-                s = "s" if rty.strip() == "float" else "d"
-                off = self._ensure_local(src)
-                self._emit(f"  movs{s} -{off}(%rbp), %xmm0")
-                self._emit("  leave")
-                self._emit("  ret")
+        # Struct/union by-value return: use StructClassifier to decide registers.
+        if isinstance(src_ty, str) and (src_ty.strip().startswith("struct ") or src_ty.strip().startswith("union ")):
+            sty = src_ty.strip()
+            sz = self._type_size_bytes(sty)
+            off = self._ensure_local(src)
+            layout = self._layouts.get(sty)
+            classification = classify_struct(sty, layout) if layout else [EightbyteClass.INTEGER]
+            pass_mode = get_struct_pass_mode(classification)
+
+            if pass_mode == "hidden_ptr":
+                # MEMORY class: copy struct data to the hidden pointer
+                # location (saved in prologue at _hidden_ret_ptr_off).
+                hidden_off = getattr(self, "_hidden_ret_ptr_off", 0)
+                if hidden_off:
+                    # Load hidden pointer into rdi, source into rsi, copy.
+                    self._emit(f"  movq -{hidden_off}(%rbp), %rdi")
+                    self._emit(f"  leaq -{off}(%rbp), %rsi")
+                    self._emit(f"  movq ${sz}, %rcx")
+                    self._emit("  rep movsb")
+                    # Return the hidden pointer in rax.
+                    self._emit(f"  movq -{hidden_off}(%rbp), %rax")
+                self._emit_return()
                 return
 
-            # Struct/union by-value return: use StructClassifier to decide registers.
-            if isinstance(src_ty, str) and (src_ty.strip().startswith("struct ") or src_ty.strip().startswith("union ")):
-                sty = src_ty.strip()
-                sz = self._type_size_bytes(sty)
-                off = self._ensure_local(src)
-                layout = getattr(self._sema_ctx, "layouts", {}).get(sty) if self._sema_ctx else None
-                classification = classify_struct(sty, layout) if layout else [EightbyteClass.INTEGER]
-                pass_mode = get_struct_pass_mode(classification)
-
-                if pass_mode == "hidden_ptr":
-                    # MEMORY class: copy struct data to the hidden pointer
-                    # location (saved in prologue at _hidden_ret_ptr_off).
-                    hidden_off = getattr(self, "_hidden_ret_ptr_off", 0)
-                    if hidden_off:
-                        # Load hidden pointer into rdi, source into rsi, copy.
-                        self._emit(f"  movq -{hidden_off}(%rbp), %rdi")
-                        self._emit(f"  leaq -{off}(%rbp), %rsi")
-                        self._emit(f"  movq ${sz}, %rcx")
-                        self._emit("  rep movsb")
-                        # Return the hidden pointer in rax.
-                        self._emit(f"  movq -{hidden_off}(%rbp), %rax")
-                    self._emit("  leave")
-                    self._emit("  ret")
-                    return
-
-                # Register return: use classification to pick rax/rdx vs xmm0/xmm1.
-                ret_gp_regs = ["%rax", "%rdx"]
-                ret_xmm_regs = ["%xmm0", "%xmm1"]
-                gp_i = 0
-                xmm_i = 0
-                for ci, cls in enumerate(classification):
-                    if cls == EightbyteClass.SSE:
-                        self._emit(f"  movq -{off - ci * 8}(%rbp), {ret_xmm_regs[xmm_i]}")
-                        xmm_i += 1
-                    else:
-                        self._emit(f"  movq -{off - ci * 8}(%rbp), {ret_gp_regs[gp_i]}")
-                        gp_i += 1
-                self._emit("  leave")
-                self._emit("  ret")
-                return
+            # Register return: use classification to pick rax/rdx vs xmm0/xmm1.
+            ret_gp_regs = ["%rax", "%rdx"]
+            ret_xmm_regs = ["%xmm0", "%xmm1"]
+            gp_i = 0
+            xmm_i = 0
+            for ci, cls in enumerate(classification):
+                if cls == EightbyteClass.SSE:
+                    self._emit(f"  movq -{off - ci * 8}(%rbp), {ret_xmm_regs[xmm_i]}")
+                    xmm_i += 1
+                else:
+                    self._emit(f"  movq -{off - ci * 8}(%rbp), {ret_gp_regs[gp_i]}")
+                    gp_i += 1
+            self._emit_return()
+            return
 
-            self._load_operand(src, "%rax")
+        self._load_operand(src, "%rax")
 
-            if not rty:
-                try:
-                    rty = self._get_type_str(ins.operand1 or "") if isinstance(ins.operand1, str) else ""
-                except Exception:
-                    rty = ""
-
-            rty_n = rty.strip().lower() if isinstance(rty, str) else ""
-            # Never apply narrow-type extension for pointer return types.
-            if "*" not in rty_n:
-                if rty_n in {"short", "signed short"}:
-                    self._emit("  movswl %ax, %eax")
-                    self._emit("  movslq %eax, %rax")
-                elif rty_n == "unsigned short":
-                    self._emit("  movzwl %ax, %eax")
-                    self._emit("  movl %eax, %eax")
-                elif rty_n in {"char", "signed char"}:
-                    self._emit("  movsbl %al, %eax")
-                    self._emit("  movslq %eax, %rax")
-                elif rty_n == "unsigned char":
-                    self._emit("  movzbl %al, %eax")
-                    self._emit("  movl %eax, %eax")
-            self._emit("  leave")
-            self._emit("  ret")
-            return
+        if not rty:
+            try:
+                rty = self._get_type_str(ins.operand1 or "") if isinstance(ins.operand1, str) else ""
+            except Exception:
+                rty = ""
 
-        if op == "store_index":
-            # store value into array: operand1=base, operand2=index, result=value
-            base = ins.operand1 or ""
-            idx = ins.operand2
-            val = ins.result
-            # determine element size
-            elem_sz = 4
-            base_ty = None
-            # CType-based path: determine element size from symbol table
-            base_ct = self._get_type(base) if isinstance(base, str) else None
-            if base_ct is not None:
-                if isinstance(base_ct, ArrayType) and base_ct.element is not None:
-                    elem_sz = type_sizeof(base_ct.element) if base_ct.element.kind not in (TypeKind.STRUCT, TypeKind.UNION) else self._ctype_sizeof(base_ct.element)
+        rty_n = rty.strip().lower() if isinstance(rty, str) else ""
+        # Never apply narrow-type extension for pointer return types.
+        if "*" not in rty_n:
+            if rty_n in {"short", "signed short"}:
+                self._emit("  movswl %ax, %eax")
+                self._emit("  movslq %eax, %rax")
+            elif rty_n == "unsigned short":
+                self._emit("  movzwl %ax, %eax")
+                self._emit("  movl %eax, %eax")
+            elif rty_n in {"char", "signed char"}:
+                self._emit("  movsbl %al, %eax")
+                self._emit("  movslq %eax, %rax")
+            elif rty_n == "unsigned char":
+                self._emit("  movzbl %al, %eax")
+                self._emit("  movl %eax, %eax")
+        self._emit_return()
+
+    def _ins_store_index(self, ins: IRInstruction) -> None:
+        # store value into array: operand1=base, operand2=index, result=value
+        base = ins.operand1 or ""
+        idx = ins.operand2
+        val = ins.result
+        # determine element size
+        elem_sz = 4
+        base_ty = None
+        # CType-based path: determine element size from symbol table
+        base_ct = self._get_type(base) if isinstance(base, str) else None
+        if base_ct is not None:
+            if isinstance(base_ct, ArrayType) and base_ct.element is not None:
+                elem_sz = type_sizeof(base_ct.element) if base_ct.element.kind not in (TypeKind.STRUCT, TypeKind.UNION) else self._ctype_sizeof(base_ct.element)
+                if elem_sz == 0:
+                    elem_sz = 4
+            elif self._ctype_is_pointer(base_ct):
+                pointee = self._ctype_deref(base_ct)
+                if pointee is not None:
+                    elem_sz = type_sizeof(pointee) if pointee.kind not in (TypeKind.STRUCT, TypeKind.UNION) else self._ctype_sizeof(pointee)
                     if elem_sz == 0:
                         elem_sz = 4
-                elif self._ctype_is_pointer(base_ct):
-                    pointee = self._ctype_deref(base_ct)
-                    if pointee is not None:
-                        elem_sz = type_sizeof(pointee) if pointee.kind not in (TypeKind.STRUCT, TypeKind.UNION) else self._ctype_sizeof(pointee)
-                        if elem_sz == 0:
-                            elem_sz = 4
-            else:
-                # String-based fallback
-                if isinstance(base, str):
-                    base_ty = self._get_type_str(base) or None
-                    if (base_ty is None or base_ty == "") and base.startswith("@"):
-                        sym = base[1:]
-                        base_ty = getattr(self._sema_ctx, "global_types", {}).get(sym) if self._sema_ctx is not None else None
-                if isinstance(base_ty, str) and base_ty.strip().startswith("array("):
-                    inner = base_ty.strip()[len("array(") :]
-                    if inner.endswith(")"):
-                        inner = inner[:-1]
-                    base_part = inner.split(",", 1)[0].strip()
-                    elem_sz = self._type_size_bytes(base_part)
-                elif isinstance(base_ty, str) and "*" in base_ty:
-                    elem_sz = self._pointee_size_bytes(base_ty)
+        else:
+            # String-based fallback
+            if isinstance(base, str):
+                base_ty = self._get_type_str(base) or None
+                if (base_ty is None or base_ty == "") and base.startswith("@"):
+                    sym = base[1:]
+                    base_ty = self._global_types.get(sym)
+            if isinstance(base_ty, str) and base_ty.strip().startswith("array("):
+                base_part = _parse_array_enc(base_ty)[0]
+                elem_sz = self._type_size_bytes(base_part)
+            elif isinstance(base_ty, str) and "*" in base_ty:
+                elem_sz = self._pointee_size_bytes(base_ty)
 
-            # compute address
-            is_ptr_base = (base_ct is not None and self._ctype_is_pointer(base_ct)) or (isinstance(base_ty, str) and "*" in base_ty)
+        # compute address
+        is_ptr_base = (base_ct is not None and self._ctype_is_pointer(base_ct)) or (isinstance(base_ty, str) and "*" in base_ty)
+        slot = None
+        k = _imm_int(idx)
+        if not is_ptr_base and k is not None and isinstance(base, str) and base.startswith("@"):
+            slot = self._direct_base(base)
+        if slot is not None:
+            # constant index into a stack array: address it directly
+            mem = f"{k * elem_sz - slot}(%rbp)"
+        else:
             if is_ptr_base:
                 self._load_operand(base, "%rax")
             else:
@@ -3464,22 +4136,82 @@ class CodeGenerator:
                 else:
                     self._addr_of_symbol(base, "%rax")
             self._load_operand(idx, "%rcx")
-            if elem_sz != 1:
-                self._emit(f"  imulq ${elem_sz}, %rcx")
-            self._emit("  addq %rcx, %rax")
-            # load value into %rdx and store
-            self._load_operand(val, "%rdx")
-            if elem_sz == 1:
-                self._emit("  movb %dl, (%rax)")
-            elif elem_sz == 2:
-                self._emit("  movw %dx, (%rax)")
-            elif elem_sz == 4:
-                self._emit("  movl %edx, (%rax)")
-            else:
-                self._emit("  movq %rdx, (%rax)")
-            return
-
-        # decl/param are handled in prologue
+            self._index_address(elem_sz)
+            mem = "(%rax)"
+        # load value into %rdx and store
+        self._load_operand(val, "%rdx")
+        w = elem_sz if elem_sz in _MOV_BY_SIZE else 8
+        self._emit(f"  {_MOV_BY_SIZE[w]} {_RDX_BY_SIZE[w]}, {mem}")
+
+    def _index_operand(self, scale: int) -> str:
+        """Return a memory operand for %rax + %rcx*scale.
+
+        Scales of 1/2/4/8 are folded into the addressing mode; any other
+        scale is applied with `imulq`/`addq` and the operand is `(%rax)`.
+        """
+        mem = _SIB_INDEX.get(scale)
+        if mem is not None:
+            return mem
+        self._emit(f"  imulq ${scale}, %rcx")
+        self._emit("  addq %rcx, %rax")
+        return "(%rax)"
+
+    def _index_address(self, scale: int) -> None:
+        """Leave %rax + %rcx*scale in %rax."""
+        mem = self._index_operand(scale)
+        if mem != "(%rax)":
+            self._emit(f"  leaq {mem}, %rax")
+
+    _INS_HANDLERS: Dict[str, Callable[["CodeGenerator", IRInstruction], None]] = {
+        "label": _ins_label,
+        "jmp": _ins_jmp,
+        "jz": _ins_jcc,
+        "jnz": _ins_jcc,
+        "str_const": _ins_str_const,
+        "label_addr": _ins_label_addr,
+        "indirect_jump": _ins_indirect_jump,
+        "addr_of": _ins_addr_of,
+        "mov": _ins_mov,
+        "struct_copy": _ins_struct_copy,
+        "fmov": _ins_fmov,
+        "fadd": _ins_farith,
+        "fsub": _ins_farith,
+        "fmul": _ins_farith,
+        "fdiv": _ins_farith,
+        "fcmp": _ins_fcmp,
+        "i2f": _ins_int_to_fp,
+        "i2d": _ins_int_to_fp,
+        "f2i": _ins_fp_to_int,
+        "d2i": _ins_fp_to_int,
+        "f2d": _ins_f2d,
+        "d2f": _ins_d2f,
+        "i2ld": _ins_i2ld,
+        "ld2i": _ins_ld2i,
+        "d2ld": _ins_d2ld,
+        "ld2d": _ins_ld2d,
+        "f2ld": _ins_f2ld,
+        "ld2f": _ins_ld2f,
+        "sext16": _ins_sext16,
+        "load": _ins_load,
+        "store": _ins_store,
+        "mov_addr": _ins_mov_addr,
+        "addr_index": _ins_addr_index,
+        "addr_of_member": _ins_addr_of_member,
+        "load_member": _ins_load_member,
+        "addr_of_member_ptr": _ins_addr_of_member_ptr,
+        "load_member_ptr": _ins_load_member_ptr,
+        "unop": _ins_unop,
+        "zext32": _ins_zext32,
+        "sext32": _ins_sext32,
+        "sext8": _ins_sext8,
+        "binop": _ins_binop,
+        "call": _ins_call,
+        "load_index": _ins_load_index,
+        "store_member": _ins_store_member,
+        "store_member_ptr": _ins_store_member_ptr,
+        "ret": _ins_ret,
+        "store_index": _ins_store_index,
+    }
 
     # Operand helpers
 
@@ -3494,8 +4226,17 @@ class CodeGenerator:
         Returns the final type string (e.g. "struct Foo", "int", "char*").
         If the type is a pointer typedef, returns "base*".
         If resolution fails, returns the input unchanged.
+        Results are cached per type string for the translation unit.
         """
-        if not isinstance(ty, str) or not ty.strip():
+        if not isinstance(ty, str):
+            return ty
+        hit = self._resolved_types.get(ty)
+        if hit is None:
+            hit = self._resolved_types[ty] = self._resolve_type_uncached(ty)
+        return hit
+
+    def _resolve_type_uncached(self, ty: str) -> str:
+        if not ty.strip():
             return ty
         b = ty.strip()
         # Already a known type — no resolution needed.
@@ -3504,25 +4245,13 @@ class CodeGenerator:
             return b
         # Handle pointer types: strip trailing *, resolve base, re-add *
         if b.endswith("*"):
-            ptr_level = 0
-            core = b
-            while core.endswith("*"):
-                ptr_level += 1
-                core = core[:-1].strip()
+            core = b.rstrip("* ")
             if core:
+                ptr_level = b.count("*", len(core))
                 resolved_core = self._resolve_type(core)
                 return resolved_core + "*" * ptr_level
             return b
-        _PRIMITIVES = {
-            "void", "char", "unsigned char", "signed char",
-            "short", "short int", "unsigned short", "unsigned short int",
-            "signed short", "signed short int",
-            "int", "unsigned int", "signed int",
-            "long", "long int", "unsigned long", "unsigned long int",
-            "signed long", "signed long int",
-            "float", "double", "long double",
-        }
-        if b in _PRIMITIVES:
+        if b in _PRIMITIVE_TYPES:
             return b
         # Try typedef resolution.
         if self._sema_ctx is not None:
@@ -3542,61 +4271,42 @@ class CodeGenerator:
     # Non-PIC: direct RIP-relative (symbol(%rip))
     # PIC: GOT-indirect (symbol@GOTPCREL(%rip) -> load through GOT)
 
-    def _load_global_value(self, sym: str, reg: str, size: int = 8) -> None:
-        """Load a global variable's value into reg, respecting PIC mode."""
+    def _load_global_value(self, sym: str, reg: str, size: int = 8,
+                           unsigned: bool = False) -> None:
+        """Load a global variable's value into reg, respecting PIC mode.
+
+        Values narrower than 8 bytes are sign- or zero-extended to 64 bits.
+        """
         if self._pic:
             self._emit(f"  movq {sym}@GOTPCREL(%rip), %r11")
-            if size == 1:
-                self._emit(f"  movsbq (%r11), {reg}")
-            elif size == 2:
-                self._emit(f"  movswq (%r11), {reg}")
-            elif size == 4:
-                self._emit(f"  movslq (%r11), {reg}")
-            else:
-                self._emit(f"  movq (%r11), {reg}")
+            mem = "(%r11)"
         else:
-            if size == 1:
-                self._emit(f"  movsbq {sym}(%rip), {reg}")
-            elif size == 2:
-                self._emit(f"  movswq {sym}(%rip), {reg}")
-            elif size == 4:
-                self._emit(f"  movslq {sym}(%rip), {reg}")
+            mem = f"{sym}(%rip)"
+        if unsigned and size == 4:
+            # movl zero-extends through the 32-bit register.
+            reg32 = _REG32.get(reg)
+            if reg32 is not None:
+                self._emit(f"  movl {mem}, {reg32}")
             else:
-                self._emit(f"  movq {sym}(%rip), {reg}")
+                self._emit(f"  movl {mem}, %eax")
+                self._emit(f"  movq %rax, {reg}")
+            return
+        insn = (_ZEXT_LOAD_BY_SIZE if unsigned else _SEXT_LOAD_BY_SIZE).get(size, "movq")
+        self._emit(f"  {insn} {mem}, {reg}")
 
     def _store_global_value(self, sym: str, reg: str, size: int = 8) -> None:
         """Store reg into a global variable, respecting PIC mode."""
-        # Map 64-bit register names to sub-register names for narrow stores.
-        _sub = {
-            "%rax": {1: "%al", 2: "%ax", 4: "%eax"},
-            "%rcx": {1: "%cl", 2: "%cx", 4: "%ecx"},
-            "%rdx": {1: "%dl", 2: "%dx", 4: "%edx"},
-        }
         if self._pic:
             self._emit(f"  movq {sym}@GOTPCREL(%rip), %r11")
-            if size == 1:
-                sr = _sub.get(reg, {}).get(1, "%al")
-                self._emit(f"  movb {sr}, (%r11)")
-            elif size == 2:
-                sr = _sub.get(reg, {}).get(2, "%ax")
-                self._emit(f"  movw {sr}, (%r11)")
-            elif size == 4:
-                sr = _sub.get(reg, {}).get(4, "%eax")
-                self._emit(f"  movl {sr}, (%r11)")
-            else:
-                self._emit(f"  movq {reg}, (%r11)")
+            mem = "(%r11)"
         else:
-            if size == 1:
-                sr = _sub.get(reg, {}).get(1, "%al")
-                self._emit(f"  movb {sr}, {sym}(%rip)")
-            elif size == 2:
-                sr = _sub.get(reg, {}).get(2, "%ax")
-                self._emit(f"  movw {sr}, {sym}(%rip)")
-            elif size == 4:
-                sr = _sub.get(reg, {}).get(4, "%eax")
-                self._emit(f"  movl {sr}, {sym}(%rip)")
-            else:
-                self._emit(f"  movq {reg}, {sym}(%rip)")
+            mem = f"{sym}(%rip)"
+        if size in (1, 2, 4):
+            # Narrow stores use reg's sub-register (%al etc. if unknown).
+            sr = _SUBREG_BY_SIZE.get(reg, _RAX_BY_SIZE)[size]
+            self._emit(f"  {_MOV_BY_SIZE[size]} {sr}, {mem}")
+        else:
+            self._emit(f"  movq {reg}, {mem}")
 
     def _load_global_addr(self, sym: str, reg: str) -> None:
         """Load the address of a global symbol into reg, respecting PIC mode."""
@@ -3606,192 +4316,164 @@ class CodeGenerator:
             self._emit(f"  leaq {sym}(%rip), {reg}")
 
     def _load_operand(self, operand: Optional[str], reg: str) -> None:
-        if operand is None:
+        # Operand kinds are told apart by their first character; %t temps
+        # are by far the most common, so they are tested first.
+        c0 = operand[:1] if operand is not None else ""
+        if c0 == "%" and operand[1:2] == "t":
+            self._load_temp(operand, reg)
+        elif c0 == "$":
+            # Negative immediates need movq's sign extension.  (No xorl for
+            # $0: callers may load operands between a compare and its use.)
+            reg32 = _REG32.get(reg)
+            if reg32 is not None and _imm_fits_u32(operand):
+                self._emit(f"  movl {operand}, {reg32}")
+            else:
+                self._emit(f"  movq {operand}, {reg}")
+        elif c0 == "@":
+            self._load_symbol(operand, reg)
+        elif c0 == "." and operand.startswith(".L"):
+            # label address
+            self._emit(f"  leaq {operand}(%rip), {reg}")
+        elif operand and operand.isidentifier() and f"@{operand}" in self._locals:
+            # If we ever see a bare identifier here, only treat it as a local
+            # if we already have a stack slot for '@name'.
+            self._load_symbol(f"@{operand}", reg)
+        else:
+            # None, or nothing we know how to load: immediate 0
             self._emit(f"  movq $0, {reg}")
+
+    def _load_temp(self, operand: str, reg: str) -> None:
+        home = self._temp_regs.get(operand)
+        if home is not None:
+            self._emit(f"  movq {home}, {reg}")
             return
-        if operand.startswith("$"):
-            self._emit(f"  movq {operand}, {reg}")
-            return
-        # If we ever see a bare identifier here, only treat it as a local if we
-        # already have a stack slot for '@name'. Otherwise, keep it bare so it
-        # can refer to a global symbol (or be handled by other cases).
-        if operand.isidentifier() and self._is_local(f"@{operand}"):
-            operand = f"@{operand}"
-        if operand.startswith("%t"):
+        off = self._locals.get(operand)
+        if off is None:
             off = self._ensure_local(operand)
-            # Load with correct width based on type info.
-            ty = self._get_type_str(operand)
-            b = ty.strip() if isinstance(ty, str) else ""
-            # IMPORTANT: pointer temps are 8-byte values.
-            if isinstance(b, str) and ("*" in b or b == "ptr"):
-                self._emit(f"  movq -{off}(%rbp), {reg}")
-                return
-            if b == "char" or b.startswith("char "):
-                self._emit(f"  movsbq -{off}(%rbp), {reg}")
-                return
-            if b == "unsigned char" or b.startswith("unsigned char"):
-                self._emit(f"  movzbq -{off}(%rbp), {reg}")
-                return
-            if b == "short" or b == "short int" or b.startswith("short"):
-                self._emit(f"  movswq -{off}(%rbp), {reg}")
-                return
-            if b == "unsigned short" or b == "unsigned short int" or b.startswith("unsigned short"):
-                self._emit(f"  movzwq -{off}(%rbp), {reg}")
-                return
-            if b == "int" or b.startswith("int ") or b.startswith("enum "):
-                self._emit(f"  movslq -{off}(%rbp), {reg}")
-                return
-            if b == "unsigned int" or b.startswith("unsigned int"):
-                # load 32-bit and zero-extend into destination
-                if reg == "%rax":
-                    self._emit(f"  movl -{off}(%rbp), %eax")
-                    self._emit("  movl %eax, %eax")
-                elif reg == "%rcx":
-                    self._emit(f"  movl -{off}(%rbp), %ecx")
-                elif reg == "%rdx":
-                    self._emit(f"  movl -{off}(%rbp), %edx")
-                elif reg == "%rsi":
-                    self._emit(f"  movl -{off}(%rbp), %esi")
-                elif reg == "%rdi":
-                    self._emit(f"  movl -{off}(%rbp), %edi")
-                elif reg == "%r8":
-                    self._emit(f"  movl -{off}(%rbp), %r8d")
-                elif reg == "%r9":
-                    self._emit(f"  movl -{off}(%rbp), %r9d")
-                elif reg == "%r10":
-                    self._emit(f"  movl -{off}(%rbp), %r10d")
-                elif reg == "%r11":
-                    self._emit(f"  movl -{off}(%rbp), %r11d")
-                else:
-                    self._emit(f"  movl -{off}(%rbp), %eax")
-                    self._emit("  movl %eax, %eax")
-                    self._emit(f"  movq %rax, {reg}")
-                return
-            self._emit(f"  movq -{off}(%rbp), {reg}")
+        # Load with correct width based on type info.
+        self._load_slot_insn(off, self._slot_kind(operand)[0], reg)
+
+    def _slot_kind(self, operand: str) -> Tuple[str, int]:
+        """(load instruction, store width) for *operand*'s stack slot.
+
+        Classified from its type string once per operand per function,
+        so loads and stores do a single dict lookup.
+        """
+        hit = self._slot_kinds.get(operand)
+        if hit is None:
+            b = self._get_type_str(operand).strip()
+            hit = self._slot_kinds[operand] = (
+                _slot_load_insn(b, operand.startswith("%t")),
+                _slot_store_width(b),
+            )
+        return hit
+
+    def _load_slot(self, off: int, b: str, is_temp: bool, reg: str) -> None:
+        """Load the stack slot at -off(%rbp), of type `b`, into `reg`."""
+        self._load_slot_insn(off, _slot_load_insn(b, is_temp), reg)
+
+    def _load_slot_insn(self, off: int, insn: str, reg: str) -> None:
+        """Load the stack slot at -off(%rbp) into `reg` with `insn` (see
+        _slot_load_insn)."""
+        if insn != "movl":
+            self._emit(f"  {insn} {_slot(off)}, {reg}")
             return
-        if operand.startswith("@"):
-            # local variable if it already has a stack slot; otherwise treat as global
-            if self._is_local(operand):
-                off = self._ensure_local(operand)
-                ty = self._get_type_str(operand)
-                b = ty.strip()
-                # array variables: in expressions, array decays to pointer to first element
-                if isinstance(b, str) and b.startswith("array("):
-                    self._emit(f"  leaq -{off}(%rbp), {reg}")
-                    return
-                # IMPORTANT: pointers are 8-byte values; do not apply char/short
-                # load/extension rules to e.g. "unsigned char*".
-                if isinstance(b, str) and "*" in b:
-                    self._emit(f"  movq -{off}(%rbp), {reg}")
-                    return
-                # signed char / char (treat plain `char` as signed in this backend)
-                if b == "char" or b == "signed char" or b.startswith("char ") or b.startswith("signed char"):
-                    self._emit(f"  movsbq -{off}(%rbp), {reg}")
-                    return
-                if b == "unsigned char" or b.startswith("unsigned char"):
-                    self._emit(f"  movzbq -{off}(%rbp), {reg}")
-                    return
-                # signed/unsigned short
-                if b == "short" or b == "short int" or b.startswith("short"):
-                    self._emit(f"  movswq -{off}(%rbp), {reg}")
-                    return
-                if b == "unsigned short" or b == "unsigned short int" or b.startswith("unsigned short"):
-                    self._emit(f"  movzwq -{off}(%rbp), {reg}")
-                    return
-                # signed int / enum
-                if b == "int" or b.startswith("int ") or b.startswith("enum "):
-                    self._emit(f"  movslq -{off}(%rbp), {reg}")
-                    return
-                # unsigned int: load 32-bit and zero-extend
-                if b == "unsigned int" or b.startswith("unsigned int"):
-                    # IMPORTANT: load into the requested destination register.
-                    # Using %eax unconditionally can clobber a live value in
-                    # %rax (e.g. binop operand1) when loading operand2.
-                    if reg == "%rax":
-                        self._emit(f"  movl -{off}(%rbp), %eax")
-                        self._emit("  movl %eax, %eax")
-                    elif reg == "%rcx":
-                        self._emit(f"  movl -{off}(%rbp), %ecx")
-                    elif reg == "%rbx":
-                        self._emit(f"  movl -{off}(%rbp), %ebx")
-                    elif reg == "%rdx":
-                        self._emit(f"  movl -{off}(%rbp), %edx")
-                    elif reg == "%rsi":
-                        self._emit(f"  movl -{off}(%rbp), %esi")
-                    elif reg == "%rdi":
-                        self._emit(f"  movl -{off}(%rbp), %edi")
-                    elif reg == "%r8":
-                        self._emit(f"  movl -{off}(%rbp), %r8d")
-                    elif reg == "%r9":
-                        self._emit(f"  movl -{off}(%rbp), %r9d")
-                    elif reg == "%r10":
-                        self._emit(f"  movl -{off}(%rbp), %r10d")
-                    elif reg == "%r11":
-                        self._emit(f"  movl -{off}(%rbp), %r11d")
-                    else:
-                        # Fallback: use %eax and copy.
-                        self._emit(f"  movl -{off}(%rbp), %eax")
-                        self._emit("  movl %eax, %eax")
-                        self._emit(f"  movq %rax, {reg}")
-                    return
-                # long/pointers/default
-                self._emit(f"  movq -{off}(%rbp), {reg}")
-                return
-            sym = operand[1:]
-            # If operand refers to a known function symbol, load its address.
-            if sym in getattr(self, "_functions", set()):
+        # unsigned int: load 32-bit and zero-extend.  IMPORTANT: load into
+        # the requested destination register; using %eax unconditionally can
+        # clobber a live value in %rax (e.g. binop operand1) when loading
+        # operand2.
+        reg32 = _REG32.get(reg)
+        if reg32 is not None:
+            self._emit(f"  movl {_slot(off)}, {reg32}")
+            if reg == "%rax":
+                self._emit("  movl %eax, %eax")
+        else:
+            # Fallback: use %eax and copy.
+            self._emit(f"  movl {_slot(off)}, %eax")
+            self._emit("  movl %eax, %eax")
+            self._emit(f"  movq %rax, {reg}")
+
+    def _load_symbol(self, operand: str, reg: str) -> None:
+        """Load @name: a stack local if it has a slot, otherwise a global."""
+        # local variable if it already has a stack slot; otherwise treat as global
+        off = self._locals.get(operand)
+        if off is not None:
+            self._load_slot_insn(off, self._slot_kind(operand)[0], reg)
+            return
+        sym = operand[1:]
+        # If operand refers to a known function symbol, load its address.
+        if sym in getattr(self, "_functions", set()):
+            self._load_global_addr(sym, reg)
+            return
+        # If semantic analysis says this symbol is a function, load its
+        # address (not its contents).
+        if self._sema_ctx is not None:
+            gty = self._global_types.get(sym)
+            if isinstance(gty, str) and gty.strip().startswith("function"):
                 self._load_global_addr(sym, reg)
                 return
-            # If semantic analysis says this symbol is a function, load its
-            # address (not its contents).
-            if self._sema_ctx is not None:
-                gty = getattr(self._sema_ctx, "global_types", {}).get(sym)
-                if isinstance(gty, str) and gty.strip().startswith("function"):
-                    self._load_global_addr(sym, reg)
-                    return
-            # Global objects: if this is an aggregate (struct/union/array), then
-            # loading it as a scalar is almost always wrong. Prefer returning
-            # its address so member/index operations can proceed correctly.
-            ty = getattr(self._sema_ctx, "global_types", {}).get(sym) if self._sema_ctx is not None else None
-            # Also check CType symbol table (seeded from gdecl/gdef for local statics).
-            if ty is None:
-                ty = self._get_type_str(operand) or None
-            # Resolve typedef to underlying type for correct load width.
-            if isinstance(ty, str):
-                ty = self._resolve_type(ty)
-            # Check if the global is an array via its declared Type.
-            is_global_array = False
-            if self._sema_ctx is not None:
-                gdt = getattr(self._sema_ctx, "global_decl_types", {})
-                g_ty = gdt.get(sym) if isinstance(gdt, dict) else None
-                if g_ty is not None and getattr(g_ty, 'is_array', False):
-                    is_global_array = True
-            is_aggregate = (
-                (isinstance(ty, str) and not ty.strip().endswith("*") and (ty.strip().startswith("struct ") or ty.strip().startswith("union ") or ty.strip().startswith("array(")))
-                or is_global_array
+        # Global objects: if this is an aggregate (struct/union/array), then
+        # loading it as a scalar is almost always wrong. Prefer returning
+        # its address so member/index operations can proceed correctly.
+        ty = self._global_types.get(sym)
+        # Also check CType symbol table (seeded from gdecl/gdef for local statics).
+        if ty is None:
+            ty = self._get_type_str(operand) or None
+        # Resolve typedef to underlying type for correct load width.
+        if isinstance(ty, str):
+            ty = self._resolve_type(ty)
+        # Check if the global is an array via its declared Type.
+        is_global_array = False
+        if self._sema_ctx is not None:
+            gdt = getattr(self._sema_ctx, "global_decl_types", {})
+            g_ty = gdt.get(sym) if isinstance(gdt, dict) else None
+            if g_ty is not None and getattr(g_ty, 'is_array', False):
+                is_global_array = True
+        is_aggregate = (
+            (isinstance(ty, str) and not ty.strip().endswith("*") and (ty.strip().startswith("struct ") or ty.strip().startswith("union ") or ty.strip().startswith("array(")))
+            or is_global_array
+        )
+        if is_aggregate:
+            self._load_global_addr(sym, reg)
+        elif isinstance(ty, str) and (ty.endswith("*") or "*" in ty):
+            self._load_global_value(sym, reg, 8)
+        else:
+            self._load_global_value(sym, reg, *self._global_scalar_width(ty))
+
+    def _global_scalar_width(self, ty: Optional[str]) -> Tuple[int, bool]:
+        """(size_bytes, unsigned) to load/store a scalar global of type *ty*.
+
+        Unknown types, and sizes a GPR cannot hold (long double), keep the
+        default of a 32-bit signed int.
+        """
+        if not isinstance(ty, str) or not ty.strip():
+            return 4, False
+        size, unsigned, _ = self._type_info(ty)
+        if size not in (1, 2, 4, 8):
+            return 4, False
+        return size, unsigned
+
+    def _type_info(self, ty: str) -> Tuple[int, bool, int]:
+        """Return (size_bytes, unsigned, pointee_size) for a type string.
+
+        Memoized per type string for the translation unit, so the
+        strip/endswith cascades run once per distinct type.
+        """
+        hit = self._ty_cache.get(ty)
+        if hit is None:
+            hit = self._ty_cache[ty] = (
+                self._type_size_uncached(ty),
+                ty.strip().startswith("unsigned "),
+                self._pointee_size_uncached(ty),
             )
-            if is_aggregate:
-                self._load_global_addr(sym, reg)
-            elif isinstance(ty, str) and (ty.endswith("*") or "*" in ty):
-                self._load_global_value(sym, reg, 8)
-            else:
-                # default scalar global: 32-bit signed int
-                self._load_global_value(sym, reg, 4)
-            return
-        # label address?
-        if operand.startswith(".L"):
-            self._emit(f"  leaq {operand}(%rip), {reg}")
-            return
-        # fallback immediate 0
-        self._emit(f"  movq $0, {reg}")
+        return hit
 
     def _as_unsigned_type(self, ty: object) -> bool:
         """Check if a type is unsigned."""
         if ty is None:
             return False
         if isinstance(ty, str):
-            t = ty.strip()
-            return t.startswith("unsigned ")
+            return self._type_info(ty)[1]
         base = getattr(ty, "base", None)
         if isinstance(base, str):
             b = base.strip()
@@ -3802,6 +4484,11 @@ class CodeGenerator:
         """Return element size for T* pointer types."""
         if ptr_ty is None:
             return 8
+        if isinstance(ptr_ty, str):
+            return self._type_info(ptr_ty)[2]
+        return self._pointee_size_uncached(ptr_ty)
+
+    def _pointee_size_uncached(self, ptr_ty: object) -> int:
         if isinstance(ptr_ty, str):
             s = ptr_ty.strip()
         else:
@@ -3833,70 +4520,92 @@ class CodeGenerator:
         if not s or "*" not in s:
             return False
         # peel trailing '*'
-        while s.endswith("*"):
-            s = s[:-1]
-        return s.strip().startswith("unsigned ")
+        return s.rstrip("*").strip().startswith("unsigned ")
 
-    def _store_result(self, result: Optional[str], reg: str) -> None:
+    def _slot_store_size(self, slot: str) -> int:
+        """Width in bytes of a store into the stack slot of *slot*."""
+        return self._slot_kind(slot)[1]
+
+    def _store_imm(self, result: Optional[str], imm: str) -> bool:
+        """Store the immediate *imm* ("$k") straight into *result*'s stack
+        slot, without going through %rax.
+
+        Returns False (emitting nothing) when *result* is not a stack slot or
+        *imm* is not a plain integer that the store can encode, and True
+        without emitting anything when *result* is a temp that is never read.
+        """
         if result is None:
+            return False
+        if result in self._dead_temps:
+            return True
+        home = self._temp_regs.get(result)
+        off = self._slot_offset(result) if home is None else None
+        if off is None and home is None:
+            return False
+        try:
+            v = int(imm[1:])
+        except ValueError:
+            return False
+        if home is not None:
+            # Register temps hold full 64-bit values (their slots are 8 bytes).
+            if not (-(1 << 31) <= v < (1 << 31)):
+                return False
+            self._emit(f"  movq ${v}, {home}")
+            return True
+        size = self._slot_store_size(result)
+        bits = size * 8
+        # Truncate exactly like storing the low bytes of %rax would.
+        v = ((v + (1 << (bits - 1))) & ((1 << bits) - 1)) - (1 << (bits - 1))
+        if size == 8 and not (-(1 << 31) <= v < (1 << 31)):
+            # movq only takes a sign-extended 32-bit immediate.
+            return False
+        self._emit(f"  {_MOV_BY_SIZE[size]} ${v}, {_slot(off)}")
+        return True
+
+    def _slot_offset(self, sym: str) -> Optional[int]:
+        """Stack offset of *sym*: temps always have a slot (allocated on first
+        use), @names do if they are locals.  None for globals."""
+        off = self._locals.get(sym)
+        if off is None and sym.startswith("%t"):
+            off = self._ensure_local(sym)
+        return off
+
+    def _store_result(self, result: Optional[str], reg: str) -> None:
+        if result is None or result in self._dead_temps:
             return
-        if result.startswith("%t"):
-            off = self._ensure_local(result)
-            # Store with correct width based on type info.
-            ty = self._get_type_str(result)
-            b = ty.strip() if isinstance(ty, str) else ""
-            # IMPORTANT: pointer temps are 8-byte values.
-            if isinstance(b, str) and ("*" in b or b == "ptr"):
-                self._emit(f"  movq {reg}, -{off}(%rbp)")
+        # A slot's offset and width are fixed for the function, so each
+        # operand's %rax store line is formatted once and then reused.
+        if reg == "%rax":
+            line = self._rax_stores.get(result)
+            if line is not None:
+                self._emit(line)
                 return
-            if b == "char" or b.startswith("char ") or b == "unsigned char" or b.startswith("unsigned char"):
-                src = "%al" if reg == "%rax" else reg
-                self._emit(f"  movb {src}, -{off}(%rbp)")
-                return
-            if b == "short" or b == "short int" or b.startswith("short") or b == "unsigned short" or b.startswith("unsigned short"):
-                src = "%ax" if reg == "%rax" else reg
-                self._emit(f"  movw {src}, -{off}(%rbp)")
-                return
-            if b == "int" or b.startswith("int ") or b.startswith("enum ") or b == "unsigned int" or b.startswith("unsigned int"):
-                src = "%eax" if reg == "%rax" else reg
-                self._emit(f"  movl {src}, -{off}(%rbp)")
-                return
-            self._emit(f"  movq {reg}, -{off}(%rbp)")
+        home = self._temp_regs.get(result)
+        if home is not None:
+            line = f"  movq {reg}, {home}"
+            if reg == "%rax":
+                self._rax_stores[result] = line
+            self._emit(line)
+            return
+        off = self._slot_offset(result)
+        if off is not None:
+            size = self._slot_store_size(result)
+            if reg == "%rax":
+                line = self._rax_stores[result] = f"  {_MOV_BY_SIZE[size]} {_RAX_BY_SIZE[size]}, {_slot(off)}"
+            else:
+                line = f"  {_MOV_BY_SIZE[size]} {reg}, {_slot(off)}"
+            self._emit(line)
             return
         if result.startswith("@"):
-            # local if it has a slot; otherwise global
-            if self._is_local(result):
-                off = self._ensure_local(result)
-                ty = self._get_type_str(result)
-                b = ty.strip()
-                # IMPORTANT: pointers are always 8-byte values. Do not let
-                # prefix checks like `startswith("unsigned char")` treat
-                # "unsigned char*" as a 1-byte scalar.
-                if isinstance(b, str) and "*" in b:
-                    self._emit(f"  movq {reg}, -{off}(%rbp)")
-                    return
-                if b == "char" or b.startswith("char ") or b == "unsigned char" or b.startswith("unsigned char"):
-                    src = "%al" if reg == "%rax" else reg
-                    self._emit(f"  movb {src}, -{off}(%rbp)")
-                    return
-                if b == "short" or b == "short int" or b.startswith("short") or b == "unsigned short" or b.startswith("unsigned short"):
-                    src = "%ax" if reg == "%rax" else reg
-                    self._emit(f"  movw {src}, -{off}(%rbp)")
-                    return
-                if b == "int" or b.startswith("int ") or b.startswith("enum ") or b == "unsigned int" or b.startswith("unsigned int"):
-                    src = "%eax" if reg == "%rax" else reg
-                    self._emit(f"  movl {src}, -{off}(%rbp)")
-                    return
-                self._emit(f"  movq {reg}, -{off}(%rbp)")
-                return
+            # global
             sym = result[1:]
-            ty = getattr(self._sema_ctx, "global_types", {}).get(sym) if self._sema_ctx is not None else None
+            ty = self._global_types.get(sym)
             if isinstance(ty, str):
                 ty = self._resolve_type(ty)
             if isinstance(ty, str) and (ty.endswith("*") or "*" in ty):
                 self._store_global_value(sym, reg, 8)
             else:
-                self._store_global_value(sym, reg, 4)
+                self._store_global_value(sym, reg, self._global_scalar_width(ty)[0])
             return
 
     def _new_spill_name(self) -> str:
@@ -3906,8 +4615,9 @@ class CodeGenerator:
         return f"%t_spill_{seq}"
 
     def _ensure_local(self, sym: str, size: int = 8) -> int:
-        if sym in self._locals:
-            return self._locals[sym]
+        off = self._locals.get(sym)
+        if off is not None:
+            return off
 
 
         # If we discover a new user-local (@name) after the initial decl scan,
@@ -3931,17 +4641,7 @@ class CodeGenerator:
             # This still avoids emitting per-temp `subq $8, %rsp`.
             alloc = max(size, 8)
             if self._spill_used + alloc > self._spill_capacity:
-                grow = 256
-                if grow % 16 != 0:
-                    grow += 16 - (grow % 16)
-                self._spill_capacity += grow
-                self._stack_size += grow
-                # Update the already-emitted prologue frame size.
-                # Prologue is: push %rbp; mov %rsp,%rbp; subq $N,%rsp
-                for idx, line in enumerate(self.assembly_lines[:16]):
-                    if line.strip().startswith("subq $") and line.strip().endswith(", %rsp"):
-                        self.assembly_lines[idx] = f"  subq ${self._stack_size}, %rsp"
-                        break
+                self._grow_spill_area(alloc)
             self._spill_used += alloc
             # Spill slots live below all declared locals.
             # Place them at (locals_base + spill_used).
@@ -3952,43 +4652,35 @@ class CodeGenerator:
         # Late-introduced local (should be rare). Do NOT adjust %rsp in the body;
         # instead, conservatively assign a slot within the reserved spill area.
         if self._spill_used + 8 > self._spill_capacity:
-            grow = 256
-            if grow % 16 != 0:
-                grow += 16 - (grow % 16)
-            self._spill_capacity += grow
-            self._stack_size += grow
-            for idx, line in enumerate(self.assembly_lines[:16]):
-                if line.strip().startswith("subq $") and line.strip().endswith(", %rsp"):
-                    self.assembly_lines[idx] = f"  subq ${self._stack_size}, %rsp"
-                    break
+            self._grow_spill_area(8)
         self._spill_used += 8
         base = int(getattr(self, "_locals_base", 0))
         self._locals[sym] = base + self._spill_used
         return self._locals[sym]
 
     def _addr_of_symbol(self, sym: str, reg: str) -> None:
-        if sym.startswith("@"):  # local if known; otherwise global
-            # If this is a local, take address of its stack slot.
-            # Special-case arrays: '@a' represents the whole array object, whose
-            # stack slot is a header; the actual elements live at (slot + sizeof(type)).
-            if sym in self._locals:
-                off = self._ensure_local(sym)
-                ty = self._get_type_str(sym)
-                if isinstance(ty, str) and ty.strip().startswith("array("):
-                    # Local arrays live directly in their allocated region.
-                    # We store the array object at -off(%rbp) .. -(off-size+1)(%rbp).
-                    # The array's decay pointer should point to the first element, i.e. -off(%rbp).
-                    self._emit(f"  leaq -{off}(%rbp), {reg}")
-                    return
-                self._emit(f"  leaq -{off}(%rbp), {reg}")
-                return
-            self._load_global_addr(sym[1:], reg)
+        # Stack locals and temps: the address of the slot.  Local arrays
+        # live directly in their allocated region too, so their decay
+        # pointer (the first element) is also -off(%rbp).
+        off = self._direct_base(sym)
+        if off is not None:
+            self._emit(f"  leaq {_slot(off)}, {reg}")
             return
+        # @name without a slot is a global.
+        self._load_global_addr(sym[1:] if sym.startswith("@") else sym, reg)
+
+    def _direct_base(self, sym: str) -> Optional[int]:
+        """Frame offset of an object _addr_of_symbol would address as
+        -off(%rbp) (a stack local or temp), else None.
+
+        Lets member/element accesses at a constant offset use
+        disp(%rbp) directly instead of leaq + (%rax).
+        """
+        if sym.startswith("@"):
+            return self._locals.get(sym)
         if sym.startswith("%t"):
-            off = self._ensure_local(sym)
-            self._emit(f"  leaq -{off}(%rbp), {reg}")
-            return
-        self._load_global_addr(sym, reg)
+            return self._ensure_local(sym)
+        return None
 
     def _resolve_member_offset(self, base_sym: str, member: str) -> int:
         """Return offset for `base_sym.member` using semantic layouts when available."""
@@ -3999,8 +4691,13 @@ class CodeGenerator:
         """Return size in bytes for a type string.
 
         Uses CType for struct/union layout lookup, falls back to TargetInfo
-        for scalars and pointers.
+        for scalars and pointers.  Cached per type string via _type_info.
         """
+        if not isinstance(ty, str):
+            return self._type_size_uncached(ty)
+        return self._type_info(ty)[0]
+
+    def _type_size_uncached(self, ty: str) -> int:
         b = self._resolve_type(ty)
         if b.startswith("struct ") or b.startswith("union "):
             # CType-based path for struct/union: parse to CType, look up layout
@@ -4010,18 +4707,25 @@ class CodeGenerator:
                 if sz > 0:
                     return sz
             # String-based fallback
-            layout = getattr(self._sema_ctx, "layouts", {}).get(b)
+            layout = self._layouts.get(b)
             return int(getattr(layout, "size", 0) or 0) if layout is not None else 0
         return self._target.sizeof(b)
 
     def _resolve_member(self, base_sym: str, member: str) -> Tuple[int, int]:
         """Return (offset, size_bytes) for `base_sym.member`."""
+        key = (base_sym, member)
+        hit = self._member_offsets.get(key)
+        if hit is None:
+            hit = self._member_offsets[key] = self._lookup_member(base_sym, member)
+        return hit
+
+    def _lookup_member(self, base_sym: str, member: str) -> Tuple[int, int]:
         # CType-based path: use symbol table to get struct tag, look up layout
         struct_ct = self._get_base_struct_ctype(base_sym)
         if struct_ct is not None and self._sema_ctx is not None:
             tag = self._ctype_struct_tag(struct_ct)
             if tag:
-                layout = getattr(self._sema_ctx, "layouts", {}).get(tag)
+                layout = self._layouts.get(tag)
                 if layout is not None:
                     off = layout.member_offsets.get(member)
                     sz = layout.member_sizes.get(member)
@@ -4030,9 +4734,9 @@ class CodeGenerator:
         # String-based fallback
         decl_ty = None
         if not decl_ty and isinstance(base_sym, str) and base_sym.startswith("@") and self._sema_ctx is not None:
-            decl_ty = getattr(self._sema_ctx, "global_types", {}).get(base_sym[1:])
-        if self._sema_ctx is not None and decl_ty and hasattr(self._sema_ctx, "layouts"):
-            layouts = getattr(self._sema_ctx, "layouts")
+            decl_ty = self._global_types.get(base_sym[1:])
+        if self._sema_ctx is not None and decl_ty:
+            layouts = self._layouts
             resolved_ty = self._resolve_type(decl_ty)
             layout = layouts.get(resolved_ty)
             if layout is not None:
@@ -4048,12 +4752,19 @@ class CodeGenerator:
 
     def _resolve_bitfield(self, base_sym: str, member: str):
         """Return (bit_offset, bit_width) if member is a bit-field, else None."""
+        key = (base_sym, member)
+        if key in self._member_bitfields:
+            return self._member_bitfields[key]
+        hit = self._member_bitfields[key] = self._lookup_bitfield(base_sym, member)
+        return hit
+
+    def _lookup_bitfield(self, base_sym: str, member: str):
         # CType-based path: use symbol table to get struct tag, look up layout
         struct_ct = self._get_base_struct_ctype(base_sym)
         if struct_ct is not None and self._sema_ctx is not None:
             tag = self._ctype_struct_tag(struct_ct)
             if tag:
-                layout = getattr(self._sema_ctx, "layouts", {}).get(tag)
+                layout = self._layouts.get(tag)
                 if layout and getattr(layout, 'bit_fields', None) and member in layout.bit_fields:
                     members = getattr(layout, '_bf_info', None)
                     if members and member in members:
@@ -4061,10 +4772,10 @@ class CodeGenerator:
         # String-based fallback
         decl_ty = None
         if not decl_ty and isinstance(base_sym, str) and base_sym.startswith("@") and self._sema_ctx is not None:
-            decl_ty = getattr(self._sema_ctx, "global_types", {}).get(base_sym[1:])
+            decl_ty = self._global_types.get(base_sym[1:])
         if self._sema_ctx is not None and decl_ty:
             resolved_ty = self._resolve_type(decl_ty)
-            layout = getattr(self._sema_ctx, "layouts", {}).get(resolved_ty)
+            layout = self._layouts.get(resolved_ty)
             if layout and getattr(layout, 'bit_fields', None) and member in layout.bit_fields:
                 members = getattr(layout, '_bf_info', None)
                 if members and member in members:
@@ -4074,8 +4785,12 @@ class CodeGenerator:
     # Strings
 
     def _intern_string(self, s: str) -> str:
-        if s in self._string_pool:
-            return self._string_pool[s]
+        # A plain dict probe is already the cheapest dedup: str caches its
+        # hash, and a hit compares by identity before contents.  sys.intern
+        # would only add a second probe of the interpreter's intern table.
+        lbl = self._string_pool.get(s)
+        if lbl is not None:
+            return lbl
         lbl = f".LC{self._string_counter}"
         self._string_counter += 1
         self._string_pool[s] = lbl
@@ -4083,21 +4798,15 @@ class CodeGenerator:
 
     def _intern_float_literal(self, value: float, fp_type: str) -> str:
         if fp_type == "float":
-            bits = _struct.pack('<f', value).hex()
-        elif fp_type == "long double":
-            bits = _struct.pack('<d', value).hex()
-            key = f"double:{bits}"
-            if key in self._float_pool:
-                return self._float_pool[key]
-            lbl = f".LF{self._float_counter}"
-            self._float_counter += 1
-            self._float_pool[key] = lbl
-            return lbl
+            key = "float:" + _struct.pack('<f', value).hex()
         else:
-            bits = _struct.pack('<d', value).hex()
-        key = f"{fp_type}:{bits}"
-        if key in self._float_pool:
-            return self._float_pool[key]
+            # long double literals share the double pool entry.
+            if fp_type == "long double":
+                fp_type = "double"
+            key = f"{fp_type}:{_struct.pack('<d', value).hex()}"
+        lbl = self._float_pool.get(key)
+        if lbl is not None:
+            return lbl
         lbl = f".LF{self._float_counter}"
         self._float_counter += 1
         self._float_pool[key] = lbl
@@ -4109,31 +4818,28 @@ class CodeGenerator:
         All non-printable and non-ASCII bytes are escaped using octal
         notation (\\ooo) which GNU as accepts universally.
         """
-        out = []
-        for ch in s:
-            cp = ord(ch)
-            if ch == '\\':
-                out.append('\\\\')
-            elif ch == '"':
-                out.append('\\"')
-            elif ch == '\n':
-                out.append('\\n')
-            elif ch == '\t':
-                out.append('\\t')
-            elif ch == '\r':
-                out.append('\\r')
-            elif ch == '\0':
-                out.append('\\0')
-            elif 32 <= cp <= 126:
-                out.append(ch)
-            else:
-                # Non-ASCII or non-printable: use octal escape
-                # For multi-byte UTF-8, encode each byte separately
-                for b in ch.encode('utf-8'):
-                    out.append(f'\\{b:03o}')
-        return '"' + ''.join(out) + '"'
-
-    def _emit(self, line: str) -> None:
-        self.assembly_lines.append(line)
+        if not s.isascii():
+            # Escape multi-byte UTF-8 one byte at a time: latin-1 maps each
+            # byte back to the code point the table is keyed by.
+            s = s.encode('utf-8').decode('latin-1')
+        return '"' + s.translate(_GAS_ESCAPES) + '"'
+
+    # _emit (one output line) is by far the most frequent call in the
+    # generator.  Rather than a method wrapping list.append, it is bound to
+    # the current buffer's append whenever assembly_lines is (re)assigned,
+    # which saves a Python frame per emitted line.  _emit_lines likewise
+    # appends a precomposed multi-line template in one call.
+    _emit: Callable[[str], None]
+    _emit_lines: Callable[[Tuple[str, ...]], None]
+
+    @property
+    def assembly_lines(self) -> List[str]:
+        return self._assembly_lines
+
+    @assembly_lines.setter
+    def assembly_lines(self, lines: List[str]) -> None:
+        self._assembly_lines = lines
+        self._emit = lines.append
+        self._emit_lines = lines.extend
 
     
@@ -6,8 +6,10 @@ Orchestrates the compilation pipeline.
 
 from __future__ import annotations
 
-from typing import Optional, List
+from typing import Iterator, Optional, List
 from dataclasses import dataclass
+import contextlib
+import gc
 import os
 import subprocess
 import tempfile
@@ -20,7 +22,27 @@ from pycc.ir import IRGenerator
 from pycc.optimizer import Optimizer
 from pycc.codegen import CodeGenerator
 from pycc.gcc_extensions import strip_gcc_extensions
-from pycc.toolchain import Toolchain
+from pycc.toolchain import Toolchain, memfd_object, staging_dir
+from pycc.cache import ObjectCache
+
+
+@contextlib.contextmanager
+def _gc_paused() -> Iterator[None]:
+    """Suspend the cyclic garbage collector for the duration of the block.
+
+    Lexing and parsing allocate one object per token/node and free almost
+    nothing, so every generation-0 collection they trigger walks an
+    ever-growing young generation for no gain.  The trees are acyclic;
+    anything cyclic is still reclaimed by the next collection.
+    """
+    if not gc.isenabled():
+        yield
+        return
+    gc.disable()
+    try:
+        yield
+    finally:
+        gc.enable()
 
 
 @dataclass
@@ -52,6 +74,8 @@ class Compiler:
         wall: bool = False,
         werror: bool = False,
         pic: bool = False,
+        cache: Optional[ObjectCache] = None,
+        linker: Optional[str] = None,
     ):
         self.optimize = optimize
         self.wall = wall
@@ -64,7 +88,10 @@ class Compiler:
         self._use_system_cpp = use_system_cpp
 
         # Toolchain (assembler + linker).
-        self._toolchain = Toolchain()
+        self._toolchain = Toolchain(linker=linker)
+
+        # Optional on-disk cache for .s/.o outputs (see pycc.cache).
+        self._cache = cache
 
     @staticmethod
     def _fmt_warning(raw: str, source_path: str) -> str:
@@ -139,16 +166,56 @@ class Compiler:
                 # to match existing tests.
                 return CompilationResult(success=True, output_file=None, assembly=source_code)
 
-            return self.compile_code(source_code, output_file, source_path=source_file)
+            cache_key = self._cache_key(source_code, source_file, output_file)
+            if cache_key is not None:
+                ext = os.path.splitext(output_file)[1]
+                if self._cache.fetch(cache_key, ext, output_file):
+                    return CompilationResult(success=True, output_file=output_file)
+
+            res = self.compile_code(source_code, output_file, source_path=source_file)
+            # Only clean, warning-free results are cached so that a hit never
+            # hides diagnostics the user would otherwise have seen.
+            if cache_key is not None and res.success and not res.warnings:
+                self._cache.store(cache_key, os.path.splitext(output_file)[1], output_file)
+            return res
         except IOError as e:
             return CompilationResult(
                 success=False,
                 errors=[f"Failed to read source file: {e}"]
             )
 
+    def _cache_key(self, source_code: str, source_file: str, output_file: Optional[str]) -> Optional[str]:
+        """Return the object-cache key for this compile, or None to bypass.
+
+        Only .s/.o outputs are cached; sidecar env vars (PYCC_ASSEMBLY_OUT,
+        PYCC_OBJECT_OUT, PYCC_KEEP_TEMPS) need a real compile to produce
+        their files, so they disable the cache as well.
+        """
+        if self._cache is None or not output_file:
+            return None
+        ext = os.path.splitext(output_file)[1]
+        if ext not in (".s", ".o"):
+            return None
+        for var in ("PYCC_ASSEMBLY_OUT", "PYCC_OBJECT_OUT", "PYCC_KEEP_TEMPS"):
+            if os.environ.get(var):
+                return None
+        options = (
+            os.path.abspath(source_file),
+            self.optimize,
+            self.pic,
+            self.wall,
+            self.werror,
+            self._toolchain.assembler,
+        )
+        return self._cache.key(source_code, out_ext=ext, options=options)
+
     def compile_files(self, source_files: List[str], output_file: str) -> CompilationResult:
         """Compile and link multiple translation units.
 
+        The Compiler itself holds no per-TU state (each stage is a fresh
+        instance per call), so memory stays bounded by the largest TU
+        rather than growing with the number of inputs.
+
         Current behavior:
         - Always compiles each input to a temporary `.o` using `compile_file(..., .o)`.
         - Links all objects into an executable at `output_file` using the existing
@@ -167,7 +234,7 @@ class Compiler:
             )
 
         keep_temps = os.environ.get("PYCC_KEEP_TEMPS") in {"1", "true", "yes"}
-        td_ctx = tempfile.TemporaryDirectory(prefix="pycc_mf_") if not keep_temps else None
+        td_ctx = tempfile.TemporaryDirectory(prefix="pycc_mf_", dir=staging_dir()) if not keep_temps else None
         td = td_ctx.name if td_ctx is not None else tempfile.mkdtemp(prefix="pycc_mf_")
         try:
             # Pre-link cross-TU validation (C89 subset): reject incompatible
@@ -262,6 +329,10 @@ class Compiler:
                 glink = getattr(sema_ctx, "global_linkage", {}) or {}
                 fsigs = getattr(sema_ctx, "function_sigs", {}) or {}
                 fptys = getattr(sema_ctx, "function_param_types", {}) or {}
+                # Only the global tables above are needed across TUs; drop the
+                # token list, AST and semantic context now rather than keeping
+                # them alive while the next TU is parsed.
+                del src_text, tokens, ast, sema_ctx
 
                 for name, ty in gtypes.items():
                     # Functions: check signature compatibility across TUs (subset).
@@ -534,7 +605,7 @@ class Compiler:
                         return CompilationResult(success=False, errors=[f"Failed to write assembly output: {e}"])
 
             elif ext == ".o":
-                with tempfile.TemporaryDirectory() as td:
+                with tempfile.TemporaryDirectory(dir=staging_dir()) as td:
                     s_path = os.path.join(td, "out.s")
                     try:
                         with open(s_path, 'w') as f:
@@ -562,11 +633,15 @@ class Compiler:
                 # link to ELF using binutils (as + ld) and a C runtime (glibc dev preferred; fallback newlib)
                 # Keep temp files if requested to simplify debugging.
                 keep_temps = os.environ.get("PYCC_KEEP_TEMPS") in {"1", "true", "yes"}
-                td_ctx = tempfile.TemporaryDirectory() if not keep_temps else None
+                td_ctx = tempfile.TemporaryDirectory(dir=staging_dir()) if not keep_temps else None
                 td = td_ctx.name if td_ctx is not None else tempfile.mkdtemp(prefix="pycc-")
+                # On Linux the object goes into a memfd that as/ld reach via
+                # /proc/self/fd, so it never hits the filesystem at all.
+                obj_fd = memfd_object("out.o") if not keep_temps else None
+                pass_fds = (obj_fd,) if obj_fd is not None else ()
                 try:
                     s_path = os.path.join(td, "out.s")
-                    o_path = os.path.join(td, "out.o")
+                    o_path = f"/proc/self/fd/{obj_fd}" if obj_fd is not None else os.path.join(td, "out.o")
                     try:
                         with open(s_path, 'w') as f:
                             f.write(assembly)
@@ -580,7 +655,7 @@ class Compiler:
                             except OSError as e:
                                 return CompilationResult(success=False, errors=[f"Failed to write assembly output: {e}"])
 
-                        self._toolchain.run_assemble(s_path, o_path)
+                        self._toolchain.run_assemble(s_path, o_path, pass_fds=pass_fds)
 
                         # Optionally keep a copy of the generated object.
                         obj_out = os.environ.get("PYCC_OBJECT_OUT")
@@ -591,7 +666,7 @@ class Compiler:
                                 return CompilationResult(success=False, errors=[f"Failed to write object output: {e}"])
 
                         link_cmd = self._toolchain.build_link_cmd([o_path], out)
-                        self._toolchain.run_link(link_cmd)
+                        self._toolchain.run_link(link_cmd, pass_fds=pass_fds)
                     except (IOError, subprocess.CalledProcessError) as e:
                         if isinstance(e, subprocess.CalledProcessError):
                             detail = getattr(e, "stderr", None) or getattr(e, "output", None)
@@ -602,6 +677,8 @@ class Compiler:
                                 )
                         return CompilationResult(success=False, errors=[f"Linking failed: {e}"])
                 finally:
+                    if obj_fd is not None:
+                        os.close(obj_fd)
                     if td_ctx is not None:
                         td_ctx.cleanup()
         
@@ -616,7 +693,8 @@ class Compiler:
     def get_tokens(self, source_code: str) -> List[Token]:
         """Get tokens from source code"""
         lexer = Lexer(source_code)
-        tokens = lexer.tokenize()
+        with _gc_paused():
+            tokens = lexer.tokenize()
         if lexer.has_errors():
             errors = lexer.get_errors()
             raise RuntimeError("\n".join(str(e) for e in errors))
@@ -625,7 +703,8 @@ class Compiler:
     def get_ast(self, tokens: List[Token]):
         """Get AST from tokens"""
         parser = Parser(tokens)
-        return parser.parse()
+        with _gc_paused():
+            return parser.parse()
     
     def analyze_semantics(self, ast):
         """Perform semantic analysis"""
@@ -465,6 +465,7 @@ class IRGenerator:
         self._shadow_counter = 0
         self._sym_table: Optional[TypedSymbolTable] = None
         self._target = None  # resolved lazily from sema_ctx in generate()
+        self._str_literals: Dict[str, str] = {}
 
     def _sizeof(self, ty: object) -> int:
         """Return sizeof(ty) using the module-level _type_size with sema_ctx.
@@ -1472,6 +1473,8 @@ class IRGenerator:
         # Used for pointer-to-row decay where (p+1) advances by sizeof(row).
         self._ptr_step_bytes: dict[str, int] = {}
         self._enum_constants: dict[str, int] = {}
+        # Canonical object per distinct string literal text (see str_const).
+        self._str_literals: dict[str, str] = {}
         # Maps local variable name to its AST Type object for type lookups.
         self._local_ast_types: dict = {}
         if self._sema_ctx is not None:
@@ -3933,8 +3936,11 @@ class IRGenerator:
             _str_ctype = PointerType(kind=TypeKind.POINTER,
                                      pointee=IntegerType(kind=TypeKind.CHAR))
             t = self._new_temp_typed(_str_ctype)
-            # encode string in IR as str_const with result temp
-            self.instructions.append(IRInstruction(op="str_const", result=t, operand1=expr.value))
+            # encode string in IR as str_const with result temp.  Equal
+            # literals share one str object, so codegen's string pool hits
+            # by identity instead of comparing the text again.
+            value = self._str_literals.setdefault(expr.value, expr.value)
+            self.instructions.append(IRInstruction(op="str_const", result=t, operand1=value))
             # Record that this temp is a pointer (char*).
             self._var_types[t] = "char*"
             return t
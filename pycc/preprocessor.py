@@ -1,12 +1,13 @@
 from __future__ import annotations
 
+import io
 import os
 import re
 import subprocess
 import shutil
 from datetime import datetime
 from dataclasses import dataclass, field
-from typing import Dict, FrozenSet, List, Optional, Set, Tuple, Union
+from typing import Callable, Dict, FrozenSet, Iterator, List, Optional, Set, TextIO, Tuple, Union
 
 
 # ---------------------------------------------------------------------------
@@ -373,7 +374,19 @@ def _parse_gcc_include_paths(gcc_stderr: str) -> List[str]:
     return paths
 
 
+# gcc's include search list is fixed for the life of the process; probing
+# spawns two gcc subprocesses, so do it at most once.
+_system_include_paths: Optional[List[str]] = None
+
+
 def _probe_system_include_paths() -> List[str]:
+    global _system_include_paths
+    if _system_include_paths is None:
+        _system_include_paths = _query_gcc_include_paths()
+    return list(_system_include_paths)
+
+
+def _query_gcc_include_paths() -> List[str]:
     gcc = shutil.which("gcc")
     if not gcc:
         return []
@@ -424,6 +437,117 @@ def _probe_system_include_paths() -> List[str]:
     return out
 
 
+# Classifies a logical line in one match: group 1 is the directive keyword
+# (None for a null directive or a GNU line marker such as `# 12 "f.c"`).
+# Lines that do not match are ordinary text and skip directive handling.
+_DIRECTIVE_RE = re.compile(r"^\s*#\s*([A-Za-z_][A-Za-z0-9_]*)?")
+
+# Any predefined macro handled by _expand_builtin_macros.
+_BUILTIN_MACRO_RE = re.compile(r"__(?:LINE|FILE|STDC|DATE|TIME|COUNTER)__")
+
+# Maximal word runs.  Every identifier token in a line is one of these, so
+# "no word is a macro name" proves a line has nothing to expand.
+_WORD_RE = re.compile(r"\w+")
+
+# Word runs used as a call, `NAME (`; group 1 is NAME.
+_FN_CALL_RE = re.compile(r"\b(\w+)\s*\(")
+
+
+@dataclass
+class _SourceFile:
+    """Physical lines of a source file, cached by path (see _read_source)."""
+    mtime_ns: int
+    size: int
+    lines: List[str]
+    # Include-guard macro when the whole file is `#ifndef G ... #endif`
+    # (multiple-include optimization); None if unknown or not guarded.
+    guard: Optional[str] = None
+
+
+@dataclass
+class _IncludeFrame:
+    """One open file on the preprocessor's include stack.
+
+    Holds everything needed to suspend the file at an ``#include`` and
+    resume it afterwards (see Preprocessor._preprocess_file).
+    """
+    abspath: str
+    base_dir: str
+    base_name: str
+    src: _SourceFile
+    lines: Iterator[str]
+    old_counter: int
+    # Logical line/file are affected by `#line` directives.
+    logical_filename: str
+    logical_line_base: Optional[int] = None
+    include_stack: List[bool] = field(default_factory=lambda: [True])
+    taken_stack: List[bool] = field(default_factory=list)
+    in_block_comment: bool = False
+    # Include-guard detection, driven by the real conditional stack:
+    # 0 = expecting `#ifndef G`, 1 = inside it, 2 = closed by its
+    # `#endif`, -1 = something else appeared at file level.
+    guard_name: Optional[str] = None
+    guard_state: int = 0
+    logical_line_no: int = 0
+
+
+# Join physical lines with trailing backslash for directives (subset).
+# This is needed for multi-line macros like:
+#   #define A 1 \
+#             + 2
+# and for header-names split across lines:
+#   #include "a\
+#            .h"
+def _logical_lines(lines: List[str]) -> Iterator[str]:
+    # Generator: yields one logical line at a time instead of
+    # building a second list the size of the file.
+    n = len(lines)
+    i = 0
+    while i < n:
+        line = lines[i]
+        if line.lstrip().startswith("#"):
+            joined = line
+            while joined.rstrip("\n").endswith("\\") and i + 1 < n:
+                # Line splicing: remove the backslash-newline pair.
+                # For directives we keep behavior simple by inserting a single space
+                # to avoid accidental token pasting.
+                joined = joined.rstrip("\n")
+                joined = joined[:-1]  # remove '\\'
+                i += 1
+                joined += " " + lines[i].lstrip(" \t").rstrip("\n")
+                joined += "\n"
+            yield joined
+            i += 1
+            continue
+        yield line
+        i += 1
+
+
+# abspath -> _SourceFile.  Entries are validated against st_mtime_ns/st_size
+# on every lookup, so edits between compilations are always picked up.
+_SOURCE_CACHE: Dict[str, _SourceFile] = {}
+
+
+def _read_source(abspath: str) -> _SourceFile:
+    """Return the trigraph-replaced physical lines of *abspath*.
+
+    Raises OSError if the file cannot be read.
+    """
+    st = os.stat(abspath)
+    ent = _SOURCE_CACHE.get(abspath)
+    if ent is not None and ent.mtime_ns == st.st_mtime_ns and ent.size == st.st_size:
+        return ent
+    with open(abspath, "r", encoding="utf-8", buffering=1 << 20) as f:
+        raw_text = f.read()
+    # Translation phase 1: trigraph replacement (C89 §3.1.1)
+    raw_text = Preprocessor._replace_trigraphs(raw_text)
+    # splitlines() (not file iteration) keeps the historical line numbering,
+    # which also breaks at form feeds and other Unicode line boundaries.
+    ent = _SourceFile(st.st_mtime_ns, st.st_size, raw_text.splitlines(True))
+    _SOURCE_CACHE[abspath] = ent
+    return ent
+
+
 @dataclass
 class PreprocessResult:
     success: bool
@@ -449,38 +573,41 @@ class Preprocessor:
     - multiline macros, comments, full tokenization, variadics, etc.
     """
 
+    # Directive patterns are constants: compile them once per process (as
+    # class attributes) rather than on every Preprocessor construction.
+    _include_quote_re = re.compile(r"^\s*#\s*include\s*\"([^\"]+)\"\s*$")
+    _include_angle_re = re.compile(r"^\s*#\s*include\s*<([^>]+)>\s*$")
+    _include_any_re = re.compile(r"^\s*#\s*include\s+(.+?)\s*$")
+    _include_next_re = re.compile(r"^\s*#\s*include_next\b.*$")
+    _define_re = re.compile(r"^\s*#\s*define\s+([A-Za-z_][A-Za-z0-9_]*)\s*(.*)$")
+    _undef_re = re.compile(r"^\s*#\s*undef\s+([A-Za-z_][A-Za-z0-9_]*)\s*$")
+    _ifdef_re = re.compile(r"^\s*#\s*ifdef\s+([A-Za-z_][A-Za-z0-9_]*)\s*$")
+    _ifndef_re = re.compile(r"^\s*#\s*ifndef\s+([A-Za-z_][A-Za-z0-9_]*)\s*$")
+    _if_name_re = re.compile(r"^\s*#\s*if\s+([A-Za-z_][A-Za-z0-9_]*)\s*$")
+    _if_defined_re = re.compile(
+        r"^\s*#\s*if\s+(!\s*)?defined\s*(?:\(\s*([A-Za-z_][A-Za-z0-9_]*)\s*\)|([A-Za-z_][A-Za-z0-9_]*))\s*$"
+    )
+    _if_expr_re = re.compile(r"^\s*#\s*if\s+(.+?)\s*$")
+    _if0_re = re.compile(r"^\s*#\s*if\s+0\s*$")
+    _if1_re = re.compile(r"^\s*#\s*if\s+1\s*$")
+    _elif0_re = re.compile(r"^\s*#\s*elif\s+0\s*$")
+    _elif1_re = re.compile(r"^\s*#\s*elif\s+1\s*$")
+    _elif_name_re = re.compile(r"^\s*#\s*elif\s+([A-Za-z_][A-Za-z0-9_]*)\s*$")
+    _elif_defined_re = re.compile(
+        r"^\s*#\s*elif\s+(!\s*)?defined\s*(?:\(\s*([A-Za-z_][A-Za-z0-9_]*)\s*\)|([A-Za-z_][A-Za-z0-9_]*))\s*$"
+    )
+    _elifdef_re = re.compile(r"^\s*#\s*elifdef\s+([A-Za-z_][A-Za-z0-9_]*)\s*$")
+    _elifndef_re = re.compile(r"^\s*#\s*elifndef\s+([A-Za-z_][A-Za-z0-9_]*)\s*$")
+    _elif_expr_re = re.compile(r"^\s*#\s*elif\s+(.+?)\s*$")
+    _else_re = re.compile(r"^\s*#\s*else\s*$")
+    _endif_re = re.compile(r"^\s*#\s*endif\s*$")
+    _line_re = re.compile(r"^\s*#\s*line\b.*$")
+    _pragma_once_re = re.compile(r"^\s*#\s*pragma\s+once\s*$")
+    _pragma_re = re.compile(r"^\s*#\s*pragma\b.*$")
+    _error_re = re.compile(r"^\s*#\s*error\b(.*)$")
+    _warning_re = re.compile(r"^\s*#\s*warning\b(.*)$")
+
     def __init__(self, *, include_paths: Optional[List[str]] = None) -> None:
-        self._include_quote_re = re.compile(r"^\s*#\s*include\s*\"([^\"]+)\"\s*$")
-        self._include_angle_re = re.compile(r"^\s*#\s*include\s*<([^>]+)>\s*$")
-        self._include_any_re = re.compile(r"^\s*#\s*include\s+(.+?)\s*$")
-        self._include_next_re = re.compile(r"^\s*#\s*include_next\b.*$")
-        self._define_re = re.compile(r"^\s*#\s*define\s+([A-Za-z_][A-Za-z0-9_]*)\s*(.*)$")
-        self._undef_re = re.compile(r"^\s*#\s*undef\s+([A-Za-z_][A-Za-z0-9_]*)\s*$")
-        self._ifdef_re = re.compile(r"^\s*#\s*ifdef\s+([A-Za-z_][A-Za-z0-9_]*)\s*$")
-        self._ifndef_re = re.compile(r"^\s*#\s*ifndef\s+([A-Za-z_][A-Za-z0-9_]*)\s*$")
-        self._if_name_re = re.compile(r"^\s*#\s*if\s+([A-Za-z_][A-Za-z0-9_]*)\s*$")
-        self._if_defined_re = re.compile(
-            r"^\s*#\s*if\s+(!\s*)?defined\s*(?:\(\s*([A-Za-z_][A-Za-z0-9_]*)\s*\)|([A-Za-z_][A-Za-z0-9_]*))\s*$"
-        )
-        self._if_expr_re = re.compile(r"^\s*#\s*if\s+(.+?)\s*$")
-        self._if0_re = re.compile(r"^\s*#\s*if\s+0\s*$")
-        self._if1_re = re.compile(r"^\s*#\s*if\s+1\s*$")
-        self._elif0_re = re.compile(r"^\s*#\s*elif\s+0\s*$")
-        self._elif1_re = re.compile(r"^\s*#\s*elif\s+1\s*$")
-        self._elif_name_re = re.compile(r"^\s*#\s*elif\s+([A-Za-z_][A-Za-z0-9_]*)\s*$")
-        self._elif_defined_re = re.compile(
-            r"^\s*#\s*elif\s+(!\s*)?defined\s*(?:\(\s*([A-Za-z_][A-Za-z0-9_]*)\s*\)|([A-Za-z_][A-Za-z0-9_]*))\s*$"
-        )
-        self._elifdef_re = re.compile(r"^\s*#\s*elifdef\s+([A-Za-z_][A-Za-z0-9_]*)\s*$")
-        self._elifndef_re = re.compile(r"^\s*#\s*elifndef\s+([A-Za-z_][A-Za-z0-9_]*)\s*$")
-        self._elif_expr_re = re.compile(r"^\s*#\s*elif\s+(.+?)\s*$")
-        self._else_re = re.compile(r"^\s*#\s*else\s*$")
-        self._endif_re = re.compile(r"^\s*#\s*endif\s*$")
-        self._line_re = re.compile(r"^\s*#\s*line\b.*$")
-        self._pragma_once_re = re.compile(r"^\s*#\s*pragma\s+once\s*$")
-        self._pragma_re = re.compile(r"^\s*#\s*pragma\b.*$")
-        self._error_re = re.compile(r"^\s*#\s*error\b(.*)$")
-        self._warning_re = re.compile(r"^\s*#\s*warning\b(.*)$")
         self._counter = 0
         self._pragma_once_files: set[str] = set()
         user_paths = [os.path.abspath(p) for p in (include_paths or [])]
@@ -499,6 +626,18 @@ class Preprocessor:
         # name -> (params, body, is_variadic)
         self._fn_macros: Dict[str, Tuple[List[str], str, bool]] = {}
 
+        # Bumped on every #define/#undef; derived tables (self-reference
+        # graphs) are rebuilt only when it changes.
+        self._macros_version = 0
+        self._fn_refs_cache: Optional[Dict[str, Set[str]]] = None
+        self._fn_refs_cache_key = -1
+
+        # Per-run path caches (reset by preprocess_to; the cwd could change
+        # between runs): path -> (abspath, dirname, basename), and
+        # (header-name, search paths) -> resolved include file.
+        self._path_info: Dict[str, Tuple[str, str, str]] = {}
+        self._resolved_includes: Dict[Tuple[str, Tuple[str, ...]], str] = {}
+
     def _parse_header_name_from_include_operand(self, operand: str) -> Optional[Tuple[str, str]]:
         """Parse an include operand into (kind, name).
 
@@ -1091,10 +1230,32 @@ class Preprocessor:
             raise RuntimeError(f"unsupported #if expression token: {tok!r}")
 
     def preprocess(self, path: str, *, initial_macros: Optional[Dict[str, str]] = None) -> PreprocessResult:
+        buf = io.StringIO()
+        res = self.preprocess_to(path, buf, initial_macros=initial_macros)
+        if res.success:
+            res.text = buf.getvalue()
+        return res
+
+    def preprocess_to(
+        self,
+        path: str,
+        out: TextIO,
+        *,
+        initial_macros: Optional[Dict[str, str]] = None,
+    ) -> PreprocessResult:
+        """Preprocess *path*, writing the result to the text stream *out*.
+
+        Output is produced incrementally as files are walked, so memory use
+        does not grow with the size of the translation unit.  On failure
+        *out* may already hold a partial result; ``text`` is always empty.
+        """
         try:
             macros = dict(initial_macros or {})
-            text = self._preprocess_file(path, stack=[], macros=macros)
-            return PreprocessResult(success=True, text=text)
+            self._macros_version += 1
+            self._path_info = {}
+            self._resolved_includes = {}
+            self._preprocess_file(path, stack={}, macros=macros, out=out)
+            return PreprocessResult(success=True)
         except RuntimeError as e:
             msg = str(e)
             if not re.match(r"^[^:\n]+:\d+: ", msg):
@@ -1108,50 +1269,25 @@ class Preprocessor:
 
     @classmethod
     def _replace_trigraphs(cls, text: str) -> str:
+        # Every trigraph starts with "??"; most files contain none, so one
+        # C-level scan saves nine full-text replace passes.
+        if "??" not in text:
+            return text
         for tri, repl in cls._TRIGRAPHS.items():
             text = text.replace(tri, repl)
         return text
 
-    def _preprocess_file(self, path: str, stack: List[str], macros: Dict[str, str]) -> str:
-        abspath = os.path.abspath(path)
-        if abspath in self._pragma_once_files:
-            return ""
-        if abspath in stack:
-            raise RuntimeError(f"{os.path.basename(abspath)}:1: include cycle detected: {abspath}")
-
-        # Per-file __COUNTER__ semantics: save and reset the instance counter
-        # while preprocessing this file so each file's __COUNTER__ starts at 0.
-        old_counter = getattr(self, "_counter", 0)
-        self._counter = 0
-
-        stack.append(abspath)
-        try:
-            raw_text = open(abspath, "r", encoding="utf-8").read()
-        except OSError as e:
-            raise RuntimeError(f"{os.path.basename(path)}:1: cannot read {path}: {e}")
-
-        # Translation phase 1: trigraph replacement (C89 §3.1.1)
-        raw_text = self._replace_trigraphs(raw_text)
-        raw = raw_text.splitlines(True)
-
-        out_lines: List[str] = []
-        base_dir = os.path.dirname(abspath)
-
-        # Emit line marker at the start of included files so the lexer
-        # knows which source file subsequent tokens belong to.
-        # Skip for the top-level file (stack depth 1) since its lines
-        # are already correct.
-        if len(stack) > 1:
-            out_lines.append(f'# 1 "{os.path.basename(abspath)}"\n')
-
-        # Logical line/file are affected by `#line` directives.
-        logical_filename = os.path.basename(abspath)
-        logical_line_base: Optional[int] = None
-
-        include_stack: List[bool] = [True]
-        taken_stack: List[bool] = []
-
-        in_block_comment = False
+    def _preprocess_file(self, path: str, stack: Dict[str, None], macros: Dict[str, str], out: TextIO) -> None:
+        # `stack` is the active include chain.  A dict is used as an ordered
+        # set: O(1) cycle checks, while iteration still yields the chain in
+        # include order for diagnostics.
+        #
+        # Includes are walked iteratively: each open file is an _IncludeFrame
+        # holding its line iterator and conditional state.  An #include
+        # suspends the current frame and pushes the child; the parent resumes
+        # where it left off once the child is exhausted.  Deep include chains
+        # therefore never approach the interpreter's recursion limit.
+        write = out.write
 
         def _with_loc(msg: str, *, file_path: str, line_no: int) -> str:
             base = os.path.basename(file_path)
@@ -1167,468 +1303,562 @@ class Preprocessor:
             chain = " -> ".join(os.path.basename(p) for p in stack)
             return f" (include stack: {chain})" if chain else ""
 
-        # Join physical lines with trailing backslash for directives (subset).
-        # This is needed for multi-line macros like:
-        #   #define A 1 \
-        #             + 2
-        # and for header-names split across lines:
-        #   #include "a\
-        #            .h"
-        def _logical_lines(lines: List[str]) -> List[str]:
-            out: List[str] = []
-            i = 0
-            while i < len(lines):
-                line = lines[i]
-                if line.lstrip().startswith("#"):
-                    joined = line
-                    while joined.rstrip("\n").endswith("\\") and i + 1 < len(lines):
-                        # Line splicing: remove the backslash-newline pair.
-                        # For directives we keep behavior simple by inserting a single space
-                        # to avoid accidental token pasting.
-                        joined = joined.rstrip("\n")
-                        joined = joined[:-1]  # remove '\\'
-                        i += 1
-                        joined += " " + lines[i].lstrip(" \t").rstrip("\n")
-                        joined += "\n"
-                    out.append(joined)
-                    i += 1
-                    continue
-                out.append(line)
-                i += 1
-            return out
-
-        logical_line_no = 0
-        for line in _logical_lines(raw):
-            logical_line_no += 1
-            line, in_block_comment = self._strip_comments(line, in_block_comment)
-
-            # Handle directive line splices that occur inside header-names.
-            # Our directive joining above only joins when the directive physical line
-            # itself ends with a backslash. For `#include "a\
-            # .h"`, the backslash occurs inside the string literal and the physical
-            # line does not end with '\\'. As a subset, if we see a directive that
-            # contains an odd number of double quotes, join with the next physical line.
-            if line.lstrip().startswith("#") and line.count('"') % 2 == 1:
-                # Join subsequent physical lines until quotes are balanced.
-                # Remove the backslash-newline pair at the join point.
-                joined = line
-                # Use the original raw physical lines; logical_line_no is 1-based index
-                # for the current directive line.
-                while joined.count('"') % 2 == 1 and logical_line_no < len(raw):
-                    nxt = raw[logical_line_no]
-                    # If the current joined line ends with a backslash-newline, splice it.
-                    if joined.endswith("\\\n"):
-                        joined = joined[:-2]
-                    else:
-                        joined = joined.rstrip("\n")
-                    joined += nxt
-                    logical_line_no += 1
-                line = joined
+        frame = self._open_include_frame(path, stack, macros, write)
+        suspended: List[_IncludeFrame] = []
+        while frame is not None:
+            abspath = frame.abspath
+            base_dir = frame.base_dir
+            base_name = frame.base_name
+            raw = frame.src.lines
+            logical_filename = frame.logical_filename
+            logical_line_base = frame.logical_line_base
+            include_stack = frame.include_stack
+            taken_stack = frame.taken_stack
+            in_block_comment = frame.in_block_comment
+            guard_name = frame.guard_name
+            guard_state = frame.guard_state
+            logical_line_no = frame.logical_line_no
+
+            # Set by an #include in an active region: the file to descend into.
+            pending: Optional[str] = None
+            for line in frame.lines:
+                logical_line_no += 1
                 line, in_block_comment = self._strip_comments(line, in_block_comment)
 
-            if self._include_next_re.match(line):
-                loc_line = (logical_line_no + (logical_line_base or 0))
-                _raise_diag("unsupported directive: #include_next", file_path=logical_filename, line_no=loc_line)
-
-            if self._pragma_once_re.match(line):
-                # Subset: remember this file as include-once and strip directive.
-                # Only activate if the directive is in an active region.
-                if include_stack[-1]:
-                    self._pragma_once_files.add(abspath)
-                continue
-
-            # Generic pragmas (subset): accept and strip. Unknown pragmas are ignored.
-            # Only in active regions.
-            if self._pragma_re.match(line):
-                if include_stack[-1]:
+                # Handle directive line splices that occur inside header-names.
+                # Our directive joining above only joins when the directive physical line
+                # itself ends with a backslash. For `#include "a\
+                # .h"`, the backslash occurs inside the string literal and the physical
+                # line does not end with '\\'. As a subset, if we see a directive that
+                # contains an odd number of double quotes, join with the next physical line.
+                if line.lstrip().startswith("#") and line.count('"') % 2 == 1:
+                    # Join subsequent physical lines until quotes are balanced.
+                    # Remove the backslash-newline pair at the join point.
+                    joined = line
+                    # Use the original raw physical lines; logical_line_no is 1-based index
+                    # for the current directive line.
+                    while joined.count('"') % 2 == 1 and logical_line_no < len(raw):
+                        nxt = raw[logical_line_no]
+                        # If the current joined line ends with a backslash-newline, splice it.
+                        if joined.endswith("\\\n"):
+                            joined = joined[:-2]
+                        else:
+                            joined = joined.rstrip("\n")
+                        joined += nxt
+                        logical_line_no += 1
+                    line = joined
+                    line, in_block_comment = self._strip_comments(line, in_block_comment)
+
+                mdir = _DIRECTIVE_RE.match(line)
+                if mdir is None:
+                    if guard_state != 1 and line.strip():
+                        guard_state = -1
+                    # Ordinary text line: no directive regex can match, so go
+                    # straight to macro expansion.
+                    if not include_stack[-1]:
+                        continue
+                    if logical_line_base is None:
+                        effective_line_no = logical_line_no
+                    else:
+                        effective_line_no = logical_line_no + logical_line_base
+                    write(self._expand_line(line, macros, filename=logical_filename, line_no=effective_line_no))
                     continue
-                continue
+                kw = mdir.group(1)
 
-            merr = self._error_re.match(line)
-            if merr:
-                if include_stack[-1]:
-                    msg = (merr.group(1) or "").strip()
+                if guard_state == 0:
+                    mguard = self._ifndef_re.match(line) if kw == "ifndef" else None
+                    if mguard:
+                        guard_name = mguard.group(1)
+                        guard_state = 1
+                    else:
+                        guard_state = -1
+                elif guard_state == 1 and len(include_stack) == 2:
+                    if kw in ("elif", "elifdef", "elifndef") or (kw == "else" and self._else_re.match(line)):
+                        guard_state = -1
+                    elif kw == "endif" and self._endif_re.match(line):
+                        guard_state = 2
+                elif guard_state == 2:
+                    guard_state = -1
+
+                if kw == "include_next":
                     loc_line = (logical_line_no + (logical_line_base or 0))
-                    # Prefer logical filename if #line changed it.
-                    origin = logical_filename or os.path.basename(abspath)
-                    # If origin differs from the current file basename, still show
-                    # the physical file basename for clarity.
-                    err = f"#error {msg}".rstrip()
-                    _raise_diag(err, file_path=origin, line_no=loc_line)
-                continue
+                    _raise_diag("unsupported directive: #include_next", file_path=logical_filename, line_no=loc_line)
 
-            mwarn = self._warning_re.match(line)
-            if mwarn:
-                # Subset: accept and ignore (do not fail, do not emit).
-                continue
-            # Line markers (#line): accept and strip; update logical file/line state.
-            if self._line_re.match(line):
-                if include_stack[-1]:
-                    parsed = self._try_parse_line_directive(line)
-                    if parsed is not None:
-                        new_line, new_file = parsed
-                        logical_line_base = new_line - (logical_line_no + 1)
-                        if new_file:
-                            logical_filename = new_file
-                continue
-
-            # Conditionals
-            if self._if0_re.match(line):
-                parent = include_stack[-1]
-                include_stack.append(parent and False)
-                taken_stack.append(False)
-                continue
-            if self._if1_re.match(line):
-                parent = include_stack[-1]
-                include_stack.append(parent and True)
-                taken_stack.append(parent and True)
-                continue
-            mifdef = self._if_defined_re.match(line)
-            if mifdef:
-                parent = include_stack[-1]
-                if not parent:
-                    # In inactive regions, do not parse/validate directive arguments.
-                    include_stack.append(False)
-                    taken_stack.append(False)
+                if kw == "pragma" and self._pragma_once_re.match(line):
+                    # Subset: remember this file as include-once and strip directive.
+                    # Only activate if the directive is in an active region.
+                    if include_stack[-1]:
+                        self._pragma_once_files.add(abspath)
                     continue
-                neg = bool(mifdef.group(1))
-                name = mifdef.group(2) or mifdef.group(3) or ""
-                cond_true = (name in macros)
-                if neg:
-                    cond_true = not cond_true
-                include_stack.append(parent and cond_true)
-                taken_stack.append(parent and cond_true)
-                continue
-            mifname = self._if_name_re.match(line)
-            if mifname:
-                parent = include_stack[-1]
-                if not parent:
-                    include_stack.append(False)
-                    taken_stack.append(False)
+
+                # Generic pragmas (subset): accept and strip. Unknown pragmas are ignored.
+                # Only in active regions.
+                if kw == "pragma":
                     continue
-                name = mifname.group(1)
-                cond_true = self._eval_if_expr_strict_01(name, macros)
-                include_stack.append(parent and cond_true)
-                taken_stack.append(parent and cond_true)
-                continue
-            mifexpr = self._if_expr_re.match(line)
-            if mifexpr:
-                parent = include_stack[-1]
-                if not parent:
-                    include_stack.append(False)
-                    taken_stack.append(False)
+
+                if kw == "error":
+                    merr = self._error_re.match(line)
+                    if include_stack[-1] and merr:
+                        msg = (merr.group(1) or "").strip()
+                        loc_line = (logical_line_no + (logical_line_base or 0))
+                        # Prefer logical filename if #line changed it.
+                        origin = logical_filename or os.path.basename(abspath)
+                        # If origin differs from the current file basename, still show
+                        # the physical file basename for clarity.
+                        err = f"#error {msg}".rstrip()
+                        _raise_diag(err, file_path=origin, line_no=loc_line)
                     continue
-                expr = mifexpr.group(1)
-                try:
-                    cond_true = self._eval_if_expr(expr, macros)
-                except RuntimeError as e:
-                    # Ensure #if failures always carry the directive location.
-                    msg = str(e)
-                    if not re.match(r"^[^:\n]+:\d+:\s", msg):
-                        msg = f"{os.path.basename(abspath)}:{logical_line_no}: {msg}"
-                    raise RuntimeError(f"{msg} (at {os.path.basename(abspath)}:{logical_line_no}: {expr.strip()!r})")
-                include_stack.append(parent and cond_true)
-                taken_stack.append(parent and cond_true)
-                continue
-            mifdef = self._ifdef_re.match(line)
-            if mifdef:
-                parent = include_stack[-1]
-                name = mifdef.group(1)
-                cond_true = name in macros
-                include_stack.append(parent and cond_true)
-                taken_stack.append(parent and cond_true)
-                continue
-            mifndef = self._ifndef_re.match(line)
-            if mifndef:
-                parent = include_stack[-1]
-                name = mifndef.group(1)
-                cond_true = name not in macros
-                include_stack.append(parent and cond_true)
-                taken_stack.append(parent and cond_true)
-                continue
-            if self._elif0_re.match(line) or self._elif1_re.match(line):
-                if len(include_stack) <= 1:
+
+                if kw == "warning":
+                    # Subset: accept and ignore (do not fail, do not emit).
                     continue
-                parent = include_stack[-2]
-                already = taken_stack[-1]
-                cond_true = bool(self._elif1_re.match(line))
-                new_active = parent and (not already) and cond_true
-                include_stack[-1] = new_active
-                taken_stack[-1] = already or new_active
-                continue
-            melifdef = self._elif_defined_re.match(line)
-            if melifdef:
-                if len(include_stack) <= 1:
+                # Line markers (#line): accept and strip; update logical file/line state.
+                if kw == "line":
+                    if include_stack[-1]:
+                        parsed = self._try_parse_line_directive(line)
+                        if parsed is not None:
+                            new_line, new_file = parsed
+                            logical_line_base = new_line - (logical_line_no + 1)
+                            if new_file:
+                                logical_filename = new_file
                     continue
-                parent = include_stack[-2]
-                already = taken_stack[-1]
-                neg = bool(melifdef.group(1))
-                name = melifdef.group(2) or melifdef.group(3) or ""
-                cond_true = (name in macros)
-                if neg:
-                    cond_true = not cond_true
-                new_active = parent and (not already) and cond_true
-                include_stack[-1] = new_active
-                taken_stack[-1] = already or new_active
-                continue
 
-            melifdef2 = self._elifdef_re.match(line)
-            if melifdef2:
-                if len(include_stack) <= 1:
+                # Conditionals
+                if kw == "if":
+                    if self._if0_re.match(line):
+                        parent = include_stack[-1]
+                        include_stack.append(parent and False)
+                        taken_stack.append(False)
+                        continue
+                    if self._if1_re.match(line):
+                        parent = include_stack[-1]
+                        include_stack.append(parent and True)
+                        taken_stack.append(parent and True)
+                        continue
+                    mifdef = self._if_defined_re.match(line)
+                    if mifdef:
+                        parent = include_stack[-1]
+                        if not parent:
+                            # In inactive regions, do not parse/validate directive arguments.
+                            include_stack.append(False)
+                            taken_stack.append(False)
+                            continue
+                        neg = bool(mifdef.group(1))
+                        name = mifdef.group(2) or mifdef.group(3) or ""
+                        cond_true = (name in macros)
+                        if neg:
+                            cond_true = not cond_true
+                        include_stack.append(parent and cond_true)
+                        taken_stack.append(parent and cond_true)
+                        continue
+                    mifname = self._if_name_re.match(line)
+                    if mifname:
+                        parent = include_stack[-1]
+                        if not parent:
+                            include_stack.append(False)
+                            taken_stack.append(False)
+                            continue
+                        name = mifname.group(1)
+                        cond_true = self._eval_if_expr_strict_01(name, macros)
+                        include_stack.append(parent and cond_true)
+                        taken_stack.append(parent and cond_true)
+                        continue
+                    mifexpr = self._if_expr_re.match(line)
+                    if mifexpr:
+                        parent = include_stack[-1]
+                        if not parent:
+                            include_stack.append(False)
+                            taken_stack.append(False)
+                            continue
+                        expr = mifexpr.group(1)
+                        try:
+                            cond_true = self._eval_if_expr(expr, macros)
+                        except RuntimeError as e:
+                            # Ensure #if failures always carry the directive location.
+                            msg = str(e)
+                            if not re.match(r"^[^:\n]+:\d+:\s", msg):
+                                msg = f"{os.path.basename(abspath)}:{logical_line_no}: {msg}"
+                            raise RuntimeError(f"{msg} (at {os.path.basename(abspath)}:{logical_line_no}: {expr.strip()!r})")
+                        include_stack.append(parent and cond_true)
+                        taken_stack.append(parent and cond_true)
+                        continue
+                mifdef = self._ifdef_re.match(line) if kw == "ifdef" else None
+                if mifdef:
+                    parent = include_stack[-1]
+                    name = mifdef.group(1)
+                    cond_true = name in macros
+                    include_stack.append(parent and cond_true)
+                    taken_stack.append(parent and cond_true)
                     continue
-                parent = include_stack[-2]
-                already = taken_stack[-1]
-                name = melifdef2.group(1)
-                cond_true = name in macros
-                new_active = parent and (not already) and cond_true
-                include_stack[-1] = new_active
-                taken_stack[-1] = already or new_active
-                continue
+                mifndef = self._ifndef_re.match(line) if kw == "ifndef" else None
+                if mifndef:
+                    parent = include_stack[-1]
+                    name = mifndef.group(1)
+                    cond_true = name not in macros
+                    include_stack.append(parent and cond_true)
+                    taken_stack.append(parent and cond_true)
+                    continue
+                if kw == "elif":
+                    if self._elif0_re.match(line) or self._elif1_re.match(line):
+                        if len(include_stack) <= 1:
+                            continue
+                        parent = include_stack[-2]
+                        already = taken_stack[-1]
+                        cond_true = bool(self._elif1_re.match(line))
+                        new_active = parent and (not already) and cond_true
+                        include_stack[-1] = new_active
+                        taken_stack[-1] = already or new_active
+                        continue
+                    melifdef = self._elif_defined_re.match(line)
+                    if melifdef:
+                        if len(include_stack) <= 1:
+                            continue
+                        parent = include_stack[-2]
+                        already = taken_stack[-1]
+                        neg = bool(melifdef.group(1))
+                        name = melifdef.group(2) or melifdef.group(3) or ""
+                        cond_true = (name in macros)
+                        if neg:
+                            cond_true = not cond_true
+                        new_active = parent and (not already) and cond_true
+                        include_stack[-1] = new_active
+                        taken_stack[-1] = already or new_active
+                        continue
 
-            melifndef2 = self._elifndef_re.match(line)
-            if melifndef2:
-                if len(include_stack) <= 1:
+                melifdef2 = self._elifdef_re.match(line) if kw == "elifdef" else None
+                if melifdef2:
+                    if len(include_stack) <= 1:
+                        continue
+                    parent = include_stack[-2]
+                    already = taken_stack[-1]
+                    name = melifdef2.group(1)
+                    cond_true = name in macros
+                    new_active = parent and (not already) and cond_true
+                    include_stack[-1] = new_active
+                    taken_stack[-1] = already or new_active
                     continue
-                parent = include_stack[-2]
-                already = taken_stack[-1]
-                name = melifndef2.group(1)
-                cond_true = name not in macros
-                new_active = parent and (not already) and cond_true
-                include_stack[-1] = new_active
-                taken_stack[-1] = already or new_active
-                continue
-            melifname = self._elif_name_re.match(line)
-            if melifname:
-                if len(include_stack) <= 1:
+
+                melifndef2 = self._elifndef_re.match(line) if kw == "elifndef" else None
+                if melifndef2:
+                    if len(include_stack) <= 1:
+                        continue
+                    parent = include_stack[-2]
+                    already = taken_stack[-1]
+                    name = melifndef2.group(1)
+                    cond_true = name not in macros
+                    new_active = parent and (not already) and cond_true
+                    include_stack[-1] = new_active
+                    taken_stack[-1] = already or new_active
                     continue
-                parent = include_stack[-2]
-                already = taken_stack[-1]
-                name = melifname.group(1)
-                cond_true = self._eval_if_expr_strict_01(name, macros)
-                new_active = parent and (not already) and cond_true
-                include_stack[-1] = new_active
-                taken_stack[-1] = already or new_active
-                continue
-            melifexpr = self._elif_expr_re.match(line)
-            if melifexpr:
-                if len(include_stack) <= 1:
+                melifname = self._elif_name_re.match(line)
+                if melifname:
+                    if len(include_stack) <= 1:
+                        continue
+                    parent = include_stack[-2]
+                    already = taken_stack[-1]
+                    name = melifname.group(1)
+                    cond_true = self._eval_if_expr_strict_01(name, macros)
+                    new_active = parent and (not already) and cond_true
+                    include_stack[-1] = new_active
+                    taken_stack[-1] = already or new_active
                     continue
-                parent = include_stack[-2]
-                already = taken_stack[-1]
-                expr = melifexpr.group(1)
-                try:
-                    cond_true = self._eval_if_expr(expr, macros)
-                except RuntimeError as e:
-                    # Ensure #elif failures always carry the directive location.
-                    msg = str(e)
-                    if not re.match(r"^[^:\n]+:\d+:\s", msg):
-                        msg = f"{os.path.basename(abspath)}:{logical_line_no}: {msg}"
-                    raise RuntimeError(f"{msg} (at {os.path.basename(abspath)}:{logical_line_no}: {expr.strip()!r})")
-                new_active = parent and (not already) and cond_true
-                include_stack[-1] = new_active
-                taken_stack[-1] = already or new_active
-                continue
-            if self._else_re.match(line):
-                if len(include_stack) > 1:
+                melifexpr = self._elif_expr_re.match(line)
+                if melifexpr:
+                    if len(include_stack) <= 1:
+                        continue
                     parent = include_stack[-2]
-                    already = taken_stack[-1] if taken_stack else False
-                    new_active = parent and (not already)
+                    already = taken_stack[-1]
+                    expr = melifexpr.group(1)
+                    try:
+                        cond_true = self._eval_if_expr(expr, macros)
+                    except RuntimeError as e:
+                        # Ensure #elif failures always carry the directive location.
+                        msg = str(e)
+                        if not re.match(r"^[^:\n]+:\d+:\s", msg):
+                            msg = f"{os.path.basename(abspath)}:{logical_line_no}: {msg}"
+                        raise RuntimeError(f"{msg} (at {os.path.basename(abspath)}:{logical_line_no}: {expr.strip()!r})")
+                    new_active = parent and (not already) and cond_true
                     include_stack[-1] = new_active
-                    if taken_stack:
-                        taken_stack[-1] = already or new_active
-                continue
-            if self._endif_re.match(line):
-                if len(include_stack) > 1:
-                    include_stack.pop()
-                    if taken_stack:
-                        taken_stack.pop()
-                continue
+                    taken_stack[-1] = already or new_active
+                    continue
+                if kw == "else" and self._else_re.match(line):
+                    if len(include_stack) > 1:
+                        parent = include_stack[-2]
+                        already = taken_stack[-1] if taken_stack else False
+                        new_active = parent and (not already)
+                        include_stack[-1] = new_active
+                        if taken_stack:
+                            taken_stack[-1] = already or new_active
+                    continue
+                if kw == "endif" and self._endif_re.match(line):
+                    if len(include_stack) > 1:
+                        include_stack.pop()
+                        if taken_stack:
+                            taken_stack.pop()
+                    continue
 
-            if not include_stack[-1]:
-                continue
+                if not include_stack[-1]:
+                    continue
 
-            # Defines
-            md = self._define_re.match(line)
-            if md:
-                name = md.group(1)
-                val = md.group(2).rstrip("\n")
-                # Function-like macro: #define F(x) ...
-                # NOTE: very small subset; no variadics, no comments handling, no multiline.
-                mfn = re.match(r"^\s*\(([^)]*)\)\s*(.*)$", val)
-                if mfn is not None:
-                    params_raw = mfn.group(1).strip()
-                    body = mfn.group(2)
-                    if params_raw == "":
-                        params = []
-                    else:
-                        params = [p.strip() for p in params_raw.split(",")]
-                    is_variadic = False
-                    if params and params[-1] == "...":
-                        is_variadic = True
-                        params = params[:-1]
-                    for p in params:
-                        if not re.match(r"^[A-Za-z_][A-Za-z0-9_]*$", p):
-                            # In system headers we may see extensions like:
-                            #   #define __END_DECLS }
-                            #   #define EOF (-1)
-                            # and function-like macro parameter lists with
-                            # unusual tokens. For the built-in preprocessor,
-                            # treat such macros as unsupported and ignore
-                            # the definition instead of failing compilation.
+                # Defines
+                md = self._define_re.match(line) if kw == "define" else None
+                if md:
+                    name = md.group(1)
+                    val = md.group(2).rstrip("\n")
+                    # Function-like macro: #define F(x) ...
+                    # NOTE: very small subset; no variadics, no comments handling, no multiline.
+                    mfn = re.match(r"^\s*\(([^)]*)\)\s*(.*)$", val)
+                    if mfn is not None:
+                        params_raw = mfn.group(1).strip()
+                        body = mfn.group(2)
+                        if params_raw == "":
                             params = []
-                            body = ""
-                            break
-                    if body == "" and params == [] and params_raw != "":
-                        # Ignored unsupported function-like macro.
-                        continue
-                    self._fn_macros[name] = (params, body.strip(), is_variadic)
+                        else:
+                            params = [p.strip() for p in params_raw.split(",")]
+                        is_variadic = False
+                        if params and params[-1] == "...":
+                            is_variadic = True
+                            params = params[:-1]
+                        for p in params:
+                            if not re.match(r"^[A-Za-z_][A-Za-z0-9_]*$", p):
+                                # In system headers we may see extensions like:
+                                #   #define __END_DECLS }
+                                #   #define EOF (-1)
+                                # and function-like macro parameter lists with
+                                # unusual tokens. For the built-in preprocessor,
+                                # treat such macros as unsupported and ignore
+                                # the definition instead of failing compilation.
+                                params = []
+                                body = ""
+                                break
+                        if body == "" and params == [] and params_raw != "":
+                            # Ignored unsupported function-like macro.
+                            continue
+                        self._fn_macros[name] = (params, body.strip(), is_variadic)
+                        macros.pop(name, None)
+                    else:
+                        macros[name] = val.strip()
+                        self._fn_macros.pop(name, None)
+                    self._macros_version += 1
+                    continue
+
+                mu = self._undef_re.match(line) if kw == "undef" else None
+                if mu:
+                    name = mu.group(1)
                     macros.pop(name, None)
-                else:
-                    macros[name] = val.strip()
                     self._fn_macros.pop(name, None)
-                continue
-
-            mu = self._undef_re.match(line)
-            if mu:
-                name = mu.group(1)
-                macros.pop(name, None)
-                self._fn_macros.pop(name, None)
-                continue
-
-            # Includes (subset)
-            miq = self._include_quote_re.match(line)
-            if miq:
-                inc_name = miq.group(1).replace(" ", "").replace("\t", "")
-                search_paths = [base_dir, *self._include_paths]
-                inc_path = self._resolve_include(
-                    inc_name,
-                    search_paths,
-                    include_stack=list(stack),
-                    includer=abspath,
-                    includer_line=logical_line_no,
-                )
-                out_lines.append(self._preprocess_file(inc_path, stack, macros))
-                out_lines.append(f'# {logical_line_no + 1} "{os.path.basename(abspath)}"\n')
-                continue
-
-            mia = self._include_angle_re.match(line)
-            if mia:
-                inc_name = mia.group(1).strip().replace(" ", "").replace("\t", "")
-                search_paths = [*self._include_paths]
-                inc_path = self._resolve_include(
-                    inc_name,
-                    search_paths,
-                    include_stack=list(stack),
-                    includer=abspath,
-                    includer_line=logical_line_no,
-                )
-                out_lines.append(self._preprocess_file(inc_path, stack, macros))
-                out_lines.append(f'# {logical_line_no + 1} "{os.path.basename(abspath)}"\n')
-                continue
+                    self._macros_version += 1
+                    continue
 
-            # Include header-name line splices (subset):
-            # handle directives like:
-            #   #include "a\
-            #            .h"
-            # and
-            #   #include <x\
-            #            y.h>
-            # by joining the physical lines and re-processing the logical directive.
-            if line.lstrip().startswith("#") and line.rstrip("\n").endswith("\\"):
-                joined = line
-                # The current line is a directive with a trailing backslash, so it must
-                # be a physical-line splice. Join subsequent lines until splice ends.
-                # NOTE: This is intentionally limited to directives.
-                while joined.rstrip("\n").endswith("\\") and logical_line_no < len(raw):
-                    # Remove backslash-newline.
-                    joined = joined.rstrip("\n")
-                    joined = joined[:-1]
-
-                    # Peek next physical line (approximate using raw list and the
-                    # current logical line number). If we cannot, break.
-                    nxt_idx = logical_line_no
-                    if nxt_idx >= len(raw):
-                        break
-                    joined += raw[nxt_idx]
-
-                    # Advance the logical line number to keep effective line mapping sane.
-                    logical_line_no += 1
-                # Re-run this logical directive by inserting it into the output stream.
-                # We do this by processing it through the normal include regexes.
-                # Strip comments for safety.
-                joined, in_block_comment = self._strip_comments(joined, in_block_comment)
-                miq2 = self._include_quote_re.match(joined)
-                if miq2:
-                    inc_name2 = miq2.group(1).replace(" ", "").replace("\t", "")
+                # Includes (subset)
+                miq = self._include_quote_re.match(line) if kw == "include" else None
+                if miq:
+                    inc_name = miq.group(1).replace(" ", "").replace("\t", "")
                     search_paths = [base_dir, *self._include_paths]
                     inc_path = self._resolve_include(
-                        inc_name2,
+                        inc_name,
                         search_paths,
                         include_stack=list(stack),
                         includer=abspath,
                         includer_line=logical_line_no,
                     )
-                    out_lines.append(self._preprocess_file(inc_path, stack, macros))
-                    out_lines.append(f'# {logical_line_no + 1} "{os.path.basename(abspath)}"\n')
-                    continue
-                mia2 = self._include_angle_re.match(joined)
-                if mia2:
-                    inc_name2 = mia2.group(1).strip().replace(" ", "").replace("\t", "")
+                    pending = inc_path
+                    break
+
+                mia = self._include_angle_re.match(line) if kw == "include" else None
+                if mia:
+                    inc_name = mia.group(1).strip().replace(" ", "").replace("\t", "")
                     search_paths = [*self._include_paths]
                     inc_path = self._resolve_include(
-                        inc_name2,
+                        inc_name,
                         search_paths,
                         include_stack=list(stack),
                         includer=abspath,
                         includer_line=logical_line_no,
                     )
-                    out_lines.append(self._preprocess_file(inc_path, stack, macros))
-                    out_lines.append(f'# {logical_line_no + 1} "{os.path.basename(abspath)}"\n')
-                    continue
+                    pending = inc_path
+                    break
+
+                # Include header-name line splices (subset):
+                # handle directives like:
+                #   #include "a\
+                #            .h"
+                # and
+                #   #include <x\
+                #            y.h>
+                # by joining the physical lines and re-processing the logical directive.
+                if line.rstrip("\n").endswith("\\"):
+                    joined = line
+                    # The current line is a directive with a trailing backslash, so it must
+                    # be a physical-line splice. Join subsequent lines until splice ends.
+                    # NOTE: This is intentionally limited to directives.
+                    while joined.rstrip("\n").endswith("\\") and logical_line_no < len(raw):
+                        # Remove backslash-newline.
+                        joined = joined.rstrip("\n")
+                        joined = joined[:-1]
 
-            # Macro-expanded include operand (subset):
-            #   #define HEADER "a.h"
-            #   #include HEADER
-            # and
-            #   #define HDR STR("b.h")
-            #   #include HDR
-            mi_any = self._include_any_re.match(line)
-            if mi_any and include_stack[-1]:
-                operand = mi_any.group(1)
-                expanded = self._expand_include_operand(operand, macros)
-                parsed = self._parse_header_name_from_include_operand(expanded)
-                if parsed is not None:
-                    kind, inc_name2 = parsed
-                    if kind == "quote":
+                        # Peek next physical line (approximate using raw list and the
+                        # current logical line number). If we cannot, break.
+                        nxt_idx = logical_line_no
+                        if nxt_idx >= len(raw):
+                            break
+                        joined += raw[nxt_idx]
+
+                        # Advance the logical line number to keep effective line mapping sane.
+                        logical_line_no += 1
+                    # Re-run this logical directive by inserting it into the output stream.
+                    # We do this by processing it through the normal include regexes.
+                    # Strip comments for safety.
+                    joined, in_block_comment = self._strip_comments(joined, in_block_comment)
+                    miq2 = self._include_quote_re.match(joined)
+                    if miq2:
+                        inc_name2 = miq2.group(1).replace(" ", "").replace("\t", "")
                         search_paths = [base_dir, *self._include_paths]
-                    else:
+                        inc_path = self._resolve_include(
+                            inc_name2,
+                            search_paths,
+                            include_stack=list(stack),
+                            includer=abspath,
+                            includer_line=logical_line_no,
+                        )
+                        pending = inc_path
+                        break
+                    mia2 = self._include_angle_re.match(joined)
+                    if mia2:
+                        inc_name2 = mia2.group(1).strip().replace(" ", "").replace("\t", "")
                         search_paths = [*self._include_paths]
-                    inc_path = self._resolve_include(
-                        inc_name2,
-                        search_paths,
-                        include_stack=list(stack),
-                        includer=abspath,
-                        includer_line=logical_line_no,
+                        inc_path = self._resolve_include(
+                            inc_name2,
+                            search_paths,
+                            include_stack=list(stack),
+                            includer=abspath,
+                            includer_line=logical_line_no,
+                        )
+                        pending = inc_path
+                        break
+
+                # Macro-expanded include operand (subset):
+                #   #define HEADER "a.h"
+                #   #include HEADER
+                # and
+                #   #define HDR STR("b.h")
+                #   #include HDR
+                mi_any = self._include_any_re.match(line) if kw == "include" else None
+                if mi_any and include_stack[-1]:
+                    operand = mi_any.group(1)
+                    expanded = self._expand_include_operand(operand, macros)
+                    parsed = self._parse_header_name_from_include_operand(expanded)
+                    if parsed is not None:
+                        kind, inc_name2 = parsed
+                        if kind == "quote":
+                            search_paths = [base_dir, *self._include_paths]
+                        else:
+                            search_paths = [*self._include_paths]
+                        inc_path = self._resolve_include(
+                            inc_name2,
+                            search_paths,
+                            include_stack=list(stack),
+                            includer=abspath,
+                            includer_line=logical_line_no,
+                        )
+                        pending = inc_path
+                        break
+                    _raise_diag(
+                        f"unsupported #include operand after macro expansion: {expanded.strip()!r}",
+                        file_path=logical_filename,
+                        line_no=logical_line_no,
                     )
-                    out_lines.append(self._preprocess_file(inc_path, stack, macros))
-                    out_lines.append(f'# {logical_line_no + 1} "{os.path.basename(abspath)}"\n')
-                    continue
-                _raise_diag(
-                    f"unsupported #include operand after macro expansion: {expanded.strip()!r}",
-                    file_path=logical_filename,
-                    line_no=logical_line_no,
-                )
-
-            if logical_line_base is None:
-                effective_line_no = logical_line_no
-            else:
-                effective_line_no = logical_line_no + logical_line_base
-            out_lines.append(self._expand_line(line, macros, filename=logical_filename, line_no=effective_line_no))
 
-        stack.pop()
-        # restore counter for the including context
-        self._counter = old_counter
-        return "".join(out_lines)
+                if logical_line_base is None:
+                    effective_line_no = logical_line_no
+                else:
+                    effective_line_no = logical_line_no + logical_line_base
+                write(self._expand_line(line, macros, filename=logical_filename, line_no=effective_line_no))
+
+            frame.logical_filename = logical_filename
+            frame.logical_line_base = logical_line_base
+            frame.in_block_comment = in_block_comment
+            frame.guard_name = guard_name
+            frame.guard_state = guard_state
+            frame.logical_line_no = logical_line_no
+
+            if pending is not None:
+                child = self._open_include_frame(pending, stack, macros, write)
+                if child is None:
+                    write(f'# {logical_line_no + 1} "{base_name}"\n')
+                else:
+                    suspended.append(frame)
+                    frame = child
+                continue
+
+            # End of file: pop back to the includer.
+            if guard_state == 2:
+                frame.src.guard = guard_name
+            del stack[abspath]
+            # restore counter for the including context
+            self._counter = frame.old_counter
+            frame = suspended.pop() if suspended else None
+            if frame is not None:
+                write(f'# {frame.logical_line_no + 1} "{frame.base_name}"\n')
+
+    def _open_include_frame(
+        self,
+        path: str,
+        stack: Dict[str, None],
+        macros: Dict[str, str],
+        write: Callable[[str], object],
+    ) -> Optional[_IncludeFrame]:
+        """Enter *path*: push it on *stack* and return its frame.
+
+        Returns None when the file contributes nothing (``#pragma once`` or
+        an already-satisfied include guard).
+        """
+        info = self._path_info.get(path)
+        if info is None:
+            ap = os.path.abspath(path)
+            info = self._path_info[path] = (ap, os.path.dirname(ap), os.path.basename(ap))
+        abspath, base_dir, base_name = info
+        if abspath in self._pragma_once_files:
+            return None
+        if abspath in stack:
+            raise RuntimeError(f"{base_name}:1: include cycle detected: {abspath}")
+
+        try:
+            src = _read_source(abspath)
+        except OSError as e:
+            raise RuntimeError(f"{os.path.basename(path)}:1: cannot read {path}: {e}")
+
+        # Multiple-include optimization: a guarded header whose guard macro
+        # is already defined would produce nothing but its line marker.
+        if src.guard is not None and src.guard in macros:
+            if stack:
+                write(f'# 1 "{base_name}"\n')
+            return None
+
+        # Per-file __COUNTER__ semantics: save and reset the instance counter
+        # while preprocessing this file so each file's __COUNTER__ starts at 0.
+        old_counter = getattr(self, "_counter", 0)
+        self._counter = 0
+
+        stack[abspath] = None
+
+        # Emit line marker at the start of included files so the lexer
+        # knows which source file subsequent tokens belong to.
+        # Skip for the top-level file (stack depth 1) since its lines
+        # are already correct.
+        if len(stack) > 1:
+            write(f'# 1 "{base_name}"\n')
+
+        return _IncludeFrame(
+            abspath=abspath,
+            base_dir=base_dir,
+            base_name=base_name,
+            src=src,
+            lines=_logical_lines(src.lines),
+            old_counter=old_counter,
+            logical_filename=base_name,
+        )
+
 
     def _strip_comments(self, line: str, in_block: bool) -> Tuple[str, bool]:
         """Strip // and /* */ comments (subset) while preserving strings/chars.
@@ -1718,14 +1948,7 @@ class Preprocessor:
             after_fn = self._expand_function_like_macros(expanded, macros, filename=filename, base_line_no=line_no)
             fn_changed = (after_fn != expanded)
             # 2. Expand built-in macros (__LINE__, __FILE__, etc.).
-            if (
-                "__LINE__" in after_fn
-                or "__FILE__" in after_fn
-                or "__STDC__" in after_fn
-                or "__DATE__" in after_fn
-                or "__TIME__" in after_fn
-                or "__COUNTER__" in after_fn
-            ):
+            if _BUILTIN_MACRO_RE.search(after_fn):
                 after_fn = self._expand_builtin_macros(after_fn, filename=filename, line_no=line_no)
             # 3. Expand object-like macros.
             # Avoid runaway growth for self-referential object-like macros like
@@ -1752,9 +1975,8 @@ class Preprocessor:
     def _obj_expansion_introduced_fn_call(self, before: str, after: str) -> bool:
         """Return True if *after* contains a function-like macro call site
         that was NOT already present in *before*."""
-        for name in self._fn_macros:
-            if name not in after:
-                continue
+        words = self._fn_macros.keys() & _WORD_RE.findall(after)
+        for name in words:
             # Count call sites in before and after.
             pat = rf"\b{re.escape(name)}\s*\("
             before_count = len(re.findall(pat, before))
@@ -1917,17 +2139,15 @@ class Preprocessor:
         # Subset hide-set behavior for self-referential object-like macros.
         # Cache the self-referential macro set to avoid rebuilding the O(n²)
         # reference graph on every line.  Invalidate when the macro set changes.
-        cache_key = len(macros)
+        cache_key = (id(macros), len(macros), self._macros_version)
         if not hasattr(self, '_obj_self_refs_cache') or self._obj_self_refs_cache_key != cache_key:
             self_refs: Set[str] = set()
             macro_refs: Dict[str, Set[str]] = {}
             # Only consider identifier-shaped macro names
             ident_macros = {k: v for k, v in macros.items() if re.match(r"^[A-Za-z_][A-Za-z0-9_]*$", k)}
             for k, v in ident_macros.items():
-                refs: Set[str] = set()
-                for m_name in ident_macros:
-                    if re.search(rf"\b{re.escape(m_name)}\b", v):
-                        refs.add(m_name)
+                # A name occurs as `\bNAME\b` iff it is one of v's word runs.
+                refs: Set[str] = {w for w in _WORD_RE.findall(v) if w in ident_macros}
                 macro_refs[k] = refs
                 if k in refs:
                     self_refs.add(k)
@@ -1993,6 +2213,11 @@ class Preprocessor:
         disabled: Optional[Set[str]] = None,
         only_empty: bool = False,
     ) -> str:
+        # Fast path: only identifiers that name a macro are ever rewritten,
+        # so a line without any is returned untouched without the scan below.
+        if macros.keys().isdisjoint(_WORD_RE.findall(line)):
+            return line
+
         out: List[str] = []
         i = 0
         n = len(line)
@@ -2102,6 +2327,11 @@ class Preprocessor:
         # - only expands NAME(arglist) with balanced parentheses in arglist
         # - arguments are split by commas at paren depth 0
         # - supports nested expansions by iterating until no change (cap iterations)
+        # Fast path: a call site needs NAME as an identifier token, i.e. one
+        # of the line's word runs; one C-level set test rules out every
+        # function-like macro at once.
+        if self._fn_macros.keys().isdisjoint(_WORD_RE.findall(text)) and "__PP_DISABLED__" not in text:
+            return text
         out = text
         for _ in range(20):
             changed = False
@@ -2223,14 +2453,16 @@ class Preprocessor:
         or an empty set if no cycle exists.
         E.g. for F(x)->G(x), G(x)->F(x), calling with 'F' returns {'F', 'G'}.
         """
-        # Build a reference graph for function-like macros
-        fn_refs: Dict[str, Set[str]] = {}
-        for k, (params, body, is_variadic) in self._fn_macros.items():
-            refs: Set[str] = set()
-            for other_name in self._fn_macros:
-                if re.search(rf"\b{re.escape(other_name)}\s*\(", body):
-                    refs.add(other_name)
-            fn_refs[k] = refs
+        # Build a reference graph for function-like macros (once per
+        # macro-table version; it does not depend on `name`).
+        fn_refs = self._fn_refs_cache
+        if fn_refs is None or self._fn_refs_cache_key != self._macros_version:
+            fn_refs = {}
+            for k, (params, body, is_variadic) in self._fn_macros.items():
+                # `\bNAME\s*\(` matches iff NAME is a word run followed by `(`.
+                fn_refs[k] = {w for w in _FN_CALL_RE.findall(body) if w in self._fn_macros}
+            self._fn_refs_cache = fn_refs
+            self._fn_refs_cache_key = self._macros_version
 
         # Check if name can reach itself through the reference graph
         visited: Set[str] = set()
@@ -2279,6 +2511,10 @@ class Preprocessor:
 
         n = len(text)
         i = max(0, start_idx)
+        # A call site needs the name itself; let str.find rule that out
+        # before the character-level scan.
+        if text.find(name, i) < 0:
+            return None, None
 
         def is_ident_start(ch: str) -> bool:
             return ch.isalpha() or ch == "_"
@@ -2498,9 +2734,14 @@ class Preprocessor:
         includer: Optional[str] = None,
         includer_line: Optional[int] = None,
     ) -> str:
+        key = (inc_name, tuple(search_paths))
+        hit = self._resolved_includes.get(key)
+        if hit is not None:
+            return hit
         for d in search_paths:
             cand = os.path.abspath(os.path.join(d, inc_name))
             if os.path.isfile(cand):
+                self._resolved_includes[key] = cand
                 return cand
         shown = ", ".join(search_paths[:10])
         more = "" if len(search_paths) <= 10 else f" (+{len(search_paths) - 10} more)"
@@ -680,7 +680,7 @@ class SemanticAnalyzer:
                 sizes[m.name] = unit_size
                 bf_members.add(m.name)
                 # Store bit offset and width as metadata
-                if not hasattr(m, '_bit_offset'):
+                if m._bit_offset is None:
                     m._bit_offset = bf_bits_used
                     m._bit_width = bw
                 bf_bits_used += bw
@@ -758,7 +758,7 @@ class SemanticAnalyzer:
         if bf_members:
             layout._bf_info = {}
             for m in members:
-                if m.name in bf_members and hasattr(m, '_bit_offset'):
+                if m.name in bf_members and m._bit_offset is not None:
                     layout._bf_info[m.name] = (m._bit_offset, m._bit_width)
         return layout
 
@@ -11,7 +11,74 @@ from __future__ import annotations
 import os
 import shutil
 import subprocess
-from typing import Dict, List, Optional
+import sys
+from typing import Dict, List, Optional, Sequence
+
+
+# gcc-style ``-fuse-ld=NAME`` spellings and the linker binary each selects.
+FUSE_LD_LINKERS: Dict[str, str] = {
+    "bfd": "ld.bfd",
+    "gold": "ld.gold",
+    "lld": "ld.lld",
+    "mold": "ld.mold",
+}
+
+
+def linker_for_fuse_ld(name: str) -> str:
+    """Map a ``-fuse-ld=`` value to a linker executable.
+
+    Known names map through :data:`FUSE_LD_LINKERS`; anything containing a
+    path separator is taken as an explicit linker path (as gcc does).
+    Raises ``ValueError`` for unknown names.
+    """
+    if os.sep in name:
+        return name
+    try:
+        return FUSE_LD_LINKERS[name]
+    except KeyError:
+        known = ", ".join(sorted(FUSE_LD_LINKERS))
+        raise ValueError(f"unsupported -fuse-ld={name} (expected one of: {known})") from None
+
+
+# tmpfs is only used for staging when it has at least this much room, so a
+# small container /dev/shm (often 64 MiB) never causes ENOSPC mid-build.
+_TMPFS_MIN_FREE = 256 * 1024 * 1024
+
+
+def staging_dir() -> Optional[str]:
+    """Directory for intermediate .s/.o files, or *None* for the default.
+
+    ``$PYCC_TMPDIR`` (set by the driver's ``--tmpdir``) wins; otherwise
+    ``/dev/shm`` is used when it is a writable tmpfs with enough free space,
+    so objects between compile and link never touch disk.
+    """
+    env = os.environ.get("PYCC_TMPDIR")
+    if env:
+        return env
+    shm = "/dev/shm"
+    try:
+        if os.path.isdir(shm) and os.access(shm, os.W_OK | os.X_OK):
+            st = os.statvfs(shm)
+            if st.f_bavail * st.f_frsize >= _TMPFS_MIN_FREE:
+                return shm
+    except (OSError, AttributeError):
+        pass
+    return None
+
+
+def memfd_object(name: str) -> Optional[int]:
+    """Create an anonymous in-memory file for an intermediate object.
+
+    Returns the file descriptor, or *None* off Linux / when ``memfd_create``
+    is unavailable.  Tools address it as ``/proc/self/fd/N``, so the fd must
+    be handed to them via ``pass_fds``; the caller closes it after linking.
+    """
+    if sys.platform != "linux" or not hasattr(os, "memfd_create"):
+        return None
+    try:
+        return os.memfd_create(name)
+    except OSError:
+        return None
 
 
 class Toolchain:
@@ -195,13 +262,13 @@ class Toolchain:
     # Runners
     # ------------------------------------------------------------------
 
-    def run_assemble(self, asm_path: str, obj_path: str) -> None:
+    def run_assemble(self, asm_path: str, obj_path: str, *, pass_fds: Sequence[int] = ()) -> None:
         """Assemble *asm_path* into *obj_path* using the system assembler."""
-        _run_cmd([self.assembler, "-o", obj_path, asm_path], "assemble")
+        _run_cmd([self.assembler, "-o", obj_path, asm_path], "assemble", pass_fds=pass_fds)
 
-    def run_link(self, cmd: List[str]) -> None:
+    def run_link(self, cmd: List[str], *, pass_fds: Sequence[int] = ()) -> None:
         """Execute a linker command (as returned by :meth:`build_link_cmd`)."""
-        _run_cmd(cmd, "link")
+        _run_cmd(cmd, "link", pass_fds=pass_fds)
 
     # ------------------------------------------------------------------
     # Internal
@@ -328,11 +395,12 @@ def _probe_gcc_lib_dirs() -> List[str]:
     return dirs
 
 
-def _run_cmd(cmd: List[str], what: str) -> None:
+def _run_cmd(cmd: List[str], what: str, *, pass_fds: Sequence[int] = ()) -> None:
     """Run *cmd* and raise ``CalledProcessError`` on failure."""
     p = subprocess.run(
         cmd, check=False,
         stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True,
+        pass_fds=tuple(pass_fds),
     )
     if p.returncode != 0:
         msg = p.stderr.strip() or p.stdout.strip() or "(no output)"
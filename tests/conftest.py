@@ -20,3 +20,10 @@ def _cleanup_stale_files():
                 os.unlink(path)
             except OSError:
                 pass
+
+
+@pytest.fixture(autouse=True)
+def _isolated_object_cache(monkeypatch, tmp_path_factory):
+    """Point the pycc object cache (inherited by subprocesses) at a fresh
+    scratch directory, so tests neither write to nor reuse ~/.cache/pycc."""
+    monkeypatch.setenv("PYCC_CACHE_DIR", str(tmp_path_factory.mktemp("pycc-cache")))
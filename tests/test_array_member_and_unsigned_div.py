@@ -44,7 +44,7 @@ void test(struct S *p) {
         assert "imulq $4" not in asm
 
     def test_pointer_arrow_int_array_store(self):
-        """p->arr[i] = val where arr is int[] must use movl with imulq $4."""
+        """p->arr[i] = val where arr is int[] must use movl with a 4-byte index scale."""
         code = '''
 struct S {
     long x;
@@ -57,7 +57,7 @@ void test(struct S *p) {
         asm = _compile_to_asm(code)
         # Must use 4-byte store
         assert "movl" in asm
-        assert "imulq $4" in asm
+        assert "(%rax,%rcx,4)" in asm
 
     def test_pointer_arrow_byte_array_load(self):
         """val = p->arr[i] where arr is unsigned char[] must load 1 byte."""
@@ -91,7 +91,7 @@ int test(void) {
 '''
         asm = _compile_to_asm(code)
         # Should compile without errors and use correct element size
-        assert "imulq $4" in asm
+        assert "(%rax,%rcx,4)" in asm
 
 
 class TestFunctionPointerDereference:
@@ -143,6 +143,7 @@ unsigned long test(unsigned long a, unsigned long b) {
         asm = _compile_to_asm(code)
         assert "divq" in asm
         assert "idivq" not in asm
+        assert "xorl %edx, %edx\n  divq %rcx" in asm
 
     def test_signed_division_unchanged(self):
         """int / int must still use idivq."""
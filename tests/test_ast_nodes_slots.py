@@ -0,0 +1,25 @@
+import sys
+
+import pytest
+
+from pycc.ast_nodes import BinaryOp, Identifier, IntLiteral, Type
+
+
+@pytest.mark.skipif(sys.version_info < (3, 10), reason="dataclass slots need Python 3.10")
+def test_expression_nodes_have_no_instance_dict():
+    lhs = Identifier(name="x", line=1, column=1)
+    node = BinaryOp(operator="+", left=lhs, right=IntLiteral(value=1, line=1, column=5), line=1, column=3)
+    for n in (lhs, node, node.right):
+        assert not hasattr(n, "__dict__")
+    with pytest.raises(AttributeError):
+        node.bogus = 1  # type: ignore[attr-defined]
+
+
+def test_annotation_slots_default_and_stay_out_of_equality():
+    a = Identifier(name="x", line=1, column=1)
+    b = Identifier(name="x", line=1, column=1)
+    assert a.resolved_type is None and a.type is None
+    a.type = Type(base="int", line=1, column=1)
+    a.resolved_type = object()
+    assert a == b
+    assert "resolved_type" not in repr(a)
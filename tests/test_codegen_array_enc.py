@@ -0,0 +1,15 @@
+from pycc import codegen
+
+
+def test_parse_array_enc():
+    assert codegen._parse_array_enc("array(int,$4)") == ("int", 4)
+    assert codegen._parse_array_enc(" array(struct S, $12) ") == ("struct S", 12)
+    assert codegen._parse_array_enc("array(char,$N)") == ("char", 1)
+    assert codegen._parse_array_enc("array(char)") == ("char", 1)
+
+
+def test_parse_array_enc_is_cached():
+    enc = "array(long,$7)"
+    first = codegen._parse_array_enc(enc)
+    assert codegen._ARRAY_ENC_CACHE[enc] is first
+    assert codegen._parse_array_enc(enc) is first
@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+import subprocess
+from pathlib import Path
+
+from pycc.codegen import CodeGenerator
+from pycc.compiler import Compiler
+from pycc.ir import IRInstruction
+
+
+def _asm(*body):
+    ins = [IRInstruction(op="func_begin", label="f"), *body, IRInstruction(op="func_end")]
+    return CodeGenerator(optimize=False).generate(ins)
+
+
+def _binop(a, b, bop):
+    return _asm(
+        IRInstruction(op="binop", result="%t1", operand1=a, operand2=b, label=bop),
+        IRInstruction(op="ret", operand1="%t1"),
+    )
+
+
+def test_literal_operands_skip_rcx():
+    assert "  shlq $3, %rax\n  movq %rax, %rbx\n" in _binop("@x", "$8", "*")
+    assert "  leaq (%rax,%rax,4), %rax\n" in _binop("$5", "@x", "*")
+    assert "  imulq $7, %rax, %rax\n" in _binop("@x", "$7", "*")
+    assert "  addq $3, %rax\n" in _binop("$3", "@x", "+")
+    assert "  negq %rax\n  addq $3, %rax\n" in _binop("$3", "@x", "-")
+    assert "  sarq $2, %rax\n" in _binop("@x", "$2", ">>")
+    assert "%rcx" not in _binop("@x", "$0", "+")
+
+
+def test_power_of_two_division_rounds_toward_zero():
+    asm = _binop("@x", "$8", "/")
+    assert "  sarq $63, %rdx\n  shrq $61, %rdx\n  addq %rdx, %rax\n  sarq $3, %rax\n" in asm
+    assert "idivq" not in asm
+    assert "idivq" in _binop("@x", "$6", "/")
+
+
+def test_literal_binops_are_folded():
+    assert "  movq $42, %rbx\n" in _binop("$6", "$7", "*")
+
+
+def test_literal_binops_run(tmp_path: Path):
+    code = r'''
+    long sdiv(long x) { return x / 8 + x % 8 * 100 + x / 1 + x % 1; }
+    int smod(int x) { return x % 16 * 1000 + x / 4; }
+    unsigned long udiv(unsigned long x) { return x / 8 + x % 8 * 100 + (x >> 3); }
+    unsigned uarith(unsigned x) { return x * 8 + x * 5 + (x ^ -1) + (100 - x) + (x >> 2) + (x & 0xF); }
+    long mul(long x) { return x * 0 + x * 1 + x * -1 + x * 3 + x * 9 + x * 1024 + 7 * x + (x & 0xFFFFFFFF) + (x ^ -1); }
+    int main(void) {
+      unsigned u = uarith(4000000000u);
+      if (sdiv(-13) != -13 / 8 + -13 % 8 * 100 + -13) return 1;
+      if (sdiv(13) != 1 + 500 + 13) return 2;
+      if (smod(-37) != -5000 - 9) return 3;
+      if (smod(37) != 5000 + 9) return 4;
+      if (udiv(77) != 9 + 500 + 9) return 5;
+      if (u != 2050327139u) return 6;
+      if (mul(-5) != 0 - 5 + 5 - 15 - 45 - 5120 - 35 + 4294967291L + 4) return 7;
+      if (mul(6) != 6 - 6 + 18 + 54 + 6144 + 42 + 6 - 7) return 8;
+      return 0;
+    }
+    '''.lstrip()
+
+    c_path = tmp_path / "t.c"
+    out_path = tmp_path / "t"
+    c_path.write_text(code)
+
+    for optimize in (False, True):
+        res = Compiler(optimize=optimize).compile_file(str(c_path), str(out_path))
+        assert res.success, "compile failed: " + "\n".join(res.errors)
+
+        p = subprocess.run([str(out_path)])
+        assert p.returncode == 0
@@ -0,0 +1,145 @@
+from __future__ import annotations
+
+import subprocess
+from pathlib import Path
+
+from pycc.codegen import CodeGenerator
+from pycc.compiler import Compiler
+from pycc.ir import IRInstruction
+
+
+def _body_asm(body):
+    ins = [IRInstruction(op="func_begin", label="f"), *body, IRInstruction(op="func_end")]
+    return CodeGenerator(optimize=False).generate(ins)
+
+
+def test_compare_feeding_only_a_jump_is_not_materialized():
+    asm = _body_asm([
+        IRInstruction(op="binop", result="%t1", operand1="$1", operand2="$2", label="<"),
+        IRInstruction(op="jz", operand1="%t1", label=".L1"),
+        IRInstruction(op="label", label=".L1"),
+        IRInstruction(op="ret", operand1="$0"),
+    ])
+    assert "  cmpq %rcx, %rax\n  jge .L1\n" in asm
+    assert "setl" not in asm
+
+
+def test_compare_with_other_readers_is_still_stored():
+    asm = _body_asm([
+        IRInstruction(op="binop", result="%t1", operand1="$1", operand2="$2", label="u>"),
+        IRInstruction(op="jnz", operand1="%t1", label=".L1"),
+        IRInstruction(op="label", label=".L1"),
+        IRInstruction(op="ret", operand1="%t1"),
+    ])
+    assert "  xorl %edx, %edx\n  cmpq %rcx, %rax\n  seta %dl\n  movq %rdx, %rax\n  movq %rax, " in asm
+    assert "\n  ja .L1\n" in asm
+
+
+def test_fused_compare_jumps_run(tmp_path: Path):
+    code = r'''
+    int main(void) {
+      int i, n = 0;
+      unsigned int u = 4000000000u;
+      long l = -5;
+      for (i = 0; i < 10; i++) {
+        if (i == 3) continue;
+        if (i >= 8) break;
+        n++;
+      }
+      if (n != 7) return 1;
+      if (u <= 3000000000u) return 2;
+      if (l > 0) return 3;
+      while (l != 0) l++;
+      i = 0;
+      do { i += 2; } while (i < 9);
+      if (i != 10) return 4;
+      if (!(i > 3) || i == 11) return 5;
+      return 0;
+    }
+    '''.lstrip()
+
+    c_path = tmp_path / "t.c"
+    out_path = tmp_path / "t"
+    c_path.write_text(code)
+
+    res = Compiler(optimize=False).compile_file(str(c_path), str(out_path))
+    assert res.success, "compile failed: " + "\n".join(res.errors)
+
+    p = subprocess.run([str(out_path)])
+    assert p.returncode == 0
+
+
+def test_zero_checks_use_test():
+    asm = _body_asm([
+        IRInstruction(op="unop", result="%t1", operand1="@x", label="!"),
+        IRInstruction(op="binop", result="%t2", operand1="%t1", operand2="@y", label="&&"),
+        IRInstruction(op="jz", operand1="%t2", label=".L1"),
+        IRInstruction(op="label", label=".L1"),
+        IRInstruction(op="ret", operand1="$0"),
+    ])
+    assert "cmpq $0" not in asm
+    assert "  testq %rax, %rax\n  je .L1\n" in asm
+
+
+def _select(cond_jump, else_label=".Lelse"):
+    return [
+        cond_jump,
+        IRInstruction(op="mov", result="%t0", operand1="$1"),
+        IRInstruction(op="jmp", label=".Lend"),
+        IRInstruction(op="label", label=else_label),
+        IRInstruction(op="mov", result="%t0", operand1="$2"),
+        IRInstruction(op="label", label=".Lend"),
+        IRInstruction(op="ret", operand1="%t0"),
+    ]
+
+
+def test_ternary_select_uses_cmov():
+    asm = _body_asm([
+        IRInstruction(op="binop", result="%t1", operand1="$1", operand2="$2", label="<"),
+        *_select(IRInstruction(op="jz", operand1="%t1", label=".Lelse")),
+    ])
+    assert "  cmpq %rcx, %rax\n  movl $2, %eax\n  movl $1, %ecx\n  cmovl %rcx, %rax\n" in asm
+    assert ".Lelse" not in asm
+
+    asm = _body_asm(_select(IRInstruction(op="jnz", operand1="%t1", label=".Lelse")))
+    assert "  testq %rax, %rax\n  movl $2, %eax\n  movl $1, %ecx\n  cmove %rcx, %rax\n" in asm
+
+
+def test_select_with_shared_else_label_keeps_jumps():
+    asm = _body_asm([
+        IRInstruction(op="jz", operand1="%t2", label=".Lelse"),
+        *_select(IRInstruction(op="jz", operand1="%t1", label=".Lelse")),
+    ])
+    assert "cmov" not in asm
+    assert ".Lelse:" in asm
+
+
+def test_ternary_selects_run(tmp_path: Path):
+    code = r'''
+    int g = 7;
+    int f1(int c, int a, int b) { return c > 3 ? a : b; }
+    int f2(int c, int a, int b) { return c ? a : b; }
+    unsigned f3(unsigned c) { return c < 5u ? 1 : 0; }
+    int f4(int c) { return !c ? g : 9; }
+    long f5(long c, long a) { return c == 0 ? a : -1; }
+    char f6(char x, char y) { return x < y ? x : y; }
+    int main(void) {
+      if (f1(5, 1, 2) != 1 || f1(2, 1, 2) != 2) return 1;
+      if (f2(0, 1, 2) != 2 || f2(3, 1, 2) != 1) return 2;
+      if (f3(4) != 1 || f3(6) != 0) return 3;
+      if (f4(0) != 7 || f4(1) != 9) return 4;
+      if (f5(0, 123456789012L) != 123456789012L || f5(1, 3) != -1) return 5;
+      if (f6(-3, 4) != -3 || f6(9, -8) != -8) return 6;
+      return 0;
+    }
+    '''.lstrip()
+
+    c_path = tmp_path / "t.c"
+    out_path = tmp_path / "t"
+    c_path.write_text(code)
+
+    res = Compiler(optimize=False).compile_file(str(c_path), str(out_path))
+    assert res.success, "compile failed: " + "\n".join(res.errors)
+
+    p = subprocess.run([str(out_path)])
+    assert p.returncode == 0
@@ -0,0 +1,48 @@
+from __future__ import annotations
+
+import subprocess
+from pathlib import Path
+
+from pycc.codegen import CodeGenerator
+from pycc.compiler import Compiler
+from pycc.ir import IRInstruction
+
+
+def test_unread_temp_results_are_not_stored():
+    ins = [
+        IRInstruction(op="func_begin", label="f"),
+        IRInstruction(op="call", result="%t1", operand1="@g", args=[]),
+        IRInstruction(op="mov", result="%t2", operand1="$7"),
+        IRInstruction(op="binop", result="%t3", operand1="$1", operand2="$2", label="+"),
+        IRInstruction(op="ret", operand1="%t3"),
+        IRInstruction(op="func_end"),
+    ]
+    asm = CodeGenerator(optimize=False).generate(ins)
+    assert "  call g\n  movq $3, %rbx\n" in asm
+    assert "$7" not in asm
+
+
+def test_discarded_results_run(tmp_path: Path):
+    code = r'''
+    int n;
+    int bump(void) { return ++n; }
+    int main(void) {
+      int x = 5;
+      bump();
+      x + 1;
+      (void)bump();
+      x++;
+      if (n != 2 || x != 6) return 1;
+      return 0;
+    }
+    '''.lstrip()
+
+    c_path = tmp_path / "t.c"
+    out_path = tmp_path / "t"
+    c_path.write_text(code)
+
+    res = Compiler(optimize=False).compile_file(str(c_path), str(out_path))
+    assert res.success, "compile failed: " + "\n".join(res.errors)
+
+    p = subprocess.run([str(out_path)])
+    assert p.returncode == 0
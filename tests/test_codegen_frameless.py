@@ -0,0 +1,77 @@
+from __future__ import annotations
+
+import subprocess
+from pathlib import Path
+
+from pycc.codegen import CodeGenerator
+from pycc.compiler import Compiler
+from pycc.ir import IRInstruction
+
+
+def _asm(body):
+    ins = [IRInstruction(op="func_begin", label="f"), *body, IRInstruction(op="func_end")]
+    return CodeGenerator(optimize=False).generate(ins)
+
+
+def test_leaf_without_locals_has_no_frame():
+    asm = _asm([IRInstruction(op="ret", operand1="$7")])
+    assert "f:\n  movl $7, %eax\n  ret\n" in asm
+    assert "%rbp" not in asm
+
+
+def test_frameless_leaf_pushes_its_temp_registers():
+    asm = _asm([
+        IRInstruction(op="binop", result="%t1", operand1="@g", operand2="$1", label="+"),
+        IRInstruction(op="ret", operand1="%t1"),
+    ])
+    assert "f:\n  pushq %rbx\n" in asm
+    assert "  movq %rbx, %rax\n  popq %rbx\n  ret\n" in asm
+    assert "%rbp" not in asm
+
+
+def test_calls_and_params_keep_the_frame():
+    asm = _asm([
+        IRInstruction(op="call", result="%t1", operand1="@g", args=[]),
+        IRInstruction(op="ret", operand1="%t1"),
+    ])
+    assert "  pushq %rbp\n  movq %rsp, %rbp\n" in asm
+    assert "  leave\n  ret\n" in asm
+
+    asm = _asm([
+        IRInstruction(op="param", result="@x", operand1="int"),
+        IRInstruction(op="ret", operand1="@x"),
+    ])
+    assert "  pushq %rbp\n  movq %rsp, %rbp\n" in asm
+
+
+def test_frameless_leaves_run(tmp_path: Path):
+    code = r'''
+    int g = 5;
+    long arr[4] = {1, 2, 3, 4};
+    int *gp = &g;
+    int seven(void) { return 7; }
+    int gsum(void) { return g * 2 + (int)arr[2]; }
+    int deref(void) { return *gp + 1; }
+    int pick(void) { return g > 3 ? 10 : 20; }
+    void setg(void) { g = g + 100; }
+    int main(void) {
+      if (seven() != 7) return 1;
+      if (gsum() != 13) return 2;
+      if (deref() != 6) return 3;
+      if (pick() != 10) return 4;
+      setg();
+      if (g != 105) return 5;
+      return 0;
+    }
+    '''.lstrip()
+
+    c_path = tmp_path / "t.c"
+    out_path = tmp_path / "t"
+    c_path.write_text(code)
+
+    for optimize in (False, True):
+        res = Compiler(optimize=optimize).compile_file(str(c_path), str(out_path))
+        assert res.success, "compile failed: " + "\n".join(res.errors)
+
+        p = subprocess.run([str(out_path)])
+        assert p.returncode == 0
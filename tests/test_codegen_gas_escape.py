@@ -0,0 +1,12 @@
+from pycc.codegen import CodeGenerator
+
+
+def test_gas_escape_specials_and_printable():
+    cg = CodeGenerator(optimize=False)
+    assert cg._gas_escape('a"b\\c\n\t\r\0~') == '"a\\"b\\\\c\\n\\t\\r\\0~"'
+
+
+def test_gas_escape_control_and_utf8_bytes_are_octal():
+    cg = CodeGenerator(optimize=False)
+    assert cg._gas_escape("\x01\x7f") == '"\\001\\177"'
+    assert cg._gas_escape("é") == '"\\303\\251"'
@@ -0,0 +1,77 @@
+from __future__ import annotations
+
+import subprocess
+from pathlib import Path
+
+from pycc.codegen import CodeGenerator
+from pycc.compiler import Compiler
+from pycc.ir import IRInstruction
+
+
+def test_mov_immediate_stores_directly_to_slot():
+    cg = CodeGenerator(optimize=False)
+    cg.assembly_lines = []
+    cg._locals = {"%t1": 8}
+    cg._emit_ins(IRInstruction(op="mov", result="%t1", operand1="$42"))
+    assert cg.assembly_lines == ["  movq $42, -8(%rbp)"]
+
+
+def test_mov_wide_immediate_goes_through_rax():
+    cg = CodeGenerator(optimize=False)
+    cg.assembly_lines = []
+    cg._locals = {"%t1": 8}
+    cg._emit_ins(IRInstruction(op="mov", result="%t1", operand1="$4294967296"))
+    assert cg.assembly_lines == ["  movq $4294967296, %rax", "  movq %rax, -8(%rbp)"]
+
+
+def test_unop_on_literal_is_folded():
+    cg = CodeGenerator(optimize=False)
+    cg.assembly_lines = []
+    cg._locals = {"%t1": 8}
+    cg._emit_ins(IRInstruction(op="unop", result="%t1", operand1="$5", label="-"))
+    assert cg.assembly_lines == ["  movq $-5, -8(%rbp)"]
+
+
+def test_small_nonnegative_immediates_load_with_movl():
+    cg = CodeGenerator(optimize=False)
+    cg.assembly_lines = []
+    cg._load_operand("$7", "%rcx")
+    cg._load_operand("$4294967295", "%rax")
+    cg._load_operand("$-1", "%rax")
+    cg._load_operand("$4294967296", "%rdx")
+    assert cg.assembly_lines == [
+        "  movl $7, %ecx",
+        "  movl $4294967295, %eax",
+        "  movq $-1, %rax",
+        "  movq $4294967296, %rdx",
+    ]
+
+
+def test_literal_stores_truncate_like_register_stores(tmp_path: Path):
+    code = r'''
+    int main(void) {
+      char c = 300;
+      unsigned char uc = 255;
+      short s = 70000;
+      int i = -7;
+      long l = 4294967296L;
+      long m = -2147483648L;
+      if (c != 44) return 1;
+      if (uc != 255) return 2;
+      if (s != 4464) return 3;
+      if (i != -7) return 4;
+      if (l != 4294967296L) return 5;
+      if (m != -2147483648L) return 6;
+      return 0;
+    }
+    '''.lstrip()
+
+    c_path = tmp_path / "t.c"
+    out_path = tmp_path / "t"
+    c_path.write_text(code)
+
+    res = Compiler(optimize=False).compile_file(str(c_path), str(out_path))
+    assert res.success, "compile failed: " + "\n".join(res.errors)
+
+    p = subprocess.run([str(out_path)])
+    assert p.returncode == 0
@@ -0,0 +1,104 @@
+from __future__ import annotations
+
+import subprocess
+from pathlib import Path
+
+from pycc.codegen import CodeGenerator
+from pycc.compiler import Compiler
+
+
+def test_index_operand_folds_sib_scales():
+    cg = CodeGenerator(optimize=False)
+    cg.assembly_lines = []
+    assert cg._index_operand(1) == "(%rax,%rcx)"
+    assert cg._index_operand(8) == "(%rax,%rcx,8)"
+    assert cg.assembly_lines == []
+
+
+def test_index_operand_scales_other_sizes_explicitly():
+    cg = CodeGenerator(optimize=False)
+    cg.assembly_lines = []
+    assert cg._index_operand(12) == "(%rax)"
+    assert cg.assembly_lines == ["  imulq $12, %rcx", "  addq %rcx, %rax"]
+
+
+def test_index_address_uses_lea():
+    cg = CodeGenerator(optimize=False)
+    cg.assembly_lines = []
+    cg._index_address(4)
+    cg._index_address(3)
+    assert cg.assembly_lines == ["  leaq (%rax,%rcx,4), %rax", "  imulq $3, %rcx", "  addq %rcx, %rax"]
+
+
+def test_scaled_index_loads_and_stores_run(tmp_path: Path):
+    code = r'''
+    struct P { int a; int b; int c; };
+    int main(void) {
+      signed char sc[4];
+      unsigned char uc[4];
+      short s[4];
+      int i[4];
+      long l[4];
+      struct P p[3];
+      int m[2][3];
+      int k;
+      for (k = 0; k < 4; k++) {
+        sc[k] = -k;
+        uc[k] = 250 + k;
+        s[k] = -1000 * k;
+        i[k] = 100000 * k;
+        l[k] = 10000000000L * k;
+      }
+      for (k = 0; k < 3; k++) {
+        p[k].b = k + 7;
+        m[1][k] = k * 3;
+      }
+      if (sc[3] != -3) return 1;
+      if (uc[3] != 253) return 2;
+      if (s[2] != -2000) return 3;
+      if (i[3] != 300000) return 4;
+      if (l[2] != 20000000000L) return 5;
+      if (p[2].b != 9) return 6;
+      if (m[1][2] != 6) return 7;
+      return 0;
+    }
+    '''.lstrip()
+
+    c_path = tmp_path / "t.c"
+    out_path = tmp_path / "t"
+    c_path.write_text(code)
+
+    res = Compiler(optimize=False).compile_file(str(c_path), str(out_path))
+    assert res.success, "compile failed: " + "\n".join(res.errors)
+
+    p = subprocess.run([str(out_path)])
+    assert p.returncode == 0
+
+
+def test_constant_offset_stack_accesses_run(tmp_path: Path):
+    code = r'''
+    struct S { char c; short h; int i; long l; unsigned char u; unsigned b : 3; double d; };
+    int main(void) {
+      struct S s;
+      int a[4];
+      char buf[3];
+      s.c = -2; s.h = -300; s.i = 70000; s.l = -5000000000L; s.u = 200; s.b = 5; s.d = 1.5;
+      a[0] = 1; a[3] = -9;
+      buf[2] = 'x';
+      if (s.c != -2 || s.h != -300 || s.i != 70000) return 1;
+      if (s.l != -5000000000L || s.u != 200 || s.b != 5) return 2;
+      if (s.d != 1.5) return 3;
+      if (a[0] != 1 || a[3] != -9 || buf[2] != 'x') return 4;
+      return 0;
+    }
+    '''.lstrip()
+
+    c_path = tmp_path / "t.c"
+    out_path = tmp_path / "t"
+    c_path.write_text(code)
+
+    res = Compiler(optimize=False).compile_file(str(c_path), str(out_path))
+    assert res.success, "compile failed: " + "\n".join(res.errors)
+
+    p = subprocess.run([str(out_path)])
+    assert p.returncode == 0
@@ -69,7 +69,7 @@ def _make_codegen_with_struct(struct_tag="struct Point", members=None):
     cg = CodeGenerator(optimize=False, sema_ctx=sema_ctx, sym_table=sym_table)
     cg._var_types = {}
     # Simulate function context
-    cg._locals = {"@s": -16}
+    cg._locals = {"@s": 16}
     cg._arrays = {}
     cg._member_offsets = {}
     cg._spill_capacity = 4096
@@ -103,7 +103,7 @@ class TestLoadMemberCType:
         )
         cg._emit_ins(ins)
         asm = "\n".join(cg.assembly_lines)
-        assert "movl (%rax), %eax" in asm
+        assert "movl -16(%rbp), %eax" in asm
 
     def test_load_member_char_uses_movsbl(self):
         """load_member with result_type=CHAR (signed) should emit movsbl."""
@@ -118,8 +118,8 @@ class TestLoadMemberCType:
         # Signed char: sign-extend
         assert "movsb" in asm.lower() or "movsbq" in asm.lower()
 
-    def test_load_member_unsigned_char_uses_movzbl(self):
-        """load_member with result_type=unsigned CHAR should emit movzbl."""
+    def test_load_member_unsigned_char_uses_movzbq(self):
+        """load_member with result_type=unsigned CHAR should emit movzbq."""
         members = [("uc", 0, 1, "unsigned char",
                      IntegerType(kind=TypeKind.CHAR, is_unsigned=True))]
         cg = _make_codegen_with_struct("struct S", members)
@@ -130,11 +130,10 @@ class TestLoadMemberCType:
         cg._emit_ins(ins)
         asm = "\n".join(cg.assembly_lines)
         # Unsigned char: zero-extend
-        assert "movb (%rax), %al" in asm
-        assert "movzbq" in asm
+        assert "movzbq -16(%rbp), %rax" in asm
 
-    def test_load_member_short_uses_movw(self):
-        """load_member with result_type=SHORT should emit movw (2-byte load)."""
+    def test_load_member_short_uses_movswq(self):
+        """load_member with result_type=SHORT should emit a sign-extending 2-byte load."""
         members = [("s", 0, 2, "short", IntegerType(kind=TypeKind.SHORT))]
         cg = _make_codegen_with_struct("struct S", members)
         ins = IRInstruction(
@@ -143,7 +142,7 @@ class TestLoadMemberCType:
         )
         cg._emit_ins(ins)
         asm = "\n".join(cg.assembly_lines)
-        assert "movw (%rax), %ax" in asm
+        assert "movswq -16(%rbp), %rax" in asm
 
     def test_load_member_pointer_uses_movq(self):
         """load_member with result_type=POINTER should emit movq (8-byte load)."""
@@ -158,7 +157,7 @@ class TestLoadMemberCType:
         )
         cg._emit_ins(ins)
         asm = "\n".join(cg.assembly_lines)
-        assert "movq (%rax), %rax" in asm
+        assert "movq -16(%rbp), %rax" in asm
 
     def test_load_member_fallback_without_result_type(self):
         """load_member without result_type falls back to _resolve_member."""
@@ -170,7 +169,7 @@ class TestLoadMemberCType:
         cg._emit_ins(ins)
         asm = "\n".join(cg.assembly_lines)
         # Should still produce valid assembly via string fallback
-        assert "(%rax)" in asm
+        assert "-16(%rbp)" in asm
 
 
 # ---------------------------------------------------------------------------
@@ -204,32 +203,32 @@ class TestStoreMemberCType:
     def test_store_member_int_uses_movl(self):
         """store_member with member_ctype=INT should emit movl (4-byte store)."""
         cg = _make_codegen_with_struct()
-        cg._locals["%t1"] = -24
+        cg._locals["%t1"] = 24
         ins = IRInstruction(
             op="store_member", result="%t1", operand1="@s", operand2="x",
             meta={"member_ctype": IntegerType(kind=TypeKind.INT)},
         )
         cg._emit_ins(ins)
         asm = "\n".join(cg.assembly_lines)
-        assert "movl %ecx, (%rax)" in asm
+        assert "movl %ecx, -16(%rbp)" in asm
 
     def test_store_member_char_uses_movb(self):
         """store_member with member_ctype=CHAR should emit movb (1-byte store)."""
         members = [("c", 0, 1, "char", IntegerType(kind=TypeKind.CHAR))]
         cg = _make_codegen_with_struct("struct S", members)
-        cg._locals["%t1"] = -24
+        cg._locals["%t1"] = 24
         ins = IRInstruction(
             op="store_member", result="%t1", operand1="@s", operand2="c",
             meta={"member_ctype": IntegerType(kind=TypeKind.CHAR)},
         )
         cg._emit_ins(ins)
         asm = "\n".join(cg.assembly_lines)
-        assert "movb %cl, (%rax)" in asm
+        assert "movb %cl, -16(%rbp)" in asm
 
     def test_store_member_fallback_without_member_ctype(self):
         """store_member without member_ctype falls back to _resolve_member."""
         cg = _make_codegen_with_struct()
-        cg._locals["%t1"] = -24
+        cg._locals["%t1"] = 24
         ins = IRInstruction(
             op="store_member", result="%t1", operand1="@s", operand2="x",
             meta={},
@@ -237,7 +236,7 @@ class TestStoreMemberCType:
         cg._emit_ins(ins)
         asm = "\n".join(cg.assembly_lines)
         # Should still produce valid assembly via string fallback
-        assert "(%rax)" in asm
+        assert "-16(%rbp)" in asm
 
 
 # ---------------------------------------------------------------------------
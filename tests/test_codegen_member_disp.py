@@ -0,0 +1,49 @@
+from __future__ import annotations
+
+import subprocess
+from pathlib import Path
+
+from pycc.compiler import Compiler
+
+
+CODE = r'''
+struct S { char c; unsigned char u; short h; int i; long l; double d; float f; };
+struct S g;
+int sum(struct S *p) { return p->c + p->u + p->h + p->i + (int)p->l + (int)p->d + (int)p->f; }
+void fill(struct S *p) {
+  p->c = -3; p->u = 250; p->h = -700; p->i = 100000; p->l = 7; p->d = 2.5; p->f = 1.5f;
+}
+int main(void) {
+  fill(&g);
+  if (sum(&g) != 99557) return 1;
+  if (g.c != -3 || g.u != 250 || g.h != -700 || g.l != 7) return 2;
+  g.i = g.i + 1;
+  if (sum(&g) != 99558) return 3;
+  return 0;
+}
+'''.lstrip()
+
+
+def _compile(tmp_path: Path, optimize: bool):
+    c_path = tmp_path / "t.c"
+    out_path = tmp_path / "t"
+    c_path.write_text(CODE)
+    res = Compiler(optimize=optimize).compile_file(str(c_path), str(out_path))
+    assert res.success, "compile failed: " + "\n".join(res.errors)
+    return res
+
+
+def test_member_offsets_fold_into_displacement(tmp_path: Path):
+    asm = _compile(tmp_path, optimize=True).assembly
+    assert "  movzbq 1(%rax), %rax\n" in asm
+    assert "  movswq 2(%rax), %rax\n" in asm
+    assert "  movl %ecx, 4(%rax)\n" in asm
+    assert "  movsd 16(%rax), %xmm0\n" in asm
+    assert "addq $" not in asm.split("fill:")[1].split("main:")[0].replace("addq $8, %rsp", "")
+
+
+def test_member_access_runs(tmp_path: Path):
+    for optimize in (False, True):
+        _compile(tmp_path, optimize)
+        p = subprocess.run([str(tmp_path / "t")])
+        assert p.returncode == 0
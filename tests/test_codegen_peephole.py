@@ -0,0 +1,202 @@
+from __future__ import annotations
+
+import subprocess
+from pathlib import Path
+
+from pycc.codegen import CodeGenerator
+from pycc.compiler import Compiler
+
+
+def _peep(lines):
+    cg = CodeGenerator(optimize=True)
+    cg.assembly_lines = list(lines)
+    cg._peephole()
+    return cg.assembly_lines
+
+
+def test_peephole_drops_reboolify_after_setcc():
+    lines = [
+        "  cmpq %rcx, %rax",
+        "  setl %al",
+        "  movzbq %al, %rax",
+        "  testq %rax, %rax",
+        "  setne %al",
+        "  movzbq %al, %rax",
+        "  movq %rax, -8(%rbp)",
+    ]
+    assert _peep(lines) == lines[:3] + lines[6:]
+
+
+def test_peephole_drops_reboolify_after_compare():
+    lines = [
+        "  xorl %edx, %edx",
+        "  cmpq %rcx, %rax",
+        "  setl %dl",
+        "  movq %rdx, %rax",
+        "  testq %rax, %rax",
+        "  setne %al",
+        "  movzbq %al, %rax",
+        "  movq %rax, -8(%rbp)",
+    ]
+    assert _peep(lines) == lines[:4] + lines[7:]
+
+
+def test_peephole_keeps_reboolify_when_flags_are_consumed():
+    lines = [
+        "  setl %al",
+        "  movzbq %al, %rax",
+        "  testq %rax, %rax",
+        "  setne %al",
+        "  movzbq %al, %rax",
+        "  jne .L1",
+    ]
+    assert _peep(lines) == lines
+
+
+def test_peephole_keeps_boolify_of_arbitrary_value():
+    lines = [
+        "  movq -8(%rbp), %rax",
+        "  testq %rax, %rax",
+        "  setne %al",
+        "  movzbq %al, %rax",
+    ]
+    assert _peep(lines) == lines
+
+
+def test_peephole_drops_reboolify_after_logical_and_or():
+    lines = [
+        "  testq %rax, %rax",
+        "  setne %al",
+        "  movzbq %al, %rax",
+        "  testq %rcx, %rcx",
+        "  setne %cl",
+        "  movzbq %cl, %rcx",
+        "  orq %rcx, %rax",
+        "  testq %rax, %rax",
+        "  setne %al",
+        "  movzbq %al, %rax",
+        "  movq %rax, -8(%rbp)",
+    ]
+    assert _peep(lines) == lines[:7] + lines[10:]
+
+
+def test_peephole_keeps_reboolify_after_plain_and():
+    lines = [
+        "  andq %rcx, %rax",
+        "  testq %rax, %rax",
+        "  setne %al",
+        "  movzbq %al, %rax",
+    ]
+    assert _peep(lines) == lines
+
+
+def test_peephole_drops_self_move():
+    lines = ["  movq %rax, %rax", "  movq %rcx, %rax", "  movl %eax, %eax"]
+    assert _peep(lines) == lines[1:]
+
+
+def test_peephole_drops_zext_after_32bit_write():
+    lines = [
+        "  movl -8(%rbp), %eax",
+        "  movl %eax, %eax",
+        "  movl -16(%rbp), %ecx",
+        "  addl %ecx, %eax",
+        "  movl %eax, %eax",
+        "  movq %rax, -24(%rbp)",
+    ]
+    assert _peep(lines) == [lines[0], lines[2], lines[3], lines[5]]
+
+
+def test_peephole_keeps_zext_of_64bit_value():
+    lines = [
+        "  movq -8(%rbp), %rax",
+        "  movl %eax, %eax",
+        "  cmpl %ecx, %eax",
+        "  movl %eax, %eax",
+        ".L1:",
+        "  movl %eax, %eax",
+    ]
+    assert _peep(lines) == lines
+
+
+def test_peephole_drops_reload_after_spill():
+    lines = [
+        "  addq %rcx, %rax",
+        "  movq %rax, -24(%rbp)",
+        "  movq -24(%rbp), %rax",
+        "  movq %rcx, -32(%rbp)",
+        "  movq -32(%rbp), %rcx",
+    ]
+    assert _peep(lines) == [lines[0], lines[1], lines[3]]
+
+
+def test_peephole_keeps_reload_of_other_slot_or_register():
+    lines = [
+        "  movq %rax, -24(%rbp)",
+        "  movq -32(%rbp), %rax",
+        "  movq %rax, -40(%rbp)",
+        "  movq -40(%rbp), %rcx",
+        "  movq %rax, -48(%rbp)",
+        ".L1:",
+        "  movq -48(%rbp), %rax",
+        "  movl %eax, -56(%rbp)",
+        "  movl -56(%rbp), %eax",
+    ]
+    assert _peep(lines) == lines
+
+
+def test_shift_and_logical_or_emit_no_redundant_moves(tmp_path: Path):
+    code = r'''
+    int main(void) {
+      int a = 3;
+      unsigned int u = 0x80000000u;
+      long l = -16;
+      int z = 0;
+      if ((a << 2) != 12) return 1;
+      if ((u >> 31) != 1u) return 2;
+      if ((l >> 2) != -4) return 3;
+      if ((z || a) != 1) return 4;
+      if ((z || z) != 0) return 5;
+      if ((u >> z) != 0x80000000u) return 6;
+      return 0;
+    }
+    '''.lstrip()
+
+    c_path = tmp_path / "t.c"
+    out_path = tmp_path / "t"
+    c_path.write_text(code)
+
+    res = Compiler(optimize=False).compile_file(str(c_path), str(out_path))
+    assert res.success, "compile failed: " + "\n".join(res.errors)
+    assert "movb %cl, %cl" not in (res.assembly or "")
+    assert "shrl %cl, %eax\n  movl %eax, %eax" not in (res.assembly or "")
+
+    p = subprocess.run([str(out_path)])
+    assert p.returncode == 0
+
+
+def test_unsigned_arith_runs_without_redundant_zext(tmp_path: Path):
+    code = r'''
+    unsigned int mix(unsigned int a, unsigned int b) {
+      unsigned int x = a * 2654435761u + b;
+      x ^= x >> 13;
+      return x - (a << 3);
+    }
+    int main(void) {
+      unsigned int r = mix(0xdeadbeefu, 12345u);
+      unsigned long w = r;
+      if (w > 0xffffffffUL) return 1;
+      if (r != 2807027769u) return 2;
+      return 0;
+    }
+    '''.lstrip()
+
+    c_path = tmp_path / "t.c"
+    out_path = tmp_path / "t"
+    c_path.write_text(code)
+
+    res = Compiler(optimize=True).compile_file(str(c_path), str(out_path))
+    assert res.success, "compile failed: " + "\n".join(res.errors)
+
+    p = subprocess.run([str(out_path)])
+    assert p.returncode == 0
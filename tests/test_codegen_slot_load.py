@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+import subprocess
+from pathlib import Path
+
+from pycc.codegen import CodeGenerator, _slot_load_insn, _slot_store_width
+from pycc.compiler import Compiler
+
+
+def test_slot_load_insn_by_type():
+    assert _slot_load_insn("char", False) == "movsbq"
+    assert _slot_load_insn("signed char", False) == "movsbq"
+    assert _slot_load_insn("unsigned char", False) == "movzbq"
+    assert _slot_load_insn("unsigned char*", False) == "movq"
+    assert _slot_load_insn("short", True) == "movswq"
+    assert _slot_load_insn("unsigned short", True) == "movzwq"
+    assert _slot_load_insn("enum E", False) == "movslq"
+    assert _slot_load_insn("unsigned int", True) == "movl"
+    assert _slot_load_insn("array(int,$4)", False) == "leaq"
+    assert _slot_load_insn("array(int,$4)", True) == "movq"
+    assert _slot_load_insn("long", False) == "movq"
+
+
+def test_slot_store_width_by_type():
+    assert _slot_store_width("char") == 1
+    assert _slot_store_width(" unsigned char ") == 1
+    assert _slot_store_width("unsigned char*") == 8
+    assert _slot_store_width("short int") == 2
+    assert _slot_store_width("enum E") == 4
+    assert _slot_store_width("unsigned int") == 4
+    assert _slot_store_width("long") == 8
+    assert _slot_store_width("") == 8
+
+
+def test_unsigned_int_slot_loads_into_requested_register():
+    cg = CodeGenerator(optimize=False)
+    cg.assembly_lines = []
+    cg._load_slot(8, "unsigned int", False, "%rcx")
+    cg._load_slot(8, "unsigned int", False, "%rax")
+    cg._load_slot(8, "unsigned int", False, "%r12")
+    assert cg.assembly_lines == [
+        "  movl -8(%rbp), %ecx",
+        "  movl -8(%rbp), %eax",
+        "  movl %eax, %eax",
+        "  movl -8(%rbp), %eax",
+        "  movl %eax, %eax",
+        "  movq %rax, %r12",
+    ]
+
+
+def test_narrow_locals_load_with_extension(tmp_path: Path):
+    code = r'''
+    int main(void) {
+      signed char sc = -3;
+      unsigned char uc = 250;
+      short s = -300;
+      unsigned short us = 65000;
+      unsigned int u = 4000000000u;
+      int a[2] = {1, 2};
+      long sum = sc + uc + s + us;
+      if (sum != -3 + 250 - 300 + 65000) return 1;
+      if ((long)u != 4000000000L) return 2;
+      if (a[1] != 2) return 3;
+      return 0;
+    }
+    '''.lstrip()
+
+    c_path = tmp_path / "t.c"
+    out_path = tmp_path / "t"
+    c_path.write_text(code)
+
+    res = Compiler(optimize=False).compile_file(str(c_path), str(out_path))
+    assert res.success, "compile failed: " + "\n".join(res.errors)
+
+    p = subprocess.run([str(out_path)])
+    assert p.returncode == 0
+
+
+def test_type_str_cache_follows_register_type():
+    from pycc.types import IntegerType, TypedSymbolTable, TypeKind
+
+    st = TypedSymbolTable(None)
+    st.push_scope()
+    st.insert("@x", IntegerType(kind=TypeKind.CHAR))
+    cg = CodeGenerator(optimize=False, sym_table=st)
+    assert cg._get_type_str("@x") == "char"
+    assert cg._get_type_str("%t0") == ""
+    cg._register_type("@x", IntegerType(kind=TypeKind.LONG))
+    assert cg._get_type_str("@x") == "long"
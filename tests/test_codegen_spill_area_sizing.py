@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+import re
+import subprocess
+from pathlib import Path
+
+from pycc.codegen import CodeGenerator
+from pycc.compiler import Compiler
+
+
+def _frame_sizes(asm: str):
+    return [int(m) for m in re.findall(r"subq \$(\d+), %rsp", asm)]
+
+
+def test_spill_area_is_sized_from_function_body(tmp_path: Path):
+    terms = " + ".join(f"(a * {i} - b / {i + 1})" for i in range(1, 60))
+    code = f'''
+    int small(void) {{ return 1; }}
+    int big(int a, int b) {{ return {terms}; }}
+    int main(void) {{
+      int expect = 0;
+      int i;
+      for (i = 1; i < 60; i++) expect += 7 * i - 3 / (i + 1);
+      return (small() == 1 && big(7, 3) == expect) ? 0 : 1;
+    }}
+    '''
+
+    c_path = tmp_path / "t.c"
+    out_path = tmp_path / "t"
+    c_path.write_text(code)
+
+    res = Compiler(optimize=False).compile_file(str(c_path), str(out_path))
+    assert res.success, "compile failed: " + "\n".join(res.errors)
+    # Frames are trimmed to the slots actually used, not the estimate.
+    assert max(_frame_sizes(res.assembly or "")) < 256
+
+    p = subprocess.run([str(out_path)])
+    assert p.returncode == 0
+
+
+def test_spill_area_growth_patches_current_function_prologue():
+    cg = CodeGenerator(optimize=False)
+    cg.assembly_lines = [
+        "f:", "  pushq %rbp", "  movq %rsp, %rbp", "  subq $32, %rsp", "  ret",
+        "g:", "  pushq %rbp", "  movq %rsp, %rbp", "  subq $32, %rsp",
+    ]
+    cg._prologue_subq_idx = 8
+    cg._locals = {}
+    cg._locals_base = 16
+    cg._spill_capacity = 16
+    cg._spill_used = 8
+    cg._stack_size = 32
+
+    off = cg._ensure_local("%t9", size=16)
+
+    assert off == 16 + 8 + 16
+    assert cg.assembly_lines[3] == "  subq $32, %rsp"
+    assert cg.assembly_lines[8] == f"  subq ${cg._stack_size}, %rsp"
+    assert cg._stack_size % 16 == 0 and cg._stack_size >= off
+
+
+def test_finish_frame_covers_late_locals():
+    cg = CodeGenerator(optimize=False)
+    cg.assembly_lines = ["f:", "  pushq %rbp", "  movq %rsp, %rbp", "  ret"]
+    cg._prologue_subq_idx = None
+    cg._prologue_end_idx = 3
+    cg._locals = {}
+    cg._locals_base = 0
+    cg._spill_capacity = 0
+    cg._spill_used = 0
+    cg._stack_size = 0
+
+    off = cg._ensure_local("@late")
+    cg._finish_frame()
+
+    assert cg.assembly_lines[3] == "  subq $16, %rsp"
+    assert cg.assembly_lines[4] == "  ret"
+    assert cg._stack_size >= off
+
+    # A frame that already covers every slot is left alone.
+    cg._finish_frame()
+    assert cg.assembly_lines.count("  subq $16, %rsp") == 1
+
+
+def test_finish_frame_trims_unused_spill_area():
+    cg = CodeGenerator(optimize=False)
+    cg.assembly_lines = ["f:", "  pushq %rbp", "  movq %rsp, %rbp", "  subq $272, %rsp", "  ret"]
+    cg._prologue_subq_idx = 3
+    cg._locals = {"@x": 8, "%t1": 24}
+    cg._stack_size = 272
+
+    cg._finish_frame()
+    assert cg.assembly_lines[3] == "  subq $32, %rsp"
+    assert cg._stack_size == 32
+
+    # With no slots at all the frame-size line goes away.
+    cg._locals = {}
+    cg._finish_frame()
+    assert cg.assembly_lines == ["f:", "  pushq %rbp", "  movq %rsp, %rbp", "  ret"]
@@ -0,0 +1,125 @@
+from __future__ import annotations
+
+import subprocess
+from pathlib import Path
+
+from pycc.codegen import CodeGenerator
+from pycc.compiler import Compiler
+from pycc.ir import IRInstruction
+
+
+def _asm(body):
+    ins = [IRInstruction(op="func_begin", label="f"), *body, IRInstruction(op="func_end")]
+    return CodeGenerator(optimize=False).generate(ins)
+
+
+def test_temps_live_in_callee_saved_registers():
+    asm = _asm([
+        IRInstruction(op="call", result="%t1", operand1="@g", args=[]),
+        IRInstruction(op="binop", result="%t2", operand1="%t1", operand2="$2", label="*"),
+        IRInstruction(op="call", result="%t3", operand1="@h", args=["%t2"]),
+        IRInstruction(op="binop", result="%t4", operand1="%t2", operand2="%t3", label="+"),
+        IRInstruction(op="ret", operand1="%t4"),
+    ])
+    # %t2 is live across the call to h, so it cannot share %rbx with %t3.
+    assert "  call g\n  movq %rax, %rbx\n  movq %rbx, %rax\n" in asm
+    assert "  shlq $1, %rax\n  movq %rax, %r12\n" in asm
+    # %t4 is defined by the op that last reads %t2/%t3, so it takes %r13.
+    assert "  movq %r12, %rax\n  movq %rbx, %rcx\n  addq %rcx, %rax\n  movq %rax, %r13\n" in asm
+    assert "  movq %rbx, -8(%rbp)\n  movq %r12, -16(%rbp)\n  movq %r13, -24(%rbp)\n" in asm
+    assert "  movq -8(%rbp), %rbx\n  movq -16(%rbp), %r12\n  movq -24(%rbp), %r13\n  leave\n  ret\n" in asm
+
+
+def test_address_taken_temps_keep_their_slot():
+    asm = _asm([
+        IRInstruction(op="mov", result="%t1", operand1="$5"),
+        IRInstruction(op="addr_of", result="%t2", operand1="%t1"),
+        IRInstruction(op="ret", operand1="%t2"),
+    ])
+    assert "  movq $5, -16(%rbp)\n  leaq -16(%rbp), %rax\n  movq %rax, %rbx\n" in asm
+
+
+def test_temp_live_around_a_loop_keeps_its_register():
+    asm = _asm([
+        IRInstruction(op="mov", result="%t1", operand1="$3"),
+        IRInstruction(op="label", label=".Lhead"),
+        IRInstruction(op="mov", result="%t2", operand1="$1"),
+        IRInstruction(op="binop", result="%t3", operand1="%t1", operand2="%t2", label="-"),
+        IRInstruction(op="jnz", operand1="%t3", label=".Lhead"),
+        IRInstruction(op="ret", operand1="$0"),
+    ])
+    assert "  movq $3, %rbx\n" in asm
+    assert "  movq $1, %r12\n" in asm
+
+
+def test_register_temps_run(tmp_path: Path):
+    code = r'''
+    long fib(long n) {
+      if (n < 2) return n;
+      return fib(n - 1) + fib(n - 2);
+    }
+    int sum(int *p, int n) {
+      int i, s = 0;
+      for (i = 0; i < n; i++) s += p[i] * (i + 1);
+      return s;
+    }
+    long wide(long a, long b) {
+      return ((a + 1) * (b + 2)) + ((a + 3) * (b + 4)) + ((a + 5) * (b + 6))
+           + ((a + 7) * (b + 8)) + ((a + 9) * (b + 10)) - fib(a) * (b - fib(b));
+    }
+    int main(void) {
+      int a[5] = {1, 2, 3, 4, 5};
+      unsigned u = 4000000000u;
+      char c = -3;
+      if (fib(15) != 610) return 1;
+      if (sum(a, 5) != 55) return 2;
+      if (wide(6, 7) != 803) return 3;
+      if ((u >> 1) + 1 != 2000000001u) return 4;
+      if (c * 2 + (c < 0) != -5) return 5;
+      return 0;
+    }
+    '''.lstrip()
+
+    c_path = tmp_path / "t.c"
+    out_path = tmp_path / "t"
+    c_path.write_text(code)
+
+    for optimize in (False, True):
+        res = Compiler(optimize=optimize).compile_file(str(c_path), str(out_path))
+        assert res.success, "compile failed: " + "\n".join(res.errors)
+
+        p = subprocess.run([str(out_path)])
+        assert p.returncode == 0
+
+
+def test_register_temps_survive_variadic_callee(tmp_path: Path):
+    # Earlier vsum() results stay in callee-saved registers across the
+    # later calls, so va_start must not use one of them as scratch.
+    code = r'''
+    #include <stdarg.h>
+    int vsum(int n, ...) {
+      va_list ap;
+      int i, s = 0;
+      va_start(ap, n);
+      for (i = 0; i < n; i++) s += va_arg(ap, int);
+      va_end(ap);
+      return s;
+    }
+    int trio(int a, int b, int c) { return a * 10000 + b * 100 + c; }
+    int main(void) {
+      if (trio(vsum(1, 3), vsum(4, 1, 2, 3, 4), vsum(0)) != 31000) return 1;
+      if (trio(vsum(2, 5, 6), vsum(1, 7), vsum(3, 1, 1, 1)) != 110703) return 2;
+      return 0;
+    }
+    '''.lstrip()
+
+    c_path = tmp_path / "t.c"
+    out_path = tmp_path / "t"
+    c_path.write_text(code)
+
+    for optimize in (False, True):
+        res = Compiler(optimize=optimize).compile_file(str(c_path), str(out_path))
+        assert res.success, "compile failed: " + "\n".join(res.errors)
+
+        p = subprocess.run([str(out_path)])
+        assert p.returncode == 0
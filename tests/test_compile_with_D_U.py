@@ -41,3 +41,49 @@ int main(void) { return 2; }
     assert res2.returncode == 0, res2.stderr
     run2 = subprocess.run([str(out2)])
     assert run2.returncode == 2
+
+
+def test_D_operand_parsing_and_validation(tmp_path: Path):
+    src = tmp_path / "main.c"
+    src.write_text("int a = A; int b = B; int c = C;\n")
+    repo = Path(__file__).resolve().parents[1]
+
+    res = subprocess.run(
+        [sys.executable, "pycc.py", "-E", "-D", " A = 4 ", "-DB", "-DC=", str(src)],
+        cwd=repo,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        text=True,
+    )
+    assert res.returncode == 0, res.stderr
+    assert "int a = 4; int b = 1; int c = ;" in res.stdout
+
+    bad = subprocess.run(
+        [sys.executable, "pycc.py", "-E", "-D1X=2", str(src)],
+        cwd=repo,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        text=True,
+    )
+    assert bad.returncode != 0
+    assert "invalid -D argument" in bad.stdout
+
+
+def test_D_accepts_function_like_macros(tmp_path: Path):
+    src = tmp_path / "main.c"
+    src.write_text("int main(void) { return SQ(3) + ADD(1, 2); }\n")
+    repo = Path(__file__).resolve().parents[1]
+
+    for extra in ([], ["--use-system-cpp"]):
+        out = tmp_path / "a.out"
+        res = subprocess.run(
+            [sys.executable, "pycc.py", *extra, "-DSQ(x)=((x)*(x))", "-D", "ADD(a, b) = ((a)+(b))",
+             str(src), "-o", str(out)],
+            cwd=repo,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            text=True,
+        )
+        assert res.returncode == 0, res.stdout + res.stderr
+        run = subprocess.run([str(out)])
+        assert run.returncode == 12
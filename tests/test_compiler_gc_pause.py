@@ -0,0 +1,38 @@
+import gc
+
+import pytest
+
+from pycc import compiler as compiler_mod
+from pycc.compiler import Compiler
+
+
+def test_gc_paused_while_parsing_and_restored(monkeypatch):
+    seen = []
+    real_parse = compiler_mod.Parser.parse
+
+    def parse(self):
+        seen.append(gc.isenabled())
+        return real_parse(self)
+
+    monkeypatch.setattr(compiler_mod.Parser, "parse", parse)
+    c = Compiler()
+    c.get_ast(c.get_tokens("int main(void) { return 0; }\n"))
+    assert seen == [False]
+    assert gc.isenabled()
+
+
+def test_gc_restored_after_parse_error():
+    c = Compiler()
+    with pytest.raises(Exception):
+        c.get_ast(c.get_tokens("int main(void) { return 0 }\n"))
+    assert gc.isenabled()
+
+
+def test_gc_left_disabled_if_caller_disabled_it():
+    gc.disable()
+    try:
+        c = Compiler()
+        c.get_ast(c.get_tokens("int x;\n"))
+        assert not gc.isenabled()
+    finally:
+        gc.enable()
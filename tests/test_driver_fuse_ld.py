@@ -0,0 +1,40 @@
+from __future__ import annotations
+
+import shutil
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+
+
+def _run(args, cwd):
+    return subprocess.run(
+        [sys.executable, str(REPO_ROOT / "pycc.py"), *args],
+        cwd=str(cwd),
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        text=True,
+    )
+
+
+@pytest.mark.skipif(shutil.which("ld.bfd") is None, reason="ld.bfd not available")
+def test_fuse_ld_selects_linker_for_multi_input(tmp_path: Path):
+    (tmp_path / "a.c").write_text("extern int f(void);\nint main(void){ return f(); }\n", encoding="utf-8")
+    (tmp_path / "b.c").write_text("int f(void){ return 0; }\n", encoding="utf-8")
+    out = tmp_path / "prog"
+
+    r = _run(["-v", "-fuse-ld=bfd", "a.c", "b.c", "-o", str(out)], tmp_path)
+    assert r.returncode == 0, r.stdout + r.stderr
+    assert "[pycc] link: ld.bfd " in r.stdout
+    assert subprocess.run([str(out)]).returncode == 0
+
+
+def test_fuse_ld_rejects_unknown_name(tmp_path: Path):
+    (tmp_path / "a.c").write_text("int main(void){ return 0; }\n", encoding="utf-8")
+    r = _run(["-fuse-ld=nosuch", "a.c", "-o", str(tmp_path / "prog")], tmp_path)
+    assert r.returncode == 1
+    assert "unsupported -fuse-ld=nosuch" in r.stdout
@@ -0,0 +1,73 @@
+from __future__ import annotations
+
+import subprocess
+import sys
+from pathlib import Path
+
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+
+
+def _run(args, cwd):
+    return subprocess.run(
+        [sys.executable, str(REPO_ROOT / "pycc.py"), *args],
+        cwd=str(cwd),
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        text=True,
+    )
+
+
+def test_driver_multi_input_three_tus_link(tmp_path: Path):
+    (tmp_path / "a.c").write_text(
+        "extern int f(void);\nextern int g(void);\nint main(void){ return f() + g() == 5 ? 0 : 1; }\n",
+        encoding="utf-8",
+    )
+    (tmp_path / "b.c").write_text("int f(void){ return 2; }\n", encoding="utf-8")
+    (tmp_path / "c.c").write_text("int g(void){ return 3; }\n", encoding="utf-8")
+    out = tmp_path / "prog"
+
+    r = _run(["a.c", "b.c", "c.c", "-o", str(out)], tmp_path)
+    assert r.returncode == 0, r.stdout + r.stderr
+
+    run = subprocess.run([str(out)])
+    assert run.returncode == 0
+
+
+def test_driver_multi_input_reports_failing_tu(tmp_path: Path):
+    (tmp_path / "a.c").write_text("int main(void){ return 0; }\n", encoding="utf-8")
+    (tmp_path / "b.c").write_text("int f(void){ return ; + }\n", encoding="utf-8")
+    out = tmp_path / "prog"
+
+    r = _run(["a.c", "b.c", "-o", str(out)], tmp_path)
+    assert r.returncode == 1
+    assert "Error:" in r.stdout
+    assert not out.exists()
+
+
+def test_driver_multi_input_fails_fast_on_first_bad_tu(tmp_path: Path):
+    # One broken TU among many good ones: the build must still fail cleanly
+    # (pending compiles are cancelled, no partial link).
+    names = []
+    for i in range(6):
+        name = f"ok{i}.c"
+        (tmp_path / name).write_text(f"int f{i}(void){{ return {i}; }}\n", encoding="utf-8")
+        names.append(name)
+    (tmp_path / "bad.c").write_text("int main(void){ return ; + }\n", encoding="utf-8")
+    out = tmp_path / "prog"
+
+    r = _run(["bad.c", *names, "-o", str(out)], tmp_path)
+    assert r.returncode == 1
+    assert "Error:" in r.stdout
+    assert not out.exists()
+
+
+def test_driver_multi_input_prints_warnings_in_source_order(tmp_path: Path):
+    (tmp_path / "a.c").write_text("int main(void){ return fa() + fb(); }\n", encoding="utf-8")
+    (tmp_path / "b.c").write_text("int fa(void){ return 0; }\nint fb(void){ return zb(); }\n", encoding="utf-8")
+    (tmp_path / "c.c").write_text("int zb(void){ return 0; }\n", encoding="utf-8")
+    out = tmp_path / "prog"
+
+    r = _run(["a.c", "b.c", "c.c", "-o", str(out)], tmp_path)
+    assert r.returncode == 0, r.stdout + r.stderr
+    assert r.stderr.index("'fa'") < r.stderr.index("'fb'") < r.stderr.index("'zb'")
@@ -0,0 +1,79 @@
+from __future__ import annotations
+
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+
+
+def _run(args, cwd, cache_dir):
+    env = dict(os.environ)
+    env["PYCC_CACHE_DIR"] = str(cache_dir)
+    return subprocess.run(
+        [sys.executable, str(REPO_ROOT / "pycc.py"), *args],
+        cwd=str(cwd),
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        text=True,
+        env=env,
+    )
+
+
+def _entries(cache_dir: Path):
+    return sorted(p for p in (cache_dir / "objects").glob("*/*") if p.is_file())
+
+
+def test_object_cache_hit_reproduces_output(tmp_path: Path):
+    cache_dir = tmp_path / "cache"
+    (tmp_path / "a.c").write_text("int f(void){ return 42; }\n", encoding="utf-8")
+
+    r = _run(["-S", "a.c", "-o", "first.s"], tmp_path, cache_dir)
+    assert r.returncode == 0, r.stdout + r.stderr
+    entries = _entries(cache_dir)
+    assert len(entries) == 1 and entries[0].suffix == ".s"
+
+    r = _run(["-S", "a.c", "-o", "second.s"], tmp_path, cache_dir)
+    assert r.returncode == 0, r.stdout + r.stderr
+    assert (tmp_path / "second.s").read_text() == (tmp_path / "first.s").read_text()
+    assert _entries(cache_dir) == entries
+
+
+def test_object_cache_key_tracks_source_and_options(tmp_path: Path):
+    cache_dir = tmp_path / "cache"
+    src = tmp_path / "a.c"
+    src.write_text("int f(void){ return 1; }\n", encoding="utf-8")
+    assert _run(["-c", "a.c", "-o", "a.o"], tmp_path, cache_dir).returncode == 0
+    assert _run(["-c", "a.c", "-o", "a.o", "--no-opt"], tmp_path, cache_dir).returncode == 0
+    assert len(_entries(cache_dir)) == 2
+
+    src.write_text("int f(void){ return 2; }\n", encoding="utf-8")
+    r = _run(["-S", "a.c", "-o", "a.s"], tmp_path, cache_dir)
+    assert r.returncode == 0, r.stdout + r.stderr
+    assert "$2" in (tmp_path / "a.s").read_text()
+
+
+def test_no_cache_flag_leaves_cache_untouched(tmp_path: Path):
+    cache_dir = tmp_path / "cache"
+    (tmp_path / "a.c").write_text("int f(void){ return 0; }\n", encoding="utf-8")
+    r = _run(["-c", "a.c", "-o", "a.o", "--no-cache"], tmp_path, cache_dir)
+    assert r.returncode == 0, r.stdout + r.stderr
+    assert (tmp_path / "a.o").exists()
+    assert not (cache_dir / "objects").exists()
+
+
+def test_cache_keeps_a_running_size_and_evicts_lru(tmp_path: Path):
+    from pycc.cache import ObjectCache
+
+    cache = ObjectCache(str(tmp_path / "cache"), max_bytes=250)
+    for i in range(3):
+        src = tmp_path / f"o{i}"
+        src.write_bytes(b"x" * 100)
+        cache.store(f"{i:02d}" + "0" * 62, ".o", str(src))
+        os.utime(cache._entry_path(f"{i:02d}" + "0" * 62, ".o"), (i, i))
+
+    # The third store pushed the total past the cap: the oldest entry went.
+    assert [p.name[:2] for p in _entries(tmp_path / "cache")] == ["01", "02"]
+    assert (tmp_path / "cache" / "objects" / "size").read_text() == "200"
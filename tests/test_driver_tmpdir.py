@@ -0,0 +1,37 @@
+from __future__ import annotations
+
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+
+
+def test_tmpdir_holds_staging_files(tmp_path: Path):
+    # The multi-input objects are staged under --tmpdir and linked from there.
+    (tmp_path / "a.c").write_text("extern int f(void);\nint main(void){ return f(); }\n", encoding="utf-8")
+    (tmp_path / "b.c").write_text("int f(void){ return 0; }\n", encoding="utf-8")
+    stage = tmp_path / "stage"
+    stage.mkdir()
+
+    env = dict(os.environ)
+    env.pop("PYCC_TMPDIR", None)
+    r = subprocess.run(
+        [
+            sys.executable, str(REPO_ROOT / "pycc.py"), "-v",
+            "--tmpdir", str(stage), "a.c", "b.c", "-o", "prog",
+        ],
+        cwd=str(tmp_path),
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        text=True,
+        env=env,
+    )
+    assert r.returncode == 0, r.stdout + r.stderr
+    seen = [line for line in r.stdout.splitlines() if line.startswith("[pycc] link:")]
+    assert seen and str(stage) in seen[0]
+    # Staging directory is cleaned up after the link.
+    assert list(stage.iterdir()) == []
+    assert subprocess.run([str(tmp_path / "prog")]).returncode == 0
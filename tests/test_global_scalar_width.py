@@ -0,0 +1,44 @@
+from __future__ import annotations
+
+import subprocess
+from pathlib import Path
+
+import pytest
+
+from pycc.compiler import Compiler
+
+
+@pytest.mark.parametrize("optimize", [False, True])
+def test_scalar_globals_load_and_store_their_own_width(tmp_path: Path, optimize: bool):
+    code = r'''
+    long g = 5000000000L;
+    unsigned char c = 200;
+    short s = -3;
+    unsigned int u = 4000000000u;
+    char tail = 7;
+    int main(void) {
+      g = g + 1;
+      c = c + 10;
+      s = s - 1;
+      u = u + 1;
+      if (g != 5000000001L) return 1;
+      if (c != 210) return 2;
+      if (s != -4) return 3;
+      if (u != 4000000001u) return 4;
+      if (tail != 7) return 5;
+      return 0;
+    }
+    '''.lstrip()
+
+    c_path = tmp_path / "t.c"
+    out_path = tmp_path / "t"
+    c_path.write_text(code)
+
+    res = Compiler(optimize=optimize).compile_file(str(c_path), str(out_path))
+    assert res.success, "compile failed: " + "\n".join(res.errors)
+    asm = res.assembly or ""
+    assert "movq %rax, g(%rip)" in asm
+    assert "movb %al, c(%rip)" in asm
+
+    p = subprocess.run([str(out_path)])
+    assert p.returncode == 0
@@ -0,0 +1,18 @@
+from pycc.ir import IRGenerator
+from pycc.lexer import Lexer
+from pycc.parser import Parser
+from pycc.semantics import SemanticAnalyzer
+
+
+def _get_ir(code: str):
+    ast = Parser(Lexer(code).tokenize()).parse()
+    gen = IRGenerator()
+    gen._sema_ctx = SemanticAnalyzer().analyze(ast)
+    return gen.generate(ast)
+
+
+def test_equal_string_literals_share_one_operand_object():
+    code = 'int f(const char *s);\nint g(void) { f("same text"); f("other"); return f("same text"); }\n'
+    values = [ins.operand1 for ins in _get_ir(code) if ins.op == "str_const"]
+    assert values == ["same text", "other", "same text"]
+    assert values[0] is values[2]
@@ -0,0 +1,26 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+from pycc.compiler import Compiler
+
+
+def test_compiler_keeps_no_per_tu_state(tmp_path: Path):
+    # A single Compiler is reused for every TU in multi-input builds; it must
+    # not accumulate per-TU attributes (ASTs, symbol tables, ...).
+    a = tmp_path / "a.c"
+    b = tmp_path / "b.c"
+    a.write_text("extern int f(void);\nint main(void){ return f(); }\n", encoding="utf-8")
+    b.write_text("int f(void){ return 0; }\n", encoding="utf-8")
+
+    comp = Compiler(optimize=False)
+    before = dict(vars(comp))
+
+    assert comp.compile_file(str(b), str(tmp_path / "b.s")).success
+    res = comp.compile_files([str(a), str(b)], str(tmp_path / "a.out"))
+    assert res.success, "\n".join(res.errors)
+
+    after = vars(comp)
+    assert after.keys() == before.keys()
+    for k, v in before.items():
+        assert after[k] is v, k
@@ -0,0 +1,26 @@
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+def _run(code: str) -> str:
+    p = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True)
+    assert p.returncode == 0, p.stderr
+    return p.stdout.strip()
+
+
+def test_importing_one_stage_does_not_load_the_pipeline():
+    out = _run("import sys, pycc.lexer; print(sorted(m for m in ('pycc.codegen', 'pycc.ir', 'pycc.compiler') if m in sys.modules))")
+    assert out == "[]"
+
+
+def test_public_names_resolve_on_access():
+    import pycc
+    from pycc.compiler import Compiler
+    from pycc.lexer import Token
+
+    assert pycc.Compiler is Compiler
+    assert pycc.Token is Token
+    assert set(pycc.__all__) <= set(dir(pycc))
@@ -0,0 +1,32 @@
+import sys
+from pathlib import Path
+
+from pycc.preprocessor import Preprocessor
+
+
+def test_include_chain_deeper_than_recursion_limit(tmp_path: Path):
+    depth = sys.getrecursionlimit() + 200
+    for i in range(depth):
+        nxt = f'#include "h{i + 1}.h"\n' if i + 1 < depth else ""
+        (tmp_path / f"h{i}.h").write_text(f"{nxt}int v{i};\n")
+    src = tmp_path / "t.c"
+    src.write_text('#include "h0.h"\nint main(void) { return 0; }\n')
+
+    res = Preprocessor(include_paths=[]).preprocess(str(src))
+    assert res.success, res.errors
+    text = res.text
+    assert text.count("int v") == depth
+    # Innermost header first; each includer resumes after its #include.
+    assert text.index(f"int v{depth - 1};") < text.index("int v0;")
+    assert text.endswith('# 2 "t.c"\nint main(void) { return 0; }\n')
+
+
+def test_include_cycle_reports_chain(tmp_path: Path):
+    (tmp_path / "a.h").write_text('#include "b.h"\n')
+    (tmp_path / "b.h").write_text('#include "a.h"\n')
+    src = tmp_path / "t.c"
+    src.write_text('#include "a.h"\n')
+
+    res = Preprocessor(include_paths=[]).preprocess(str(src))
+    assert not res.success
+    assert "include cycle detected" in res.errors[0]
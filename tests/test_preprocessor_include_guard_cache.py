@@ -0,0 +1,48 @@
+import os
+from pathlib import Path
+
+from pycc import preprocessor
+from pycc.preprocessor import Preprocessor
+
+
+def _pp(path: Path) -> str:
+    res = Preprocessor(include_paths=[]).preprocess(str(path))
+    assert res.success, res.errors
+    return res.text
+
+
+def test_guarded_header_reinclude_emits_only_marker(tmp_path: Path):
+    (tmp_path / "g.h").write_text("/* hdr */\n#ifndef G_H\n#define G_H\nint g;\n#endif\n\n")
+    src = tmp_path / "t.c"
+    src.write_text('#include "g.h"\n#include "g.h"\nint x;\n')
+
+    text = _pp(src)
+    assert text.count("int g;") == 1
+    assert text.count('# 1 "g.h"') == 2
+    assert preprocessor._SOURCE_CACHE[os.path.abspath(tmp_path / "g.h")].guard == "G_H"
+
+
+def test_guard_not_assumed_with_code_outside_or_else_branch(tmp_path: Path):
+    (tmp_path / "a.h").write_text("#ifndef A_H\n#define A_H\n#endif\nint a;\n")
+    (tmp_path / "b.h").write_text("#ifndef B_H\n#define B_H\n#else\nint b;\n#endif\n")
+    src = tmp_path / "t.c"
+    src.write_text('#include "a.h"\n#include "a.h"\n#include "b.h"\n#include "b.h"\n')
+
+    text = _pp(src)
+    assert text.count("int a;") == 2
+    assert text.count("int b;") == 1
+    assert preprocessor._SOURCE_CACHE[os.path.abspath(tmp_path / "a.h")].guard is None
+    assert preprocessor._SOURCE_CACHE[os.path.abspath(tmp_path / "b.h")].guard is None
+
+
+def test_source_cache_picks_up_edits(tmp_path: Path):
+    hdr = tmp_path / "h.h"
+    hdr.write_text("#define V 1\n")
+    src = tmp_path / "t.c"
+    src.write_text('#include "h.h"\nint v = V;\n')
+    assert "int v = 1;" in _pp(src)
+
+    hdr.write_text("#define V 22\n")
+    st = hdr.stat()
+    os.utime(hdr, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+    assert "int v = 22;" in _pp(src)
@@ -0,0 +1,52 @@
+import io
+import subprocess
+import sys
+from pathlib import Path
+
+from pycc.preprocessor import Preprocessor
+
+
+def test_preprocess_to_matches_preprocess(tmp_path: Path):
+    (tmp_path / "a.h").write_text("#define N 3\nint a = N;\n")
+    src = tmp_path / "t.c"
+    src.write_text('#include "a.h"\nint b = N + 1;\n')
+
+    buf = io.StringIO()
+    res = Preprocessor(include_paths=[]).preprocess_to(str(src), buf, initial_macros={})
+    assert res.success
+    assert res.text == ""
+    assert buf.getvalue() == Preprocessor(include_paths=[]).preprocess(str(src)).text
+    assert "int a = 3;" in buf.getvalue()
+    assert "int b = 3 + 1;" in buf.getvalue()
+
+
+def test_E_output_file_removed_on_error(tmp_path: Path):
+    src = tmp_path / "t.c"
+    src.write_text("int x = 1;\n#error boom\n")
+    out = tmp_path / "t.i"
+    r = subprocess.run(
+        [sys.executable, "pycc.py", "-E", str(src), "-o", str(out)],
+        cwd=Path(__file__).resolve().parents[1],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        text=True,
+    )
+    assert r.returncode != 0
+    assert "boom" in r.stdout
+    assert not out.exists()
+
+
+def test_E_stdout_large_output_matches_api(tmp_path: Path):
+    # More than one 1 MiB output chunk.
+    src = tmp_path / "big.c"
+    src.write_text("#define V 7\n" + "".join(f"int v{i} = V;\n" for i in range(90000)))
+    r = subprocess.run(
+        [sys.executable, "pycc.py", "-E", str(src)],
+        cwd=Path(__file__).resolve().parents[1],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        text=True,
+    )
+    assert r.returncode == 0, r.stderr
+    assert r.stdout == Preprocessor(include_paths=[]).preprocess(str(src)).text
+    assert r.stdout.endswith("int v89999 = 7;\n")
@@ -0,0 +1,55 @@
+import sys
+
+from pycc.ast_nodes import CompoundStmt, Declaration, FunctionDecl, IntLiteral, Program, Statement, Type, print_ast
+
+
+def test_print_ast_layout():
+    int_ty = Type(base="int", line=1, column=1)
+    body = CompoundStmt(statements=[], line=1, column=20)
+    prog = Program(
+        declarations=[
+            Declaration(name="g", type=int_ty, initializer=IntLiteral(value=7, line=1, column=9), line=1, column=5),
+            FunctionDecl(
+                name="f",
+                return_type=int_ty,
+                parameters=[Declaration(name="a", type=int_ty, line=2, column=7)],
+                body=body,
+                line=2,
+                column=1,
+            ),
+        ],
+        line=1,
+        column=1,
+    )
+    assert print_ast(prog) == (
+        "Program\n"
+        "  Declaration: g (int)\n"
+        "    Initializer:\n"
+        "      IntLiteral(7)\n"
+        "  FunctionDecl: f\n"
+        "    ReturnType: int\n"
+        "    Parameters:\n"
+        "      Declaration: a (int)\n"
+        "    Body:\n"
+        "      CompoundStmt\n"
+    )
+
+
+def test_print_ast_deeper_than_recursion_limit():
+    depth = sys.getrecursionlimit() + 100
+    node = CompoundStmt(statements=[], line=1, column=1)
+    for _ in range(depth):
+        node = CompoundStmt(statements=[node], line=1, column=1)
+    text = print_ast(node)
+    assert text.count("CompoundStmt\n") == depth + 1
+
+
+def test_print_ast_dispatches_subclasses_through_mro():
+    class TaggedLiteral(IntLiteral):
+        pass
+
+    class Unregistered(Statement):
+        pass
+
+    assert print_ast(TaggedLiteral(value=5, line=1, column=1), 1) == "  IntLiteral(5)\n"
+    assert print_ast(Unregistered(line=1, column=1)) == "Unregistered\n"
@@ -8,7 +8,7 @@ from pathlib import Path
 
 import pytest
 
-from pycc.toolchain import Toolchain, _first_existing, _probe_gcc_crt, _probe_gcc_lib_dirs
+from pycc.toolchain import Toolchain, memfd_object, _first_existing, _probe_gcc_crt, _probe_gcc_lib_dirs
 
 
 # ------------------------------------------------------------------
@@ -187,6 +187,37 @@ def test_toolchain_assemble_and_link(tmp_path: Path):
     assert result.returncode == 0
 
 
+def test_toolchain_assemble_and_link_via_memfd(tmp_path: Path):
+    """The object may live in a memfd addressed as /proc/self/fd/N."""
+    tc = Toolchain()
+    crt = tc.probe_crt_files()
+    if len(crt) < 5:
+        pytest.skip("glibc dev files not found")
+    fd = memfd_object("test.o")
+    if fd is None:
+        pytest.skip("memfd_create not available")
+
+    asm = tmp_path / "test.s"
+    asm.write_text(
+        ".text\n"
+        ".globl main\n"
+        "main:\n"
+        "  movl $7, %eax\n"
+        "  ret\n"
+    )
+    exe = tmp_path / "test"
+    try:
+        obj = f"/proc/self/fd/{fd}"
+        tc.run_assemble(str(asm), obj, pass_fds=(fd,))
+        assert os.fstat(fd).st_size > 0
+        tc.run_link(tc.build_link_cmd([obj], str(exe)), pass_fds=(fd,))
+    finally:
+        os.close(fd)
+
+    result = subprocess.run([str(exe)], stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    assert result.returncode == 7
+
+
 def test_toolchain_link_with_extra_lib(tmp_path: Path):
     """Link a program that calls sqrt via -lm using Toolchain."""
     tc = Toolchain()